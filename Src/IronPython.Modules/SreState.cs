@@ -0,0 +1,1355 @@
+/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Globalization;
+
+namespace IronPython.Modules {
+    /// <summary>
+    /// Matching state of the _sre engine: runs the code produced by sre_compile against a
+    /// string.  This follows the matcher of CPython's _sre.c - backtracking keeps its contexts
+    /// on an explicit stack instead of recursing so deeply nested repeats can't overflow the
+    /// CLR stack, and the code has the same layout with 32 bit code words (CODESIZE 4).
+    /// </summary>
+    internal sealed class SreState {
+        #region Opcodes
+
+        internal const int OP_FAILURE = 0;
+        internal const int OP_SUCCESS = 1;
+        internal const int OP_ANY = 2;
+        internal const int OP_ANY_ALL = 3;
+        internal const int OP_ASSERT = 4;
+        internal const int OP_ASSERT_NOT = 5;
+        internal const int OP_AT = 6;
+        internal const int OP_BRANCH = 7;
+        internal const int OP_CALL = 8;
+        internal const int OP_CATEGORY = 9;
+        internal const int OP_CHARSET = 10;
+        internal const int OP_BIGCHARSET = 11;
+        internal const int OP_GROUPREF = 12;
+        internal const int OP_GROUPREF_EXISTS = 13;
+        internal const int OP_GROUPREF_IGNORE = 14;
+        internal const int OP_IN = 15;
+        internal const int OP_IN_IGNORE = 16;
+        internal const int OP_INFO = 17;
+        internal const int OP_JUMP = 18;
+        internal const int OP_LITERAL = 19;
+        internal const int OP_LITERAL_IGNORE = 20;
+        internal const int OP_MARK = 21;
+        internal const int OP_MAX_UNTIL = 22;
+        internal const int OP_MIN_UNTIL = 23;
+        internal const int OP_NOT_LITERAL = 24;
+        internal const int OP_NOT_LITERAL_IGNORE = 25;
+        internal const int OP_NEGATE = 26;
+        internal const int OP_RANGE = 27;
+        internal const int OP_REPEAT = 28;
+        internal const int OP_REPEAT_ONE = 29;
+        internal const int OP_SUBPATTERN = 30;
+        internal const int OP_MIN_REPEAT_ONE = 31;
+
+        private const int AT_BEGINNING = 0;
+        private const int AT_BEGINNING_LINE = 1;
+        private const int AT_BEGINNING_STRING = 2;
+        private const int AT_BOUNDARY = 3;
+        private const int AT_NON_BOUNDARY = 4;
+        private const int AT_END = 5;
+        private const int AT_END_LINE = 6;
+        private const int AT_END_STRING = 7;
+        private const int AT_LOC_BOUNDARY = 8;
+        private const int AT_LOC_NON_BOUNDARY = 9;
+        private const int AT_UNI_BOUNDARY = 10;
+        private const int AT_UNI_NON_BOUNDARY = 11;
+
+        private const int CATEGORY_DIGIT = 0;
+        private const int CATEGORY_NOT_DIGIT = 1;
+        private const int CATEGORY_SPACE = 2;
+        private const int CATEGORY_NOT_SPACE = 3;
+        private const int CATEGORY_WORD = 4;
+        private const int CATEGORY_NOT_WORD = 5;
+        private const int CATEGORY_LINEBREAK = 6;
+        private const int CATEGORY_NOT_LINEBREAK = 7;
+        private const int CATEGORY_LOC_WORD = 8;
+        private const int CATEGORY_LOC_NOT_WORD = 9;
+        private const int CATEGORY_UNI_DIGIT = 10;
+        private const int CATEGORY_UNI_NOT_DIGIT = 11;
+        private const int CATEGORY_UNI_SPACE = 12;
+        private const int CATEGORY_UNI_NOT_SPACE = 13;
+        private const int CATEGORY_UNI_WORD = 14;
+        private const int CATEGORY_UNI_NOT_WORD = 15;
+        private const int CATEGORY_UNI_LINEBREAK = 16;
+        private const int CATEGORY_UNI_NOT_LINEBREAK = 17;
+
+        internal const int FLAG_IGNORECASE = 2;
+        internal const int FLAG_LOCALE = 4;
+        internal const int FLAG_UNICODE = 32;
+
+        private const int INFO_PREFIX = 1;
+        private const int INFO_LITERAL = 2;
+        private const int INFO_CHARSET = 4;
+
+        /// <summary>
+        /// Maximum repeat count, an unbounded repeat has this as its maximum.
+        /// </summary>
+        internal const long MAXREPEAT = UInt32.MaxValue;
+
+        internal const int ERROR_ILLEGAL = -1;
+        internal const int ERROR_STATE = -2;
+
+        #endregion
+
+        #region Continuations
+
+        // after a sub-match returns, the context that started it continues at one of these
+        private const int Entrance = 100;
+        private const int Exit = 101;
+        private const int BranchNext = 102;
+        private const int JumpBranch = 103;
+        private const int RepeatOneNext = 104;
+        private const int JumpRepeatOne = 105;
+        private const int RepeatOneLiteralNext = 106;
+        private const int JumpRepeatOneLiteral = 107;
+        private const int MinRepeatOneNext = 108;
+        private const int JumpMinRepeatOne = 109;
+        private const int JumpRepeat = 110;
+        private const int JumpMaxUntil1 = 111;
+        private const int JumpMaxUntil2 = 112;
+        private const int MaxUntilTail = 113;
+        private const int JumpMaxUntil3 = 114;
+        private const int JumpMinUntil1 = 115;
+        private const int JumpMinUntil2 = 116;
+        private const int JumpMinUntil3 = 117;
+        private const int JumpAssert = 118;
+        private const int JumpAssertNot = 119;
+
+        #endregion
+
+        private readonly int[]/*!*/ _code;
+        private readonly string/*!*/ _text;
+        private readonly int _flags;
+
+        /// <summary>Start of the current match attempt.</summary>
+        internal int Start;
+        /// <summary>Current position, the end of the match after a successful match.</summary>
+        internal int Ptr;
+        /// <summary>End of the part of the string which is matched.</summary>
+        internal readonly int End;
+        /// <summary>pos and endpos as given by the caller after clipping them to the string.</summary>
+        internal readonly int Pos, EndPos;
+
+        internal int LastMark, LastIndex;
+        private int[]/*!*/ _marks;
+
+        private Repeat _repeat;
+        private Context[]/*!*/ _contexts = new Context[16];
+        private int _contextCount;
+        private int[]/*!*/ _data = new int[64];
+        private int _dataCount;
+
+        internal SreState(int[]/*!*/ code, int flags, int groups, string/*!*/ text, int pos, int endpos) {
+            _code = code;
+            _flags = flags;
+            _text = text;
+            _marks = new int[Math.Max(2 * groups, 2)];
+
+            if (pos < 0) {
+                pos = 0;
+            } else if (pos > text.Length) {
+                pos = text.Length;
+            }
+            if (endpos < 0) {
+                endpos = 0;
+            } else if (endpos > text.Length) {
+                endpos = text.Length;
+            }
+
+            Pos = Start = pos;
+            EndPos = End = endpos;
+            Reset();
+        }
+
+        internal string/*!*/ Text {
+            get { return _text; }
+        }
+
+        internal void Reset() {
+            LastMark = LastIndex = -1;
+            _repeat = null;
+            _contextCount = _dataCount = 0;
+        }
+
+        /// <summary>
+        /// Gets the bounds of a group after a successful match, returns false if the group
+        /// didn't participate in the match.
+        /// </summary>
+        internal bool TryGetGroup(int group, out int start, out int end) {
+            int index = (group - 1) * 2;
+            if (index + 1 <= LastMark && _marks[index] >= 0 && _marks[index + 1] >= 0) {
+                start = _marks[index];
+                end = _marks[index + 1];
+                return true;
+            }
+            start = end = -1;
+            return false;
+        }
+
+        #region Public entry points
+
+        /// <summary>
+        /// Matches at Start.  Returns a positive value on success, zero if there's no match and
+        /// a negative error code if the code is invalid.
+        /// </summary>
+        internal int Match() {
+            Ptr = Start;
+            if (Start > End) {
+                return 0;
+            }
+            return Match(0);
+        }
+
+        /// <summary>
+        /// Searches for a match starting at Start or later.  On success Start and Ptr are the
+        /// bounds of the match.
+        /// </summary>
+        internal int Search() {
+            int[] code = _code;
+            string text = _text;
+            int ptr = Start;
+            int end = End;
+            int pc = 0;
+            int flags = 0, prefixLength = 0, prefixSkip = 0, prefix = 0, overlap = 0, charset = -1;
+
+            if (ptr > end) {
+                return 0;
+            }
+
+            if (code[0] == OP_INFO) {
+                // <INFO> <1=skip> <2=flags> <3=min> <4=max> <5=prefix info>
+                flags = code[2];
+                uint min = (uint)code[3];
+
+                if (min != 0 && end - ptr < min) {
+                    return 0;
+                }
+                if (min > 1) {
+                    // leave at least one character for the literal search
+                    end -= (int)(min - 1);
+                    if (end <= ptr) {
+                        end = ptr;
+                    }
+                }
+
+                if ((flags & INFO_PREFIX) != 0) {
+                    // <length> <skip> <prefix data> <overlap data>
+                    prefixLength = code[5];
+                    prefixSkip = code[6];
+                    prefix = 7;
+                    overlap = prefix + prefixLength - 1;
+                } else if ((flags & INFO_CHARSET) != 0) {
+                    charset = 5;
+                }
+
+                pc = 1 + code[1];
+            }
+
+            int status;
+            if (prefixLength == 1) {
+                // the pattern starts with a literal character
+                int c = code[prefix];
+                if (c > Char.MaxValue) {
+                    return 0;
+                }
+
+                end = End;
+                while (ptr < end) {
+                    while (text[ptr] != c) {
+                        if (++ptr >= end) {
+                            return 0;
+                        }
+                    }
+                    Start = ptr;
+                    Ptr = ptr + prefixSkip;
+                    if ((flags & INFO_LITERAL) != 0) {
+                        return 1;
+                    }
+                    status = Match(pc + 2 * prefixSkip);
+                    if (status != 0) {
+                        return status;
+                    }
+                    ++ptr;
+                    LastMark = LastIndex = -1;
+                }
+                return 0;
+            }
+
+            if (prefixLength > 1) {
+                // the pattern starts with a known prefix, use the overlap table to skip forward
+                end = End;
+                if (prefixLength > end - ptr) {
+                    return 0;
+                }
+                for (int i = 0; i < prefixLength; i++) {
+                    if (code[prefix + i] > Char.MaxValue) {
+                        return 0;
+                    }
+                }
+
+                while (ptr < end) {
+                    int c = code[prefix];
+                    while (text[ptr++] != c) {
+                        if (ptr >= end) {
+                            return 0;
+                        }
+                    }
+                    if (ptr >= end) {
+                        return 0;
+                    }
+
+                    int i = 1;
+                    do {
+                        if (text[ptr] == code[prefix + i]) {
+                            if (++i != prefixLength) {
+                                if (++ptr >= end) {
+                                    return 0;
+                                }
+                                continue;
+                            }
+
+                            // found a potential match
+                            Start = ptr - (prefixLength - 1);
+                            Ptr = ptr - (prefixLength - prefixSkip - 1);
+                            if ((flags & INFO_LITERAL) != 0) {
+                                return 1;
+                            }
+                            status = Match(pc + 2 * prefixSkip);
+                            if (status != 0) {
+                                return status;
+                            }
+                            // close but no cigar -- try again
+                            if (++ptr >= end) {
+                                return 0;
+                            }
+                            LastMark = LastIndex = -1;
+                        }
+                        i = code[overlap + i];
+                    } while (i != 0);
+                }
+                return 0;
+            }
+
+            if (charset >= 0) {
+                // the pattern starts with a character from a known set
+                end = End;
+                for (;;) {
+                    while (ptr < end && !InCharset(charset, text[ptr])) {
+                        ptr++;
+                    }
+                    if (ptr >= end) {
+                        return 0;
+                    }
+                    Start = Ptr = ptr;
+                    status = Match(pc);
+                    if (status != 0) {
+                        return status;
+                    }
+                    ptr++;
+                    LastMark = LastIndex = -1;
+                }
+            }
+
+            for (;;) {
+                Start = Ptr = ptr;
+                status = Match(pc);
+                if (status != 0 || ptr >= end) {
+                    return status;
+                }
+                ptr++;
+                LastMark = LastIndex = -1;
+            }
+        }
+
+        #endregion
+
+        #region Matching
+
+        private sealed class Context {
+            public int Jump, Pc, Ptr, Count, LastMark, LastIndex, Chr;
+            public Repeat Rep;
+        }
+
+        private sealed class Repeat {
+            public int Count, Pc, LastPtr;
+            public Repeat Prev;
+        }
+
+        private Context/*!*/ PushContext(int jump, int pc) {
+            if (_contextCount == _contexts.Length) {
+                Array.Resize(ref _contexts, _contexts.Length * 2);
+            }
+            Context ctx = _contexts[_contextCount];
+            if (ctx == null) {
+                _contexts[_contextCount] = ctx = new Context();
+            }
+            _contextCount++;
+
+            ctx.Jump = jump;
+            ctx.Pc = pc;
+            ctx.Rep = null;
+            return ctx;
+        }
+
+        private int Match(int startPc) {
+            int[] code = _code;
+            string text = _text;
+            int end = End;
+            int baseCount = _contextCount;
+            int ret = 0;
+            int i, p, e;
+            Repeat rep;
+
+            Context ctx = PushContext(Exit, startPc);
+            int op = Entrance;
+
+            for (;;) {
+            Dispatch:
+                switch (op) {
+                    case Entrance:
+                        ctx.Ptr = Ptr;
+                        if (code[ctx.Pc] == OP_INFO) {
+                            // <INFO> <1=skip> <2=flags> <3=min> ...
+                            uint min = (uint)code[ctx.Pc + 3];
+                            if (min != 0 && (uint)(end - ctx.Ptr) < min) {
+                                goto Failure;
+                            }
+                            ctx.Pc += code[ctx.Pc + 1] + 1;
+                        }
+                        break;
+
+                    case Exit: {
+                            int jump = ctx.Jump;
+                            _contextCount--;
+                            if (_contextCount == baseCount) {
+                                return ret;
+                            }
+                            ctx = _contexts[_contextCount - 1];
+                            op = jump;
+                            goto Dispatch;
+                        }
+
+                    case OP_MARK:
+                        // <MARK> <gid>
+                        i = code[ctx.Pc];
+                        if ((i & 1) != 0) {
+                            LastIndex = i / 2 + 1;
+                        }
+                        if (i > LastMark) {
+                            // marks between the last valid one and this one haven't been set
+                            if (i >= _marks.Length) {
+                                Array.Resize(ref _marks, i + 2);
+                            }
+                            for (int j = LastMark + 1; j < i; j++) {
+                                _marks[j] = -1;
+                            }
+                            LastMark = i;
+                        }
+                        _marks[i] = ctx.Ptr;
+                        ctx.Pc++;
+                        break;
+
+                    case OP_LITERAL:
+                        // <LITERAL> <code>
+                        if (ctx.Ptr >= end || text[ctx.Ptr] != code[ctx.Pc]) {
+                            goto Failure;
+                        }
+                        ctx.Pc++;
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_NOT_LITERAL:
+                        if (ctx.Ptr >= end || text[ctx.Ptr] == code[ctx.Pc]) {
+                            goto Failure;
+                        }
+                        ctx.Pc++;
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_SUCCESS:
+                        Ptr = ctx.Ptr;
+                        goto Success;
+
+                    case OP_AT:
+                        // <AT> <code>
+                        if (!At(ctx.Ptr, code[ctx.Pc])) {
+                            goto Failure;
+                        }
+                        ctx.Pc++;
+                        break;
+
+                    case OP_CATEGORY:
+                        // <CATEGORY> <code>
+                        if (ctx.Ptr >= end || !Category(code[ctx.Pc], text[ctx.Ptr])) {
+                            goto Failure;
+                        }
+                        ctx.Pc++;
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_ANY:
+                        if (ctx.Ptr >= end || text[ctx.Ptr] == '\n') {
+                            goto Failure;
+                        }
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_ANY_ALL:
+                        if (ctx.Ptr >= end) {
+                            goto Failure;
+                        }
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_IN:
+                        // <IN> <skip> <set>
+                        if (ctx.Ptr >= end || !InCharset(ctx.Pc + 1, text[ctx.Ptr])) {
+                            goto Failure;
+                        }
+                        ctx.Pc += code[ctx.Pc];
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_LITERAL_IGNORE:
+                        if (ctx.Ptr >= end || Lower(text[ctx.Ptr]) != Lower(code[ctx.Pc])) {
+                            goto Failure;
+                        }
+                        ctx.Pc++;
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_NOT_LITERAL_IGNORE:
+                        if (ctx.Ptr >= end || Lower(text[ctx.Ptr]) == Lower(code[ctx.Pc])) {
+                            goto Failure;
+                        }
+                        ctx.Pc++;
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_IN_IGNORE:
+                        if (ctx.Ptr >= end || !InCharset(ctx.Pc + 1, Lower(text[ctx.Ptr]))) {
+                            goto Failure;
+                        }
+                        ctx.Pc += code[ctx.Pc];
+                        ctx.Ptr++;
+                        break;
+
+                    case OP_JUMP:
+                    case OP_INFO:
+                        // <JUMP> <offset>
+                        ctx.Pc += code[ctx.Pc];
+                        break;
+
+                    case OP_BRANCH:
+                        // <BRANCH> <0=skip> code <JUMP> ... <NULL>
+                        ctx.LastMark = LastMark;
+                        ctx.LastIndex = LastIndex;
+                        ctx.Rep = _repeat;
+                        if (ctx.Rep != null) {
+                            MarkPush(ctx.LastMark);
+                        }
+                        goto case BranchNext;
+
+                    case BranchNext:
+                        for (; code[ctx.Pc] != 0; ctx.Pc += code[ctx.Pc]) {
+                            if (code[ctx.Pc + 1] == OP_LITERAL &&
+                                (ctx.Ptr >= end || text[ctx.Ptr] != code[ctx.Pc + 2])) {
+                                continue;
+                            }
+                            if (code[ctx.Pc + 1] == OP_IN &&
+                                (ctx.Ptr >= end || !InCharset(ctx.Pc + 3, text[ctx.Ptr]))) {
+                                continue;
+                            }
+                            Ptr = ctx.Ptr;
+                            ctx = PushContext(JumpBranch, ctx.Pc + 1);
+                            op = Entrance;
+                            goto Dispatch;
+                        }
+                        if (ctx.Rep != null) {
+                            MarkPopDiscard(ctx.LastMark);
+                        }
+                        goto Failure;
+
+                    case JumpBranch:
+                        if (ret != 0) {
+                            if (ctx.Rep != null) {
+                                MarkPopDiscard(ctx.LastMark);
+                            }
+                            goto Return;
+                        }
+                        if (ctx.Rep != null) {
+                            MarkPopKeep(ctx.LastMark);
+                        }
+                        LastMark = ctx.LastMark;
+                        LastIndex = ctx.LastIndex;
+                        ctx.Pc += code[ctx.Pc];
+                        goto case BranchNext;
+
+                    case OP_REPEAT_ONE:
+                        // match a repeated single character item (maximizing)
+                        // <REPEAT_ONE> <skip> <1=min> <2=max> item <SUCCESS> tail
+                        if ((uint)code[ctx.Pc + 1] > end - ctx.Ptr) {
+                            goto Failure;
+                        }
+
+                        Ptr = ctx.Ptr;
+                        ret = Count(ctx.Pc + 3, (uint)code[ctx.Pc + 2]);
+                        if (ret < 0) {
+                            goto Return;
+                        }
+                        ctx.Count = ret;
+                        ctx.Ptr += ctx.Count;
+
+                        // check if the rest of the pattern matches, backtrack if it doesn't
+                        if (ctx.Count < (uint)code[ctx.Pc + 1]) {
+                            goto Failure;
+                        }
+
+                        if (code[ctx.Pc + code[ctx.Pc]] == OP_SUCCESS) {
+                            // tail is empty, we're finished
+                            Ptr = ctx.Ptr;
+                            goto Success;
+                        }
+
+                        ctx.LastMark = LastMark;
+                        ctx.LastIndex = LastIndex;
+
+                        if (code[ctx.Pc + code[ctx.Pc]] == OP_LITERAL) {
+                            // tail starts with a literal, skip positions where the rest of
+                            // the pattern cannot possibly match
+                            ctx.Chr = code[ctx.Pc + code[ctx.Pc] + 1];
+                            goto case RepeatOneLiteralNext;
+                        }
+                        goto case RepeatOneNext;
+
+                    case RepeatOneLiteralNext:
+                        while (ctx.Count >= (uint)code[ctx.Pc + 1] &&
+                            (ctx.Ptr >= end || text[ctx.Ptr] != ctx.Chr)) {
+                            ctx.Ptr--;
+                            ctx.Count--;
+                        }
+                        if (ctx.Count < (uint)code[ctx.Pc + 1]) {
+                            goto Failure;
+                        }
+                        Ptr = ctx.Ptr;
+                        ctx = PushContext(JumpRepeatOneLiteral, ctx.Pc + code[ctx.Pc]);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpRepeatOneLiteral:
+                        if (ret != 0) {
+                            goto Return;
+                        }
+                        LastMark = ctx.LastMark;
+                        LastIndex = ctx.LastIndex;
+                        ctx.Ptr--;
+                        ctx.Count--;
+                        goto case RepeatOneLiteralNext;
+
+                    case RepeatOneNext:
+                        if (ctx.Count < (uint)code[ctx.Pc + 1]) {
+                            goto Failure;
+                        }
+                        Ptr = ctx.Ptr;
+                        ctx = PushContext(JumpRepeatOne, ctx.Pc + code[ctx.Pc]);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpRepeatOne:
+                        if (ret != 0) {
+                            goto Return;
+                        }
+                        ctx.Ptr--;
+                        ctx.Count--;
+                        LastMark = ctx.LastMark;
+                        LastIndex = ctx.LastIndex;
+                        goto case RepeatOneNext;
+
+                    case OP_MIN_REPEAT_ONE:
+                        // match a repeated single character item (minimizing)
+                        // <MIN_REPEAT_ONE> <skip> <1=min> <2=max> item <SUCCESS> tail
+                        if ((uint)code[ctx.Pc + 1] > end - ctx.Ptr) {
+                            goto Failure;
+                        }
+
+                        Ptr = ctx.Ptr;
+                        if (code[ctx.Pc + 1] == 0) {
+                            ctx.Count = 0;
+                        } else {
+                            // count using pattern min as the maximum
+                            ret = Count(ctx.Pc + 3, (uint)code[ctx.Pc + 1]);
+                            if (ret < 0) {
+                                goto Return;
+                            }
+                            if (ret < (uint)code[ctx.Pc + 1]) {
+                                goto Failure;
+                            }
+                            ctx.Count = ret;
+                            ctx.Ptr += ctx.Count;
+                        }
+
+                        if (code[ctx.Pc + code[ctx.Pc]] == OP_SUCCESS) {
+                            // tail is empty, we're finished
+                            Ptr = ctx.Ptr;
+                            goto Success;
+                        }
+
+                        ctx.LastMark = LastMark;
+                        ctx.LastIndex = LastIndex;
+                        goto case MinRepeatOneNext;
+
+                    case MinRepeatOneNext:
+                        if ((uint)code[ctx.Pc + 2] != MAXREPEAT && ctx.Count > (uint)code[ctx.Pc + 2]) {
+                            goto Failure;
+                        }
+                        Ptr = ctx.Ptr;
+                        ctx = PushContext(JumpMinRepeatOne, ctx.Pc + code[ctx.Pc]);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpMinRepeatOne:
+                        if (ret != 0) {
+                            goto Return;
+                        }
+                        Ptr = ctx.Ptr;
+                        ret = Count(ctx.Pc + 3, 1);
+                        if (ret < 0) {
+                            goto Return;
+                        }
+                        if (ret == 0) {
+                            goto Failure;
+                        }
+                        ctx.Ptr++;
+                        ctx.Count++;
+                        LastMark = ctx.LastMark;
+                        LastIndex = ctx.LastIndex;
+                        goto case MinRepeatOneNext;
+
+                    case OP_REPEAT:
+                        // create a repeat context, the UNTIL operators do the actual work
+                        // <REPEAT> <skip> <1=min> <2=max> item <UNTIL> tail
+                        rep = new Repeat();
+                        rep.Count = -1;
+                        rep.Pc = ctx.Pc;
+                        rep.Prev = _repeat;
+                        rep.LastPtr = -1;
+                        ctx.Rep = _repeat = rep;
+
+                        Ptr = ctx.Ptr;
+                        ctx = PushContext(JumpRepeat, ctx.Pc + code[ctx.Pc]);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpRepeat:
+                        _repeat = ctx.Rep.Prev;
+                        goto Return;
+
+                    case OP_MAX_UNTIL:
+                        // maximizing repeat
+                        // <REPEAT> <skip> <1=min> <2=max> item <MAX_UNTIL> tail
+                        rep = ctx.Rep = _repeat;
+                        if (rep == null) {
+                            ret = ERROR_STATE;
+                            goto Return;
+                        }
+
+                        Ptr = ctx.Ptr;
+                        ctx.Count = rep.Count + 1;
+
+                        if (ctx.Count < (uint)code[rep.Pc + 1]) {
+                            // not enough matches
+                            rep.Count = ctx.Count;
+                            ctx = PushContext(JumpMaxUntil1, rep.Pc + 3);
+                            op = Entrance;
+                            goto Dispatch;
+                        }
+
+                        if ((ctx.Count < (uint)code[rep.Pc + 2] || (uint)code[rep.Pc + 2] == MAXREPEAT) &&
+                            Ptr != rep.LastPtr) {
+                            // we may have enough matches, but if we can match another item, do so
+                            rep.Count = ctx.Count;
+                            ctx.LastMark = LastMark;
+                            ctx.LastIndex = LastIndex;
+                            MarkPush(ctx.LastMark);
+                            // zero-width match protection
+                            DataPush(rep.LastPtr);
+                            rep.LastPtr = Ptr;
+                            ctx = PushContext(JumpMaxUntil2, rep.Pc + 3);
+                            op = Entrance;
+                            goto Dispatch;
+                        }
+                        goto case MaxUntilTail;
+
+                    case JumpMaxUntil1:
+                    case JumpMinUntil1:
+                        if (ret != 0) {
+                            goto Return;
+                        }
+                        ctx.Rep.Count = ctx.Count - 1;
+                        Ptr = ctx.Ptr;
+                        goto Failure;
+
+                    case JumpMaxUntil2:
+                        ctx.Rep.LastPtr = DataPop();
+                        if (ret != 0) {
+                            MarkPopDiscard(ctx.LastMark);
+                            goto Return;
+                        }
+                        MarkPop(ctx.LastMark);
+                        LastMark = ctx.LastMark;
+                        LastIndex = ctx.LastIndex;
+                        ctx.Rep.Count = ctx.Count - 1;
+                        Ptr = ctx.Ptr;
+                        goto case MaxUntilTail;
+
+                    case MaxUntilTail:
+                        // cannot match more repeated items here, make sure the tail matches
+                        _repeat = ctx.Rep.Prev;
+                        ctx = PushContext(JumpMaxUntil3, ctx.Pc);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpMaxUntil3:
+                        if (ret != 0) {
+                            goto Return;
+                        }
+                        _repeat = ctx.Rep;
+                        Ptr = ctx.Ptr;
+                        goto Failure;
+
+                    case OP_MIN_UNTIL:
+                        // minimizing repeat
+                        // <REPEAT> <skip> <1=min> <2=max> item <MIN_UNTIL> tail
+                        rep = ctx.Rep = _repeat;
+                        if (rep == null) {
+                            ret = ERROR_STATE;
+                            goto Return;
+                        }
+
+                        Ptr = ctx.Ptr;
+                        ctx.Count = rep.Count + 1;
+
+                        if (ctx.Count < (uint)code[rep.Pc + 1]) {
+                            // not enough matches
+                            rep.Count = ctx.Count;
+                            ctx = PushContext(JumpMinUntil1, rep.Pc + 3);
+                            op = Entrance;
+                            goto Dispatch;
+                        }
+
+                        ctx.LastMark = LastMark;
+                        ctx.LastIndex = LastIndex;
+
+                        // see if the tail matches
+                        _repeat = rep.Prev;
+                        ctx = PushContext(JumpMinUntil2, ctx.Pc);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpMinUntil2:
+                        if (ret != 0) {
+                            goto Return;
+                        }
+                        rep = _repeat = ctx.Rep;
+                        Ptr = ctx.Ptr;
+                        LastMark = ctx.LastMark;
+                        LastIndex = ctx.LastIndex;
+
+                        if ((ctx.Count >= (uint)code[rep.Pc + 2] && (uint)code[rep.Pc + 2] != MAXREPEAT) ||
+                            Ptr == rep.LastPtr) {
+                            goto Failure;
+                        }
+
+                        rep.Count = ctx.Count;
+                        // zero-width match protection
+                        DataPush(rep.LastPtr);
+                        rep.LastPtr = Ptr;
+                        ctx = PushContext(JumpMinUntil3, rep.Pc + 3);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpMinUntil3:
+                        ctx.Rep.LastPtr = DataPop();
+                        if (ret != 0) {
+                            goto Return;
+                        }
+                        ctx.Rep.Count = ctx.Count - 1;
+                        Ptr = ctx.Ptr;
+                        goto Failure;
+
+                    case OP_GROUPREF:
+                    case OP_GROUPREF_IGNORE:
+                        // match a backreference
+                        // <GROUPREF> <group>
+                        i = code[ctx.Pc] * 2;
+                        if (i >= LastMark) {
+                            goto Failure;
+                        }
+                        p = _marks[i];
+                        e = _marks[i + 1];
+                        if (p < 0 || e < 0 || e < p) {
+                            goto Failure;
+                        }
+                        if (op == OP_GROUPREF) {
+                            while (p < e) {
+                                if (ctx.Ptr >= end || text[ctx.Ptr] != text[p]) {
+                                    goto Failure;
+                                }
+                                p++;
+                                ctx.Ptr++;
+                            }
+                        } else {
+                            while (p < e) {
+                                if (ctx.Ptr >= end || Lower(text[ctx.Ptr]) != Lower(text[p])) {
+                                    goto Failure;
+                                }
+                                p++;
+                                ctx.Ptr++;
+                            }
+                        }
+                        ctx.Pc++;
+                        break;
+
+                    case OP_GROUPREF_EXISTS:
+                        // <GROUPREF_EXISTS> <group> <skip> codeyes <JUMP> codeno ...
+                        i = code[ctx.Pc] * 2;
+                        if (i >= LastMark || _marks[i] < 0 || _marks[i + 1] < 0 || _marks[i + 1] < _marks[i]) {
+                            ctx.Pc += code[ctx.Pc + 1];
+                        } else {
+                            ctx.Pc += 2;
+                        }
+                        break;
+
+                    case OP_ASSERT:
+                        // <ASSERT> <skip> <back> <pattern>
+                        if (ctx.Ptr < (uint)code[ctx.Pc + 1]) {
+                            goto Failure;
+                        }
+                        Ptr = ctx.Ptr - code[ctx.Pc + 1];
+                        ctx = PushContext(JumpAssert, ctx.Pc + 2);
+                        op = Entrance;
+                        goto Dispatch;
+
+                    case JumpAssert:
+                        if (ret < 0) {
+                            goto Return;
+                        } else if (ret == 0) {
+                            goto Failure;
+                        }
+                        ctx.Pc += code[ctx.Pc];
+                        break;
+
+                    case OP_ASSERT_NOT:
+                        // <ASSERT_NOT> <skip> <back> <pattern>
+                        if (ctx.Ptr >= (uint)code[ctx.Pc + 1]) {
+                            Ptr = ctx.Ptr - code[ctx.Pc + 1];
+                            ctx = PushContext(JumpAssertNot, ctx.Pc + 2);
+                            op = Entrance;
+                            goto Dispatch;
+                        }
+                        ctx.Pc += code[ctx.Pc];
+                        break;
+
+                    case JumpAssertNot:
+                        if (ret < 0) {
+                            goto Return;
+                        } else if (ret > 0) {
+                            goto Failure;
+                        }
+                        ctx.Pc += code[ctx.Pc];
+                        break;
+
+                    case OP_FAILURE:
+                        goto Failure;
+
+                    default:
+                        ret = ERROR_ILLEGAL;
+                        goto Return;
+                }
+
+                // continue with the next opcode of the current context
+                op = code[ctx.Pc++];
+                continue;
+
+            Failure:
+                ret = 0;
+                op = Exit;
+                continue;
+
+            Success:
+                ret = 1;
+                op = Exit;
+                continue;
+
+            Return:
+                // exit with the result of the sub-match (or an error)
+                op = Exit;
+            }
+        }
+
+        /// <summary>
+        /// Counts how many times the single character item at pc matches, starting at Ptr.
+        /// </summary>
+        private int Count(int pc, long maxCount) {
+            int[] code = _code;
+            string text = _text;
+            int start = Ptr;
+            int ptr = start;
+            int end = End;
+            int chr;
+
+            if (maxCount < end - ptr && maxCount != MAXREPEAT) {
+                end = ptr + (int)maxCount;
+            }
+
+            switch (code[pc]) {
+                case OP_IN:
+                    while (ptr < end && InCharset(pc + 2, text[ptr])) {
+                        ptr++;
+                    }
+                    break;
+
+                case OP_ANY:
+                    while (ptr < end && text[ptr] != '\n') {
+                        ptr++;
+                    }
+                    break;
+
+                case OP_ANY_ALL:
+                    ptr = end;
+                    break;
+
+                case OP_LITERAL:
+                    chr = code[pc + 1];
+                    while (ptr < end && text[ptr] == chr) {
+                        ptr++;
+                    }
+                    break;
+
+                case OP_LITERAL_IGNORE:
+                    chr = code[pc + 1];
+                    while (ptr < end && Lower(text[ptr]) == chr) {
+                        ptr++;
+                    }
+                    break;
+
+                case OP_NOT_LITERAL:
+                    chr = code[pc + 1];
+                    while (ptr < end && text[ptr] != chr) {
+                        ptr++;
+                    }
+                    break;
+
+                case OP_NOT_LITERAL_IGNORE:
+                    chr = code[pc + 1];
+                    while (ptr < end && Lower(text[ptr]) != chr) {
+                        ptr++;
+                    }
+                    break;
+
+                default:
+                    // repeated single character pattern
+                    while (Ptr < end) {
+                        int res = Match(pc);
+                        if (res < 0) {
+                            return res;
+                        }
+                        if (res == 0) {
+                            break;
+                        }
+                    }
+                    return Ptr - start;
+            }
+
+            return ptr - start;
+        }
+
+        private void MarkPush(int lastMark) {
+            if (lastMark > 0) {
+                int count = lastMark + 1;
+                EnsureData(count);
+                Array.Copy(_marks, 0, _data, _dataCount, count);
+                _dataCount += count;
+            }
+        }
+
+        private void MarkPop(int lastMark) {
+            if (lastMark > 0) {
+                int count = lastMark + 1;
+                _dataCount -= count;
+                Array.Copy(_data, _dataCount, _marks, 0, count);
+            }
+        }
+
+        private void MarkPopKeep(int lastMark) {
+            if (lastMark > 0) {
+                int count = lastMark + 1;
+                Array.Copy(_data, _dataCount - count, _marks, 0, count);
+            }
+        }
+
+        private void MarkPopDiscard(int lastMark) {
+            if (lastMark > 0) {
+                _dataCount -= lastMark + 1;
+            }
+        }
+
+        private void DataPush(int value) {
+            EnsureData(1);
+            _data[_dataCount++] = value;
+        }
+
+        private int DataPop() {
+            return _data[--_dataCount];
+        }
+
+        private void EnsureData(int count) {
+            if (_dataCount + count > _data.Length) {
+                Array.Resize(ref _data, Math.Max(_data.Length * 2, _dataCount + count));
+            }
+        }
+
+        #endregion
+
+        #region Character classes
+
+        private bool At(int ptr, int at) {
+            bool thisp, thatp;
+            string text = _text;
+
+            switch (at) {
+                case AT_BEGINNING:
+                case AT_BEGINNING_STRING:
+                    return ptr == 0;
+
+                case AT_BEGINNING_LINE:
+                    return ptr == 0 || text[ptr - 1] == '\n';
+
+                case AT_END:
+                    return (ptr + 1 == End && text[ptr] == '\n') || ptr == End;
+
+                case AT_END_LINE:
+                    return ptr == End || text[ptr] == '\n';
+
+                case AT_END_STRING:
+                    return ptr == End;
+
+                case AT_BOUNDARY:
+                case AT_NON_BOUNDARY:
+                    if (End == 0) {
+                        return false;
+                    }
+                    thatp = ptr > 0 && IsWord(text[ptr - 1]);
+                    thisp = ptr < End && IsWord(text[ptr]);
+                    return at == AT_BOUNDARY ? thisp != thatp : thisp == thatp;
+
+                case AT_LOC_BOUNDARY:
+                case AT_LOC_NON_BOUNDARY:
+                    if (End == 0) {
+                        return false;
+                    }
+                    thatp = ptr > 0 && IsLocaleWord(text[ptr - 1]);
+                    thisp = ptr < End && IsLocaleWord(text[ptr]);
+                    return at == AT_LOC_BOUNDARY ? thisp != thatp : thisp == thatp;
+
+                case AT_UNI_BOUNDARY:
+                case AT_UNI_NON_BOUNDARY:
+                    if (End == 0) {
+                        return false;
+                    }
+                    thatp = ptr > 0 && IsUnicodeWord(text[ptr - 1]);
+                    thisp = ptr < End && IsUnicodeWord(text[ptr]);
+                    return at == AT_UNI_BOUNDARY ? thisp != thatp : thisp == thatp;
+            }
+
+            return false;
+        }
+
+        private static bool Category(int category, int ch) {
+            switch (category) {
+                case CATEGORY_DIGIT: return IsDigit(ch);
+                case CATEGORY_NOT_DIGIT: return !IsDigit(ch);
+                case CATEGORY_SPACE: return IsSpace(ch);
+                case CATEGORY_NOT_SPACE: return !IsSpace(ch);
+                case CATEGORY_WORD: return IsWord(ch);
+                case CATEGORY_NOT_WORD: return !IsWord(ch);
+                case CATEGORY_LINEBREAK: return ch == '\n';
+                case CATEGORY_NOT_LINEBREAK: return ch != '\n';
+                case CATEGORY_LOC_WORD: return IsLocaleWord(ch);
+                case CATEGORY_LOC_NOT_WORD: return !IsLocaleWord(ch);
+                case CATEGORY_UNI_DIGIT: return IsUnicodeDigit(ch);
+                case CATEGORY_UNI_NOT_DIGIT: return !IsUnicodeDigit(ch);
+                case CATEGORY_UNI_SPACE: return IsUnicodeSpace(ch);
+                case CATEGORY_UNI_NOT_SPACE: return !IsUnicodeSpace(ch);
+                case CATEGORY_UNI_WORD: return IsUnicodeWord(ch);
+                case CATEGORY_UNI_NOT_WORD: return !IsUnicodeWord(ch);
+                case CATEGORY_UNI_LINEBREAK: return IsUnicodeLinebreak(ch);
+                case CATEGORY_UNI_NOT_LINEBREAK: return !IsUnicodeLinebreak(ch);
+            }
+            return false;
+        }
+
+        /// <summary>
+        /// Checks if ch is a member of the set at pc.
+        /// </summary>
+        private bool InCharset(int pc, int ch) {
+            int[] code = _code;
+            bool ok = true;
+
+            for (;;) {
+                switch (code[pc++]) {
+                    case OP_FAILURE:
+                        return !ok;
+
+                    case OP_LITERAL:
+                        // <LITERAL> <code>
+                        if (ch == code[pc]) {
+                            return ok;
+                        }
+                        pc++;
+                        break;
+
+                    case OP_CATEGORY:
+                        // <CATEGORY> <code>
+                        if (Category(code[pc], ch)) {
+                            return ok;
+                        }
+                        pc++;
+                        break;
+
+                    case OP_CHARSET:
+                        // <CHARSET> <bitmap> (8 words)
+                        if (ch < 256 && (code[pc + (ch >> 5)] & (1 << (ch & 31))) != 0) {
+                            return ok;
+                        }
+                        pc += 8;
+                        break;
+
+                    case OP_RANGE:
+                        // <RANGE> <lower> <upper>
+                        if (code[pc] <= ch && ch <= code[pc + 1]) {
+                            return ok;
+                        }
+                        pc += 2;
+                        break;
+
+                    case OP_NEGATE:
+                        ok = !ok;
+                        break;
+
+                    case OP_BIGCHARSET: {
+                            // <BIGCHARSET> <blockcount> <256 block indices> <blocks>
+                            int count = code[pc++];
+                            // the block indices are bytes packed into the words (little endian)
+                            int block = (code[pc + (ch >> 10)] >> (((ch >> 8) & 3) * 8)) & 0xff;
+                            pc += 64;
+                            if ((code[pc + block * 8 + ((ch & 255) >> 5)] & (1 << (ch & 31))) != 0) {
+                                return ok;
+                            }
+                            pc += count * 8;
+                            break;
+                        }
+
+                    default:
+                        // internal error, pretend it didn't match
+                        return false;
+                }
+            }
+        }
+
+        private int Lower(int ch) {
+            return GetLower(ch, _flags);
+        }
+
+        /// <summary>
+        /// Lower cases a character the way the matcher does for the given flags.
+        /// </summary>
+        internal static int GetLower(int ch, int flags) {
+            if ((flags & FLAG_LOCALE) != 0) {
+                // the C locale only maps ASCII letters
+                return ch < 256 ? AsciiLower(ch) : ch;
+            } else if ((flags & FLAG_UNICODE) != 0) {
+                return ch <= Char.MaxValue ? Char.ToLowerInvariant((char)ch) : ch;
+            }
+            return ch < 128 ? AsciiLower(ch) : ch;
+        }
+
+        private static int AsciiLower(int ch) {
+            return ch >= 'A' && ch <= 'Z' ? ch + ('a' - 'A') : ch;
+        }
+
+        private static bool IsDigit(int ch) {
+            return ch >= '0' && ch <= '9';
+        }
+
+        private static bool IsSpace(int ch) {
+            return ch == ' ' || (ch >= '\t' && ch <= '\r');
+        }
+
+        private static bool IsWord(int ch) {
+            return (ch >= 'a' && ch <= 'z') || (ch >= 'A' && ch <= 'Z') || (ch >= '0' && ch <= '9') || ch == '_';
+        }
+
+        private static bool IsLocaleWord(int ch) {
+            // matches isalnum in the C locale
+            return IsWord(ch);
+        }
+
+        private static bool IsUnicodeDigit(int ch) {
+            return ch <= Char.MaxValue && Char.GetUnicodeCategory((char)ch) == UnicodeCategory.DecimalDigitNumber;
+        }
+
+        private static bool IsUnicodeSpace(int ch) {
+            if (ch > Char.MaxValue) {
+                return false;
+            }
+            // Python also counts the information separators as white space
+            return Char.IsWhiteSpace((char)ch) || (ch >= 0x1c && ch <= 0x1f);
+        }
+
+        private static bool IsUnicodeWord(int ch) {
+            if (ch > Char.MaxValue) {
+                return false;
+            }
+            char c = (char)ch;
+            return Char.IsLetterOrDigit(c) || Char.IsNumber(c) || c == '_';
+        }
+
+        private static bool IsUnicodeLinebreak(int ch) {
+            switch (ch) {
+                case 0x0a:
+                case 0x0b:
+                case 0x0c:
+                case 0x0d:
+                case 0x1c:
+                case 0x1d:
+                case 0x1e:
+                case 0x85:
+                case 0x2028:
+                case 0x2029:
+                    return true;
+            }
+            return false;
+        }
+
+        #endregion
+    }
+}
@@ -0,0 +1,1522 @@
+/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Collections;
+using System.Collections.Generic;
+using System.IO;
+using System.Runtime.InteropServices;
+using System.Text;
+using System.Threading;
+using System.Xml;
+
+using Microsoft.Scripting;
+using Microsoft.Scripting.Runtime;
+using Microsoft.Scripting.Utils;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+[assembly: PythonModule("_elementtree", typeof(IronPython.Modules.PythonElementTree))]
+namespace IronPython.Modules {
+    /// <summary>
+    /// Native implementation of the cElementTree accelerator.  Elements store their children
+    /// in a flat array and create their attribute dictionary on demand; parsing is done with
+    /// System.Xml.XmlReader which drives the target with the same callbacks expat would.
+    ///
+    /// xml/etree/cElementTree.py layers the remaining pure Python API (ElementTree, tostring,
+    /// Comment, ...) on top of this module.
+    /// </summary>
+    public static class PythonElementTree {
+        public const string __doc__ = "Native ElementTree accelerator built on System.Xml.";
+        public const string VERSION = "1.0.6";
+
+        private const string XmlnsNamespace = "http://www.w3.org/2000/xmlns/";
+        private const int DefaultReadSize = 64 * 1024;
+
+        #region Element
+
+        [PythonType]
+        public class Element : IEnumerable, ICodeFormattable {
+            private object _tag;
+            private PythonDictionary _attrib;   // created lazily, most elements have no attributes
+            private Element[] _children;        // null until the first child is added
+            private int _count;
+            internal object _text, _tail;
+
+            public Element(object tag) {
+                _tag = tag;
+            }
+
+            public Element(object tag, [NotNull]PythonDictionary attrib) {
+                __init__(tag, attrib, null);
+            }
+
+            public Element(object tag, [ParamDictionary]IDictionary<object, object> extra) {
+                __init__(tag, null, extra);
+            }
+
+            public Element(object tag, [NotNull]PythonDictionary attrib, [ParamDictionary]IDictionary<object, object> extra) {
+                __init__(tag, attrib, extra);
+            }
+
+            internal Element(object tag, PythonDictionary attrib, bool takeOwnership) {
+                _tag = tag;
+                if (attrib != null && attrib.Count != 0) {
+                    _attrib = takeOwnership ? attrib : new PythonDictionary(attrib);
+                }
+            }
+
+            public void __init__(object tag) {
+                _tag = tag;
+            }
+
+            public void __init__(object tag, [ParamDictionary]IDictionary<object, object> extra) {
+                __init__(tag, null, extra);
+            }
+
+            public void __init__(object tag, [NotNull]PythonDictionary attrib, [ParamDictionary]IDictionary<object, object> extra) {
+                _tag = tag;
+                _attrib = null;
+                if ((attrib != null && attrib.Count != 0) || (extra != null && extra.Count != 0)) {
+                    _attrib = attrib != null ? new PythonDictionary(attrib) : new PythonDictionary();
+                    if (extra != null) {
+                        foreach (KeyValuePair<object, object> kvp in extra) {
+                            _attrib[kvp.Key] = kvp.Value;
+                        }
+                    }
+                }
+            }
+
+            #region Properties
+
+            public object tag {
+                get { return _tag; }
+                set { _tag = value; }
+            }
+
+            public object text {
+                get { return _text; }
+                set { _text = value; }
+            }
+
+            public object tail {
+                get { return _tail; }
+                set { _tail = value; }
+            }
+
+            public PythonDictionary attrib {
+                get {
+                    if (_attrib == null) {
+                        _attrib = new PythonDictionary();
+                    }
+                    return _attrib;
+                }
+                set {
+                    if (value == null) {
+                        throw PythonOps.TypeError("attrib must be dict, not None");
+                    }
+                    _attrib = value;
+                }
+            }
+
+            #endregion
+
+            #region Sequence protocol
+
+            public int __len__() {
+                return _count;
+            }
+
+            public bool __nonzero__() {
+                return _count != 0;
+            }
+
+            public object this[int index] {
+                get {
+                    return _children[CheckIndex(index)];
+                }
+                set {
+                    _children[CheckIndex(index)] = CheckElement(value);
+                }
+            }
+
+            public object this[[NotNull]Slice slice] {
+                get {
+                    return ChildList()[slice];
+                }
+                set {
+                    List children = ChildList();
+                    children[slice] = value;
+                    SetChildren(children);
+                }
+            }
+
+            public void __delitem__(int index) {
+                index = CheckIndex(index);
+                RemoveAt(index);
+            }
+
+            public void __delitem__([NotNull]Slice slice) {
+                List children = ChildList();
+                children.__delitem__(slice);
+                SetChildren(children);
+            }
+
+            IEnumerator IEnumerable.GetEnumerator() {
+                // iterate over a snapshot so that mutation during iteration behaves like a list
+                return ChildList().GetEnumerator();
+            }
+
+            #endregion
+
+            #region Child manipulation
+
+            public void append(object element) {
+                Add(CheckElement(element));
+            }
+
+            public void extend(object elements) {
+                IEnumerator e = PythonOps.GetEnumerator(elements);
+                while (e.MoveNext()) {
+                    Add(CheckElement(e.Current));
+                }
+            }
+
+            public void insert(int index, object element) {
+                Element child = CheckElement(element);
+                if (index < 0) {
+                    index = Math.Max(0, index + _count);
+                } else if (index > _count) {
+                    index = _count;
+                }
+
+                EnsureCapacity(_count + 1);
+                Array.Copy(_children, index, _children, index + 1, _count - index);
+                _children[index] = child;
+                _count++;
+            }
+
+            public void remove(object element) {
+                for (int i = 0; i < _count; i++) {
+                    if (_children[i] == element || PythonOps.EqualRetBool(_children[i], element)) {
+                        RemoveAt(i);
+                        return;
+                    }
+                }
+                throw PythonOps.ValueError("list.remove(x): x not in list");
+            }
+
+            public List getchildren() {
+                return ChildList();
+            }
+
+            public void clear() {
+                _attrib = null;
+                _children = null;
+                _count = 0;
+                _text = _tail = null;
+            }
+
+            public Element makeelement(object tag, [NotNull]PythonDictionary attrib) {
+                return new Element(tag, attrib, false);
+            }
+
+            public Element copy() {
+                Element res = new Element(_tag, _attrib, false);
+                res._text = _text;
+                res._tail = _tail;
+                if (_count != 0) {
+                    res._children = new Element[_count];
+                    Array.Copy(_children, res._children, _count);
+                    res._count = _count;
+                }
+                return res;
+            }
+
+            public Element __copy__() {
+                return copy();
+            }
+
+            public Element __deepcopy__(CodeContext/*!*/ context, object memo) {
+                object copyModule = Importer.ImportModule(context, new PythonDictionary(), "copy", true, 0);
+                object deepcopy = PythonOps.GetBoundAttr(context, copyModule, "deepcopy");
+
+                Element res = new Element(PythonCalls.Call(context, deepcopy, _tag, memo));
+                if (_attrib != null) {
+                    res._attrib = (PythonDictionary)PythonCalls.Call(context, deepcopy, _attrib, memo);
+                }
+                res._text = PythonCalls.Call(context, deepcopy, _text, memo);
+                res._tail = PythonCalls.Call(context, deepcopy, _tail, memo);
+                if (_count != 0) {
+                    res._children = new Element[_count];
+                    for (int i = 0; i < _count; i++) {
+                        res._children[i] = CheckElement(PythonCalls.Call(context, deepcopy, _children[i], memo));
+                    }
+                    res._count = _count;
+                }
+                return res;
+            }
+
+            #endregion
+
+            #region Attributes
+
+            public object get(object key, [DefaultParameterValue(null)]object @default) {
+                object res;
+                if (_attrib != null && _attrib.TryGetValue(key, out res)) {
+                    return res;
+                }
+                return @default;
+            }
+
+            public void set(object key, object value) {
+                attrib[key] = value;
+            }
+
+            public List keys() {
+                return _attrib == null ? new List() : _attrib.keys();
+            }
+
+            public List items() {
+                return _attrib == null ? new List() : _attrib.items();
+            }
+
+            #endregion
+
+            #region Searching
+
+            public object find(CodeContext/*!*/ context, object path, [DefaultParameterValue(null)]object namespaces) {
+                return PythonOps.Invoke(context, ElementPath(context), "find", this, path, namespaces);
+            }
+
+            public object findtext(CodeContext/*!*/ context, object path, [DefaultParameterValue(null)]object @default, [DefaultParameterValue(null)]object namespaces) {
+                return PythonOps.Invoke(context, ElementPath(context), "findtext", this, path, @default, namespaces);
+            }
+
+            public object findall(CodeContext/*!*/ context, object path, [DefaultParameterValue(null)]object namespaces) {
+                return PythonOps.Invoke(context, ElementPath(context), "findall", this, path, namespaces);
+            }
+
+            public object iterfind(CodeContext/*!*/ context, object path, [DefaultParameterValue(null)]object namespaces) {
+                return PythonOps.Invoke(context, ElementPath(context), "iterfind", this, path, namespaces);
+            }
+
+            public IEnumerator<object> iter([DefaultParameterValue(null)]object tag) {
+                if (tag is string && (string)tag == "*") {
+                    tag = null;
+                }
+                return Iterate(this, tag);
+            }
+
+            public List getiterator([DefaultParameterValue(null)]object tag) {
+                List res = new List();
+                IEnumerator<object> e = iter(tag);
+                while (e.MoveNext()) {
+                    res.AddNoLock(e.Current);
+                }
+                return res;
+            }
+
+            public IEnumerator<object> itertext() {
+                return IterateText(this);
+            }
+
+            private static IEnumerator<object> Iterate(Element root, object tag) {
+                // explicit stack so that deep documents don't nest enumerators
+                Stack<KeyValuePair<Element, int>> stack = new Stack<KeyValuePair<Element, int>>();
+                if (tag == null || PythonOps.EqualRetBool(root._tag, tag)) {
+                    yield return root;
+                }
+
+                Element cur = root;
+                int index = 0;
+                for (; ; ) {
+                    if (index < cur._count) {
+                        Element child = cur._children[index];
+                        if (tag == null || PythonOps.EqualRetBool(child._tag, tag)) {
+                            yield return child;
+                        }
+                        stack.Push(new KeyValuePair<Element, int>(cur, index + 1));
+                        cur = child;
+                        index = 0;
+                    } else if (stack.Count != 0) {
+                        KeyValuePair<Element, int> top = stack.Pop();
+                        cur = top.Key;
+                        index = top.Value;
+                    } else {
+                        yield break;
+                    }
+                }
+            }
+
+            private static IEnumerator<object> IterateText(Element root) {
+                if (!(root._tag is string) && root._tag != null) {
+                    // comments and processing instructions have no text content
+                    yield break;
+                }
+
+                if (root._text is string && ((string)root._text).Length != 0) {
+                    yield return root._text;
+                }
+
+                for (int i = 0; i < root._count; i++) {
+                    Element child = root._children[i];
+                    IEnumerator<object> inner = IterateText(child);
+                    while (inner.MoveNext()) {
+                        yield return inner.Current;
+                    }
+                    if (child._tail is string && ((string)child._tail).Length != 0) {
+                        yield return child._tail;
+                    }
+                }
+            }
+
+            #endregion
+
+            #region ICodeFormattable Members
+
+            public string/*!*/ __repr__(CodeContext/*!*/ context) {
+                return String.Format("<Element {0} at 0x{1:x}>", PythonOps.Repr(context, _tag), IdDispenser.GetId(this));
+            }
+
+            #endregion
+
+            #region Internal helpers
+
+            internal void Add(Element child) {
+                EnsureCapacity(_count + 1);
+                _children[_count++] = child;
+            }
+
+            private void EnsureCapacity(int size) {
+                if (_children == null) {
+                    _children = new Element[Math.Max(size, 4)];
+                } else if (_children.Length < size) {
+                    Element[] newChildren = new Element[Math.Max(size, _children.Length * 2)];
+                    Array.Copy(_children, newChildren, _count);
+                    _children = newChildren;
+                }
+            }
+
+            private void RemoveAt(int index) {
+                _count--;
+                Array.Copy(_children, index + 1, _children, index, _count - index);
+                _children[_count] = null;
+            }
+
+            private int CheckIndex(int index) {
+                if (index < 0) {
+                    index += _count;
+                }
+                if (index < 0 || index >= _count) {
+                    throw PythonOps.IndexError("child index out of range");
+                }
+                return index;
+            }
+
+            private List ChildList() {
+                object[] items = new object[_count];
+                if (_count != 0) {
+                    Array.Copy(_children, items, _count);
+                }
+                return List.FromArrayNoCopy(items);
+            }
+
+            private void SetChildren(List children) {
+                Element[] newChildren = new Element[children.__len__()];
+                for (int i = 0; i < newChildren.Length; i++) {
+                    newChildren[i] = CheckElement(children[i]);
+                }
+                _children = newChildren;
+                _count = newChildren.Length;
+            }
+
+            private static Element CheckElement(object value) {
+                Element res = value as Element;
+                if (res == null) {
+                    throw PythonOps.TypeError("expected an Element, not {0}", PythonTypeOps.GetName(value));
+                }
+                return res;
+            }
+
+            #endregion
+        }
+
+        public static Element SubElement(object parent, object tag, [DefaultParameterValue(null)]PythonDictionary attrib, [ParamDictionary]IDictionary<object, object> extra) {
+            Element p = parent as Element;
+            if (p == null) {
+                throw PythonOps.TypeError("SubElement() argument 1 must be Element, not {0}", PythonTypeOps.GetName(parent));
+            }
+
+            Element res = new Element(tag, attrib, extra);
+            p.Add(res);
+            return res;
+        }
+
+        #endregion
+
+        #region TreeBuilder
+
+        [PythonType]
+        public class TreeBuilder {
+            private readonly object _factory;
+            private readonly List<object> _elem = new List<object>();
+            private readonly List<string> _data = new List<string>();
+            private object _last;
+            private object _root;
+            private bool _tail;
+
+            public TreeBuilder([DefaultParameterValue(null)]object element_factory) {
+                _factory = element_factory;
+            }
+
+            public object close(CodeContext/*!*/ context) {
+                if (_elem.Count != 0) {
+                    throw PythonOps.AssertionError("missing end tags");
+                }
+                if (_root == null) {
+                    throw PythonOps.AssertionError("missing toplevel element");
+                }
+                return _root;
+            }
+
+            public void data(string data) {
+                _data.Add(data);
+            }
+
+            public object start(CodeContext/*!*/ context, object tag, [DefaultParameterValue(null)]PythonDictionary attrs) {
+                Flush(context);
+
+                object elem;
+                if (_factory == null) {
+                    elem = new Element(tag, attrs, false);
+                } else {
+                    elem = PythonCalls.Call(context, _factory, tag, attrs ?? new PythonDictionary());
+                }
+                return Start(context, elem);
+            }
+
+            public object end(CodeContext/*!*/ context, object tag) {
+                Flush(context);
+                if (_elem.Count == 0) {
+                    throw PythonOps.IndexError("pop from empty list");
+                }
+
+                _last = _elem[_elem.Count - 1];
+                _elem.RemoveAt(_elem.Count - 1);
+                _tail = true;
+                return _last;
+            }
+
+            /// <summary>
+            /// Fast path used by XMLParser: the attribute dictionary is freshly created by the
+            /// parser and can be handed to the element without copying.
+            /// </summary>
+            internal object StartOwned(CodeContext/*!*/ context, object tag, PythonDictionary attrs) {
+                if (_factory != null) {
+                    return start(context, tag, attrs);
+                }
+
+                Flush(context);
+                return Start(context, new Element(tag, attrs, true));
+            }
+
+            private object Start(CodeContext/*!*/ context, object elem) {
+                if (_elem.Count != 0) {
+                    object parent = _elem[_elem.Count - 1];
+                    Element nativeParent = parent as Element;
+                    Element nativeElem = elem as Element;
+                    if (nativeParent != null && nativeElem != null) {
+                        nativeParent.Add(nativeElem);
+                    } else {
+                        PythonOps.Invoke(context, parent, "append", elem);
+                    }
+                } else if (_root == null) {
+                    _root = elem;
+                }
+
+                _elem.Add(elem);
+                _last = elem;
+                _tail = false;
+                return elem;
+            }
+
+            private void Flush(CodeContext/*!*/ context) {
+                if (_data.Count == 0) {
+                    return;
+                }
+
+                if (_last != null) {
+                    string text = _data.Count == 1 ? _data[0] : String.Concat(_data.ToArray());
+                    Element native = _last as Element;
+                    if (_tail) {
+                        if (native != null) {
+                            native._tail = text;
+                        } else {
+                            PythonOps.SetAttr(context, _last, "tail", text);
+                        }
+                    } else {
+                        if (native != null) {
+                            native._text = text;
+                        } else {
+                            PythonOps.SetAttr(context, _last, "text", text);
+                        }
+                    }
+                }
+                _data.Clear();
+            }
+        }
+
+        #endregion
+
+        #region XMLParser
+
+        /// <summary>
+        /// XML parser driving a target object (TreeBuilder by default) with start/end/data/
+        /// comment/pi/doctype callbacks.
+        ///
+        /// XmlReader is a pull parser and cannot be suspended in the middle of a token, so once
+        /// more than a read buffer's worth of data has been fed the reader runs on a worker thread
+        /// over a pipe that feed() writes to.  Each feed() waits until the reader has consumed the
+        /// new data and then calls the target for the nodes completed so far, on the calling
+        /// thread, so memory use doesn't grow with the size of the document.  Smaller documents
+        /// are parsed by close() without starting a thread, as are all documents on platforms
+        /// without threads.
+        /// </summary>
+        [PythonType]
+        public class XMLParser {
+            private readonly object _target;
+            private readonly TreeBuilder _builder;
+            private readonly object _start, _end, _data, _comment, _pi, _doctype;
+            private readonly InputDecoder _decoder = new InputDecoder();
+            private readonly EventReader _events;
+            private StringBuilder _buffer = new StringBuilder();  // input held until the pipe is started or the parser is closed
+#if FEATURE_THREAD
+            private InputPipe _pipe;
+#endif
+            private bool _closed;
+
+            public readonly string version = "System.Xml " + typeof(XmlReader).Assembly.GetName().Version.ToString();
+            public readonly PythonDictionary entity = new PythonDictionary();
+
+            public XMLParser(CodeContext/*!*/ context, [DefaultParameterValue(0)]object html, [DefaultParameterValue(null)]object target, [DefaultParameterValue(null)]string encoding) {
+                if (target == null) {
+                    target = new TreeBuilder(null);
+                }
+                _target = target;
+                _builder = target as TreeBuilder;
+                _events = new EventReader(context, this, false, false);
+
+                if (_builder == null) {
+                    PythonOps.TryGetBoundAttr(context, target, "start", out _start);
+                    PythonOps.TryGetBoundAttr(context, target, "end", out _end);
+                    PythonOps.TryGetBoundAttr(context, target, "data", out _data);
+                    PythonOps.TryGetBoundAttr(context, target, "comment", out _comment);
+                    PythonOps.TryGetBoundAttr(context, target, "pi", out _pi);
+                    PythonOps.TryGetBoundAttr(context, target, "doctype", out _doctype);
+                }
+            }
+
+#if FEATURE_THREAD
+            ~XMLParser() {
+                InputPipe pipe = _pipe;
+                if (pipe != null) {
+                    // let the worker thread run into the end of the input and exit
+                    pipe.Abandon();
+                }
+            }
+#endif
+
+            public object target {
+                get { return _target; }
+            }
+
+            public void feed([NotNull]string data) {
+                if (_closed) {
+                    throw PythonOps.ValueError("parser has been closed");
+                }
+
+                string text = _decoder.Decode(data, false);
+#if FEATURE_THREAD
+                if (_pipe != null) {
+                    _pipe.Write(text);
+                    DispatchFromPipe();
+                    return;
+                }
+#endif
+                _buffer.Append(text);
+#if FEATURE_THREAD
+                if (_buffer.Length >= DefaultReadSize) {
+                    _pipe = new InputPipe();
+                    _pipe.Write(_buffer.ToString());
+                    _buffer = null;
+                    _pipe.Start();
+                    DispatchFromPipe();
+                }
+#endif
+            }
+
+            public object close(CodeContext/*!*/ context) {
+                if (_closed) {
+                    throw PythonOps.ValueError("parser has been closed");
+                }
+
+                string text = _decoder.Decode(String.Empty, true);
+#if FEATURE_THREAD
+                if (_pipe != null) {
+                    _pipe.Write(text);
+                    _pipe.Complete();
+                    DispatchFromPipe();
+                    _pipe = null;
+                    _closed = true;
+                    return CloseTarget(context);
+                }
+#endif
+                _closed = true;
+                _buffer.Append(text);
+                using (XmlReader reader = XmlReader.Create(new StringReader(_buffer.ToString()), CreateSettings())) {
+                    _buffer = null;
+                    NodeReader nodes = new NodeReader(reader);
+                    for (; ; ) {
+                        XmlNodeInfo node;
+                        try {
+                            node = nodes.Read();
+                        } catch (XmlException ex) {
+                            throw MakeParseError(context, ex);
+                        }
+                        if (node == null) {
+                            break;
+                        }
+                        _events.Dispatch(node);
+                    }
+                }
+
+                return CloseTarget(context);
+            }
+
+            public void doctype(object name, object pubid, object system) {
+            }
+
+#if FEATURE_THREAD
+            private void DispatchFromPipe() {
+                Exception error;
+                foreach (XmlNodeInfo node in _pipe.TakeNodes(out error)) {
+                    _events.Dispatch(node);
+                }
+
+                if (error != null) {
+                    _closed = true;
+                    _pipe = null;
+                    XmlException xmlError = error as XmlException;
+                    if (xmlError != null) {
+                        throw MakeParseError(_events.Context, xmlError);
+                    }
+                    throw new InvalidOperationException("XML parser failed", error);
+                }
+            }
+#endif
+
+            /// <summary>
+            /// Closes the target once the whole document has been dispatched to it and returns
+            /// the result of its close().
+            /// </summary>
+            internal object CloseTarget(CodeContext/*!*/ context) {
+                _closed = true;
+
+                if (_builder != null) {
+                    return _builder.close(context);
+                }
+
+                object close;
+                if (PythonOps.TryGetBoundAttr(context, _target, "close", out close)) {
+                    return PythonCalls.Call(context, close);
+                }
+                return null;
+            }
+
+            internal object Start(CodeContext/*!*/ context, string tag, PythonDictionary attrib) {
+                if (_builder != null) {
+                    return _builder.StartOwned(context, tag, attrib);
+                }
+                if (_start != null) {
+                    return PythonCalls.Call(context, _start, tag, attrib ?? new PythonDictionary());
+                }
+                return null;
+            }
+
+            internal object End(CodeContext/*!*/ context, string tag) {
+                if (_builder != null) {
+                    return _builder.end(context, tag);
+                }
+                if (_end != null) {
+                    return PythonCalls.Call(context, _end, tag);
+                }
+                return null;
+            }
+
+            internal void Data(CodeContext/*!*/ context, string data) {
+                if (_builder != null) {
+                    _builder.data(data);
+                } else if (_data != null) {
+                    PythonCalls.Call(context, _data, data);
+                }
+            }
+
+            internal void Comment(CodeContext/*!*/ context, string text) {
+                if (_comment != null) {
+                    PythonCalls.Call(context, _comment, text);
+                }
+            }
+
+            internal void ProcessingInstruction(CodeContext/*!*/ context, string target, string text) {
+                if (_pi != null) {
+                    PythonCalls.Call(context, _pi, target, text);
+                }
+            }
+
+            internal void DocType(CodeContext/*!*/ context, string name, string pubid, string system) {
+                if (_doctype != null) {
+                    PythonCalls.Call(context, _doctype, name, pubid, system);
+                }
+            }
+        }
+
+        public static XMLParser XMLTreeBuilder(CodeContext/*!*/ context, [DefaultParameterValue(0)]object html, [DefaultParameterValue(null)]object target, [DefaultParameterValue(null)]string encoding) {
+            return new XMLParser(context, html, target, encoding);
+        }
+
+        #endregion
+
+        #region iterparse
+
+        /// <summary>
+        /// Incrementally parses source (a file name or a file object) yielding (event, elem)
+        /// pairs.  Only a small read buffer is held in memory; callers that clear() elements
+        /// once they've processed them can parse arbitrarily large documents.
+        /// </summary>
+        [PythonType]
+        public class iterparse : IEnumerator<object> {
+            private readonly CodeContext _context;
+            private readonly Stream _stream;
+            private readonly XmlReader _reader;
+            private readonly NodeReader _nodes;
+            private readonly EventReader _events;
+            private readonly XMLParser _parser;
+            private object _current;
+            private bool _done;
+
+            public object root;
+
+            public iterparse(CodeContext/*!*/ context, object source, [DefaultParameterValue(null)]object events, [DefaultParameterValue(null)]object parser) {
+                if (parser == null) {
+                    _parser = new XMLParser(context, 0, null, null);
+                } else {
+                    _parser = parser as XMLParser;
+                    if (_parser == null) {
+                        throw PythonOps.TypeError("iterparse() parser must be an _elementtree.XMLParser, not {0}", PythonTypeOps.GetName(parser));
+                    }
+                }
+
+                bool start = false, end = false, startNs = false, endNs = false;
+                if (events == null) {
+                    end = true;
+                } else {
+                    IEnumerator e = PythonOps.GetEnumerator(events);
+                    while (e.MoveNext()) {
+                        string name = e.Current as string;
+                        switch (name) {
+                            case "start": start = true; break;
+                            case "end": end = true; break;
+                            case "start-ns": startNs = true; break;
+                            case "end-ns": endNs = true; break;
+                            default:
+                                throw new ValueErrorException("unknown event " + PythonOps.Repr(context, e.Current));
+                        }
+                    }
+                }
+
+                _context = context;
+                string filename = source as string;
+                if (filename != null) {
+                    try {
+                        _stream = context.LanguageContext.DomainManager.Platform.OpenInputFileStream(filename, FileMode.Open, FileAccess.Read, FileShare.Read);
+                    } catch (IOException ex) {
+                        throw PythonOps.IOError(ex);
+                    }
+                    _reader = XmlReader.Create(_stream, CreateSettings());
+                } else {
+                    _reader = XmlReader.Create(new PythonFileReader(context, source), CreateSettings());
+                }
+
+                _nodes = new NodeReader(_reader);
+                _events = new EventReader(context, _parser, start, end);
+                _events.ReportNamespaces(startNs, endNs);
+            }
+
+            public object Current {
+                get { return _current; }
+            }
+
+            public bool MoveNext() {
+                if (_done) {
+                    return false;
+                }
+
+                for (; ; ) {
+                    if (_events.Pending.Count != 0) {
+                        _current = _events.Pending.Dequeue();
+                        return true;
+                    }
+
+                    XmlNodeInfo node;
+                    try {
+                        node = _nodes.Read();
+                    } catch (XmlException ex) {
+                        Close();
+                        throw MakeParseError(_context, ex);
+                    } catch {
+                        Close();
+                        throw;
+                    }
+
+                    if (node == null) {
+                        Close();
+                        root = _parser.CloseTarget(_context);
+                        return false;
+                    }
+
+                    try {
+                        _events.Dispatch(node);
+                    } catch {
+                        Close();
+                        throw;
+                    }
+                }
+            }
+
+            public void Reset() {
+                throw new NotSupportedException();
+            }
+
+            public void Dispose() {
+                Close();
+            }
+
+            private void Close() {
+                if (!_done) {
+                    _done = true;
+                    _reader.Close();
+                    if (_stream != null) {
+                        _stream.Close();
+                    }
+                }
+            }
+        }
+
+        #endregion
+
+        public static object XML(CodeContext/*!*/ context, [NotNull]string text, [DefaultParameterValue(null)]object parser) {
+            if (parser == null) {
+                parser = new XMLParser(context, 0, null, null);
+            }
+            PythonOps.Invoke(context, parser, "feed", text);
+            return PythonOps.Invoke(context, parser, "close");
+        }
+
+        public static object fromstring(CodeContext/*!*/ context, [NotNull]string text, [DefaultParameterValue(null)]object parser) {
+            return XML(context, text, parser);
+        }
+
+        #region Parsing implementation
+
+        private static XmlReaderSettings CreateSettings() {
+            XmlReaderSettings settings = new XmlReaderSettings();
+            settings.DtdProcessing = DtdProcessing.Parse;
+            settings.XmlResolver = null;
+            settings.MaxCharactersFromEntities = 10000000;
+            settings.IgnoreWhitespace = false;
+            settings.IgnoreComments = false;
+            settings.IgnoreProcessingInstructions = false;
+            settings.CloseInput = false;
+            return settings;
+        }
+
+        private static string QualifiedName(XmlReader reader) {
+            if (reader.NamespaceURI.Length == 0) {
+                return reader.LocalName;
+            }
+            return "{" + reader.NamespaceURI + "}" + reader.LocalName;
+        }
+
+        private static Exception MakeParseError(CodeContext/*!*/ context, XmlException ex) {
+            object etree = Importer.ImportModule(context, new PythonDictionary(), "xml.etree.ElementTree", true, 0);
+            object parseError = PythonOps.GetBoundAttr(context, etree, "ParseError");
+
+            object err = PythonCalls.Call(context, parseError, ex.Message);
+            PythonOps.SetAttr(context, err, "code", 2);   // XML_ERROR_SYNTAX
+            PythonOps.SetAttr(context, err, "position", PythonTuple.MakeTuple(ex.LineNumber, Math.Max(0, ex.LinePosition - 1)));
+            return PythonOps.MakeException(context, err, null, null);
+        }
+
+        /// <summary>
+        /// A node read from the document, detached from the XmlReader so that it can be read on
+        /// one thread and dispatched on another.  Text, CDATA and whitespace are all Text.
+        /// </summary>
+        private sealed class XmlNodeInfo {
+            public readonly XmlNodeType Type;
+            public readonly string Name, Value;
+            public List<KeyValuePair<string, string>> Attributes, Namespaces;
+            public bool IsEmpty;
+            public string PublicId, SystemId;
+
+            public XmlNodeInfo(XmlNodeType type, string name, string value) {
+                Type = type;
+                Name = name;
+                Value = value;
+            }
+        }
+
+        /// <summary>
+        /// Reads the nodes the parser reports from an XmlReader.
+        /// </summary>
+        private sealed class NodeReader {
+            private readonly XmlReader _reader;
+
+            public NodeReader(XmlReader/*!*/ reader) {
+                _reader = reader;
+            }
+
+            /// <summary>
+            /// Returns the next node or null at the end of the document.
+            /// </summary>
+            public XmlNodeInfo Read() {
+                while (_reader.Read()) {
+                    switch (_reader.NodeType) {
+                        case XmlNodeType.Element:
+                            return ReadElement();
+                        case XmlNodeType.EndElement:
+                            return new XmlNodeInfo(XmlNodeType.EndElement, QualifiedName(_reader), null);
+                        case XmlNodeType.Text:
+                        case XmlNodeType.CDATA:
+                        case XmlNodeType.Whitespace:
+                        case XmlNodeType.SignificantWhitespace:
+                            return new XmlNodeInfo(XmlNodeType.Text, null, _reader.Value);
+                        case XmlNodeType.Comment:
+                            return new XmlNodeInfo(XmlNodeType.Comment, null, _reader.Value);
+                        case XmlNodeType.ProcessingInstruction:
+                            return new XmlNodeInfo(XmlNodeType.ProcessingInstruction, _reader.Name, _reader.Value);
+                        case XmlNodeType.DocumentType:
+                            XmlNodeInfo doctype = new XmlNodeInfo(XmlNodeType.DocumentType, _reader.Name, null);
+                            doctype.PublicId = _reader.GetAttribute("PUBLIC");
+                            doctype.SystemId = _reader.GetAttribute("SYSTEM");
+                            return doctype;
+                    }
+                }
+                return null;
+            }
+
+            private XmlNodeInfo ReadElement() {
+                XmlNodeInfo node = new XmlNodeInfo(XmlNodeType.Element, QualifiedName(_reader), null);
+                node.IsEmpty = _reader.IsEmptyElement;
+
+                if (_reader.MoveToFirstAttribute()) {
+                    do {
+                        if (_reader.NamespaceURI == XmlnsNamespace) {
+                            if (node.Namespaces == null) {
+                                node.Namespaces = new List<KeyValuePair<string, string>>();
+                            }
+                            string prefix = _reader.Prefix.Length == 0 ? "" : _reader.LocalName;
+                            node.Namespaces.Add(new KeyValuePair<string, string>(prefix, _reader.Value));
+                            continue;
+                        }
+
+                        if (node.Attributes == null) {
+                            node.Attributes = new List<KeyValuePair<string, string>>();
+                        }
+                        node.Attributes.Add(new KeyValuePair<string, string>(QualifiedName(_reader), _reader.Value));
+                    } while (_reader.MoveToNextAttribute());
+                    _reader.MoveToElement();
+                }
+
+                return node;
+            }
+        }
+
+        /// <summary>
+        /// Translates nodes into target callbacks and, when requested, queues iterparse events.
+        /// </summary>
+        private sealed class EventReader {
+            private readonly CodeContext _context;
+            private readonly XMLParser _parser;
+            private readonly bool _reportStart, _reportEnd;
+            private bool _reportStartNs, _reportEndNs;
+            private readonly Queue<object> _pending = new Queue<object>();
+            private readonly Stack<int> _nsCounts = new Stack<int>();
+
+            public EventReader(CodeContext/*!*/ context, XMLParser parser, bool reportStart, bool reportEnd) {
+                _context = context;
+                _parser = parser;
+                _reportStart = reportStart;
+                _reportEnd = reportEnd;
+            }
+
+            public CodeContext Context {
+                get { return _context; }
+            }
+
+            public Queue<object> Pending {
+                get { return _pending; }
+            }
+
+            public void ReportNamespaces(bool startNs, bool endNs) {
+                _reportStartNs = startNs;
+                _reportEndNs = endNs;
+            }
+
+            public void Dispatch(XmlNodeInfo/*!*/ node) {
+                switch (node.Type) {
+                    case XmlNodeType.Element:
+                        StartElement(node);
+                        break;
+                    case XmlNodeType.EndElement:
+                        EndElement(node.Name);
+                        break;
+                    case XmlNodeType.Text:
+                        if (_nsCounts.Count != 0) {
+                            // expat doesn't report data outside of the document element
+                            _parser.Data(_context, node.Value);
+                        }
+                        break;
+                    case XmlNodeType.Comment:
+                        _parser.Comment(_context, node.Value);
+                        break;
+                    case XmlNodeType.ProcessingInstruction:
+                        _parser.ProcessingInstruction(_context, node.Name, node.Value);
+                        break;
+                    case XmlNodeType.DocumentType:
+                        _parser.DocType(_context, node.Name, node.PublicId, node.SystemId);
+                        break;
+                }
+            }
+
+            private void StartElement(XmlNodeInfo/*!*/ node) {
+                PythonDictionary attrib = null;
+                if (node.Attributes != null) {
+                    attrib = new PythonDictionary();
+                    foreach (KeyValuePair<string, string> attr in node.Attributes) {
+                        attrib[attr.Key] = attr.Value;
+                    }
+                }
+
+                int nsCount = 0;
+                if (node.Namespaces != null) {
+                    nsCount = node.Namespaces.Count;
+                    if (_reportStartNs) {
+                        foreach (KeyValuePair<string, string> decl in node.Namespaces) {
+                            _pending.Enqueue(PythonTuple.MakeTuple("start-ns", PythonTuple.MakeTuple(decl.Key, decl.Value)));
+                        }
+                    }
+                }
+
+                _nsCounts.Push(nsCount);
+                object elem = _parser.Start(_context, node.Name, attrib);
+                if (_reportStart) {
+                    _pending.Enqueue(PythonTuple.MakeTuple("start", elem));
+                }
+
+                if (node.IsEmpty) {
+                    EndElement(node.Name);
+                }
+            }
+
+            private void EndElement(string tag) {
+                object elem = _parser.End(_context, tag);
+                if (_reportEnd) {
+                    _pending.Enqueue(PythonTuple.MakeTuple("end", elem));
+                }
+
+                int nsCount = _nsCounts.Pop();
+                if (_reportEndNs) {
+                    for (int i = 0; i < nsCount; i++) {
+                        _pending.Enqueue(PythonTuple.MakeTuple("end-ns", null));
+                    }
+                }
+            }
+        }
+
+        /// <summary>
+        /// Turns the strings passed to feed() or returned by read() into document text.
+        ///
+        /// IronPython uses the same string type for byte strings (one character per byte, e.g.
+        /// read from a file opened in binary mode) and unicode, so the kind of input is decided
+        /// once per document, at the first non-ASCII data: data with characters above 0xFF is
+        /// unicode, data starting with a byte order mark or declaring an encoding other than
+        /// UTF-8 is bytes in that encoding, other data that is valid UTF-8 is UTF-8 bytes and
+        /// anything else is unicode.  Unicode is used as is, whatever encoding the document
+        /// declares, and bytes are decoded with a stateful decoder so that multi-byte sequences
+        /// may be split across chunks.
+        /// </summary>
+        private sealed class InputDecoder {
+            private const int HeadSize = 256;
+            private readonly StringBuilder _head = new StringBuilder();  // ASCII input seen before deciding, for finding the declaration
+            private string _pending = String.Empty;                    // a first character which may start a byte order mark
+            private bool _decided, _started;
+            private Decoder _decoder;                                   // null for unicode input
+
+            public string Decode(string/*!*/ data, bool final) {
+                if (!_decided) {
+                    if (_pending.Length != 0) {
+                        data = _pending + data;
+                        _pending = String.Empty;
+                    }
+
+                    if (IsAscii(data)) {
+                        if (_head.Length < HeadSize) {
+                            _head.Append(data, 0, Math.Min(data.Length, HeadSize - _head.Length));
+                        }
+                        _started |= data.Length != 0;
+                        return data;
+                    }
+
+                    if (_head.Length == 0 && data.Length < 2 && !final) {
+                        _pending = data;
+                        return String.Empty;
+                    }
+
+                    Decide(data);
+                }
+
+                string text;
+                if (_decoder == null || HasWideChars(data)) {
+                    text = data;
+                } else {
+                    byte[] bytes = PythonOps.MakeByteArray(data);
+                    char[] chars = new char[_decoder.GetCharCount(bytes, 0, bytes.Length, final)];
+                    int count = _decoder.GetChars(bytes, 0, bytes.Length, chars, 0, final);
+                    text = new string(chars, 0, count);
+                }
+
+                if (!_started && text.Length != 0) {
+                    _started = true;
+                    if (text[0] == '\uFEFF') {
+                        // XmlReader only accepts a byte order mark in byte input
+                        text = text.Substring(1);
+                    }
+                }
+                return text;
+            }
+
+            private void Decide(string/*!*/ data) {
+                _decided = true;
+                if (HasWideChars(data)) {
+                    return;
+                }
+
+                Encoding encoding = null;
+                if (_head.Length == 0 && data.StartsWith("\u00EF\u00BB\u00BF", StringComparison.Ordinal)) {
+                    encoding = Encoding.UTF8;
+                } else if (_head.Length == 0 && data.StartsWith("\u00FF\u00FE", StringComparison.Ordinal)) {
+                    encoding = Encoding.Unicode;
+                } else if (_head.Length == 0 && data.StartsWith("\u00FE\u00FF", StringComparison.Ordinal)) {
+                    encoding = Encoding.BigEndianUnicode;
+                } else {
+                    string declared = GetDeclaredEncoding(_head.ToString() + data.Substring(0, Math.Min(data.Length, HeadSize)));
+                    if (declared != null && !IsUtf8(declared)) {
+                        encoding = TryGetEncoding(declared);
+                    }
+                    if (encoding == null && IsValidUtf8(data)) {
+                        encoding = Encoding.UTF8;
+                    }
+                }
+
+                if (encoding != null) {
+                    _decoder = encoding.GetDecoder();
+                }
+            }
+
+            private static bool IsAscii(string/*!*/ data) {
+                for (int i = 0; i < data.Length; i++) {
+                    if (data[i] >= 0x80) {
+                        return false;
+                    }
+                }
+                return true;
+            }
+
+            private static bool HasWideChars(string/*!*/ data) {
+                for (int i = 0; i < data.Length; i++) {
+                    if (data[i] > 0xFF) {
+                        return true;
+                    }
+                }
+                return false;
+            }
+
+            /// <summary>
+            /// Checks that data is a valid UTF-8 byte sequence, allowing a sequence to be cut
+            /// off at the end of the chunk.
+            /// </summary>
+            private static bool IsValidUtf8(string/*!*/ data) {
+                int i = 0;
+                while (i < data.Length) {
+                    int c = data[i++], trailing;
+                    if (c < 0x80) {
+                        continue;
+                    } else if (c >= 0xC2 && c <= 0xDF) {
+                        trailing = 1;
+                    } else if (c >= 0xE0 && c <= 0xEF) {
+                        trailing = 2;
+                    } else if (c >= 0xF0 && c <= 0xF4) {
+                        trailing = 3;
+                    } else {
+                        return false;
+                    }
+
+                    for (; trailing > 0 && i < data.Length; trailing--, i++) {
+                        if ((data[i] & 0xC0) != 0x80) {
+                            return false;
+                        }
+                    }
+                }
+                return true;
+            }
+
+            private static bool IsUtf8(string/*!*/ name) {
+                return String.Equals(name, "utf-8", StringComparison.OrdinalIgnoreCase) ||
+                    String.Equals(name, "utf8", StringComparison.OrdinalIgnoreCase);
+            }
+
+            private static Encoding TryGetEncoding(string/*!*/ name) {
+                try {
+                    return Encoding.GetEncoding(name);
+                } catch (ArgumentException) {
+                    return null;
+                }
+            }
+
+            /// <summary>
+            /// Returns the encoding named by the XML declaration at the start of head, if any.
+            /// </summary>
+            private static string GetDeclaredEncoding(string/*!*/ head) {
+                if (!head.StartsWith("<?xml", StringComparison.Ordinal)) {
+                    return null;
+                }
+
+                int end = head.IndexOf("?>", StringComparison.Ordinal);
+                if (end >= 0) {
+                    head = head.Substring(0, end);
+                }
+
+                int i = head.IndexOf("encoding", StringComparison.Ordinal);
+                if (i < 0) {
+                    return null;
+                }
+
+                i += "encoding".Length;
+                while (i < head.Length && (head[i] == ' ' || head[i] == '\t' || head[i] == '\r' || head[i] == '\n' || head[i] == '=')) {
+                    i++;
+                }
+                if (i == head.Length || (head[i] != '"' && head[i] != '\'')) {
+                    return null;
+                }
+
+                int close = head.IndexOf(head[i], i + 1);
+                if (close < 0) {
+                    return null;
+                }
+                return head.Substring(i + 1, close - i - 1);
+            }
+        }
+
+#if FEATURE_THREAD
+        /// <summary>
+        /// Text written by XMLParser.feed() and read by an XmlReader running on a worker thread.
+        /// The worker records the nodes it reads for the feeding thread to dispatch.
+        /// </summary>
+        private sealed class InputPipe : TextReader {
+            private readonly object _lock = new object();
+            private readonly Queue<string> _chunks = new Queue<string>();
+            private string _current = String.Empty;
+            private int _position;
+            private bool _complete, _waiting, _finished;
+            private List<XmlNodeInfo> _nodes = new List<XmlNodeInfo>();
+            private Exception _error;
+
+            public void Start() {
+                Thread thread = new Thread(Run);
+                thread.IsBackground = true;
+                thread.Start();
+            }
+
+            public void Write(string/*!*/ text) {
+                if (text.Length != 0) {
+                    lock (_lock) {
+                        _chunks.Enqueue(text);
+                        Monitor.PulseAll(_lock);
+                    }
+                }
+            }
+
+            /// <summary>
+            /// Marks the end of the input.
+            /// </summary>
+            public void Complete() {
+                lock (_lock) {
+                    _complete = true;
+                    Monitor.PulseAll(_lock);
+                }
+            }
+
+            /// <summary>
+            /// Ends the input of a parser which won't be closed; the reader reports an error and
+            /// the worker exits.
+            /// </summary>
+            public void Abandon() {
+                lock (_lock) {
+                    _chunks.Clear();
+                    _complete = true;
+                    Monitor.PulseAll(_lock);
+                }
+            }
+
+            /// <summary>
+            /// Waits until the reader has consumed everything written so far, or has finished
+            /// once the input is complete, and returns the nodes read since the last call along
+            /// with the error the reader failed with, if any.
+            /// </summary>
+            public List<XmlNodeInfo> TakeNodes(out Exception error) {
+                lock (_lock) {
+                    while (!_finished && (_complete || !_waiting || _chunks.Count != 0)) {
+                        Monitor.Wait(_lock);
+                    }
+
+                    List<XmlNodeInfo> res = _nodes;
+                    _nodes = new List<XmlNodeInfo>();
+                    error = _error;
+                    return res;
+                }
+            }
+
+            private void Run() {
+                Exception error = null;
+                try {
+                    using (XmlReader reader = XmlReader.Create(this, CreateSettings())) {
+                        NodeReader nodes = new NodeReader(reader);
+                        XmlNodeInfo node;
+                        while ((node = nodes.Read()) != null) {
+                            lock (_lock) {
+                                _nodes.Add(node);
+                            }
+                        }
+                    }
+                } catch (Exception ex) {
+                    error = ex;
+                }
+
+                lock (_lock) {
+                    _finished = true;
+                    _error = error;
+                    _chunks.Clear();
+                    Monitor.PulseAll(_lock);
+                }
+            }
+
+            public override int Read(char[] buffer, int index, int count) {
+                lock (_lock) {
+                    while (_position == _current.Length) {
+                        if (_chunks.Count != 0) {
+                            _current = _chunks.Dequeue();
+                            _position = 0;
+                        } else if (_complete) {
+                            return 0;
+                        } else {
+                            _waiting = true;
+                            Monitor.PulseAll(_lock);
+                            Monitor.Wait(_lock);
+                            _waiting = false;
+                        }
+                    }
+
+                    int read = Math.Min(count, _current.Length - _position);
+                    _current.CopyTo(_position, buffer, index, read);
+                    _position += read;
+                    return read;
+                }
+            }
+
+            public override int Read() {
+                char[] buffer = new char[1];
+                return Read(buffer, 0, 1) == 0 ? -1 : buffer[0];
+            }
+        }
+#endif
+
+        /// <summary>
+        /// Reader over a Python file-like object's read(n) method.
+        /// </summary>
+        private sealed class PythonFileReader : TextReader {
+            private readonly CodeContext _context;
+            private readonly object _read;
+            private readonly InputDecoder _decoder = new InputDecoder();
+            private string _current = String.Empty;
+            private int _position;
+            private bool _eof;
+
+            public PythonFileReader(CodeContext/*!*/ context, object file) {
+                _context = context;
+                _read = PythonOps.GetBoundAttr(context, file, "read");
+            }
+
+            public override int Read(char[] buffer, int index, int count) {
+                while (_position == _current.Length) {
+                    if (_eof) {
+                        return 0;
+                    }
+
+                    object data = PythonCalls.Call(_context, _read, DefaultReadSize);
+                    string str = data as string;
+                    if (str == null) {
+                        if (data is Bytes) {
+                            str = ((Bytes)data).ToString();
+                        } else if (data == null) {
+                            str = String.Empty;
+                        } else {
+                            throw PythonOps.TypeError("read() did not return a string object (type={0})", PythonTypeOps.GetName(data));
+                        }
+                    }
+
+                    _eof = str.Length == 0;
+                    _current = _decoder.Decode(str, _eof);
+                    _position = 0;
+                }
+
+                int read = Math.Min(count, _current.Length - _position);
+                _current.CopyTo(_position, buffer, index, read);
+                _position += read;
+                return read;
+            }
+
+            public override int Read() {
+                char[] buffer = new char[1];
+                return Read(buffer, 0, 1) == 0 ? -1 : buffer[0];
+            }
+        }
+
+        #endregion
+    }
+}
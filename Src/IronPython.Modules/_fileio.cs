@@ -55,6 +55,7 @@ namespace IronPython.Modules {
 
             private Stream _readStream;
             private Stream _writeStream;
+            private byte[] _buffer; // scratch buffer for readinto and write, see BufferOps.TakeBuffer
             private bool _closed, _closefd;
             private string _mode;
             private WeakRefTracker _tracker;
@@ -342,20 +343,15 @@ namespace IronPython.Modules {
 
             [Documentation("readinto() -> Same as RawIOBase.readinto().")]
             public BigInteger readinto([NotNull]ArrayModule.array buffer) {
-                EnsureReadable();
-
-                return (int)buffer.FromStream(_readStream, 0, buffer.__len__() * buffer.itemsize);
+                return ReadIntoWorker(buffer);
             }
 
             public BigInteger readinto([NotNull]ByteArray buffer) {
-                EnsureReadable();
+                return ReadIntoWorker(buffer);
+            }
 
-                for (int i = 0; i < buffer.Count; i++) {
-                    int b = _readStream.ReadByte();
-                    if (b == -1) return i - 1;
-                    buffer[i] = (byte)b;
-                }
-                return buffer.Count;
+            public BigInteger readinto([NotNull]MemoryView buffer) {
+                return ReadIntoWorker(buffer);
             }
 
             public BigInteger readinto([NotNull]PythonBuffer buffer) {
@@ -365,21 +361,56 @@ namespace IronPython.Modules {
             }
 
             public override BigInteger readinto(CodeContext/*!*/ context, object buf) {
-                ByteArray bytes = buf as ByteArray;
-                if (bytes != null) {
-                    return readinto(bytes);
+                int length;
+                if (!BufferOps.TryGetWritableLength(buf, out length)) {
+                    EnsureReadable();
+                    throw PythonOps.TypeError(
+                        "argument 1 must be read/write buffer, not {0}",
+                        DynamicHelpers.GetPythonType(buf).Name
+                    );
+                }
+
+                return ReadIntoWorker(buf);
+            }
+
+            /// <summary>
+            /// Reads into a writable bytes-like object: directly if it exposes its memory,
+            /// otherwise through the scratch buffer of this file.
+            /// </summary>
+            private int ReadIntoWorker(object buf) {
+                EnsureReadable();
+
+                int length;
+                BufferOps.TryGetWritableLength(buf, out length);
+
+                ArraySegment<byte> segment;
+                if (BufferOps.TryGetWritableSegment(buf, out segment)) {
+                    return _readStream.Read(segment.Array, segment.Offset, length);
                 }
 
-                ArrayModule.array arr = buf as ArrayModule.array;
-                if (arr != null) {
-                    return readinto(bytes);
-                };
+                byte[] buffer = BufferOps.TakeBuffer(ref _buffer, length);
+                try {
+                    int bytesRead = _readStream.Read(buffer, 0, length);
+                    ArrayModule.array arr = buf as ArrayModule.array;
+                    if (arr != null) {
+                        arr.SetBytes(0, buffer, 0, bytesRead);
+                    } else {
+                        BufferOps.Write(buf, 0, buffer, 0, bytesRead);
+                    }
+                    return bytesRead;
+                } finally {
+                    BufferOps.ReturnBuffer(ref _buffer, buffer);
+                }
+            }
 
+            /// <summary>
+            /// Reads at most count bytes into the array, used by BufferedReader to bypass its
+            /// buffer for large reads.
+            /// </summary>
+            internal int ReadInto(byte[] buffer, int offset, int count) {
                 EnsureReadable();
-                throw PythonOps.TypeError(
-                    "argument 1 must be read/write buffer, not {0}",
-                    DynamicHelpers.GetPythonType(buf).Name
-                );
+
+                return _readStream.Read(buffer, offset, count);
             }
 
             [Documentation("seek(offset: int[, whence: int]) -> None.  Move to new file position.\n\n"
@@ -458,12 +489,16 @@ namespace IronPython.Modules {
             }
 
             private BigInteger write([NotNull]byte[] b) {
+                return write(new ArraySegment<byte>(b));
+            }
+
+            private BigInteger write(ArraySegment<byte> b) {
                 EnsureWritable();
 
-                _writeStream.Write(b, 0, b.Length);
+                _writeStream.Write(b.Array, b.Offset, b.Count);
                 SeekToEnd();
 
-                return b.Length;
+                return b.Count;
             }
 
             private BigInteger write([NotNull]Bytes b) {
@@ -474,9 +509,13 @@ namespace IronPython.Modules {
                 EnsureWritable();
 
                 int len = b.Count;
-                byte[] bytes = new byte[len];
-                b.CopyTo(bytes, 0);
-                _writeStream.Write(bytes, 0, len);
+                byte[] bytes = BufferOps.TakeBuffer(ref _buffer, len);
+                try {
+                    b.CopyTo(bytes, 0);
+                    _writeStream.Write(bytes, 0, len);
+                } finally {
+                    BufferOps.ReturnBuffer(ref _buffer, bytes);
+                }
                 SeekToEnd();
 
                 return len;
@@ -506,6 +545,12 @@ namespace IronPython.Modules {
                     return write(bPythonArray.ToByteArray());
                 }
 
+                // memoryview and buffer objects are written without copying them if possible
+                ArraySegment<byte> segment;
+                if ((b is MemoryView || b is PythonBuffer) && BufferOps.TryGetReadableSegment(b, out segment)) {
+                    return write(segment);
+                }
+
                 ICollection<byte> bCollection = b as ICollection<byte>;
                 if (bCollection != null) {
                     return write(bCollection);
@@ -33,6 +33,7 @@ namespace IronPython.Modules {
 
         [Documentation("Transform list into a heap, in-place, in O(len(heap)) time.")]
         public static void heapify(CodeContext/*!*/ context, List list) {
+            list.Inflate();
             lock (list) {
                 DoHeapify(context, list);
             }
@@ -40,6 +41,7 @@ namespace IronPython.Modules {
 
         [Documentation("Pop the smallest item off the heap, maintaining the heap invariant.")]
         public static object heappop(CodeContext/*!*/ context, List list) {
+            list.Inflate();
             lock (list) {
                 int last = list._size - 1;
                 if (last < 0) {
@@ -54,6 +56,7 @@ namespace IronPython.Modules {
 
         [Documentation("Push item onto heap, maintaining the heap invariant.")]
         public static void heappush(CodeContext/*!*/ context, List list, object item) {
+            list.Inflate();
             lock (list) {
                 list.AddNoLock(item);
                 SiftUp(context, list, list._size - 1);
@@ -65,6 +68,7 @@ namespace IronPython.Modules {
             + "heappush() followed by a separate call to heappop()."
             )]
         public static object heappushpop(CodeContext/*!*/ context, List list, object item) {
+            list.Inflate();
             lock (list) {
                 return DoPushPop(context, list, item);
             }
@@ -79,6 +83,7 @@ namespace IronPython.Modules {
             + "            item = heapreplace(heap, item)\n"
             )]
         public static object heapreplace(CodeContext/*!*/ context, List list, object item) {
+            list.Inflate();
             lock (list) {
                 object ret = list._data[0];
                 list._data[0] = item;
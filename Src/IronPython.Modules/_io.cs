@@ -515,6 +515,13 @@ namespace IronPython.Modules {
                 }
 
                 Bytes data = GetBytes(dataObj, "read()");
+                int bufLength;
+                if (BufferOps.TryGetWritableLength(buf, out bufLength) && data.Count <= bufLength) {
+                    BufferOps.Write(buf, 0, data._bytes, 0, data.Count);
+                    GC.KeepAlive(this);
+                    return data.Count;
+                }
+
                 IList<byte> bytes = buf as IList<byte>;
                 if (bytes != null) {
                     for (int i = 0; i < data.Count; i++) {
@@ -614,6 +621,7 @@ namespace IronPython.Modules {
             private int _bufSize;
             private Bytes _readBuf;
             private int _readBufPos;
+            private byte[] _buffer; // scratch buffer for readinto, see BufferOps.TakeBuffer
 
             internal static BufferedReader Create(CodeContext/*!*/ context, object raw, [DefaultParameterValue(DEFAULT_BUFFER_SIZE)]int buffer_size) {
                 var res = new BufferedReader(context, raw, buffer_size);
@@ -908,6 +916,80 @@ namespace IronPython.Modules {
                 }
             }
 
+            public override BigInteger readinto(CodeContext/*!*/ context, object buf) {
+                int length;
+                if (!BufferOps.TryGetWritableLength(buf, out length)) {
+                    return base.readinto(context, buf);
+                }
+
+                lock (this) {
+                    int written = 0;
+                    while (written < length) {
+                        int remaining = length - written;
+                        int buffered = _readBuf.Count - _readBufPos;
+                        if (buffered > 0) {
+                            // copy what's already buffered
+                            int count = Math.Min(buffered, remaining);
+                            BufferOps.Write(buf, written, _readBuf._bytes, _readBufPos, count);
+                            _readBufPos += count;
+                            if (_readBufPos == _readBuf.Count) {
+                                _readBuf = Bytes.Empty;
+                                _readBufPos = 0;
+                            }
+                            written += count;
+                            continue;
+                        }
+
+                        FileIO file = _rawIO as FileIO;
+                        if (file != null && remaining >= _bufSize) {
+                            // large reads from files bypass the buffer
+                            int read = ReadRawNoLock(file, buf, written, remaining);
+                            if (read == 0) {
+                                break;
+                            }
+                            written += read;
+                            continue;
+                        }
+
+                        object chunkObj;
+                        if (_rawIO != null) {
+                            chunkObj = _rawIO.read(context, _bufSize);
+                        } else {
+                            chunkObj = PythonOps.Invoke(context, _raw, "read", _bufSize);
+                        }
+
+                        _readBuf = chunkObj != null ? GetBytes(chunkObj, "read()") : Bytes.Empty;
+                        _readBufPos = 0;
+                        if (_readBuf.Count == 0) {
+                            break;
+                        }
+                    }
+
+                    GC.KeepAlive(this);
+                    return written;
+                }
+            }
+
+            /// <summary>
+            /// Reads from the file straight into buf at offset if it exposes its memory, otherwise
+            /// through the scratch buffer of this reader.
+            /// </summary>
+            private int ReadRawNoLock(FileIO/*!*/ file, object buf, int offset, int count) {
+                ArraySegment<byte> segment;
+                if (BufferOps.TryGetWritableSegment(buf, out segment)) {
+                    return file.ReadInto(segment.Array, segment.Offset + offset, count);
+                }
+
+                byte[] buffer = BufferOps.TakeBuffer(ref _buffer, _bufSize);
+                try {
+                    int read = file.ReadInto(buffer, 0, Math.Min(count, buffer.Length));
+                    BufferOps.Write(buf, offset, buffer, 0, read);
+                    return read;
+                } finally {
+                    BufferOps.ReturnBuffer(ref _buffer, buffer);
+                }
+            }
+
             public override BigInteger tell(CodeContext/*!*/ context) {
                 BigInteger res = _rawIO != null ?
                     _rawIO.tell(context) :
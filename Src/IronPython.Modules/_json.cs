@@ -0,0 +1,868 @@
+/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Numerics;
+using System.Runtime.CompilerServices;
+using System.Runtime.InteropServices;
+using System.Text;
+
+using Microsoft.Scripting.Runtime;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Exceptions;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+[assembly: PythonModule("_json", typeof(IronPython.Modules.PythonJson))]
+namespace IronPython.Modules {
+    /// <summary>
+    /// Accelerators for the json package.  The scanner and encoder work directly over
+    /// the source string / a single StringBuilder and follow the error messages and
+    /// positions of the pure Python implementation in json/decoder.py and json/encoder.py.
+    /// </summary>
+    public static class PythonJson {
+        public const string __doc__ = "json speedups\n";
+
+        /// <summary>
+        /// Nesting limit used when sys.setrecursionlimit has not been called, matching
+        /// CPython's default so deeply nested documents fail with RuntimeError rather
+        /// than overflowing the CLR stack.
+        /// </summary>
+        private const int DefaultRecursionLimit = 1000;
+
+        #region Public API
+
+        [Documentation(@"scanstring(basestring, end, encoding, strict=True) -> (str, end)
+
+Scan the string s for a JSON string. End is the index of the
+character in s after the quote that started the JSON string.
+Unescapes all valid JSON string escape sequences and raises ValueError
+on attempt to decode an invalid string. If strict is False then literal
+control characters are allowed in the string.
+
+Returns a tuple of the decoded string and the index of the character in s
+after the end quote.")]
+        public static PythonTuple scanstring(CodeContext/*!*/ context, string s, int end, [DefaultParameterValue(null)]object encoding, [DefaultParameterValue(true)]bool strict) {
+            if (end < 0 || end > s.Length) {
+                throw PythonOps.ValueError("end is out of bounds");
+            }
+
+            int next;
+            string res = ScanString(context, s, end, strict, out next);
+            return PythonTuple.MakeTuple(res, next);
+        }
+
+        [Documentation(@"encode_basestring_ascii(basestring) -> str
+
+Return an ASCII-only JSON representation of a Python string")]
+        public static string encode_basestring_ascii(object s) {
+            string str = AsString(s);
+            if (str == null) {
+                throw PythonOps.TypeError("first argument must be a string, not {0}", PythonTypeOps.GetName(s));
+            }
+
+            str = MaybeDecodeUtf8(str);
+            if (!NeedsEscape(str)) {
+                return string.Concat("\"", str, "\"");
+            }
+
+            StringBuilder res = new StringBuilder(str.Length + 16);
+            EncodeBasestringAscii(res, str);
+            return res.ToString();
+        }
+
+        [Documentation("JSON scanner object")]
+        public static Scanner make_scanner(CodeContext/*!*/ context, object ctx) {
+            return new Scanner(context, ctx);
+        }
+
+        [Documentation("_iterencode(obj, _current_indent_level) -> iterable")]
+        public static Encoder make_encoder(CodeContext/*!*/ context, object markers, object @default, object encoder, object indent,
+            object key_separator, object item_separator, object sort_keys, object skipkeys, object allow_nan) {
+            return new Encoder(context, markers, @default, encoder, indent, key_separator, item_separator, sort_keys, skipkeys, allow_nan);
+        }
+
+        #endregion
+
+        #region Scanner
+
+        [PythonType("Scanner"), PythonHidden]
+        public sealed class Scanner {
+            private readonly bool _strict;
+            private readonly object _objectHook, _objectPairsHook, _parseFloat, _parseInt, _parseConstant, _encoding;
+            private readonly bool _floatIsDefault, _intIsDefault;
+            private readonly int _recursionLimit;
+
+            internal Scanner(CodeContext/*!*/ context, object ctx) {
+                object encoding = PythonOps.GetBoundAttr(context, ctx, "encoding");
+                _encoding = encoding ?? "utf-8";
+                _strict = PythonOps.IsTrue(PythonOps.GetBoundAttr(context, ctx, "strict"));
+                _objectHook = PythonOps.GetBoundAttr(context, ctx, "object_hook");
+                _objectPairsHook = PythonOps.GetBoundAttr(context, ctx, "object_pairs_hook");
+                _parseFloat = PythonOps.GetBoundAttr(context, ctx, "parse_float");
+                _parseInt = PythonOps.GetBoundAttr(context, ctx, "parse_int");
+                _parseConstant = PythonOps.GetBoundAttr(context, ctx, "parse_constant");
+
+                _floatIsDefault = _parseFloat == TypeCache.Double;
+                _intIsDefault = _parseInt == TypeCache.Int32;
+                _recursionLimit = GetRecursionLimit(context);
+            }
+
+            public object encoding { get { return _encoding; } }
+            public bool strict { get { return _strict; } }
+            public object object_hook { get { return _objectHook; } }
+            public object object_pairs_hook { get { return _objectPairsHook; } }
+            public object parse_float { get { return _parseFloat; } }
+            public object parse_int { get { return _parseInt; } }
+            public object parse_constant { get { return _parseConstant; } }
+
+            public PythonTuple __call__(CodeContext/*!*/ context, string @string, int idx) {
+                if (idx < 0) {
+                    throw PythonOps.ValueError("idx cannot be negative");
+                }
+
+                object value;
+                int next;
+                if (!TryScanOnce(context, @string, idx, 0, out value, out next)) {
+                    throw new StopIterationException();
+                }
+                return PythonTuple.MakeTuple(value, next);
+            }
+
+            private bool TryScanOnce(CodeContext/*!*/ context, string s, int idx, int depth, out object value, out int next) {
+                if (idx >= s.Length) {
+                    value = null;
+                    next = idx;
+                    return false;
+                }
+
+                switch (s[idx]) {
+                    case '"':
+                        value = ScanString(context, s, idx + 1, _strict, out next);
+                        return true;
+                    case '{':
+                        CheckDepth(depth, "object");
+                        value = ParseObject(context, s, idx + 1, depth + 1, out next);
+                        return true;
+                    case '[':
+                        CheckDepth(depth, "array");
+                        value = ParseArray(context, s, idx + 1, depth + 1, out next);
+                        return true;
+                    case 'n':
+                        if (Matches(s, idx, "null")) {
+                            value = null;
+                            next = idx + 4;
+                            return true;
+                        }
+                        break;
+                    case 't':
+                        if (Matches(s, idx, "true")) {
+                            value = ScriptingRuntimeHelpers.True;
+                            next = idx + 4;
+                            return true;
+                        }
+                        break;
+                    case 'f':
+                        if (Matches(s, idx, "false")) {
+                            value = ScriptingRuntimeHelpers.False;
+                            next = idx + 5;
+                            return true;
+                        }
+                        break;
+                }
+
+                if (TryMatchNumber(context, s, idx, out value, out next)) {
+                    return true;
+                }
+
+                switch (s[idx]) {
+                    case 'N':
+                        if (Matches(s, idx, "NaN")) {
+                            value = PythonCalls.Call(context, _parseConstant, "NaN");
+                            next = idx + 3;
+                            return true;
+                        }
+                        break;
+                    case 'I':
+                        if (Matches(s, idx, "Infinity")) {
+                            value = PythonCalls.Call(context, _parseConstant, "Infinity");
+                            next = idx + 8;
+                            return true;
+                        }
+                        break;
+                    case '-':
+                        if (Matches(s, idx, "-Infinity")) {
+                            value = PythonCalls.Call(context, _parseConstant, "-Infinity");
+                            next = idx + 9;
+                            return true;
+                        }
+                        break;
+                }
+
+                value = null;
+                next = idx;
+                return false;
+            }
+
+            private object ParseObject(CodeContext/*!*/ context, string s, int end, int depth, out int next) {
+                PythonDictionary dict = null;
+                List pairs = null;
+                if (_objectPairsHook != null) {
+                    pairs = new List();
+                } else {
+                    dict = new PythonDictionary();
+                }
+
+                int len = s.Length;
+                if (end >= len || s[end] != '"') {
+                    end = SkipWhitespace(s, end);
+                    if (end < len && s[end] == '}') {
+                        next = end + 1;
+                        return FinishObject(context, dict, pairs);
+                    } else if (end >= len || s[end] != '"') {
+                        throw MakeError("Expecting property name enclosed in double quotes", s, end);
+                    }
+                }
+                end++;
+
+                for (; ; ) {
+                    string key = ScanString(context, s, end, _strict, out end);
+
+                    if (end >= len || s[end] != ':') {
+                        end = SkipWhitespace(s, end);
+                        if (end >= len || s[end] != ':') {
+                            throw MakeError("Expecting ':' delimiter", s, end);
+                        }
+                    }
+                    end = SkipWhitespace(s, end + 1);
+
+                    object value;
+                    if (!TryScanOnce(context, s, end, depth, out value, out end)) {
+                        throw MakeError("Expecting object", s, end);
+                    }
+
+                    if (pairs != null) {
+                        pairs.AddNoLock(PythonTuple.MakeTuple(key, value));
+                    } else {
+                        dict[key] = value;
+                    }
+
+                    end = SkipWhitespace(s, end);
+                    char nextchar = end < len ? s[end] : '\0';
+                    end++;
+
+                    if (nextchar == '}') {
+                        break;
+                    } else if (nextchar != ',') {
+                        throw MakeError("Expecting ',' delimiter", s, end - 1);
+                    }
+
+                    end = SkipWhitespace(s, end);
+                    nextchar = end < len ? s[end] : '\0';
+                    end++;
+                    if (nextchar != '"') {
+                        throw MakeError("Expecting property name enclosed in double quotes", s, end - 1);
+                    }
+                }
+
+                next = end;
+                return FinishObject(context, dict, pairs);
+            }
+
+            private object FinishObject(CodeContext/*!*/ context, PythonDictionary dict, List pairs) {
+                if (pairs != null) {
+                    return PythonCalls.Call(context, _objectPairsHook, pairs);
+                }
+                if (_objectHook != null) {
+                    return PythonCalls.Call(context, _objectHook, dict);
+                }
+                return dict;
+            }
+
+            private List ParseArray(CodeContext/*!*/ context, string s, int end, int depth, out int next) {
+                List values = new List();
+                int len = s.Length;
+
+                end = SkipWhitespace(s, end);
+                if (end < len && s[end] == ']') {
+                    next = end + 1;
+                    return values;
+                }
+
+                for (; ; ) {
+                    object value;
+                    if (!TryScanOnce(context, s, end, depth, out value, out end)) {
+                        throw MakeError("Expecting object", s, end);
+                    }
+                    values.AddNoLock(value);
+
+                    end = SkipWhitespace(s, end);
+                    char nextchar = end < len ? s[end] : '\0';
+                    end++;
+                    if (nextchar == ']') {
+                        break;
+                    } else if (nextchar != ',') {
+                        throw MakeError("Expecting ',' delimiter", s, end);
+                    }
+
+                    end = SkipWhitespace(s, end);
+                }
+
+                next = end;
+                return values;
+            }
+
+            private bool TryMatchNumber(CodeContext/*!*/ context, string s, int start, out object value, out int next) {
+                // -?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?
+                int len = s.Length;
+                int i = start;
+
+                if (i < len && s[i] == '-') {
+                    i++;
+                }
+
+                if (i < len && s[i] == '0') {
+                    i++;
+                } else if (i < len && s[i] >= '1' && s[i] <= '9') {
+                    i++;
+                    while (i < len && IsDigit(s[i])) i++;
+                } else {
+                    value = null;
+                    next = start;
+                    return false;
+                }
+
+                int intEnd = i;
+                if (i + 1 < len && s[i] == '.' && IsDigit(s[i + 1])) {
+                    i += 2;
+                    while (i < len && IsDigit(s[i])) i++;
+                }
+
+                if (i < len && (s[i] == 'e' || s[i] == 'E')) {
+                    int j = i + 1;
+                    if (j < len && (s[j] == '-' || s[j] == '+')) j++;
+                    if (j < len && IsDigit(s[j])) {
+                        j++;
+                        while (j < len && IsDigit(s[j])) j++;
+                        i = j;
+                    }
+                }
+
+                string numstr = s.Substring(start, i - start);
+                if (i != intEnd) {
+                    value = _floatIsDefault ? LiteralParser.ParseFloat(numstr) : PythonCalls.Call(context, _parseFloat, numstr);
+                } else {
+                    value = _intIsDefault ? LiteralParser.ParseIntegerSign(numstr, 10) : PythonCalls.Call(context, _parseInt, numstr);
+                }
+                next = i;
+                return true;
+            }
+
+            private void CheckDepth(int depth, string kind) {
+                if (depth >= _recursionLimit) {
+                    throw PythonOps.RuntimeError("maximum recursion depth exceeded while decoding a JSON {0} from a unicode string", kind);
+                }
+            }
+
+            private static bool Matches(string s, int idx, string literal) {
+                return idx + literal.Length <= s.Length && String.CompareOrdinal(s, idx, literal, 0, literal.Length) == 0;
+            }
+
+            private static bool IsDigit(char c) {
+                return c >= '0' && c <= '9';
+            }
+
+            private static int SkipWhitespace(string s, int idx) {
+                int len = s.Length;
+                while (idx < len) {
+                    char c = s[idx];
+                    if (c != ' ' && c != '\t' && c != '\n' && c != '\r') break;
+                    idx++;
+                }
+                return idx;
+            }
+        }
+
+        #endregion
+
+        #region Encoder
+
+        [PythonType("Encoder"), PythonHidden]
+        public sealed class Encoder {
+            private readonly bool _checkCircular, _sortKeys, _skipKeys, _allowNan, _fastEncode;
+            private readonly object _markers, _default, _encoder, _indent;
+            private readonly string _keySeparator, _itemSeparator;
+            private readonly int _recursionLimit;
+
+            internal Encoder(CodeContext/*!*/ context, object markers, object @default, object encoder, object indent,
+                object key_separator, object item_separator, object sort_keys, object skipkeys, object allow_nan) {
+                if (markers != null && !(markers is PythonDictionary)) {
+                    throw PythonOps.TypeError("make_encoder() argument 1 must be dict or None, not {0}", PythonTypeOps.GetName(markers));
+                }
+
+                _keySeparator = AsString(key_separator);
+                _itemSeparator = AsString(item_separator);
+                if (_keySeparator == null) {
+                    throw PythonOps.TypeError("make_encoder() argument 5 must be string, not {0}", PythonTypeOps.GetName(key_separator));
+                }
+                if (_itemSeparator == null) {
+                    throw PythonOps.TypeError("make_encoder() argument 6 must be string, not {0}", PythonTypeOps.GetName(item_separator));
+                }
+
+                _markers = markers;
+                _checkCircular = markers != null;
+                _default = @default;
+                _encoder = encoder;
+                _indent = indent;
+                _sortKeys = PythonOps.IsTrue(sort_keys);
+                _skipKeys = PythonOps.IsTrue(skipkeys);
+                _allowNan = PythonOps.IsTrue(allow_nan);
+
+                BuiltinFunction bf = encoder as BuiltinFunction;
+                _fastEncode = bf != null && bf.DeclaringType == typeof(PythonJson) && bf.__name__ == "encode_basestring_ascii";
+                _recursionLimit = GetRecursionLimit(context);
+            }
+
+            public object markers { get { return _markers; } }
+            public object @default { get { return _default; } }
+            public object encoder { get { return _encoder; } }
+            public object indent { get { return _indent; } }
+            public string key_separator { get { return _keySeparator; } }
+            public string item_separator { get { return _itemSeparator; } }
+            public bool sort_keys { get { return _sortKeys; } }
+            public bool skipkeys { get { return _skipKeys; } }
+
+            public List __call__(CodeContext/*!*/ context, object obj, int _current_indent_level) {
+                StringBuilder res = new StringBuilder();
+                HashSet<object> markers = _checkCircular ? new HashSet<object>(ReferenceEqualityComparer.Instance) : null;
+
+                EncodeObject(context, res, obj, markers, 0);
+
+                return List.FromArrayNoCopy(res.ToString());
+            }
+
+            private void EncodeObject(CodeContext/*!*/ context, StringBuilder res, object obj, HashSet<object> markers, int depth) {
+                if (obj == null) {
+                    res.Append("null");
+                } else if (obj is bool) {
+                    res.Append((bool)obj ? "true" : "false");
+                } else if (obj is string || obj is Extensible<string>) {
+                    EncodeString(context, res, obj);
+                } else if (obj is int) {
+                    res.Append(((int)obj).ToString(CultureInfo.InvariantCulture));
+                } else if (obj is BigInteger) {
+                    res.Append(((BigInteger)obj).ToString(CultureInfo.InvariantCulture));
+                } else if (obj is Extensible<int> || obj is Extensible<BigInteger>) {
+                    res.Append(PythonOps.ToString(context, obj));
+                } else if (obj is double) {
+                    res.Append(EncodeFloat(context, (double)obj));
+                } else if (obj is Extensible<double>) {
+                    res.Append(EncodeFloat(context, ((Extensible<double>)obj).Value));
+                } else if (obj is List || obj is PythonTuple) {
+                    CheckDepth(depth);
+                    EncodeList(context, res, obj, markers, depth + 1);
+                } else if (obj is PythonDictionary) {
+                    CheckDepth(depth);
+                    EncodeDict(context, res, (PythonDictionary)obj, markers, depth + 1);
+                } else {
+                    CheckDepth(depth);
+                    EnterMarker(markers, obj);
+                    object newobj = PythonCalls.Call(context, _default, obj);
+                    EncodeObject(context, res, newobj, markers, depth + 1);
+                    ExitMarker(markers, obj);
+                }
+            }
+
+            private void EncodeList(CodeContext/*!*/ context, StringBuilder res, object seq, HashSet<object> markers, int depth) {
+                List list = seq as List;
+                int count = list != null ? list.__len__() : ((PythonTuple)seq).__len__();
+                if (count == 0) {
+                    res.Append("[]");
+                    return;
+                }
+
+                EnterMarker(markers, seq);
+                res.Append('[');
+                if (list != null) {
+                    // re-check the length each time in case the default hook mutates the list
+                    for (int i = 0; i < list.__len__(); i++) {
+                        if (i > 0) res.Append(_itemSeparator);
+                        EncodeObject(context, res, list[i], markers, depth);
+                    }
+                } else {
+                    object[] items = ((PythonTuple)seq)._data;
+                    for (int i = 0; i < items.Length; i++) {
+                        if (i > 0) res.Append(_itemSeparator);
+                        EncodeObject(context, res, items[i], markers, depth);
+                    }
+                }
+                res.Append(']');
+                ExitMarker(markers, seq);
+            }
+
+            private void EncodeDict(CodeContext/*!*/ context, StringBuilder res, PythonDictionary dict, HashSet<object> markers, int depth) {
+                if (dict.__len__() == 0) {
+                    res.Append("{}");
+                    return;
+                }
+
+                EnterMarker(markers, dict);
+                res.Append('{');
+
+                bool first = true;
+                foreach (KeyValuePair<object, object> kvp in GetItems(context, dict)) {
+                    string key = EncodeKey(context, kvp.Key);
+                    if (key == null) {
+                        // skipkeys
+                        continue;
+                    }
+
+                    if (first) {
+                        first = false;
+                    } else {
+                        res.Append(_itemSeparator);
+                    }
+
+                    EncodeString(context, res, key);
+                    res.Append(_keySeparator);
+                    EncodeObject(context, res, kvp.Value, markers, depth);
+                }
+
+                res.Append('}');
+                ExitMarker(markers, dict);
+            }
+
+            private IList<KeyValuePair<object, object>> GetItems(CodeContext/*!*/ context, PythonDictionary dict) {
+                List<KeyValuePair<object, object>> items;
+                if (dict.GetType() == typeof(PythonDictionary)) {
+                    items = dict._storage.GetItems();
+                } else {
+                    // subclasses such as OrderedDict define the iteration order through items()
+                    items = new List<KeyValuePair<object, object>>();
+                    foreach (object item in PythonOps.GetCollection(PythonOps.Invoke(context, dict, "items"))) {
+                        PythonTuple tuple = item as PythonTuple;
+                        if (tuple == null || tuple.__len__() != 2) {
+                            throw PythonOps.ValueError("items must return 2-tuples");
+                        }
+                        items.Add(new KeyValuePair<object, object>(tuple[0], tuple[1]));
+                    }
+                }
+
+                if (_sortKeys) {
+                    List keys = new List();
+                    Dictionary<object, object> values = new Dictionary<object, object>(ReferenceEqualityComparer.Instance);
+                    foreach (KeyValuePair<object, object> kvp in items) {
+                        keys.AddNoLock(kvp.Key);
+                        values[kvp.Key] = kvp.Value;
+                    }
+                    keys.sort(context);
+
+                    items = new List<KeyValuePair<object, object>>(keys.__len__());
+                    foreach (object key in keys) {
+                        items.Add(new KeyValuePair<object, object>(key, values[key]));
+                    }
+                }
+
+                return items;
+            }
+
+            private string EncodeKey(CodeContext/*!*/ context, object key) {
+                string str = AsString(key);
+                if (str != null) {
+                    return str;
+                } else if (key is double) {
+                    return EncodeFloat(context, (double)key);
+                } else if (key is Extensible<double>) {
+                    return EncodeFloat(context, ((Extensible<double>)key).Value);
+                } else if (key is bool) {
+                    return (bool)key ? "true" : "false";
+                } else if (key == null) {
+                    return "null";
+                } else if (key is int || key is BigInteger || key is Extensible<int> || key is Extensible<BigInteger>) {
+                    return PythonOps.ToString(context, key);
+                } else if (_skipKeys) {
+                    return null;
+                }
+
+                throw PythonOps.TypeError("key {0} is not a string", PythonOps.Repr(context, key));
+            }
+
+            private void EncodeString(CodeContext/*!*/ context, StringBuilder res, object obj) {
+                if (_fastEncode) {
+                    string str = MaybeDecodeUtf8(AsString(obj));
+                    if (NeedsEscape(str)) {
+                        EncodeBasestringAscii(res, str);
+                    } else {
+                        res.Append('"').Append(str).Append('"');
+                    }
+                    return;
+                }
+
+                object encoded = PythonCalls.Call(context, _encoder, obj);
+                string str = AsString(encoded);
+                if (str == null) {
+                    throw PythonOps.TypeError("encoder() must return a string, not {0}", PythonTypeOps.GetName(encoded));
+                }
+                res.Append(str);
+            }
+
+            private string EncodeFloat(CodeContext/*!*/ context, double value) {
+                if (Double.IsNaN(value) || Double.IsInfinity(value)) {
+                    if (!_allowNan) {
+                        throw PythonOps.ValueError("Out of range float values are not JSON compliant: {0}", DoubleOps.__repr__(context, value));
+                    }
+                    if (Double.IsNaN(value)) return "NaN";
+                    return value > 0 ? "Infinity" : "-Infinity";
+                }
+                return DoubleOps.__repr__(context, value);
+            }
+
+            private void CheckDepth(int depth) {
+                if (depth >= _recursionLimit) {
+                    throw PythonOps.RuntimeError("maximum recursion depth exceeded while encoding a JSON object");
+                }
+            }
+
+            private static void EnterMarker(HashSet<object> markers, object obj) {
+                if (markers != null && !markers.Add(obj)) {
+                    throw PythonOps.ValueError("Circular reference detected");
+                }
+            }
+
+            private static void ExitMarker(HashSet<object> markers, object obj) {
+                if (markers != null) {
+                    markers.Remove(obj);
+                }
+            }
+        }
+
+        #endregion
+
+        #region Private Implementation Details
+
+        private static string ScanString(CodeContext/*!*/ context, string s, int end, bool strict, out int next) {
+            int len = s.Length;
+            int begin = end - 1;
+            int chunkStart = end;
+            int i = end;
+            StringBuilder res = null;
+
+            for (; ; ) {
+                char c = '\0';
+                while (i < len) {
+                    c = s[i];
+                    if (c == '"' || c == '\\' || c < 0x20) break;
+                    i++;
+                }
+
+                if (i >= len) {
+                    throw MakeError("Unterminated string starting at", s, begin);
+                }
+
+                if (c == '"') {
+                    next = i + 1;
+                    if (res == null) {
+                        return s.Substring(chunkStart, i - chunkStart);
+                    }
+                    res.Append(s, chunkStart, i - chunkStart);
+                    return res.ToString();
+                }
+
+                if (res == null) {
+                    res = new StringBuilder(i - chunkStart + 16);
+                }
+                res.Append(s, chunkStart, i - chunkStart);
+
+                if (c != '\\') {
+                    // literal control character
+                    if (strict) {
+                        throw MakeError("Invalid control character " + PythonOps.Repr(context, c.ToString()) + " at", s, i + 1);
+                    }
+                    res.Append(c);
+                    chunkStart = ++i;
+                    continue;
+                }
+
+                if (++i >= len) {
+                    throw MakeError("Unterminated string starting at", s, begin);
+                }
+
+                c = s[i];
+                switch (c) {
+                    case '"': res.Append('"'); break;
+                    case '\\': res.Append('\\'); break;
+                    case '/': res.Append('/'); break;
+                    case 'b': res.Append('\b'); break;
+                    case 'f': res.Append('\f'); break;
+                    case 'n': res.Append('\n'); break;
+                    case 'r': res.Append('\r'); break;
+                    case 't': res.Append('\t'); break;
+                    case 'u':
+                        int uni = 0;
+                        if (i + 4 >= len) {
+                            throw MakeError("Invalid \\uXXXX escape", s, i);
+                        }
+                        for (int j = i + 1; j <= i + 4; j++) {
+                            int digit;
+                            if (!TryHexDigit(s[j], out digit)) {
+                                throw MakeError("Invalid \\uXXXX escape", s, i);
+                            }
+                            uni = (uni << 4) | digit;
+                        }
+                        res.Append((char)uni);
+                        i += 4;
+                        break;
+                    default:
+                        throw MakeError("Invalid \\escape: " + PythonOps.Repr(context, c.ToString()), s, i);
+                }
+                chunkStart = ++i;
+            }
+        }
+
+        private static bool TryHexDigit(char c, out int digit) {
+            if (c >= '0' && c <= '9') {
+                digit = c - '0';
+            } else if (c >= 'a' && c <= 'f') {
+                digit = c - 'a' + 10;
+            } else if (c >= 'A' && c <= 'F') {
+                digit = c - 'A' + 10;
+            } else {
+                digit = 0;
+                return false;
+            }
+            return true;
+        }
+
+        private static bool NeedsEscape(string s) {
+            for (int i = 0; i < s.Length; i++) {
+                char c = s[i];
+                if (c < ' ' || c > '~' || c == '"' || c == '\\') {
+                    return true;
+                }
+            }
+            return false;
+        }
+
+        private static void EncodeBasestringAscii(StringBuilder res, string s) {
+            res.Append('"');
+            for (int i = 0; i < s.Length; i++) {
+                char c = s[i];
+                if (c >= ' ' && c <= '~' && c != '\\' && c != '"') {
+                    res.Append(c);
+                    continue;
+                }
+
+                switch (c) {
+                    case '\\': res.Append("\\\\"); break;
+                    case '"': res.Append("\\\""); break;
+                    case '\b': res.Append("\\b"); break;
+                    case '\f': res.Append("\\f"); break;
+                    case '\n': res.Append("\\n"); break;
+                    case '\r': res.Append("\\r"); break;
+                    case '\t': res.Append("\\t"); break;
+                    default:
+                        // surrogate pairs are already two UTF-16 code units
+                        res.Append("\\u").Append(((int)c).ToString("x4", CultureInfo.InvariantCulture));
+                        break;
+                }
+            }
+            res.Append('"');
+        }
+
+        /// <summary>
+        /// Mirrors py_encode_basestring_ascii: a str holding UTF-8 encoded bytes is decoded
+        /// before escaping.  Strings that are not valid UTF-8 are escaped as they are.
+        /// </summary>
+        private static string MaybeDecodeUtf8(string s) {
+            bool hasHigh = false;
+            for (int i = 0; i < s.Length; i++) {
+                char c = s[i];
+                if (c > 0xff) {
+                    return s;
+                } else if (c >= 0x80) {
+                    hasHigh = true;
+                }
+            }
+
+            if (!hasHigh) {
+                return s;
+            }
+
+            byte[] bytes = new byte[s.Length];
+            for (int i = 0; i < s.Length; i++) {
+                bytes[i] = (byte)s[i];
+            }
+
+            try {
+                return _strictUtf8.GetString(bytes);
+            } catch (DecoderFallbackException) {
+                return s;
+            }
+        }
+
+        private static readonly Encoding _strictUtf8 = new UTF8Encoding(false, true);
+
+        private static string AsString(object obj) {
+            string str = obj as string;
+            if (str != null) {
+                return str;
+            }
+
+            Extensible<string> es = obj as Extensible<string>;
+            if (es != null) {
+                return es.Value;
+            }
+
+            return null;
+        }
+
+        private static int GetRecursionLimit(CodeContext/*!*/ context) {
+            int limit = context.LanguageContext.RecursionLimit;
+            return limit == Int32.MaxValue ? DefaultRecursionLimit : limit;
+        }
+
+        private static Exception MakeError(string msg, string doc, int pos) {
+            int lineno = 1, lastNewline = -1;
+            for (int i = 0; i < pos && i < doc.Length; i++) {
+                if (doc[i] == '\n') {
+                    lineno++;
+                    lastNewline = i;
+                }
+            }
+            int colno = lineno == 1 ? pos + 1 : pos - lastNewline;
+
+            return new ValueErrorException(string.Format("{0}: line {1} column {2} (char {3})", msg, lineno, colno, pos));
+        }
+
+        private class ReferenceEqualityComparer : IEqualityComparer<object> {
+            public static ReferenceEqualityComparer Instance = new ReferenceEqualityComparer();
+
+            private ReferenceEqualityComparer() { }
+
+            public new bool Equals(object x, object y) {
+                return x == y;
+            }
+
+            public int GetHashCode(object obj) {
+                return RuntimeHelpers.GetHashCode(obj);
+            }
+        }
+
+        #endregion
+    }
+}
@@ -0,0 +1,412 @@
+/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Runtime.InteropServices;
+using System.Text;
+
+using Microsoft.Scripting.Runtime;
+
+using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
+
+[assembly: PythonModule("_lsprof", typeof(IronPython.Modules.PythonLsprof))]
+namespace IronPython.Modules {
+    /// <summary>
+    /// Deterministic profiler backing cProfile.  Call and return events come straight from
+    /// the tracing support in PythonTracebackListener, so unlike a sys.setprofile function
+    /// no frame objects are created and no Python code runs per event.
+    /// </summary>
+    public static class PythonLsprof {
+        public const string __doc__ = "Fast profiler";
+
+        /// <summary>
+        /// Ticks per second assumed for custom timers returning floats, same as CPython.
+        /// </summary>
+        private const double DoubleTimerPrecision = 4294967296.0;
+
+        [PythonType]
+        public class Profiler : IFrameProfiler {
+            private readonly CodeContext/*!*/ _context;
+            private readonly object _timer;
+            private readonly double _factor;
+            private readonly Dictionary<object, ProfilerEntry> _entries = new Dictionary<object, ProfilerEntry>();
+            private ProfilerContext _current;
+            private bool _subcalls, _enabled, _inTimer;
+
+            public const string __doc__ = @"Profiler(custom_timer=None, time_unit=None, subcalls=True, builtins=True)
+
+    Builds a profiler object using the specified timer function.
+    The default timer is a fast built-in one based on real time.
+    For custom timer functions returning integers, time_unit can
+    be a float specifying a scale (i.e. how long each integer unit
+    is, in seconds).
+";
+
+            public Profiler(CodeContext/*!*/ context, [DefaultParameterValue(null)]object timer, [DefaultParameterValue(0.0)]double timeunit, [DefaultParameterValue(true)]bool subcalls, [DefaultParameterValue(true)]bool builtins) {
+                _context = context;
+                _timer = timer;
+                _subcalls = subcalls;
+
+                if (timer == null) {
+                    _factor = 1.0 / Stopwatch.Frequency;
+                } else if (timeunit > 0.0) {
+                    _factor = timeunit;
+                } else {
+                    _factor = 1.0 / DoubleTimerPrecision;
+                }
+            }
+
+            [Documentation(@"getstats() -> list of profiler_entry objects
+
+Return all information collected by the profiler.
+Each profiler_entry is a tuple-like object with the
+following attributes:
+
+    code          code object
+    callcount     how many times this was called
+    reccallcount  how many times called recursively
+    totaltime     total time in this entry
+    inlinetime    inline time in this entry (not in subcalls)
+    calls         details of the calls
+
+The calls attribute is either None or a list of
+profiler_subentry objects:
+
+    code          called code object
+    callcount     how many times this is called
+    reccallcount  how many times this is called recursively
+    totaltime     total time spent in this call
+    inlinetime    inline time (not in further subcalls)
+")]
+            public List getstats() {
+                List res = new List();
+                foreach (ProfilerEntry entry in _entries.Values) {
+                    List calls = null;
+                    if (_subcalls) {
+                        calls = new List();
+                        if (entry.Calls != null) {
+                            foreach (ProfilerSubEntry sub in entry.Calls.Values) {
+                                calls.AddNoLock(new profiler_subentry(
+                                    sub.Callee.Code,
+                                    sub.CallCount,
+                                    sub.RecursiveCallCount,
+                                    sub.TotalTime * _factor,
+                                    sub.InlineTime * _factor
+                                ));
+                            }
+                        }
+                    }
+
+                    res.AddNoLock(new profiler_entry(
+                        entry.Code,
+                        entry.CallCount,
+                        entry.RecursiveCallCount,
+                        entry.TotalTime * _factor,
+                        entry.InlineTime * _factor,
+                        calls
+                    ));
+                }
+                return res;
+            }
+
+            [Documentation(@"enable(subcalls=True, builtins=True)
+
+Start collecting profiling information.
+If 'subcalls' is True, also records for each function
+statistics separated according to its current caller.
+If 'builtins' is True, records the time spent in
+built-in functions separately from their caller.
+")]
+            public void enable([DefaultParameterValue(true)]bool subcalls, [DefaultParameterValue(true)]bool builtins) {
+                // builtins is accepted for compatibility: calls into .NET code are not
+                // traced, their time is accounted to the calling Python function
+                _subcalls = subcalls;
+                _enabled = true;
+                _context.LanguageContext.SetProfiler(this);
+            }
+
+            [Documentation(@"disable()
+
+Stop collecting profiling information.
+")]
+            public void disable() {
+                _enabled = false;
+                _context.LanguageContext.SetProfiler(null);
+                FlushUnmatched();
+            }
+
+            [Documentation(@"clear()
+
+Clear all profiling information collected so far.
+")]
+            public void clear() {
+                _entries.Clear();
+                _current = null;
+            }
+
+            #region IFrameProfiler Members
+
+            void IFrameProfiler.OnCall(FunctionCode code) {
+                if (!_enabled || _inTimer) {
+                    return;
+                }
+
+                ProfilerEntry entry = GetEntry(code);
+                ProfilerContext ctx = new ProfilerContext(entry, _current);
+                _current = ctx;
+
+                entry.RecursionLevel++;
+                if (_subcalls && ctx.Previous != null) {
+                    ctx.Previous.Entry.GetSubEntry(entry).RecursionLevel++;
+                }
+
+                ctx.Start = GetTime();
+            }
+
+            void IFrameProfiler.OnReturn(FunctionCode code) {
+                if (!_enabled || _inTimer) {
+                    return;
+                }
+
+                ProfilerContext ctx = _current;
+                while (ctx != null && ctx.Entry.Code != code) {
+                    ctx = ctx.Previous;
+                }
+                if (ctx == null) {
+                    // frames which were entered before the profiler was enabled
+                    return;
+                }
+
+                // frames above the returning one whose exit wasn't reported, e.g. when an
+                // exception unwinds them, return along with it
+                long now = GetTime();
+                ProfilerContext stop;
+                do {
+                    stop = _current;
+                    Stop(stop, now);
+                } while (stop != ctx);
+            }
+
+            #endregion
+
+            #region Implementation details
+
+            private ProfilerEntry GetEntry(object code) {
+                ProfilerEntry entry;
+                if (!_entries.TryGetValue(code, out entry)) {
+                    _entries[code] = entry = new ProfilerEntry(code);
+                }
+                return entry;
+            }
+
+            private void Stop(ProfilerContext ctx, long now) {
+                ProfilerEntry entry = ctx.Entry;
+                long tt = now - ctx.Start;
+                long it = tt - ctx.SubTime;
+
+                if (ctx.Previous != null) {
+                    ctx.Previous.SubTime += tt;
+                }
+                _current = ctx.Previous;
+
+                if (--entry.RecursionLevel == 0) {
+                    entry.TotalTime += tt;
+                } else {
+                    entry.RecursiveCallCount++;
+                }
+                entry.InlineTime += it;
+                entry.CallCount++;
+
+                if (_subcalls && ctx.Previous != null) {
+                    ProfilerSubEntry sub = ctx.Previous.Entry.GetSubEntry(entry);
+                    if (--sub.RecursionLevel == 0) {
+                        sub.TotalTime += tt;
+                    } else {
+                        sub.RecursiveCallCount++;
+                    }
+                    sub.InlineTime += it;
+                    sub.CallCount++;
+                }
+            }
+
+            private void FlushUnmatched() {
+                while (_current != null) {
+                    Stop(_current, GetTime());
+                }
+            }
+
+            private long GetTime() {
+                if (_timer == null) {
+                    return Stopwatch.GetTimestamp();
+                }
+
+                // calls made by the timer itself must not be profiled
+                _inTimer = true;
+                try {
+                    object res = PythonCalls.Call(_context, _timer);
+                    if (res is double) {
+                        return (long)((double)res * DoubleTimerPrecision);
+                    }
+                    return Converter.ConvertToInt64(res);
+                } finally {
+                    _inTimer = false;
+                }
+            }
+
+            #endregion
+        }
+
+        #region Result types
+
+        [PythonType]
+        public class profiler_entry : PythonTuple {
+            public const string __module__ = "_lsprof";
+
+            internal profiler_entry(object code, int callcount, int reccallcount, double totaltime, double inlinetime, object calls)
+                : base(new object[] { code, callcount, reccallcount, totaltime, inlinetime, calls }) {
+            }
+
+            public object code {
+                get { return _data[0]; }
+            }
+
+            public object callcount {
+                get { return _data[1]; }
+            }
+
+            public object reccallcount {
+                get { return _data[2]; }
+            }
+
+            public object totaltime {
+                get { return _data[3]; }
+            }
+
+            public object inlinetime {
+                get { return _data[4]; }
+            }
+
+            public object calls {
+                get { return _data[5]; }
+            }
+
+            public override string __repr__(CodeContext/*!*/ context) {
+                return FormatStructSeq(context, "_lsprof.profiler_entry", new[] { "code", "callcount", "reccallcount", "totaltime", "inlinetime", "calls" }, _data);
+            }
+        }
+
+        [PythonType]
+        public class profiler_subentry : PythonTuple {
+            public const string __module__ = "_lsprof";
+
+            internal profiler_subentry(object code, int callcount, int reccallcount, double totaltime, double inlinetime)
+                : base(new object[] { code, callcount, reccallcount, totaltime, inlinetime }) {
+            }
+
+            public object code {
+                get { return _data[0]; }
+            }
+
+            public object callcount {
+                get { return _data[1]; }
+            }
+
+            public object reccallcount {
+                get { return _data[2]; }
+            }
+
+            public object totaltime {
+                get { return _data[3]; }
+            }
+
+            public object inlinetime {
+                get { return _data[4]; }
+            }
+
+            public override string __repr__(CodeContext/*!*/ context) {
+                return FormatStructSeq(context, "_lsprof.profiler_subentry", new[] { "code", "callcount", "reccallcount", "totaltime", "inlinetime" }, _data);
+            }
+        }
+
+        private static string FormatStructSeq(CodeContext/*!*/ context, string name, string[] fields, object[] data) {
+            StringBuilder res = new StringBuilder(name);
+            res.Append('(');
+            for (int i = 0; i < fields.Length; i++) {
+                if (i != 0) {
+                    res.Append(", ");
+                }
+                res.Append(fields[i]);
+                res.Append('=');
+                res.Append(PythonOps.Repr(context, data[i]));
+            }
+            res.Append(')');
+            return res.ToString();
+        }
+
+        #endregion
+
+        #region Profiler data
+
+        private sealed class ProfilerEntry {
+            public readonly object Code;
+            public long TotalTime, InlineTime;
+            public int CallCount, RecursiveCallCount, RecursionLevel;
+            public Dictionary<ProfilerEntry, ProfilerSubEntry> Calls;
+
+            public ProfilerEntry(object code) {
+                Code = code;
+            }
+
+            public ProfilerSubEntry GetSubEntry(ProfilerEntry callee) {
+                if (Calls == null) {
+                    Calls = new Dictionary<ProfilerEntry, ProfilerSubEntry>();
+                }
+
+                ProfilerSubEntry sub;
+                if (!Calls.TryGetValue(callee, out sub)) {
+                    Calls[callee] = sub = new ProfilerSubEntry(callee);
+                }
+                return sub;
+            }
+        }
+
+        private sealed class ProfilerSubEntry {
+            public readonly ProfilerEntry Callee;
+            public long TotalTime, InlineTime;
+            public int CallCount, RecursiveCallCount, RecursionLevel;
+
+            public ProfilerSubEntry(ProfilerEntry callee) {
+                Callee = callee;
+            }
+        }
+
+        private sealed class ProfilerContext {
+            public readonly ProfilerEntry Entry;
+            public readonly ProfilerContext Previous;
+            public long Start, SubTime;
+
+            public ProfilerContext(ProfilerEntry entry, ProfilerContext previous) {
+                Entry = entry;
+                Previous = previous;
+            }
+        }
+
+        #endregion
+    }
+}
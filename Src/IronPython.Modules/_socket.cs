@@ -147,6 +147,7 @@ namespace IronPython.Modules {
             internal string _hostName;
             private WeakRefTracker _weakRefTracker = null;
             private int _referenceCount = 1;
+            private byte[] _recvBuffer; // scratch buffer for the receive calls, see BufferOps.TakeBuffer
             public const string __module__ = "socket";
             internal CodeContext/*!*/ _context;
             private int _timeout;
@@ -450,16 +451,16 @@ namespace IronPython.Modules {
                 + "recv() returns immediately with zero bytes when the connection is closed."
                 )]
             public string recv(int maxBytes, [DefaultParameterValue(0)] int flags) {
-                int bytesRead;
                 if (maxBytes < 0)
                     throw PythonOps.ValueError("negative buffersize in recv");
-                byte[] buffer = new byte[maxBytes];
+                byte[] buffer = BufferOps.TakeBuffer(ref _recvBuffer, maxBytes);
                 try {
-                    bytesRead = _socket.Receive(buffer, (SocketFlags)flags);
-                } catch (Exception e) {
-                    throw MakeRecvException(e, SocketError.NotConnected);
+                    EndPoint remoteEP = null;
+                    int bytesRead = receiveWorker(buffer, 0, maxBytes, flags, ref remoteEP);
+                    return PythonOps.MakeString(buffer, bytesRead);
+                } finally {
+                    BufferOps.ReturnBuffer(ref _recvBuffer, buffer);
                 }
-                return PythonOps.MakeString(buffer, bytesRead);
             }
 
             [Documentation("recv_into(buffer, [nbytes[, flags]]) -> nbytes_read\n\n"
@@ -492,17 +493,8 @@ namespace IronPython.Modules {
                 + "See recv() for documentation about the flags.\n"
                 )]
             public int recv_into(PythonArray buffer, [DefaultParameterValue(0)]int nbytes, [DefaultParameterValue(0)]int flags) {
-                int bytesRead;
-                byte[] byteBuffer = new byte[byteBufferSize("recv_into", nbytes, buffer.__len__(), buffer.itemsize)];
-
-                try {
-                    bytesRead = _socket.Receive(byteBuffer, (SocketFlags)flags);
-                } catch (Exception e) {
-                    throw MakeRecvException(e, SocketError.NotConnected);
-                }
-
-                buffer.FromStream(new MemoryStream(byteBuffer), 0);
-                return bytesRead;
+                EndPoint remoteEP = null;
+                return receiveIntoWorker(buffer, byteBufferSize("recv_into", nbytes, buffer.__len__(), buffer.itemsize), flags, ref remoteEP);
             }
 
 
@@ -513,19 +505,8 @@ namespace IronPython.Modules {
                 + "See recv() for documentation about the flags.\n"
                 )]
             public int recv_into(ByteArray buffer, [DefaultParameterValue(0)]int nbytes, [DefaultParameterValue(0)]int flags) {
-                int bytesRead;
-                byte[] byteBuffer = new byte[byteBufferSize("recv_into", nbytes, buffer.Count, 1)];
-
-                try {
-                    bytesRead = _socket.Receive(byteBuffer, (SocketFlags)flags);
-                } catch (Exception e) {
-                    throw MakeRecvException(e, SocketError.NotConnected);
-                }
-
-                for (int i = 0; i < bytesRead; i++) {
-                    buffer[i] = byteBuffer[i];
-                }
-                return bytesRead;
+                EndPoint remoteEP = null;
+                return receiveIntoWorker(buffer, byteBufferSize("recv_into", nbytes, buffer.Count, 1), flags, ref remoteEP);
             }
 
             [Documentation("recv_into(memoryview, [nbytes[, flags]]) -> nbytes_read\n\n"
@@ -535,24 +516,12 @@ namespace IronPython.Modules {
                 + "See recv() for documentation about the flags.\n"
                 )]
             public int recv_into(MemoryView buffer, [DefaultParameterValue(0)]int nbytes, [DefaultParameterValue(0)]int flags) {
-                int bytesRead;
-                byte[] byteBuffer = buffer.tobytes().ToByteArray();
-                try {
-                    bytesRead = _socket.Receive(byteBuffer, (SocketFlags)flags);
-                }
-                catch (Exception e) {
-                    if (_socket.SendTimeout == 0) {
-                        var s = new SocketException((int)SocketError.NotConnected);
-                        throw PythonExceptions.CreateThrowable(error(_context), (int)SocketError.NotConnected, s.Message);
-                    }
-                    else
-                        throw MakeException(_context, e);
-
+                if (buffer.@readonly) {
+                    throw PythonOps.TypeError("buffer is read-only");
                 }
 
-                buffer[new Slice(0, bytesRead)] = byteBuffer.Slice(new Slice(0, bytesRead));
-                return bytesRead;
-
+                EndPoint remoteEP = null;
+                return receiveIntoWorker(buffer, byteBufferSize("recv_into", nbytes, buffer.__len__(), (int)buffer.itemsize), flags, ref remoteEP);
             }
 
 
@@ -571,17 +540,16 @@ namespace IronPython.Modules {
                     throw PythonOps.ValueError("negative buffersize in recvfrom");
                 }
 
-                int bytesRead;
-                byte[] buffer = new byte[maxBytes];
-                IPEndPoint remoteIPEP = new IPEndPoint(IPAddress.Any, 0);
-                EndPoint remoteEP = remoteIPEP;
+                string data;
+                byte[] buffer = BufferOps.TakeBuffer(ref _recvBuffer, maxBytes);
+                EndPoint remoteEP = new IPEndPoint(IPAddress.Any, 0);
                 try {
-                    bytesRead = _socket.ReceiveFrom(buffer, (SocketFlags)flags, ref remoteEP);
-                } catch (Exception e) {
-                    throw MakeRecvException(e, SocketError.InvalidArgument);
+                    int bytesRead = receiveWorker(buffer, 0, maxBytes, flags, ref remoteEP);
+                    data = PythonOps.MakeString(buffer, bytesRead);
+                } finally {
+                    BufferOps.ReturnBuffer(ref _recvBuffer, buffer);
                 }
 
-                string data = PythonOps.MakeString(buffer, bytesRead);
                 PythonTuple remoteAddress = EndPointToTuple((IPEndPoint)remoteEP);
                 return PythonTuple.MakeTuple(data, remoteAddress);
             }
@@ -607,18 +575,9 @@ namespace IronPython.Modules {
                 + "Like recv_into(buffer[, nbytes[, flags]]) but also return the sender's address info.\n"
                 )]
             public PythonTuple recvfrom_into(PythonArray buffer, [DefaultParameterValue(0)]int nbytes, [DefaultParameterValue(0)]int flags) {
-                int bytesRead;
-                byte[] byteBuffer = new byte[byteBufferSize("recvfrom_into", nbytes, buffer.__len__(), buffer.itemsize)];
-                IPEndPoint remoteIPEP = new IPEndPoint(IPAddress.Any, 0);
-                EndPoint remoteEP = remoteIPEP;
+                EndPoint remoteEP = new IPEndPoint(IPAddress.Any, 0);
+                int bytesRead = receiveIntoWorker(buffer, byteBufferSize("recvfrom_into", nbytes, buffer.__len__(), buffer.itemsize), flags, ref remoteEP);
 
-                try {
-                    bytesRead = _socket.ReceiveFrom(byteBuffer, (SocketFlags)flags, ref remoteEP);
-                } catch (Exception e) {
-                    throw MakeRecvException(e, SocketError.InvalidArgument);
-                }
-
-                buffer.FromStream(new MemoryStream(byteBuffer), 0);
                 PythonTuple remoteAddress = EndPointToTuple((IPEndPoint)remoteEP);
                 return PythonTuple.MakeTuple(bytesRead, remoteAddress);
             }
@@ -627,20 +586,13 @@ namespace IronPython.Modules {
                + "Like recv_into(buffer[, nbytes[, flags]]) but also return the sender's address info.\n"
                )]
             public PythonTuple recvfrom_into(MemoryView buffer, [DefaultParameterValue(0)]int nbytes, [DefaultParameterValue(0)]int flags){
-                
-                int bytesRead;
-                byte[] byteBuffer = buffer.tobytes().ToByteArray();
-                IPEndPoint remoteIPEP = new IPEndPoint(IPAddress.Any, 0);
-                EndPoint remoteEP = remoteIPEP;
-
-                try {
-                    bytesRead = _socket.ReceiveFrom(byteBuffer, (SocketFlags)flags, ref remoteEP);
-                }
-                catch (Exception e) {
-                    throw MakeRecvException(e, SocketError.InvalidArgument);
+                if (buffer.@readonly) {
+                    throw PythonOps.TypeError("buffer is read-only");
                 }
 
-                buffer[new Slice(0, bytesRead)] = byteBuffer.Slice(new Slice(0, bytesRead));
+                EndPoint remoteEP = new IPEndPoint(IPAddress.Any, 0);
+                int bytesRead = receiveIntoWorker(buffer, byteBufferSize("recvfrom_into", nbytes, buffer.__len__(), (int)buffer.itemsize), flags, ref remoteEP);
+
                 PythonTuple remoteAddress = EndPointToTuple((IPEndPoint)remoteEP);
                 return PythonTuple.MakeTuple(bytesRead, remoteAddress);
             }
@@ -649,20 +601,14 @@ namespace IronPython.Modules {
                 + "Like recv_into(buffer[, nbytes[, flags]]) but also return the sender's address info.\n"
                 )]
             public PythonTuple recvfrom_into(IList<byte> buffer, [DefaultParameterValue(0)]int nbytes, [DefaultParameterValue(0)]int flags) {
-                int bytesRead;
-                byte[] byteBuffer = new byte[byteBufferSize("recvfrom_into", nbytes, buffer.Count, 1)];
-                IPEndPoint remoteIPEP = new IPEndPoint(IPAddress.Any, 0);
-                EndPoint remoteEP = remoteIPEP;
-
-                try {
-                    bytesRead = _socket.ReceiveFrom(byteBuffer, (SocketFlags)flags, ref remoteEP);
-                } catch (Exception e) {
-                    throw MakeRecvException(e, SocketError.InvalidArgument);
+                int length;
+                if (!BufferOps.TryGetWritableLength(buffer, out length)) {
+                    throw PythonOps.TypeError("buffer is read-only");
                 }
 
-                for (int i = 0; i < byteBuffer.Length; i++) {
-                    buffer[i] = byteBuffer[i];
-                }
+                EndPoint remoteEP = new IPEndPoint(IPAddress.Any, 0);
+                int bytesRead = receiveIntoWorker(buffer, byteBufferSize("recvfrom_into", nbytes, length, 1), flags, ref remoteEP);
+
                 PythonTuple remoteAddress = EndPointToTuple((IPEndPoint)remoteEP);
                 return PythonTuple.MakeTuple(bytesRead, remoteAddress);
             }
@@ -671,6 +617,43 @@ namespace IronPython.Modules {
                 throw PythonOps.TypeError(string.Format("recvfrom_into() argument 1 must be read-write buffer, not {0}", PythonOps.GetPythonTypeName(buffer)));
             }
 
+            /// <summary>
+            /// Receives up to size bytes into a writable buffer object: directly if it exposes its
+            /// memory, otherwise through the receive buffer of this socket.  remoteEP is null for
+            /// recv and receives the sender's address for recvfrom.
+            /// </summary>
+            private int receiveIntoWorker(object buffer, int size, int flags, ref EndPoint remoteEP) {
+                ArraySegment<byte> segment;
+                if (BufferOps.TryGetWritableSegment(buffer, out segment)) {
+                    return receiveWorker(segment.Array, segment.Offset, size, flags, ref remoteEP);
+                }
+
+                byte[] byteBuffer = BufferOps.TakeBuffer(ref _recvBuffer, size);
+                try {
+                    int bytesRead = receiveWorker(byteBuffer, 0, size, flags, ref remoteEP);
+                    PythonArray array = buffer as PythonArray;
+                    if (array != null) {
+                        array.SetBytes(0, byteBuffer, 0, bytesRead);
+                    } else {
+                        BufferOps.Write(buffer, 0, byteBuffer, 0, bytesRead);
+                    }
+                    return bytesRead;
+                } finally {
+                    BufferOps.ReturnBuffer(ref _recvBuffer, byteBuffer);
+                }
+            }
+
+            private int receiveWorker(byte[] buffer, int offset, int size, int flags, ref EndPoint remoteEP) {
+                try {
+                    if (remoteEP == null) {
+                        return _socket.Receive(buffer, offset, size, (SocketFlags)flags);
+                    }
+                    return _socket.ReceiveFrom(buffer, offset, size, (SocketFlags)flags, ref remoteEP);
+                } catch (Exception e) {
+                    throw MakeRecvException(e, remoteEP == null ? SocketError.NotConnected : SocketError.InvalidArgument);
+                }
+            }
+
             private static int byteBufferSize(string funcName, int nbytes, int bufLength, int itemSize) {
                 if (nbytes < 0) {
                     throw PythonOps.ValueError("negative buffersize in " + funcName);
@@ -757,9 +740,27 @@ namespace IronPython.Modules {
                 + "had room to buffer your data for a network send"
                 )]
             public int send(PythonBuffer data, [DefaultParameterValue(0)] int flags) {
-                byte[] buffer = data.byteCache;
+                return sendWorker(GetSendBuffer(data), flags);
+            }
+
+            [Documentation("")]
+            public int send([NotNull]ByteArray data, [DefaultParameterValue(0)] int flags) {
+                return sendWorker(GetSendBuffer(data), flags);
+            }
+
+            [Documentation("")]
+            public int send([NotNull]MemoryView data, [DefaultParameterValue(0)] int flags) {
+                return sendWorker(GetSendBuffer(data), flags);
+            }
+
+            [Documentation("")]
+            public int send([NotNull]PythonArray data, [DefaultParameterValue(0)] int flags) {
+                return sendWorker(GetSendBuffer(data), flags);
+            }
+
+            private int sendWorker(ArraySegment<byte> buffer, int flags) {
                 try {
-                    return _socket.Send(buffer, (SocketFlags)flags);
+                    return _socket.Send(buffer.Array, buffer.Offset, buffer.Count, (SocketFlags)flags);
                 } catch (Exception e) {
                     throw MakeException(_context, e);
                 }
@@ -786,7 +787,7 @@ namespace IronPython.Modules {
                 + "had room to buffer your data for a network send"
                 )]
             public void sendall(string data, [DefaultParameterValue(0)] int flags) {
-                sendallWorker(data.MakeByteArray(), flags);
+                sendallWorker(new ArraySegment<byte>(data.MakeByteArray()), flags);
             }
 
             [Documentation("sendall(string[, flags]) -> None\n\n"
@@ -810,7 +811,7 @@ namespace IronPython.Modules {
                 + "had room to buffer your data for a network send"
                 )]
             public void sendall(Bytes data, [DefaultParameterValue(0)] int flags) {
-                sendallWorker(data.GetUnsafeByteArray(), flags);
+                sendallWorker(new ArraySegment<byte>(data.GetUnsafeByteArray()), flags);
             }
 
             [Documentation("sendall(string[, flags]) -> None\n\n"
@@ -834,15 +835,39 @@ namespace IronPython.Modules {
                 + "had room to buffer your data for a network send"
                 )]
             public void sendall(PythonBuffer data, [DefaultParameterValue(0)] int flags) {
-                sendallWorker(data.byteCache, flags);
+                sendallWorker(GetSendBuffer(data), flags);
+            }
+
+            [Documentation("")]
+            public void sendall([NotNull]ByteArray data, [DefaultParameterValue(0)] int flags) {
+                sendallWorker(GetSendBuffer(data), flags);
+            }
+
+            [Documentation("")]
+            public void sendall([NotNull]MemoryView data, [DefaultParameterValue(0)] int flags) {
+                sendallWorker(GetSendBuffer(data), flags);
+            }
+
+            [Documentation("")]
+            public void sendall([NotNull]PythonArray data, [DefaultParameterValue(0)] int flags) {
+                sendallWorker(GetSendBuffer(data), flags);
+            }
+
+            /// <summary>
+            /// Gets the data to send, reading buffers which expose their memory in place.
+            /// </summary>
+            private static ArraySegment<byte> GetSendBuffer(object data) {
+                ArraySegment<byte> buffer;
+                BufferOps.TryGetReadableSegment(data, out buffer);
+                return buffer;
             }
 
-            private void sendallWorker(byte[] buffer, int flags) {
+            private void sendallWorker(ArraySegment<byte> buffer, int flags) {
                 try {
-                    int bytesTotal = buffer.Length;
+                    int bytesTotal = buffer.Count;
                     int bytesRemaining = bytesTotal;
                     while (bytesRemaining > 0) {
-                        bytesRemaining -= _socket.Send(buffer, bytesTotal - bytesRemaining, bytesRemaining, (SocketFlags)flags);
+                        bytesRemaining -= _socket.Send(buffer.Array, buffer.Offset + bytesTotal - bytesRemaining, bytesRemaining, (SocketFlags)flags);
                     }
                 } catch (Exception e) {
                     throw MakeException(_context, e);
@@ -1,11 +1,11 @@
 /* ****************************************************************************
  *
- * Copyright (c) Microsoft Corporation. 
+ * Copyright (c) Microsoft Corporation.
  *
- * This source code is subject to terms and conditions of the Apache License, Version 2.0. A 
- * copy of the license can be found in the License.html file at the root of this distribution. If 
- * you cannot locate the  Apache License, Version 2.0, please send an email to 
- * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound 
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
  * by the terms of the Apache License, Version 2.0.
  *
  * You must not remove this notice, or any other, from this software.
@@ -14,33 +14,580 @@
  * ***************************************************************************/
 
 using System;
-using System.Globalization;
+using System.Collections;
+using System.Collections.Generic;
+using System.Numerics;
+using System.Runtime.InteropServices;
+using System.Text;
 
 using Microsoft.Scripting.Runtime;
 
 using IronPython.Runtime;
+using IronPython.Runtime.Operations;
+using IronPython.Runtime.Types;
 
 [assembly: PythonModule("_sre", typeof(IronPython.Modules.PythonSRegEx))]
 namespace IronPython.Modules {
+    /// <summary>
+    /// The _sre module: runs the code which sre_compile produces for a regular expression.  The
+    /// matching itself is done by SreState, this module provides the pattern, match and scanner
+    /// objects on top of it with the semantics of CPython's _sre.
+    /// </summary>
     public static class PythonSRegEx {
-        public const string __doc__ = "non-functional _sre module.  Included only for completeness.";
+        public const string __doc__ = "Regular expression engine used by sre_compile.";
 
         public const int MAGIC = 20031017;
-        public const int CODESIZE = 2;
+        public const int CODESIZE = 4;
+        public static readonly BigInteger MAXREPEAT = SreState.MAXREPEAT;
+        public const string copyright = " SRE 2.2.2 Copyright (c) 1997-2002 by Secret Labs AB ";
 
-        public static object getlower(CodeContext/*!*/ context, object val, object encoding) {
-            int encInt = context.LanguageContext.ConvertToInt32(val);
-            int charVal = context.LanguageContext.ConvertToInt32(val);
+        public static int getcodesize() {
+            return CODESIZE;
+        }
+
+        public static int getlower(int character, int flags) {
+            return SreState.GetLower(character, flags);
+        }
 
-            if (encInt == (int)PythonRegex.UNICODE) {
-                return (int)Char.ToLower((char)charVal);
-            } else {
-                return (int)Char.ToLowerInvariant((char)charVal);
+        public static SRE_Pattern compile(object pattern, int flags, [NotNull]IList<object> code, [DefaultParameterValue(0)]int groups, [DefaultParameterValue(null)]PythonDictionary groupindex, [DefaultParameterValue(null)]object indexgroup) {
+            int[] words = new int[code.Count];
+            for (int i = 0; i < words.Length; i++) {
+                object item = code[i];
+                if (item is int && (int)item >= 0) {
+                    words[i] = (int)item;
+                } else if (item is BigInteger && (BigInteger)item >= 0 && (BigInteger)item <= UInt32.MaxValue) {
+                    words[i] = (int)(uint)(BigInteger)item;
+                } else if (item is int || item is BigInteger) {
+                    throw PythonOps.OverflowError("regular expression code size limit exceeded");
+                } else {
+                    throw PythonOps.TypeError("regular expression code must be a list of integers, got {0}", PythonOps.GetPythonTypeName(item));
+                }
             }
+
+            return new SRE_Pattern(pattern, flags, words, groups, groupindex ?? new PythonDictionary(), indexgroup);
         }
 
-        public static object compile(object a, object b, object c) {
-            return null;
+        /// <summary>
+        /// Compiled regular expression
+        /// </summary>
+        [PythonType]
+        public sealed class SRE_Pattern : IWeakReferenceable {
+            private readonly object _pattern;
+            private readonly int _flags;
+            internal readonly int[]/*!*/ _code;
+            internal readonly int _groups;
+            internal readonly PythonDictionary/*!*/ _groupindex;
+            internal readonly object _indexgroup;
+            private Template _lastTemplate;
+            private WeakRefTracker _weakRefTracker;
+
+            internal SRE_Pattern(object pattern, int flags, int[]/*!*/ code, int groups, PythonDictionary/*!*/ groupindex, object indexgroup) {
+                _pattern = pattern;
+                _flags = flags;
+                _code = code;
+                _groups = groups;
+                _groupindex = groupindex;
+                _indexgroup = indexgroup;
+            }
+
+            public SRE_Match match(object @string, [DefaultParameterValue(0)]int pos, [DefaultParameterValue(Int32.MaxValue)]int endpos) {
+                SreState state = CreateState(@string, pos, endpos);
+                return MakeMatch(@string, state, state.Match());
+            }
+
+            public SRE_Match search(object @string, [DefaultParameterValue(0)]int pos, [DefaultParameterValue(Int32.MaxValue)]int endpos) {
+                SreState state = CreateState(@string, pos, endpos);
+                return MakeMatch(@string, state, state.Search());
+            }
+
+            public List findall(object @string, [DefaultParameterValue(0)]int pos, [DefaultParameterValue(Int32.MaxValue)]int endpos) {
+                SreState state = CreateState(@string, pos, endpos);
+                string text = state.Text;
+                List res = new List();
+
+                while (state.Start <= state.End) {
+                    state.Reset();
+                    int status = state.Search();
+                    if (status <= 0) {
+                        CheckStatus(status);
+                        break;
+                    }
+
+                    object item;
+                    switch (_groups) {
+                        case 0:
+                            item = text.Substring(state.Start, state.Ptr - state.Start);
+                            break;
+                        case 1:
+                            item = GetGroup(state, 1, String.Empty);
+                            break;
+                        default:
+                            object[] items = new object[_groups];
+                            for (int i = 0; i < items.Length; i++) {
+                                items[i] = GetGroup(state, i + 1, String.Empty);
+                            }
+                            item = PythonTuple.MakeTuple(items);
+                            break;
+                    }
+                    res.AddNoLock(item);
+
+                    state.Start = state.Ptr == state.Start ? state.Ptr + 1 : state.Ptr;
+                }
+
+                return res;
+            }
+
+            public object finditer(object @string, [DefaultParameterValue(0)]int pos, [DefaultParameterValue(Int32.MaxValue)]int endpos) {
+                return FindIterator(scanner(@string, pos, endpos));
+            }
+
+            public SRE_Scanner scanner(object @string, [DefaultParameterValue(0)]int pos, [DefaultParameterValue(Int32.MaxValue)]int endpos) {
+                return new SRE_Scanner(this, @string, CreateState(@string, pos, endpos));
+            }
+
+            [return: SequenceTypeInfo(typeof(string))]
+            public List split(object @string, [DefaultParameterValue(0)]int maxsplit) {
+                SreState state = CreateState(@string, 0, Int32.MaxValue);
+                string text = state.Text;
+                List res = new List();
+                int last = state.Start;
+
+                for (int n = 0; maxsplit == 0 || n < maxsplit; ) {
+                    state.Reset();
+                    int status = state.Search();
+                    if (status <= 0) {
+                        CheckStatus(status);
+                        break;
+                    }
+
+                    if (state.Start == state.Ptr) {
+                        // empty matches don't split the string
+                        if (last == state.End) {
+                            break;
+                        }
+                        state.Start = state.Ptr + 1;
+                        continue;
+                    }
+
+                    res.AddNoLock(text.Substring(last, state.Start - last));
+                    for (int i = 1; i <= _groups; i++) {
+                        res.AddNoLock(GetGroup(state, i, null));
+                    }
+
+                    n++;
+                    last = state.Start = state.Ptr;
+                }
+
+                res.AddNoLock(text.Substring(last, state.EndPos - last));
+                return res;
+            }
+
+            public string sub(CodeContext/*!*/ context, object repl, object @string, [DefaultParameterValue(0)]int count) {
+                int n;
+                return Substitute(context, repl, @string, count, out n);
+            }
+
+            public PythonTuple subn(CodeContext/*!*/ context, object repl, object @string, [DefaultParameterValue(0)]int count) {
+                int n;
+                string res = Substitute(context, repl, @string, count, out n);
+                return PythonTuple.MakeTuple(res, n);
+            }
+
+            public object pattern {
+                get { return _pattern; }
+            }
+
+            public int flags {
+                get { return _flags; }
+            }
+
+            public int groups {
+                get { return _groups; }
+            }
+
+            public PythonDictionary groupindex {
+                get { return _groupindex; }
+            }
+
+            #region Implementation details
+
+            private SreState/*!*/ CreateState(object @string, int pos, int endpos) {
+                return new SreState(_code, _flags, _groups, PythonRegex.ValidateString(@string, "string"), pos, endpos);
+            }
+
+            private SRE_Match MakeMatch(object @string, SreState/*!*/ state, int status) {
+                if (status > 0) {
+                    return new SRE_Match(this, @string, state);
+                }
+                CheckStatus(status);
+                return null;
+            }
+
+            private static object GetGroup(SreState/*!*/ state, int group, object @default) {
+                int start, end;
+                if (state.TryGetGroup(group, out start, out end)) {
+                    return state.Text.Substring(start, end - start);
+                }
+                return @default;
+            }
+
+            private static IEnumerator FindIterator(SRE_Scanner/*!*/ scanner) {
+                for (;;) {
+                    SRE_Match match = scanner.search();
+                    if (match == null) {
+                        yield break;
+                    }
+                    yield return match;
+                }
+            }
+
+            private string Substitute(CodeContext/*!*/ context, object repl, object @string, int count, out int n) {
+                object filter = null;
+                string literal = null;
+                Template template = null;
+
+                if (PythonOps.IsCallable(context, repl)) {
+                    filter = repl;
+                } else {
+                    string replacement = PythonRegex.ValidateString(repl, "repl");
+                    if (replacement.IndexOf('\\') == -1) {
+                        literal = replacement;
+                    } else {
+                        template = GetTemplate(context, replacement);
+                    }
+                }
+
+                SreState state = CreateState(@string, 0, Int32.MaxValue);
+                string text = state.Text;
+                StringBuilder res = null;
+                int last = 0;
+                n = 0;
+
+                while (count == 0 || n < count) {
+                    state.Reset();
+                    int status = state.Search();
+                    if (status <= 0) {
+                        CheckStatus(status);
+                        break;
+                    }
+
+                    int start = state.Start, end = state.Ptr;
+                    if (last < start || !(last == end && n > 0)) {
+                        // empty matches adjacent to the previous match aren't replaced
+                        if (res == null) {
+                            res = new StringBuilder(text.Length);
+                        }
+                        res.Append(text, last, start - last);
+
+                        if (filter != null) {
+                            object item = PythonCalls.Call(context, filter, new SRE_Match(this, @string, state));
+                            if (item != null) {
+                                res.Append(PythonRegex.ValidateString(item, "repl"));
+                            }
+                        } else if (literal != null) {
+                            res.Append(literal);
+                        } else {
+                            template.Expand(context, this, state, res);
+                        }
+
+                        last = end;
+                        n++;
+                    }
+
+                    state.Start = state.Ptr == state.Start ? state.Ptr + 1 : state.Ptr;
+                }
+
+                if (res == null) {
+                    return text;
+                }
+                res.Append(text, last, state.EndPos - last);
+                return res.ToString();
+            }
+
+            internal Template/*!*/ GetTemplate(CodeContext/*!*/ context, string/*!*/ source) {
+                Template res = _lastTemplate;
+                if (res == null || res.Source != source) {
+                    _lastTemplate = res = new Template(context, this, source);
+                }
+                return res;
+            }
+
+            #endregion
+
+            #region IWeakReferenceable Members
+
+            WeakRefTracker IWeakReferenceable.GetWeakRef() {
+                return _weakRefTracker;
+            }
+
+            bool IWeakReferenceable.SetWeakRef(WeakRefTracker value) {
+                _weakRefTracker = value;
+                return true;
+            }
+
+            void IWeakReferenceable.SetFinalizer(WeakRefTracker value) {
+                ((IWeakReferenceable)this).SetWeakRef(value);
+            }
+
+            #endregion
         }
+
+        [PythonType]
+        public sealed class SRE_Match {
+            private readonly SRE_Pattern/*!*/ _pattern;
+            private readonly object _string;
+            private readonly string/*!*/ _text;
+            private readonly int[]/*!*/ _regs;
+            private readonly int _pos, _endpos, _lastindex;
+
+            internal SRE_Match(SRE_Pattern/*!*/ pattern, object @string, SreState/*!*/ state) {
+                _pattern = pattern;
+                _string = @string;
+                _text = state.Text;
+                _pos = state.Pos;
+                _endpos = state.EndPos;
+                _lastindex = state.LastIndex;
+
+                _regs = new int[(pattern._groups + 1) * 2];
+                _regs[0] = state.Start;
+                _regs[1] = state.Ptr;
+                for (int i = 1; i <= pattern._groups; i++) {
+                    state.TryGetGroup(i, out _regs[i * 2], out _regs[i * 2 + 1]);
+                }
+            }
+
+            public object group() {
+                return GetSlice(0, null);
+            }
+
+            public object group(object index) {
+                return GetSlice(GetIndex(index), null);
+            }
+
+            public object group(object index, params object[] additional) {
+                object[] res = new object[additional.Length + 1];
+                res[0] = group(index);
+                for (int i = 0; i < additional.Length; i++) {
+                    res[i + 1] = group(additional[i]);
+                }
+                return PythonTuple.MakeTuple(res);
+            }
+
+            public PythonTuple groups([DefaultParameterValue(null)]object @default) {
+                object[] res = new object[_pattern._groups];
+                for (int i = 0; i < res.Length; i++) {
+                    res[i] = GetSlice(i + 1, @default);
+                }
+                return PythonTuple.MakeTuple(res);
+            }
+
+            public PythonDictionary groupdict([DefaultParameterValue(null)]object @default) {
+                PythonDictionary res = new PythonDictionary();
+                foreach (KeyValuePair<object, object> group in _pattern._groupindex) {
+                    res[group.Key] = GetSlice(GetIndex(group.Key), @default);
+                }
+                return res;
+            }
+
+            public int start([DefaultParameterValue(0)]object group) {
+                return _regs[GetIndex(group) * 2];
+            }
+
+            public int end([DefaultParameterValue(0)]object group) {
+                return _regs[GetIndex(group) * 2 + 1];
+            }
+
+            public PythonTuple span([DefaultParameterValue(0)]object group) {
+                int index = GetIndex(group);
+                return PythonTuple.MakeTuple(_regs[index * 2], _regs[index * 2 + 1]);
+            }
+
+            public string expand(CodeContext/*!*/ context, object template) {
+                StringBuilder res = new StringBuilder();
+                _pattern.GetTemplate(context, PythonRegex.ValidateString(template, "template")).Expand(context, this, res);
+                return res.ToString();
+            }
+
+            public PythonTuple regs {
+                get {
+                    object[] res = new object[_pattern._groups + 1];
+                    for (int i = 0; i < res.Length; i++) {
+                        res[i] = PythonTuple.MakeTuple(_regs[i * 2], _regs[i * 2 + 1]);
+                    }
+                    return PythonTuple.MakeTuple(res);
+                }
+            }
+
+            public object lastindex {
+                get {
+                    if (_lastindex >= 0) {
+                        return _lastindex;
+                    }
+                    return null;
+                }
+            }
+
+            public object lastgroup {
+                get {
+                    IList<object> names = _pattern._indexgroup as IList<object>;
+                    if (names != null && _lastindex >= 0 && _lastindex < names.Count) {
+                        return names[_lastindex];
+                    }
+                    return null;
+                }
+            }
+
+            public object @string {
+                get { return _string; }
+            }
+
+            public SRE_Pattern re {
+                get { return _pattern; }
+            }
+
+            public int pos {
+                get { return _pos; }
+            }
+
+            public int endpos {
+                get { return _endpos; }
+            }
+
+            internal object GetSlice(int index, object @default) {
+                int start = _regs[index * 2], end = _regs[index * 2 + 1];
+                if (start < 0 || end < 0) {
+                    return @default;
+                }
+                return _text.Substring(start, end - start);
+            }
+
+            private int GetIndex(object group) {
+                int index = -1;
+                if (group is int) {
+                    index = (int)group;
+                } else if (group is BigInteger) {
+                    BigInteger big = (BigInteger)group;
+                    if (big >= 0 && big <= Int32.MaxValue) {
+                        index = (int)big;
+                    }
+                } else if (group is bool) {
+                    index = (bool)group ? 1 : 0;
+                } else {
+                    object value;
+                    if (_pattern._groupindex.TryGetValue(group, out value) && value is int) {
+                        index = (int)value;
+                    }
+                }
+
+                if (index < 0 || index > _pattern._groups) {
+                    throw PythonOps.IndexError("no such group");
+                }
+                return index;
+            }
+        }
+
+        [PythonType]
+        public sealed class SRE_Scanner {
+            private readonly SRE_Pattern/*!*/ _pattern;
+            private readonly object _string;
+            private readonly SreState/*!*/ _state;
+
+            internal SRE_Scanner(SRE_Pattern/*!*/ pattern, object @string, SreState/*!*/ state) {
+                _pattern = pattern;
+                _string = @string;
+                _state = state;
+            }
+
+            public SRE_Match match() {
+                return Next(_state.Match());
+            }
+
+            public SRE_Match search() {
+                return Next(_state.Search());
+            }
+
+            public SRE_Pattern pattern {
+                get { return _pattern; }
+            }
+
+            private SRE_Match Next(int status) {
+                SRE_Match res = null;
+                if (status > 0) {
+                    res = new SRE_Match(_pattern, _string, _state);
+                } else {
+                    CheckStatus(status);
+                }
+
+                _state.Start = status == 0 || _state.Ptr == _state.Start ? _state.Ptr + 1 : _state.Ptr;
+                _state.Reset();
+                return res;
+            }
+        }
+
+        #region Implementation details
+
+        /// <summary>
+        /// Replacement template as parsed by sre_parse.parse_template: literal text with the
+        /// group references filled in for each match.
+        /// </summary>
+        internal sealed class Template {
+            public readonly string/*!*/ Source;
+            private readonly object[]/*!*/ _literals;
+            private readonly int[]/*!*/ _indices, _groups;
+
+            public Template(CodeContext/*!*/ context, SRE_Pattern/*!*/ pattern, string/*!*/ source) {
+                object sreParse = Importer.ImportModule(context, new PythonDictionary(), "sre_parse", false, 0);
+                PythonTuple parsed = (PythonTuple)PythonOps.Invoke(context, sreParse, "parse_template", source, pattern);
+                IList<object> groups = (IList<object>)parsed[0];
+                IList<object> literals = (IList<object>)parsed[1];
+
+                Source = source;
+                _literals = new object[literals.Count];
+                literals.CopyTo(_literals, 0);
+                _indices = new int[groups.Count];
+                _groups = new int[groups.Count];
+                for (int i = 0; i < groups.Count; i++) {
+                    PythonTuple group = (PythonTuple)groups[i];
+                    _indices[i] = (int)group[0];
+                    _groups[i] = (int)group[1];
+                }
+            }
+
+            public void Expand(CodeContext/*!*/ context, SRE_Pattern/*!*/ pattern, SreState/*!*/ state, StringBuilder/*!*/ res) {
+                Expand(context, new SRE_Match(pattern, null, state), res);
+            }
+
+            public void Expand(CodeContext/*!*/ context, SRE_Match/*!*/ match, StringBuilder/*!*/ res) {
+                object[] values = (object[])_literals.Clone();
+                for (int i = 0; i < _groups.Length; i++) {
+                    if (_groups[i] < 0 || _groups[i] > match.re._groups) {
+                        throw MakeError(context, "invalid group reference");
+                    }
+                    values[_indices[i]] = match.GetSlice(_groups[i], null);
+                    if (values[_indices[i]] == null) {
+                        throw MakeError(context, "unmatched group");
+                    }
+                }
+
+                foreach (object value in values) {
+                    if (value != null) {
+                        res.Append((string)value);
+                    }
+                }
+            }
+        }
+
+        private static void CheckStatus(int status) {
+            if (status < 0) {
+                throw PythonOps.RuntimeError("internal error in regular expression engine");
+            }
+        }
+
+        private static Exception MakeError(CodeContext/*!*/ context, string/*!*/ message) {
+            object sreConstants = Importer.ImportModule(context, new PythonDictionary(), "sre_constants", false, 0);
+            return PythonOps.MakeException(context, PythonOps.GetBoundAttr(context, sreConstants, "error"), message, null);
+        }
+
+        #endregion
     }
-}
\ No newline at end of file
+}
@@ -14,14 +14,18 @@
  * ***************************************************************************/
 
 using System;
+using System.Collections;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
-using System.IO;
+using System.Linq.Expressions;
+using System.Reflection;
 using System.Runtime.CompilerServices;
 using System.Runtime.InteropServices;
-using System.Text;
 using System.Threading;
 
 using Microsoft.Scripting;
+using Microsoft.Scripting.Generation;
+using Microsoft.Scripting.Interpreter;
 using Microsoft.Scripting.Runtime;
 using Microsoft.Scripting.Utils;
 
@@ -58,6 +62,7 @@ namespace IronPython.Modules {
             private bool _isLittleEndian;           // true if the format is in little endian mode
             private int _encodingCount = -1;        // the number of objects consumed/produced by the format
             private int _encodingSize = -1;         // the number of bytes read/produced by the format
+            private FormatCode _code;               // the compiled pack/unpack delegates, shared with the cached struct
             private WeakRefTracker _tracker;        // storage for weak proxy's
 
             private void Initialize(Struct s) {
@@ -67,11 +72,11 @@ namespace IronPython.Modules {
                 _isLittleEndian = s._isLittleEndian;
                 _encodingCount = s._encodingCount;
                 _encodingSize = s._encodingSize;
-                _tracker = s._tracker;
+                _code = s._code;
             }
 
             internal Struct(CodeContext/*!*/ context, [NotNull]string/*!*/ fmt) {
-                __init__(context, fmt);
+                Compile(context, fmt);
             }
 
             #region Python construction
@@ -88,18 +93,7 @@ namespace IronPython.Modules {
             public void __init__(CodeContext/*!*/ context, [NotNull]string/*!*/ fmt) {
                 ContractUtils.RequiresNotNull(fmt, "fmt");
 
-                _formatString = fmt;
-
-                Struct s;
-                bool gotIt;
-                lock (_cache) {
-                    gotIt = _cache.TryGetValue(_formatString, out s);
-                }
-                if (gotIt) {
-                    Initialize(s);
-                } else {
-                    Compile(context, fmt);
-                }
+                Initialize(GetStructFromCache(context, fmt));
             }
 
             #endregion
@@ -119,124 +113,38 @@ namespace IronPython.Modules {
                     throw Error(context, String.Format("pack requires exactly {0} arguments", _encodingCount));
                 }
 
-                int curObj = 0;
-                StringBuilder res = new StringBuilder(_encodingSize);
-
-                for (int i = 0; i < _formats.Length; i++) {
-                    Format curFormat = _formats[i];
-                    if (!_isStandardized) {
-                        // In native mode, align to {size}-byte boundaries
-                        int nativeSize = curFormat.NativeSize;
-
-                        int alignLength = Align(res.Length, nativeSize);
-                        int padLength = alignLength - res.Length;
-                        for (int j = 0; j < padLength; j++) {
-                            res.Append('\0');
-                        }
-                    }
-
-                    switch (curFormat.Type) {
-                        case FormatType.PadByte:
-                            res.Append('\0', curFormat.Count);
-                            break;
-                        case FormatType.Bool:
-                            res.Append(GetBoolValue(context, curObj++, values) ? (char)1 : '\0');
-                            break;
-                        case FormatType.Char:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Append(GetCharValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.SignedChar:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Append((char)(byte)GetSByteValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.UnsignedChar:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Append((char)GetByteValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.Short:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteShort(res, _isLittleEndian, GetShortValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.UnsignedShort:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteUShort(res, _isLittleEndian, GetUShortValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.Int:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteInt(res, _isLittleEndian, GetIntValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.UnsignedInt:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteUInt(res, _isLittleEndian, GetULongValue(context, curObj++, values, "unsigned int"));
-                            }
-                            break;
-                        case FormatType.UnsignedLong:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteUInt(res, _isLittleEndian, GetULongValue(context, curObj++, values, "unsigned long"));
-                            }
-                            break;
-                        case FormatType.Pointer:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WritePointer(res, _isLittleEndian, GetPointer(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.LongLong:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteLong(res, _isLittleEndian, GetLongValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.UnsignedLongLong:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteULong(res, _isLittleEndian, GetULongLongValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.Double:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteDouble(res, _isLittleEndian, GetDoubleValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.Float:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                WriteFloat(res, _isLittleEndian, (float)GetDoubleValue(context, curObj++, values));
-                            }
-                            break;
-                        case FormatType.CString:
-                            WriteString(res, curFormat.Count, GetStringValue(context, curObj++, values));
-                            break;
-                        case FormatType.PascalString:
-                            WritePascalString(res, curFormat.Count - 1, GetStringValue(context, curObj++, values));
-                            break;
-                        default:
-                            throw Error(context, "bad format string");
-                    }
-                }
-
-                return res.ToString();
+                byte[] data = new byte[_encodingSize];
+                _code.Pack(context, values, data, 0);
+                return MakeString(data, 0, data.Length);
             }
 
             [Documentation("Stores the deserialized data into the provided array")]
-            public void pack_into(CodeContext/*!*/ context, [NotNull]ArrayModule.array/*!*/ buffer, int offset, params object[] args) {
-                byte[] existing = buffer.ToByteArray();
-
-                if (offset + size > existing.Length) {
-                    throw Error(context, String.Format("pack_into requires a buffer of at least {0} bytes", size));
+            public void pack_into(CodeContext/*!*/ context, object buffer, int offset, params object[] args) {
+                if (args.Length != _encodingCount) {
+                    throw Error(context, String.Format("pack requires exactly {0} arguments", _encodingCount));
                 }
 
-                string data = pack(context, args);
+                int length;
+                if (!BufferOps.TryGetWritableLength(buffer, out length)) {
+                    throw PythonOps.TypeError("pack_into() argument 1 must be read-write buffer, not {0}", PythonOps.GetPythonTypeName(buffer));
+                }
 
-                for (int i = 0; i < data.Length; i++) {
-                    existing[i + offset] = (byte)data[i];
+                if (offset < 0) {
+                    offset += length;
+                }
+                if (offset < 0 || length - offset < size) {
+                    throw Error(context, String.Format("pack_into requires a buffer of at least {0} bytes", size));
                 }
 
-                buffer.Clear();
-                buffer.FromStream(new MemoryStream(existing));
+                ArraySegment<byte> segment;
+                if (BufferOps.TryGetWritableSegment(buffer, out segment)) {
+                    Array.Clear(segment.Array, segment.Offset + offset, size);
+                    _code.Pack(context, args, segment.Array, segment.Offset + offset);
+                } else {
+                    byte[] data = new byte[size];
+                    _code.Pack(context, args, data, 0);
+                    BufferOps.Write(buffer, offset, data, 0, data.Length);
+                }
             }
 
             [Documentation("deserializes the string using the structs specified format")]
@@ -245,105 +153,7 @@ namespace IronPython.Modules {
                     throw Error(context, String.Format("unpack requires a string argument of length {0}", size));
                 }
 
-                string data = @string;
-                int curIndex = 0;
-                List<object> res = new List<object>(_encodingCount);
-
-                for (int i = 0; i < _formats.Length; i++) {
-                    Format curFormat = _formats[i];
-
-                    if (!_isStandardized) {
-                        // In native mode, align to {size}-byte boundaries
-                        int nativeSize = curFormat.NativeSize;
-                        if (nativeSize > 0) {
-                            curIndex = Align(curIndex, nativeSize);
-                        }
-                    }
-
-                    switch (curFormat.Type) {
-                        case FormatType.PadByte:
-                            curIndex += curFormat.Count;
-                            break;
-                        case FormatType.Bool:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add(CreateBoolValue(context, ref curIndex, data));
-                            }
-                            break;
-                        case FormatType.Char:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add(CreateCharValue(context, ref curIndex, data).ToString());
-                            }
-                            break;
-                        case FormatType.SignedChar:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add((int)(sbyte)CreateCharValue(context, ref curIndex, data));
-                            }
-                            break;
-                        case FormatType.UnsignedChar:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add((int)CreateCharValue(context, ref curIndex, data));
-                            }
-                            break;
-                        case FormatType.Short:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add((int)CreateShortValue(context, ref curIndex, _isLittleEndian, data));
-                            }
-                            break;
-                        case FormatType.UnsignedShort:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add((int)CreateUShortValue(context, ref curIndex, _isLittleEndian, data));
-                            }
-                            break;
-                        case FormatType.Int:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add(CreateIntValue(context, ref curIndex, _isLittleEndian, data));
-                            }
-                            break;
-                        case FormatType.UnsignedInt:
-                        case FormatType.UnsignedLong:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add(BigIntegerOps.__int__((BigInteger)CreateUIntValue(context, ref curIndex, _isLittleEndian, data)));
-                            }
-                            break;
-                        case FormatType.Pointer:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                if (IntPtr.Size == 4) {
-                                    res.Add(CreateIntValue(context, ref curIndex, _isLittleEndian, data));
-                                } else {
-                                    res.Add(BigIntegerOps.__int__((BigInteger)CreateLongValue(context, ref curIndex, _isLittleEndian, data)));
-                                }
-                            }
-                            break;
-                        case FormatType.LongLong:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add(BigIntegerOps.__int__((BigInteger)CreateLongValue(context, ref curIndex, _isLittleEndian, data)));
-                            }
-                            break;
-                        case FormatType.UnsignedLongLong:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add(BigIntegerOps.__int__((BigInteger)CreateULongValue(context, ref curIndex, _isLittleEndian, data)));
-                            }
-                            break;
-                        case FormatType.Float:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add((double)CreateFloatValue(context, ref curIndex, _isLittleEndian, data));
-                            }
-                            break;
-                        case FormatType.Double:
-                            for (int j = 0; j < curFormat.Count; j++) {
-                                res.Add(CreateDoubleValue(context, ref curIndex, _isLittleEndian, data));
-                            }
-                            break;
-                        case FormatType.CString:
-                            res.Add(CreateString(context, ref curIndex, curFormat.Count, data));
-                            break;
-                        case FormatType.PascalString:
-                            res.Add(CreatePascalString(context, ref curIndex, curFormat.Count - 1, data));
-                            break;
-                    }
-                }
-
-                return new PythonTuple(res);
+                return Unpack(context, GetBytes(@string, 0, size), 0);
             }
 
             public PythonTuple/*!*/ unpack(CodeContext/*!*/ context, [BytesConversion][NotNull]IList<byte> @string) {
@@ -360,27 +170,44 @@ namespace IronPython.Modules {
 
             [Documentation("reads the current format from the specified string")]
             public PythonTuple/*!*/ unpack_from(CodeContext/*!*/ context, [NotNull]string/*!*/ buffer, [DefaultParameterValue(0)] int offset) {
-                int bytesAvail = buffer.Length - offset;
-                if (bytesAvail < size) {
+                // only the bytes which are read are converted, so that large strings can be walked through cheaply
+                if (offset < 0) {
+                    offset += buffer.Length;
+                }
+                if (offset < 0 || buffer.Length - offset < size) {
                     throw Error(context, String.Format("unpack_from requires a buffer of at least {0} bytes", size));
                 }
 
-                return unpack(context, buffer.Substring(offset, size));
+                return Unpack(context, GetBytes(buffer, offset, size), 0);
             }
 
             [Documentation("reads the current format from the specified array")]
             public PythonTuple/*!*/ unpack_from(CodeContext/*!*/ context, [BytesConversion][NotNull]IList<byte>/*!*/ buffer, [DefaultParameterValue(0)] int offset) {
-                return unpack_from(context, buffer.MakeString(), offset);
+                return UnpackFrom(context, buffer.ToSegment(), offset);
             }
 
             [Documentation("reads the current format from the specified array")]
             public PythonTuple/*!*/ unpack_from(CodeContext/*!*/ context, [NotNull]ArrayModule.array/*!*/ buffer, [DefaultParameterValue(0)] int offset) {
-                return unpack_from(context, buffer.ToByteArray().MakeString(), offset);
+                return UnpackFrom(context, GetSegment(buffer), offset);
             }
 
             [Documentation("reads the current format from the specified buffer object")]
             public PythonTuple/*!*/ unpack_from(CodeContext/*!*/ context, [NotNull]PythonBuffer/*!*/ buffer, [DefaultParameterValue(0)] int offset) {
-                return unpack_from(context, buffer.ToString(), offset);
+                return UnpackFrom(context, GetSegment(buffer), offset);
+            }
+
+            [Documentation("iter_unpack(buffer) -> iterator(tuple)\n\nReturn an iterator yielding tuples unpacked from the given buffer, like a\nrepeated invocation of unpack_from().  Requires that the buffer length be\na multiple of the struct size.")]
+            public IEnumerator/*!*/ iter_unpack(CodeContext/*!*/ context, object buffer) {
+                if (size == 0) {
+                    throw Error(context, "cannot iteratively unpack with a struct of length 0");
+                }
+
+                ArraySegment<byte> segment = GetSegment(buffer);
+                if (segment.Count % size != 0) {
+                    throw Error(context, String.Format("iterative unpacking requires a buffer of a multiple of {0} bytes", size));
+                }
+
+                return new unpack_iterator(context, this, segment);
             }
 
             [Documentation("gets the number of bytes that the serialized string will occupy or are required to deserialize the data")]
@@ -543,11 +370,92 @@ namespace IronPython.Modules {
                         _encodingSize = Align(_encodingSize, _formats[i].NativeSize);
                     }
 
+                    _formats[i].Offset = _encodingSize;
                     _encodingSize += GetNativeSize(_formats[i].Type) * _formats[i].Count;
                 }
-                lock (_cache) {
-                    _cache.Add(fmt, this);
+
+                _formatString = fmt;
+                _code = new FormatCode(context, fmt, _formats, _encodingCount, _isLittleEndian);
+            }
+
+            private PythonTuple/*!*/ Unpack(CodeContext/*!*/ context, byte[]/*!*/ data, int offset) {
+                return PythonTuple.MakeTuple(_code.Unpack(context, data, offset));
+            }
+
+            private PythonTuple/*!*/ UnpackFrom(CodeContext/*!*/ context, ArraySegment<byte> buffer, int offset) {
+                if (offset < 0) {
+                    offset += buffer.Count;
+                }
+                if (offset < 0 || buffer.Count - offset < size) {
+                    throw Error(context, String.Format("unpack_from requires a buffer of at least {0} bytes", size));
+                }
+
+                return Unpack(context, buffer.Array, buffer.Offset + offset);
+            }
+
+            private static ArraySegment<byte> GetSegment(object buffer) {
+                // the contents of buffers of strings are converted once and then kept by the buffer
+                PythonBuffer pyBuffer = buffer as PythonBuffer;
+                if (pyBuffer != null && pyBuffer._object is string) {
+                    return new ArraySegment<byte>(pyBuffer.byteCache);
+                }
+
+                ArraySegment<byte> segment;
+                if (!BufferOps.TryGetReadableSegment(buffer, out segment)) {
+                    throw PythonOps.TypeError("struct.unpack requires a buffer object, not {0}", PythonOps.GetPythonTypeName(buffer));
+                }
+                return segment;
+            }
+
+            /// <summary>
+            /// Iterator returned by iter_unpack.  The contents of the buffer are captured when the
+            /// iterator is created and each item is unpacked in place.
+            /// </summary>
+            [PythonType]
+            private sealed class unpack_iterator : IEnumerator {
+                private readonly CodeContext/*!*/ _context;
+                private readonly FormatCode/*!*/ _code;
+                private readonly int _size;
+                private readonly ArraySegment<byte> _buffer;
+                private int _index;
+                private object _current;
+
+                public unpack_iterator(CodeContext/*!*/ context, Struct/*!*/ s, ArraySegment<byte> buffer) {
+                    _context = context;
+                    _code = s._code;
+                    _size = s.size;
+                    _buffer = buffer;
+                }
+
+                public int __length_hint__() {
+                    return (_buffer.Count - _index) / _size;
+                }
+
+                #region IEnumerator Members
+
+                object IEnumerator.Current {
+                    get {
+                        return _current;
+                    }
+                }
+
+                bool IEnumerator.MoveNext() {
+                    if (_index >= _buffer.Count) {
+                        _current = null;
+                        return false;
+                    }
+
+                    _current = PythonTuple.MakeTuple(_code.Unpack(_context, _buffer.Array, _buffer.Offset + _index));
+                    _index += _size;
+                    return true;
+                }
+
+                void IEnumerator.Reset() {
+                    _index = 0;
+                    _current = null;
                 }
+
+                #endregion
             }
 
             #endregion
@@ -631,10 +539,12 @@ namespace IronPython.Modules {
         private struct Format {
             public FormatType Type;
             public int Count;
+            public int Offset;      // the offset of the first item in the packed data
 
             public Format(FormatType type, int count) {
                 Type = type;
                 Count = count;
+                Offset = 0;
             }
 
             public int NativeSize {
@@ -644,28 +554,188 @@ namespace IronPython.Modules {
             }
         }
 
+        /// <summary>
+        /// The pack and unpack delegates compiled for a format string.  Each item is read or written
+        /// at a constant offset by the ModuleOps helper for its type.  The delegates start out
+        /// interpreted and are replaced with the compiled ones once the adaptive compiler has
+        /// compiled them.  Formats with a lot of items are packed and unpacked in a loop instead.
+        /// </summary>
+        private sealed class FormatCode {
+            // formats producing more items than this aren't compiled into a single delegate
+            private const int MaxCompiledItems = 256;
+
+            public Func<CodeContext, byte[], int, object[]> Unpack;
+            public Action<CodeContext, object[], byte[], int> Pack;
+
+            public FormatCode(CodeContext/*!*/ context, string/*!*/ fmt, Format[]/*!*/ formats, int count, bool fLittleEndian) {
+                if (count > MaxCompiledItems) {
+                    Unpack = MakeUnpackLoop(formats, count, fLittleEndian);
+                    Pack = MakePackLoop(formats, fLittleEndian);
+                    return;
+                }
+
+                ParameterExpression codeContext = Expression.Parameter(typeof(CodeContext), "context");
+                ParameterExpression values = Expression.Parameter(typeof(object[]), "values");
+                ParameterExpression data = Expression.Parameter(typeof(byte[]), "data");
+                ParameterExpression offset = Expression.Parameter(typeof(int), "offset");
+                Expression littleEndian = Expression.Constant(fLittleEndian);
+
+                List<Expression> items = new List<Expression>(count);
+                List<Expression> writes = new List<Expression>(count);
+                for (int i = 0; i < formats.Length; i++) {
+                    Format format = formats[i];
+                    switch (format.Type) {
+                        case FormatType.PadByte:
+                            break;
+                        case FormatType.CString:
+                        case FormatType.PascalString:
+                            items.Add(Expression.Call(GetHelper("Unpack", format.Type), data, Add(offset, format.Offset), Expression.Constant(format.Count)));
+                            writes.Add(Expression.Call(GetHelper("Pack", format.Type), codeContext, values, Expression.Constant(writes.Count), data, Add(offset, format.Offset), Expression.Constant(format.Count)));
+                            break;
+                        default:
+                            MethodInfo reader = GetHelper("Unpack", format.Type), writer = GetHelper("Pack", format.Type);
+                            for (int j = 0; j < format.Count; j++) {
+                                Expression index = Add(offset, format.Offset + j * format.NativeSize);
+                                items.Add(Expression.Call(reader, codeContext, data, index, littleEndian));
+                                writes.Add(Expression.Call(writer, codeContext, values, Expression.Constant(writes.Count), data, index, littleEndian));
+                            }
+                            break;
+                    }
+                }
+
+                Unpack = Compile(
+                    context,
+                    Expression.Lambda<Func<CodeContext, byte[], int, object[]>>(Expression.NewArrayInit(typeof(object), items), "unpack " + fmt, new[] { codeContext, data, offset }),
+                    compiled => Unpack = compiled
+                );
+                Pack = Compile(
+                    context,
+                    Expression.Lambda<Action<CodeContext, object[], byte[], int>>(writes.Count == 0 ? (Expression)Expression.Empty() : Expression.Block(writes), "pack " + fmt, new[] { codeContext, values, data, offset }),
+                    compiled => Pack = compiled
+                );
+            }
+
+            private static T Compile<T>(CodeContext/*!*/ context, Expression<T>/*!*/ lambda, Action<T>/*!*/ setCompiled) where T : class {
+                LanguageOptions options = context.LanguageContext.Options;
+                if (options.NoAdaptiveCompilation) {
+                    return lambda.Compile();
+                }
+
+                Delegate res = CompilerHelpers.LightCompile(lambda, options.CompilationThreshold);
+
+                // swap in the compiled delegate so that the hot formats skip the interpreter stub
+                LightLambda lightLambda = res.Target as LightLambda;
+                if (lightLambda != null) {
+                    lightLambda.Compile += (sender, e) => setCompiled((T)(object)e.Compiled);
+                }
+                return (T)(object)res;
+            }
+
+            private static Func<CodeContext, byte[], int, object[]> MakeUnpackLoop(Format[]/*!*/ formats, int count, bool fLittleEndian) {
+                var readers = new Func<CodeContext, byte[], int, bool, object>[formats.Length];
+                for (int i = 0; i < formats.Length; i++) {
+                    if (IsItemType(formats[i].Type)) {
+                        readers[i] = (Func<CodeContext, byte[], int, bool, object>)GetHelper("Unpack", formats[i].Type).CreateDelegate(typeof(Func<CodeContext, byte[], int, bool, object>));
+                    }
+                }
+
+                return (context, data, offset) => {
+                    object[] res = new object[count];
+                    int item = 0;
+                    for (int i = 0; i < formats.Length; i++) {
+                        Format format = formats[i];
+                        switch (format.Type) {
+                            case FormatType.PadByte:
+                                break;
+                            case FormatType.CString:
+                                res[item++] = ModuleOps.StructUnpackCString(data, offset + format.Offset, format.Count);
+                                break;
+                            case FormatType.PascalString:
+                                res[item++] = ModuleOps.StructUnpackPascalString(data, offset + format.Offset, format.Count);
+                                break;
+                            default:
+                                for (int j = 0; j < format.Count; j++) {
+                                    res[item++] = readers[i](context, data, offset + format.Offset + j * format.NativeSize, fLittleEndian);
+                                }
+                                break;
+                        }
+                    }
+                    return res;
+                };
+            }
+
+            private static Action<CodeContext, object[], byte[], int> MakePackLoop(Format[]/*!*/ formats, bool fLittleEndian) {
+                var writers = new Action<CodeContext, object[], int, byte[], int, bool>[formats.Length];
+                for (int i = 0; i < formats.Length; i++) {
+                    if (IsItemType(formats[i].Type)) {
+                        writers[i] = (Action<CodeContext, object[], int, byte[], int, bool>)GetHelper("Pack", formats[i].Type).CreateDelegate(typeof(Action<CodeContext, object[], int, byte[], int, bool>));
+                    }
+                }
+
+                return (context, values, data, offset) => {
+                    int item = 0;
+                    for (int i = 0; i < formats.Length; i++) {
+                        Format format = formats[i];
+                        switch (format.Type) {
+                            case FormatType.PadByte:
+                                break;
+                            case FormatType.CString:
+                                ModuleOps.StructPackCString(context, values, item++, data, offset + format.Offset, format.Count);
+                                break;
+                            case FormatType.PascalString:
+                                ModuleOps.StructPackPascalString(context, values, item++, data, offset + format.Offset, format.Count);
+                                break;
+                            default:
+                                for (int j = 0; j < format.Count; j++) {
+                                    writers[i](context, values, item++, data, offset + format.Offset + j * format.NativeSize, fLittleEndian);
+                                }
+                                break;
+                        }
+                    }
+                };
+            }
+
+            private static bool IsItemType(FormatType type) {
+                return type != FormatType.PadByte && type != FormatType.CString && type != FormatType.PascalString;
+            }
+
+            /// <summary>
+            /// Gets the ModuleOps helper which packs or unpacks the given type, they're named after the format types.
+            /// </summary>
+            private static MethodInfo/*!*/ GetHelper(string operation, FormatType type) {
+                return typeof(ModuleOps).GetMethod("Struct" + operation + type.ToString());
+            }
+
+            private static Expression/*!*/ Add(ParameterExpression/*!*/ offset, int value) {
+                return value == 0 ? (Expression)offset : Expression.Add(offset, Expression.Constant(value));
+            }
+        }
+
         #endregion
 
         #region Cache of compiled struct patterns
 
         private const int MAX_CACHE_SIZE = 1024;
-        private static CacheDict<string, Struct> _cache = new CacheDict<string, Struct>(MAX_CACHE_SIZE);
+
+        // Lookups don't take a lock.  Like CPython the cache is emptied when it's full, which
+        // only costs recompiling the formats which are still in use.
+        private static readonly ConcurrentDictionary<string, Struct> _cache = new ConcurrentDictionary<string, Struct>();
 
         private static Struct GetStructFromCache(CodeContext/*!*/ context, [NotNull] string fmt/*!*/) {
             Struct s;
-            bool gotIt;
-            lock (_cache) {
-                gotIt = _cache.TryGetValue(fmt, out s);
-            }
-            if (!gotIt) {
+            if (!_cache.TryGetValue(fmt, out s)) {
                 s = new Struct(context, fmt);
+                if (_cache.Count >= MAX_CACHE_SIZE) {
+                    _cache.Clear();
+                }
+                _cache[fmt] = s;
             }
             return s;
         }
 
         [Documentation("Clear the internal cache.")]
         public static void _clearcache() {
-            _cache = new CacheDict<string, Struct>(MAX_CACHE_SIZE);
+            _cache.Clear();
         }
 
         [Documentation("int(x[, base]) -> integer\n\nConvert a string or number to an integer, if possible.  A floating point\nargument will be truncated towards zero (this does not include a string\nrepresentation of a floating point number!)  When converting a string, use\nthe optional base.  It is an error to supply a base when converting a\nnon-string.  If base is zero, the proper base is guessed based on the\nstring content.  If the argument is outside the integer range a\nlong object will be returned instead.")]
@@ -679,7 +749,7 @@ namespace IronPython.Modules {
         }
 
         [Documentation("Pack the values v1, v2, ... according to fmt.\nWrite the packed bytes into the writable buffer buf starting at offset.")]
-        public static void pack_into(CodeContext/*!*/ context, [BytesConversion][NotNull]string/*!*/ fmt, [NotNull]ArrayModule.array/*!*/ buffer, int offset, params object[] args) {
+        public static void pack_into(CodeContext/*!*/ context, [BytesConversion][NotNull]string/*!*/ fmt, object buffer, int offset, params object[] args) {
             GetStructFromCache(context, fmt).pack_into(context, buffer, offset, args);
         }
 
@@ -723,168 +793,127 @@ namespace IronPython.Modules {
             return GetStructFromCache(context, fmt).unpack_from(context, buffer, offset);
         }
 
+        [Documentation("iter_unpack(fmt, buffer) -> iterator(tuple)\n\nUnpack the buffer according to fmt, yielding a tuple for each item like a\nrepeated invocation of unpack_from().  Requires that the buffer length be\na multiple of calcsize(fmt).")]
+        public static IEnumerator/*!*/ iter_unpack(CodeContext/*!*/ context, [BytesConversion][NotNull]string fmt/*!*/, object buffer) {
+            return GetStructFromCache(context, fmt).iter_unpack(context, buffer);
+        }
+
         #endregion
 
-        #region Write Helpers
+        #region Read/Write Helpers
 
-        private static void WriteShort(StringBuilder res, bool fLittleEndian, short val) {
+        internal static short ReadInt16(byte[] data, int index, bool fLittleEndian) {
             if (fLittleEndian) {
-                res.Append((char)(val & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
+                return (short)(data[index] | data[index + 1] << 8);
             } else {
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)(val & 0xff));
+                return (short)(data[index] << 8 | data[index + 1]);
             }
         }
 
-        private static void WriteUShort(StringBuilder res, bool fLittleEndian, ushort val) {
+        internal static int ReadInt32(byte[] data, int index, bool fLittleEndian) {
             if (fLittleEndian) {
-                res.Append((char)(val & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
+                return data[index] | data[index + 1] << 8 | data[index + 2] << 16 | data[index + 3] << 24;
             } else {
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)(val & 0xff));
+                return data[index] << 24 | data[index + 1] << 16 | data[index + 2] << 8 | data[index + 3];
             }
         }
 
-        private static void WriteInt(StringBuilder res, bool fLittleEndian, int val) {
+        internal static long ReadInt64(byte[] data, int index, bool fLittleEndian) {
             if (fLittleEndian) {
-                res.Append((char)(val & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 24) & 0xff));
+                return (uint)ReadInt32(data, index, true) | (long)ReadInt32(data, index + 4, true) << 32;
             } else {
-                res.Append((char)((val >> 24) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)(val & 0xff));
+                return (long)ReadInt32(data, index, false) << 32 | (uint)ReadInt32(data, index + 4, false);
             }
         }
 
-        private static void WriteUInt(StringBuilder res, bool fLittleEndian, uint val) {
-            if (fLittleEndian) {
-                res.Append((char)(val & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 24) & 0xff));
-            } else {
-                res.Append((char)((val >> 24) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)(val & 0xff));
-            }
+        internal static float ReadSingle(byte[] data, int index, bool fLittleEndian) {
+            SingleBits bits = new SingleBits();
+            bits.Int32 = ReadInt32(data, index, fLittleEndian);
+            return bits.Single;
         }
 
-        private static void WritePointer(StringBuilder res, bool fLittleEndian, IntPtr val) {
-            if (IntPtr.Size == 4) {
-                WriteInt(res, fLittleEndian, val.ToInt32());
+        internal static void WriteInt16(byte[] data, int index, bool fLittleEndian, short val) {
+            if (fLittleEndian) {
+                data[index] = (byte)val;
+                data[index + 1] = (byte)(val >> 8);
             } else {
-                WriteLong(res, fLittleEndian, val.ToInt64());
+                data[index] = (byte)(val >> 8);
+                data[index + 1] = (byte)val;
             }
         }
 
-        private static void WriteFloat(StringBuilder res, bool fLittleEndian, float val) {
-            byte[] bytes = BitConverter.GetBytes(val);
+        internal static void WriteInt32(byte[] data, int index, bool fLittleEndian, int val) {
             if (fLittleEndian) {
-                res.Append((char)bytes[0]);
-                res.Append((char)bytes[1]);
-                res.Append((char)bytes[2]);
-                res.Append((char)bytes[3]);
+                data[index] = (byte)val;
+                data[index + 1] = (byte)(val >> 8);
+                data[index + 2] = (byte)(val >> 16);
+                data[index + 3] = (byte)(val >> 24);
             } else {
-                res.Append((char)bytes[3]);
-                res.Append((char)bytes[2]);
-                res.Append((char)bytes[1]);
-                res.Append((char)bytes[0]);
+                data[index] = (byte)(val >> 24);
+                data[index + 1] = (byte)(val >> 16);
+                data[index + 2] = (byte)(val >> 8);
+                data[index + 3] = (byte)val;
             }
         }
 
-        private static void WriteLong(StringBuilder res, bool fLittleEndian, long val) {
+        internal static void WriteInt64(byte[] data, int index, bool fLittleEndian, long val) {
             if (fLittleEndian) {
-                res.Append((char)(val & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 24) & 0xff));
-                res.Append((char)((val >> 32) & 0xff));
-                res.Append((char)((val >> 40) & 0xff));
-                res.Append((char)((val >> 48) & 0xff));
-                res.Append((char)((val >> 56) & 0xff));
+                WriteInt32(data, index, true, (int)val);
+                WriteInt32(data, index + 4, true, (int)(val >> 32));
             } else {
-                res.Append((char)((val >> 56) & 0xff));
-                res.Append((char)((val >> 48) & 0xff));
-                res.Append((char)((val >> 40) & 0xff));
-                res.Append((char)((val >> 32) & 0xff));
-                res.Append((char)((val >> 24) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)(val & 0xff));
+                WriteInt32(data, index, false, (int)(val >> 32));
+                WriteInt32(data, index + 4, false, (int)val);
             }
         }
 
-        private static void WriteULong(StringBuilder res, bool fLittleEndian, ulong val) {
-            if (fLittleEndian) {
-                res.Append((char)(val & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 24) & 0xff));
-                res.Append((char)((val >> 32) & 0xff));
-                res.Append((char)((val >> 40) & 0xff));
-                res.Append((char)((val >> 48) & 0xff));
-                res.Append((char)((val >> 56) & 0xff));
-            } else {
-                res.Append((char)((val >> 56) & 0xff));
-                res.Append((char)((val >> 48) & 0xff));
-                res.Append((char)((val >> 40) & 0xff));
-                res.Append((char)((val >> 32) & 0xff));
-                res.Append((char)((val >> 24) & 0xff));
-                res.Append((char)((val >> 16) & 0xff));
-                res.Append((char)((val >> 8) & 0xff));
-                res.Append((char)(val & 0xff));
-            }
+        internal static void WriteSingle(byte[] data, int index, bool fLittleEndian, float val) {
+            SingleBits bits = new SingleBits();
+            bits.Single = val;
+            WriteInt32(data, index, fLittleEndian, bits.Int32);
         }
 
-        private static void WriteDouble(StringBuilder res, bool fLittleEndian, double val) {
-            byte[] bytes = BitConverter.GetBytes(val);
-            if (fLittleEndian) {
-                res.Append((char)bytes[0]);
-                res.Append((char)bytes[1]);
-                res.Append((char)bytes[2]);
-                res.Append((char)bytes[3]);
-                res.Append((char)bytes[4]);
-                res.Append((char)bytes[5]);
-                res.Append((char)bytes[6]);
-                res.Append((char)bytes[7]);
-            } else {
-                res.Append((char)bytes[7]);
-                res.Append((char)bytes[6]);
-                res.Append((char)bytes[5]);
-                res.Append((char)bytes[4]);
-                res.Append((char)bytes[3]);
-                res.Append((char)bytes[2]);
-                res.Append((char)bytes[1]);
-                res.Append((char)bytes[0]);
+        internal static void WriteString(CodeContext/*!*/ context, byte[] data, int index, string val, int count) {
+            for (int i = 0; i < val.Length && i < count; i++) {
+                if (val[i] > 0xff) {
+                    throw Error(context, "argument for 's' must be a string");
+                }
+                data[index + i] = (byte)val[i];
             }
         }
 
-        private static void WriteString(StringBuilder res, int len, string val) {
-            for (int i = 0; i < val.Length && i < len; i++) {
-                res.Append(val[i]);
-            }
-            for (int i = val.Length; i < len; i++) {
-                res.Append('\0');
+        /// <summary>
+        /// Converts the bytes to a string with a character for each byte.
+        /// </summary>
+        internal static string/*!*/ MakeString(byte[] data, int index, int count) {
+            char[] chars = new char[count];
+            for (int i = 0; i < count; i++) {
+                chars[i] = (char)data[index + i];
             }
+            return new string(chars);
         }
 
-        private static void WritePascalString(StringBuilder res, int len, string val) {
-            int lenByte = Math.Min(255, Math.Min(val.Length, len));
-            res.Append((char)lenByte);
-
-            for (int i = 0; i < val.Length && i < len; i++) {
-                res.Append(val[i]);
-            }
-            for (int i = val.Length; i < len; i++) {
-                res.Append('\0');
+        /// <summary>
+        /// Gets the bytes of the given part of a string, the string holds a character for each byte.
+        /// </summary>
+        private static byte[]/*!*/ GetBytes(string data, int index, int count) {
+            byte[] bytes = new byte[count];
+            for (int i = 0; i < count; i++) {
+                bytes[i] = (byte)data[index + i];
             }
+            return bytes;
         }
+
+        /// <summary>
+        /// Reinterprets the bits of a float, BitConverter only has conversions between doubles and longs.
+        /// </summary>
+        [StructLayout(LayoutKind.Explicit)]
+        private struct SingleBits {
+            [FieldOffset(0)]
+            public float Single;
+            [FieldOffset(0)]
+            public int Int32;
+        }
+
         #endregion
 
         #region Data getter helpers
@@ -1052,25 +1081,6 @@ namespace IronPython.Modules {
 
         #region Data creater helpers
 
-        internal static bool CreateBoolValue(CodeContext/*!*/ context, ref int index, string data) {
-            return (int)ReadData(context, ref index, data) != 0;
-        }
-
-        internal static char CreateCharValue(CodeContext/*!*/ context, ref int index, string data) {
-            return ReadData(context, ref index, data);
-        }
-
-        internal static short CreateShortValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
-            byte b1 = (byte)ReadData(context, ref index, data);
-            byte b2 = (byte)ReadData(context, ref index, data);
-
-            if (fLittleEndian) {
-                return (short)((b2 << 8) | b1);
-            } else {
-                return (short)((b1 << 8) | b2);
-            }
-        }
-
         internal static ushort CreateUShortValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
             byte b1 = (byte)ReadData(context, ref index, data);
             byte b2 = (byte)ReadData(context, ref index, data);
@@ -1082,89 +1092,6 @@ namespace IronPython.Modules {
             }
         }
 
-        internal static float CreateFloatValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
-            byte[] bytes = new byte[4];
-            if (fLittleEndian) {
-                bytes[0] = (byte)ReadData(context, ref index, data);
-                bytes[1] = (byte)ReadData(context, ref index, data);
-                bytes[2] = (byte)ReadData(context, ref index, data);
-                bytes[3] = (byte)ReadData(context, ref index, data);
-            } else {
-                bytes[3] = (byte)ReadData(context, ref index, data);
-                bytes[2] = (byte)ReadData(context, ref index, data);
-                bytes[1] = (byte)ReadData(context, ref index, data);
-                bytes[0] = (byte)ReadData(context, ref index, data);
-            }
-            float res = BitConverter.ToSingle(bytes, 0);
-
-            if (context.LanguageContext.FloatFormat == FloatFormat.Unknown) {
-                if (Single.IsNaN(res) || Single.IsInfinity(res)) {
-                    throw PythonOps.ValueError("can't unpack IEEE 754 special value on non-IEEE platform");
-                }
-            }
-
-            return res;
-        }
-
-        internal static int CreateIntValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
-            byte b1 = (byte)ReadData(context, ref index, data);
-            byte b2 = (byte)ReadData(context, ref index, data);
-            byte b3 = (byte)ReadData(context, ref index, data);
-            byte b4 = (byte)ReadData(context, ref index, data);
-
-            if (fLittleEndian)
-                return (int)((b4 << 24) | (b3 << 16) | (b2 << 8) | b1);
-            else
-                return (int)((b1 << 24) | (b2 << 16) | (b3 << 8) | b4);
-        }
-
-        internal static uint CreateUIntValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
-            byte b1 = (byte)ReadData(context, ref index, data);
-            byte b2 = (byte)ReadData(context, ref index, data);
-            byte b3 = (byte)ReadData(context, ref index, data);
-            byte b4 = (byte)ReadData(context, ref index, data);
-
-            if (fLittleEndian)
-                return (uint)((b4 << 24) | (b3 << 16) | (b2 << 8) | b1);
-            else
-                return (uint)((b1 << 24) | (b2 << 16) | (b3 << 8) | b4);
-        }
-
-        internal static long CreateLongValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
-            long b1 = (byte)ReadData(context, ref index, data);
-            long b2 = (byte)ReadData(context, ref index, data);
-            long b3 = (byte)ReadData(context, ref index, data);
-            long b4 = (byte)ReadData(context, ref index, data);
-            long b5 = (byte)ReadData(context, ref index, data);
-            long b6 = (byte)ReadData(context, ref index, data);
-            long b7 = (byte)ReadData(context, ref index, data);
-            long b8 = (byte)ReadData(context, ref index, data);
-
-            if (fLittleEndian)
-                return (long)((b8 << 56) | (b7 << 48) | (b6 << 40) | (b5 << 32) |
-                                (b4 << 24) | (b3 << 16) | (b2 << 8) | b1);
-            else
-                return (long)((b1 << 56) | (b2 << 48) | (b3 << 40) | (b4 << 32) |
-                                (b5 << 24) | (b6 << 16) | (b7 << 8) | b8);
-        }
-
-        internal static ulong CreateULongValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
-            ulong b1 = (byte)ReadData(context, ref index, data);
-            ulong b2 = (byte)ReadData(context, ref index, data);
-            ulong b3 = (byte)ReadData(context, ref index, data);
-            ulong b4 = (byte)ReadData(context, ref index, data);
-            ulong b5 = (byte)ReadData(context, ref index, data);
-            ulong b6 = (byte)ReadData(context, ref index, data);
-            ulong b7 = (byte)ReadData(context, ref index, data);
-            ulong b8 = (byte)ReadData(context, ref index, data);
-            if (fLittleEndian)
-                return (ulong)((b8 << 56) | (b7 << 48) | (b6 << 40) | (b5 << 32) |
-                                (b4 << 24) | (b3 << 16) | (b2 << 8) | b1);
-            else
-                return (ulong)((b1 << 56) | (b2 << 48) | (b3 << 40) | (b4 << 32) |
-                                (b5 << 24) | (b6 << 16) | (b7 << 8) | b8);
-        }
-
         internal static double CreateDoubleValue(CodeContext/*!*/ context, ref int index, bool fLittleEndian, string data) {
             byte[] bytes = new byte[8];
             if (fLittleEndian) {
@@ -1197,28 +1124,6 @@ namespace IronPython.Modules {
             return res;
         }
 
-        internal static string CreateString(CodeContext/*!*/ context, ref int index, int count, string data) {
-            StringBuilder res = new StringBuilder();
-            for (int i = 0; i < count; i++) {
-                res.Append(ReadData(context, ref index, data));
-            }
-            return res.ToString();
-        }
-
-
-        internal static string CreatePascalString(CodeContext/*!*/ context, ref int index, int count, string data) {
-            int realLen = (int)ReadData(context, ref index, data);
-            StringBuilder res = new StringBuilder();
-            for (int i = 0; i < realLen; i++) {
-                res.Append(ReadData(context, ref index, data));
-            }
-            for (int i = realLen; i < count; i++) {
-                // throw away null bytes
-                ReadData(context, ref index, data);
-            }
-            return res.ToString();
-        }
-
         private static char ReadData(CodeContext/*!*/ context, ref int index, string data) {
             if (index >= data.Length) throw Error(context, "not enough data while reading");
 
@@ -1232,10 +1137,187 @@ namespace IronPython.Modules {
             return length + (size - 1) & ~(size - 1);
         }
 
-        private static Exception Error(CodeContext/*!*/ context, string msg) {
+        internal static Exception Error(CodeContext/*!*/ context, string msg) {
             return PythonExceptions.CreateThrowable((PythonType)context.LanguageContext.GetModuleState("structerror"), msg);
         }
 
         #endregion
     }
+
+    public static partial class ModuleOps {
+        #region struct
+
+        // The helpers for the code compiled by _struct, which reads and writes each item of a format
+        // with the helper named after its format type.  Items are read from and written to data at index.
+
+        public static object StructUnpackBool(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return ScriptingRuntimeHelpers.BooleanToObject(data[index] != 0);
+        }
+
+        public static object StructUnpackChar(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return ScriptingRuntimeHelpers.CharToString((char)data[index]);
+        }
+
+        public static object StructUnpackSignedChar(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return ScriptingRuntimeHelpers.Int32ToObject((sbyte)data[index]);
+        }
+
+        public static object StructUnpackUnsignedChar(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return ScriptingRuntimeHelpers.Int32ToObject(data[index]);
+        }
+
+        public static object StructUnpackShort(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return ScriptingRuntimeHelpers.Int32ToObject(PythonStruct.ReadInt16(data, index, fLittleEndian));
+        }
+
+        public static object StructUnpackUnsignedShort(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return ScriptingRuntimeHelpers.Int32ToObject((ushort)PythonStruct.ReadInt16(data, index, fLittleEndian));
+        }
+
+        public static object StructUnpackInt(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return ScriptingRuntimeHelpers.Int32ToObject(PythonStruct.ReadInt32(data, index, fLittleEndian));
+        }
+
+        public static object StructUnpackUnsignedInt(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return Int64ToObject((uint)PythonStruct.ReadInt32(data, index, fLittleEndian));
+        }
+
+        public static object StructUnpackUnsignedLong(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return Int64ToObject((uint)PythonStruct.ReadInt32(data, index, fLittleEndian));
+        }
+
+        public static object StructUnpackLongLong(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            return Int64ToObject(PythonStruct.ReadInt64(data, index, fLittleEndian));
+        }
+
+        public static object StructUnpackUnsignedLongLong(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            ulong val = (ulong)PythonStruct.ReadInt64(data, index, fLittleEndian);
+            if (val <= Int32.MaxValue) {
+                return ScriptingRuntimeHelpers.Int32ToObject((int)val);
+            }
+            return (BigInteger)val;
+        }
+
+        public static object StructUnpackPointer(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            if (IntPtr.Size == 4) {
+                return ScriptingRuntimeHelpers.Int32ToObject(PythonStruct.ReadInt32(data, index, fLittleEndian));
+            }
+            return Int64ToObject(PythonStruct.ReadInt64(data, index, fLittleEndian));
+        }
+
+        public static object StructUnpackFloat(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            float res = PythonStruct.ReadSingle(data, index, fLittleEndian);
+            if (context.LanguageContext.FloatFormat == FloatFormat.Unknown && (Single.IsNaN(res) || Single.IsInfinity(res))) {
+                throw PythonOps.ValueError("can't unpack IEEE 754 special value on non-IEEE platform");
+            }
+            return (double)res;
+        }
+
+        public static object StructUnpackDouble(CodeContext/*!*/ context, byte[] data, int index, bool fLittleEndian) {
+            double res = BitConverter.Int64BitsToDouble(PythonStruct.ReadInt64(data, index, fLittleEndian));
+            if (context.LanguageContext.DoubleFormat == FloatFormat.Unknown && (Double.IsNaN(res) || Double.IsInfinity(res))) {
+                throw PythonOps.ValueError("can't unpack IEEE 754 special value on non-IEEE platform");
+            }
+            return res;
+        }
+
+        public static object StructUnpackCString(byte[] data, int index, int count) {
+            return PythonStruct.MakeString(data, index, count);
+        }
+
+        public static object StructUnpackPascalString(byte[] data, int index, int count) {
+            if (count == 0) {
+                return String.Empty;
+            }
+            return PythonStruct.MakeString(data, index + 1, Math.Min(data[index], count - 1));
+        }
+
+        public static void StructPackBool(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            data[index] = PythonStruct.GetBoolValue(context, valueIndex, values) ? (byte)1 : (byte)0;
+        }
+
+        public static void StructPackChar(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            char val = PythonStruct.GetCharValue(context, valueIndex, values);
+            if (val > 0xff) {
+                throw PythonStruct.Error(context, "char format requires string of length 1");
+            }
+            data[index] = (byte)val;
+        }
+
+        public static void StructPackSignedChar(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            data[index] = (byte)PythonStruct.GetSByteValue(context, valueIndex, values);
+        }
+
+        public static void StructPackUnsignedChar(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            data[index] = PythonStruct.GetByteValue(context, valueIndex, values);
+        }
+
+        public static void StructPackShort(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt16(data, index, fLittleEndian, PythonStruct.GetShortValue(context, valueIndex, values));
+        }
+
+        public static void StructPackUnsignedShort(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt16(data, index, fLittleEndian, (short)PythonStruct.GetUShortValue(context, valueIndex, values));
+        }
+
+        public static void StructPackInt(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt32(data, index, fLittleEndian, PythonStruct.GetIntValue(context, valueIndex, values));
+        }
+
+        public static void StructPackUnsignedInt(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt32(data, index, fLittleEndian, (int)PythonStruct.GetULongValue(context, valueIndex, values, "unsigned int"));
+        }
+
+        public static void StructPackUnsignedLong(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt32(data, index, fLittleEndian, (int)PythonStruct.GetULongValue(context, valueIndex, values, "unsigned long"));
+        }
+
+        public static void StructPackLongLong(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt64(data, index, fLittleEndian, PythonStruct.GetLongValue(context, valueIndex, values));
+        }
+
+        public static void StructPackUnsignedLongLong(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt64(data, index, fLittleEndian, (long)PythonStruct.GetULongLongValue(context, valueIndex, values));
+        }
+
+        public static void StructPackPointer(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            IntPtr val = PythonStruct.GetPointer(context, valueIndex, values);
+            if (IntPtr.Size == 4) {
+                PythonStruct.WriteInt32(data, index, fLittleEndian, val.ToInt32());
+            } else {
+                PythonStruct.WriteInt64(data, index, fLittleEndian, val.ToInt64());
+            }
+        }
+
+        public static void StructPackFloat(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteSingle(data, index, fLittleEndian, (float)PythonStruct.GetDoubleValue(context, valueIndex, values));
+        }
+
+        public static void StructPackDouble(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, bool fLittleEndian) {
+            PythonStruct.WriteInt64(data, index, fLittleEndian, BitConverter.DoubleToInt64Bits(PythonStruct.GetDoubleValue(context, valueIndex, values)));
+        }
+
+        public static void StructPackCString(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, int count) {
+            PythonStruct.WriteString(context, data, index, PythonStruct.GetStringValue(context, valueIndex, values), count);
+        }
+
+        public static void StructPackPascalString(CodeContext/*!*/ context, object[] values, int valueIndex, byte[] data, int index, int count) {
+            if (count == 0) {
+                return;
+            }
+
+            string val = PythonStruct.GetStringValue(context, valueIndex, values);
+            PythonStruct.WriteString(context, data, index + 1, val, count - 1);
+            data[index] = (byte)Math.Min(255, Math.Min(val.Length, count - 1));
+        }
+
+        private static object Int64ToObject(long val) {
+            if (val >= Int32.MinValue && val <= Int32.MaxValue) {
+                return ScriptingRuntimeHelpers.Int32ToObject((int)val);
+            }
+            return (BigInteger)val;
+        }
+
+        #endregion
+    }
 }
@@ -39,7 +39,7 @@ namespace IronPython.Modules {
         public static readonly PythonType/*!*/ ArrayType = DynamicHelpers.GetPythonTypeFromType(typeof(array));
 
         [PythonType]
-        public class array : IPythonArray, IEnumerable, IWeakReferenceable, ICollection, ICodeFormattable, IList<object>, IStructuralEquatable
+        public class array : IPythonArray, IEnumerable, IWeakReferenceable, ICollection, ICodeFormattable, IList<object>, IStructuralEquatable, IBufferProtocol, IDirectBuffer
 #if CLR2
             , IValueEquality
 #endif
@@ -172,22 +172,13 @@ namespace IronPython.Modules {
             }
 
             public void byteswap() {
-                Stream s = ToStream();
-                byte[] bytes = new byte[s.Length];
-                s.Read(bytes, 0, bytes.Length);
+                byte[] bytes = ToByteArray();
 
-                byte[] tmp = new byte[itemsize];
-                for (int i = 0; i < bytes.Length; i += itemsize) {
-                    for (int j = 0; j < itemsize; j++) {
-                        tmp[j] = bytes[i + j];
-                    }
-                    for (int j = 0; j < itemsize; j++) {
-                        bytes[i + j] = tmp[itemsize - (j + 1)];
-                    }
+                int size = itemsize;
+                for (int i = 0; i < bytes.Length; i += size) {
+                    Array.Reverse(bytes, i, size);
                 }
-                _data.Clear();
-                MemoryStream ms = new MemoryStream(bytes);
-                FromStream(ms);
+                SetBytes(0, bytes, 0, bytes.Length);
             }
 
             public int count(object x) {
@@ -202,10 +193,7 @@ namespace IronPython.Modules {
                     if (typecode != pa.typecode) {
                         throw PythonOps.TypeError("cannot extend with different typecode");
                     }
-                    int l = pa._data.Length;
-                    for (int i = 0; i < l; i++) {
-                        _data.Append(pa._data.GetData(i));
-                    }
+                    _data.AppendData(pa._data);
                     return;
                 }
 
@@ -259,8 +247,8 @@ namespace IronPython.Modules {
 
             public void fromstring([NotNull]Bytes b) {
                 if ((b.Count % itemsize) != 0) throw PythonOps.ValueError("string length not a multiple of itemsize");
-                
-                FromStream(new MemoryStream(b._bytes, false));
+
+                AppendBytes(b._bytes, 0, b._bytes.Length);
             }
 
             public void fromstring([NotNull]string s) {
@@ -269,15 +257,15 @@ namespace IronPython.Modules {
                 for (int i = 0; i < bytes.Length; i++) {
                     bytes[i] = checked((byte)s[i]);
                 }
-                MemoryStream ms = new MemoryStream(bytes);
 
-                FromStream(ms);
+                AppendBytes(bytes, 0, bytes.Length);
             }
 
             public void fromstring([NotNull]PythonBuffer buf) {
                 if ((buf.Size % itemsize) != 0) throw PythonOps.ValueError("string length not a multiple of itemsize");
 
-                FromStream(new MemoryStream(buf.byteCache, false));
+                byte[] bytes = buf.byteCache;
+                AppendBytes(bytes, 0, bytes.Length);
             }
 
             public void fromunicode(CodeContext/*!*/ context, string s) {
@@ -401,23 +389,7 @@ namespace IronPython.Modules {
             }
 
             internal byte[] RawGetItem(int index) {
-                MemoryStream ms = new MemoryStream();
-                BinaryWriter bw = new BinaryWriter(ms);
-                switch (_typeCode) {
-                    case 'c': bw.Write((byte)(char)_data.GetData(index)); break;
-                    case 'b': bw.Write((sbyte)_data.GetData(index)); break;
-                    case 'B': bw.Write((byte)_data.GetData(index)); break;
-                    case 'u': bw.Write((char)_data.GetData(index)); break;
-                    case 'h': bw.Write((short)_data.GetData(index)); break;
-                    case 'H': bw.Write((ushort)_data.GetData(index)); break;
-                    case 'l':
-                    case 'i': bw.Write((int)_data.GetData(index)); break;
-                    case 'L':
-                    case 'I': bw.Write((uint)_data.GetData(index)); break;
-                    case 'f': bw.Write((float)_data.GetData(index)); break;
-                    case 'd': bw.Write((double)_data.GetData(index)); break;
-                }
-                return ms.ToArray();
+                return ToByteArray(index, 1);
             }
 
             public void __delitem__(int index) {
@@ -620,15 +592,7 @@ namespace IronPython.Modules {
             }
 
             public string tostring() {
-                Stream s = ToStream();
-                byte[] bytes = new byte[s.Length];
-                s.Read(bytes, 0, (int)s.Length);
-
-                StringBuilder res = new StringBuilder();
-                for (int i = 0; i < bytes.Length; i++) {
-                    res.Append((char)bytes[i]);
-                }
-                return res.ToString();
+                return ToByteArray().MakeString();
             }
 
             public string tounicode(CodeContext/*!*/ context) {
@@ -662,6 +626,10 @@ namespace IronPython.Modules {
                 public abstract void Clear();
                 public abstract IntPtr GetAddress();
                 public abstract ArrayData Multiply(int count);
+                public abstract void AppendData(ArrayData other);
+                public abstract void AppendBytes(byte[] bytes, int offset, int count);
+                public abstract void GetBytes(int index, int count, byte[] bytes, int offset);
+                public abstract void SetBytes(int index, byte[] bytes, int offset, int count);
             }
 
             internal MemoryStream ToStream() {
@@ -672,27 +640,67 @@ namespace IronPython.Modules {
             }
 
             internal void ToStream(Stream ms) {
-                BinaryWriter bw = new BinaryWriter(ms, Encoding.Unicode);
-                for (int i = 0; i < _data.Length; i++) {
-                    switch (_typeCode) {
-                        case 'c': bw.Write((byte)(char)_data.GetData(i)); break;
-                        case 'b': bw.Write((sbyte)_data.GetData(i)); break;
-                        case 'B': bw.Write((byte)_data.GetData(i)); break;
-                        case 'u': bw.Write((char)_data.GetData(i)); break;
-                        case 'h': bw.Write((short)_data.GetData(i)); break;
-                        case 'H': bw.Write((ushort)_data.GetData(i)); break;
-                        case 'l':
-                        case 'i': bw.Write((int)_data.GetData(i)); break;
-                        case 'L':
-                        case 'I': bw.Write((uint)_data.GetData(i)); break;
-                        case 'f': bw.Write((float)_data.GetData(i)); break;
-                        case 'd': bw.Write((double)_data.GetData(i)); break;
+                byte[] bytes = ToByteArray();
+                ms.Write(bytes, 0, bytes.Length);
+            }
+
+            internal byte[] ToByteArray() {
+                return ToByteArray(0, _data.Length);
+            }
+
+            /// <summary>
+            /// Returns the machine representation of count items starting at index.
+            /// </summary>
+            private byte[] ToByteArray(int index, int count) {
+                byte[] res = new byte[count * itemsize];
+                if (_typeCode == 'c') {
+                    char[] chars = ((ArrayData<char>)_data).Data;
+                    for (int i = 0; i < res.Length; i++) {
+                        res[i] = (byte)chars[index + i];
                     }
+                } else {
+                    _data.GetBytes(index, count, res, 0);
                 }
+                return res;
             }
 
-            internal byte[] ToByteArray() {
-                return ToStream().ToArray();
+            /// <summary>
+            /// Appends the items stored in count bytes of their machine representation.  Any
+            /// trailing bytes which don't form a whole item are ignored.
+            /// </summary>
+            private void AppendBytes(byte[] bytes, int offset, int count) {
+                count -= count % itemsize;
+                if (_typeCode == 'c') {
+                    for (int i = 0; i < count; i++) {
+                        _data.Append((char)bytes[offset + i]);
+                    }
+                } else {
+                    _data.AppendBytes(bytes, offset, count);
+                }
+            }
+
+            /// <summary>
+            /// Overwrites the items starting at index from count bytes of their machine
+            /// representation.  A trailing partial item only replaces the leading bytes of
+            /// the existing item.
+            /// </summary>
+            internal void SetBytes(int index, byte[] bytes, int offset, int count) {
+                int size = itemsize;
+                int whole = count - count % size;
+                if (_typeCode == 'c') {
+                    for (int i = 0; i < whole; i++) {
+                        _data.SetData(index + i, (char)bytes[offset + i]);
+                    }
+                } else {
+                    _data.SetBytes(index, bytes, offset, whole);
+                }
+
+                if (whole != count) {
+                    int last = index + whole / size;
+                    byte[] item = ToByteArray(last, 1);
+                    Array.Copy(bytes, offset + whole, item, 0, count - whole);
+                    _data.SetBytes(last, item, 0, size);
+                }
             }
 
             internal void Clear() {
@@ -700,146 +708,42 @@ namespace IronPython.Modules {
             }
 
             internal void FromStream(Stream ms) {
-                BinaryReader br = new BinaryReader(ms);
-
-                for (int i = 0; i < ms.Length / itemsize; i++) {
-                    object value;
-                    switch (_typeCode) {
-                        case 'c': value = (char)br.ReadByte(); break;
-                        case 'b': value = (sbyte)br.ReadByte(); break;
-                        case 'B': value = br.ReadByte(); break;
-                        case 'u': value = ReadBinaryChar(br); break;
-                        case 'h': value = br.ReadInt16(); break;
-                        case 'H': value = br.ReadUInt16(); break;
-                        case 'i': value = br.ReadInt32(); break;
-                        case 'I': value = br.ReadUInt32(); break;
-                        case 'l': value = br.ReadInt32(); break;
-                        case 'L': value = br.ReadUInt32(); break;
-                        case 'f': value = br.ReadSingle(); break;
-                        case 'd': value = br.ReadDouble(); break;
-                        default: throw new InvalidOperationException(); // should never happen
-                    }
-                    _data.Append(value);
-                }
+                byte[] bytes = ReadBytes(ms, (int)(ms.Length - ms.Position));
+                AppendBytes(bytes, 0, bytes.Length);
             }
 
             // a version of FromStream that overwrites starting at 'index'
             internal void FromStream(Stream ms, int index) {
-                BinaryReader br = new BinaryReader(ms);
-
-                for (int i = index; i < ms.Length / itemsize + index; i++) {
-                    object value;
-                    switch (_typeCode) {
-                        case 'c': value = (char)br.ReadByte(); break;
-                        case 'b': value = (sbyte)br.ReadByte(); break;
-                        case 'B': value = br.ReadByte(); break;
-                        case 'u': value = ReadBinaryChar(br); break;
-                        case 'h': value = br.ReadInt16(); break;
-                        case 'H': value = br.ReadUInt16(); break;
-                        case 'i': value = br.ReadInt32(); break;
-                        case 'I': value = br.ReadUInt32(); break;
-                        case 'l': value = br.ReadInt32(); break;
-                        case 'L': value = br.ReadUInt32(); break;
-                        case 'f': value = br.ReadSingle(); break;
-                        case 'd': value = br.ReadDouble(); break;
-                        default: throw new InvalidOperationException(); // should never happen
-                    }
-                    _data.SetData(i, value);
-                }
+                byte[] bytes = ReadBytes(ms, (int)(ms.Length - ms.Position));
+                SetBytes(index, bytes, 0, bytes.Length - bytes.Length % itemsize);
             }
 
             // a version of FromStream that overwrites up to 'nbytes' bytes, starting at 'index' 
             // Returns the number of bytes written.
             internal long FromStream(Stream ms, int index, int nbytes) {
-                BinaryReader br = new BinaryReader(ms);
-
                 if (nbytes <= 0) {
                     return 0;
                 }
 
-                int len = Math.Min((int)(ms.Length - ms.Position), nbytes);
-                for (int i = index; i < len / itemsize + index; i++) {
-                    object value;
-                    switch (_typeCode) {
-                        case 'c': value = (char)br.ReadByte(); break;
-                        case 'b': value = (sbyte)br.ReadByte(); break;
-                        case 'B': value = br.ReadByte(); break;
-                        case 'u':
-                            value = ReadBinaryChar(br);
-                            break;
-                        case 'h': value = br.ReadInt16(); break;
-                        case 'H': value = br.ReadUInt16(); break;
-                        case 'i': value = br.ReadInt32(); break;
-                        case 'I': value = br.ReadUInt32(); break;
-                        case 'l': value = br.ReadInt32(); break;
-                        case 'L': value = br.ReadUInt32(); break;
-                        case 'f': value = br.ReadSingle(); break;
-                        case 'd': value = br.ReadDouble(); break;
-                        default: throw new InvalidOperationException(); // should never happen
-                    }
-                    _data.SetData(i, value);
-                }
-
-                if (len % itemsize > 0) {
-                    // we have some extra bytes that we need to do a partial read on.                  
-                    byte[] curBytes = ToBytes(len / itemsize + index);
-                    for (int i = 0; i < len % itemsize; i++) {
-                        curBytes[i] = br.ReadByte();
-                    }
-
-                    _data.SetData(len / itemsize + index, FromBytes(curBytes));
-                }
-
-                return len;
-            }
-
-            // br.ReadChar() doesn't read 16-bit chars, it reads 8-bit chars.
-            private static object ReadBinaryChar(BinaryReader br) {
-                object value;
-                byte byteVal = br.ReadByte();
-                value = (char)((br.ReadByte() << 8) | byteVal);
-                return value;
+                byte[] bytes = ReadBytes(ms, Math.Min((int)(ms.Length - ms.Position), nbytes));
+                SetBytes(index, bytes, 0, bytes.Length);
+                return bytes.Length;
             }
 
-            private byte[] ToBytes(int index) {
-                switch(_typeCode) {
-                    case 'c': return new[] { (byte)(char)_data.GetData(index) };
-                    case 'b': return new[] { (byte)(sbyte)_data.GetData(index) };
-                    case 'B': return new[] { (byte)_data.GetData(index) };
-                    case 'u': return BitConverter.GetBytes((char)_data.GetData(index));
-                    case 'h': return BitConverter.GetBytes((short)_data.GetData(index));
-                    case 'H': return BitConverter.GetBytes((ushort)_data.GetData(index)); 
-                    case 'l':
-                    case 'i': return BitConverter.GetBytes((int)_data.GetData(index)); 
-                    case 'L':
-                    case 'I': return BitConverter.GetBytes((uint)_data.GetData(index));
-                    case 'f': return BitConverter.GetBytes((float)_data.GetData(index)); 
-                    case 'd': return BitConverter.GetBytes((double)_data.GetData(index)); 
-                    default:
-                        throw PythonOps.ValueError("Bad type code (expected one of 'c', 'b', 'B', 'u', 'H', 'h', 'i', 'I', 'l', 'L', 'f', 'd')");
+            private static byte[] ReadBytes(Stream ms, int count) {
+                byte[] bytes = new byte[count];
+                int read = 0, n;
+                while (read < count && (n = ms.Read(bytes, read, count - read)) > 0) {
+                    read += n;
                 }
-            }
-
-            private object FromBytes(byte[] bytes) {
-                switch (_typeCode) {
-                    case 'c': return (char)bytes[0];
-                    case 'b': return (sbyte)bytes[0];
-                    case 'B': return bytes[0];
-                    case 'u': return BitConverter.ToChar(bytes, 0);
-                    case 'h': return BitConverter.ToInt16(bytes, 0);
-                    case 'H': return BitConverter.ToUInt16(bytes, 0);
-                    case 'l':
-                    case 'i': return BitConverter.ToInt32(bytes, 0);
-                    case 'L':
-                    case 'I': return BitConverter.ToUInt32(bytes, 0);
-                    case 'f': return BitConverter.ToSingle(bytes, 0);
-                    case 'd': return BitConverter.ToDouble(bytes, 0);
-                    default:
-                        throw PythonOps.ValueError("Bad type code (expected one of 'c', 'b', 'B', 'u', 'H', 'h', 'i', 'I', 'l', 'L', 'f', 'd')");
+                if (read != count) {
+                    Array.Resize(ref bytes, read);
                 }
+                return bytes;
             }
 
             private class ArrayData<T> : ArrayData {
+                private static readonly int _itemSize = Buffer.ByteLength(new T[1]);
                 private T[] _data;
                 private int _count;
                 private GCHandle? _dataHandle;
@@ -901,7 +805,7 @@ namespace IronPython.Modules {
 
                 public void EnsureSize(int size) {
                     if (_data.Length < size) {
-                        Array.Resize(ref _data, _data.Length * 2);
+                        Array.Resize(ref _data, Math.Max(size, _data.Length * 2));
                         if (_dataHandle != null) {
                             _dataHandle.Value.Free();
                             _dataHandle = null;
@@ -1002,6 +906,31 @@ namespace IronPython.Modules {
                     return _dataHandle.Value.AddrOfPinnedObject();
                 }
 
+                public override void AppendData(ArrayData other) {
+                    ArrayData<T> data = (ArrayData<T>)other;
+                    int count = data._count;
+                    EnsureSize(_count + count);
+                    Array.Copy(data._data, 0, _data, _count, count);
+                    _count += count;
+                }
+
+                // The bulk conversions copy the items' machine representation with
+                // Buffer.BlockCopy, T is always a primitive type.
+                public override void AppendBytes(byte[] bytes, int offset, int count) {
+                    int items = count / _itemSize;
+                    EnsureSize(_count + items);
+                    Buffer.BlockCopy(bytes, offset, _data, _count * _itemSize, items * _itemSize);
+                    _count += items;
+                }
+
+                public override void GetBytes(int index, int count, byte[] bytes, int offset) {
+                    Buffer.BlockCopy(_data, index * _itemSize, bytes, offset, count * _itemSize);
+                }
+
+                public override void SetBytes(int index, byte[] bytes, int offset, int count) {
+                    Buffer.BlockCopy(bytes, offset, _data, index * _itemSize, count - count % _itemSize);
+                }
+
                 public override ArrayData Multiply(int count) {
                     var res = new ArrayData<T>(count * _count);
                     if (count != 0) {
@@ -1315,6 +1244,107 @@ namespace IronPython.Modules {
             }
 
             #endregion
+
+            #region IBufferProtocol Members
+
+            Bytes IBufferProtocol.GetItem(int index) {
+                return Bytes.Make(ToByteArray(PythonOps.FixIndex(index, _data.Length), 1));
+            }
+
+            void IBufferProtocol.SetItem(int index, object value) {
+                index = PythonOps.FixIndex(index, _data.Length);
+
+                // accept the item's machine representation as well as the item itself
+                ArraySegment<byte> bytes;
+                if (!(value is array) && BufferOps.TryGetReadableSegment(value, out bytes) && bytes.Count == itemsize) {
+                    SetBytes(index, bytes.Array, bytes.Offset, bytes.Count);
+                } else {
+                    this[index] = value;
+                }
+            }
+
+            void IBufferProtocol.SetSlice(Slice index, object value) {
+                int start, stop, step;
+                index.indices(_data.Length, out start, out stop, out step);
+
+                ArraySegment<byte> bytes;
+                if (step == 1 && !(value is array) && BufferOps.TryGetReadableSegment(value, out bytes) && bytes.Count == (stop - start) * itemsize) {
+                    SetBytes(start, bytes.Array, bytes.Offset, bytes.Count);
+                } else {
+                    this[index] = value;
+                }
+            }
+
+            int IBufferProtocol.ItemCount {
+                get {
+                    return _data.Length;
+                }
+            }
+
+            string IBufferProtocol.Format {
+                get { return typecode; }
+            }
+
+            BigInteger IBufferProtocol.ItemSize {
+                get { return itemsize; }
+            }
+
+            BigInteger IBufferProtocol.NumberDimensions {
+                get { return 1; }
+            }
+
+            bool IBufferProtocol.ReadOnly {
+                get { return false; }
+            }
+
+            IList<BigInteger> IBufferProtocol.GetShape(int start, int? end) {
+                if (end != null) {
+                    return new[] { (BigInteger)end - start };
+                }
+                return new[] { (BigInteger)_data.Length - start };
+            }
+
+            PythonTuple IBufferProtocol.Strides {
+                get { return PythonTuple.MakeTuple(itemsize); }
+            }
+
+            object IBufferProtocol.SubOffsets {
+                get { return null; }
+            }
+
+            Bytes IBufferProtocol.ToBytes(int start, int? end) {
+                int stop, step;
+                new Slice(start, end).indices(_data.Length, out start, out stop, out step);
+                return Bytes.Make(ToByteArray(start, Math.Max(stop - start, 0)));
+            }
+
+            List IBufferProtocol.ToList(int start, int? end) {
+                int stop, step;
+                new Slice(start, end).indices(_data.Length, out start, out stop, out step);
+
+                List res = new List();
+                for (int i = start; i < stop; i++) {
+                    res.AddNoLock(this[i]);
+                }
+                return res;
+            }
+
+            #endregion
+
+            #region IDirectBuffer Members
+
+            bool IDirectBuffer.TryGetSegment(bool writable, out ArraySegment<byte> segment) {
+                // only the byte arrays can be read in place, the others need converting
+                if (_typeCode == 'B') {
+                    segment = new ArraySegment<byte>(((ArrayData<byte>)_data).Data, 0, _data.Length);
+                    return true;
+                }
+
+                segment = default(ArraySegment<byte>);
+                return false;
+            }
+
+            #endregion
         }
     }
 }
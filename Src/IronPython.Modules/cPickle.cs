@@ -33,9 +33,7 @@ using System.Numerics;
 [assembly: PythonModule("cPickle", typeof(IronPython.Modules.PythonPickle))]
 namespace IronPython.Modules {
     public static class PythonPickle {
-        public const string __doc__ = "Fast object serialization/deserialization.\n\n"
-            + "Differences from CPython:\n"
-            + " - does not implement the undocumented fast mode\n";
+        public const string __doc__ = "Fast object serialization/deserialization.";
         [System.Runtime.CompilerServices.SpecialName]
         public static void PerformModuleReload(PythonContext/*!*/ context, PythonDictionary/*!*/ dict) {
             context.EnsureModuleException("PickleError", dict, "PickleError", "cPickle");
@@ -47,8 +45,6 @@ namespace IronPython.Modules {
             dict["compatible_formats"] = PythonOps.MakeList("1.0", "1.1", "1.2", "1.3", "2.0");
         }
 
-        private static readonly PythonStruct.Struct _float64 = PythonStruct.Struct.Create(">d");
-        
         private const int highestProtocol = 2;
         
         public const string __version__ = "1.71";
@@ -80,12 +76,8 @@ namespace IronPython.Modules {
             + "(deprecated) bin parameters."
             )]
         public static string dumps(CodeContext/*!*/ context, object obj, [DefaultParameterValue(null)] object protocol, [DefaultParameterValue(null)] object bin) {
-            //??? possible perf enhancement: use a C# TextWriter-backed IFileOutput and
-            // thus avoid Python call overhead. Also do similar thing for LoadFromString.
-            var stringIO = new StringBuilderOutput();
-            PicklerObject/*!*/ pickler = new PicklerObject(context, stringIO, protocol, bin);
-            pickler.dump(context, obj);
-            return stringIO.GetString();
+            PicklerObject/*!*/ pickler = new PicklerObject(context, protocol, bin);
+            return pickler.DumpToString(context, obj);
         }
 
         [Documentation("load(file) -> unpickled object\n\n"
@@ -150,21 +142,7 @@ namespace IronPython.Modules {
         /// This enables the creation of thin wrappers that make fast .NET types and slow Python types look the same.
         /// </summary>
         internal abstract class FileOutput {
-            private readonly char[] int32chars = new char[4];
-
             public abstract void Write(CodeContext/*!*/ context, string data);
-
-            public virtual void Write(CodeContext context, int data) {
-                int32chars[0] = (char)(int)((data & 0xff));
-                int32chars[1] = (char)(int)((data >> 8) & 0xff);
-                int32chars[2] = (char)(int)((data >> 16) & 0xff);
-                int32chars[3] = (char)(int)((data >> 24) & 0xff);
-                Write(context, new string(int32chars));
-            }
-
-            public virtual void Write(CodeContext context, char data) {
-                Write(context, ScriptingRuntimeHelpers.CharToString(data));
-            }
         }
 
         private class PythonFileInput : FileInput {
@@ -276,29 +254,6 @@ namespace IronPython.Modules {
             }
         }
 
-        private class StringBuilderOutput : FileOutput {
-            private readonly StringBuilder _builder = new StringBuilder(4096);
-
-            public string GetString() {
-                return _builder.ToString();
-            }
-
-            public override void Write(CodeContext context, char data) {
-                _builder.Append(data);
-            }
-
-            public override void Write(CodeContext context, int data) {
-                _builder.Append((char)(int)((data) & 0xff));
-                _builder.Append((char)(int)((data >> 8) & 0xff));
-                _builder.Append((char)(int)((data >> 16) & 0xff));
-                _builder.Append((char)(int)((data >> 24) & 0xff));
-            }
-
-            public override void Write(CodeContext context, string data) {
-                _builder.Append(data);
-            }
-        }
-
         private class PythonReadableFileOutput : PythonFileLikeOutput {
             private object _getValueMethod;
 
@@ -401,17 +356,27 @@ namespace IronPython.Modules {
 
             private const char LowestPrintableChar = (char)32;
             private const char HighestPrintableChar = (char)126;
-            // max elements that can be set/appended at a time using SETITEMS/APPENDS
+            // output is handed to the file in chunks of about this many characters
+            private const int FlushSize = 64 * 1024;
+            private const int InitialBufferSize = 1024;
+            // containers nested deeper than this are checked for cycles in fast mode
+            private const int FastNestingLimit = 50;
 
             private delegate void PickleFunction(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object value);
             private static readonly Dictionary<Type, PickleFunction> _dispatchTable;
 
+            // max elements that can be set/appended at a time using SETITEMS/APPENDS
             private int _batchSize = 1000;
-            private FileOutput _file;
+            private FileOutput _file;                     // null when pickling to a string
+            private char[] _buffer = new char[InitialBufferSize];   // pickle data which hasn't been written to _file yet
+            private int _bufferLength;
             private int _protocol;
             private PythonDictionary _memo;               // memo if the user accesses the memo property
             private Dictionary<object, int> _privMemo;    // internal fast memo which we can use if the user doesn't access memo
             private object _persist_id;
+            private bool _fast;                           // don't memoize, for acyclic data
+            private int _fastNesting;
+            private HashSet<object> _fastActive;          // containers being pickled below FastNestingLimit in fast mode
 
             static PicklerObject() {
                 _dispatchTable = new Dictionary<Type, PickleFunction>();
@@ -474,10 +439,11 @@ namespace IronPython.Modules {
             }
 
             public int fast {
-                // We don't implement fast, but we silently ignore it when it's set so that test_cpickle works.
+                // In fast mode nothing is memoized, so shared objects are pickled once for each reference
+                // and recursive objects can't be pickled.
                 // For a description of fast, see http://mail.python.org/pipermail/python-bugs-list/2001-October/007695.html
-                get { return 0; }
-                set { /* ignore */ }
+                get { return _fast ? 1 : 0; }
+                set { _fast = value != 0; }
             }
 
             public PicklerObject(CodeContext/*!*/ context, object file, object protocol, object bin) {
@@ -500,11 +466,22 @@ namespace IronPython.Modules {
                     _file = new PythonFileLikeOutput(context, file);
                 }
 
+                Initialize(context, protocol, bin);
+            }
+
+            /// <summary>
+            /// Creates a pickler without a file, its output is returned by DumpToString.
+            /// </summary>
+            internal PicklerObject(CodeContext/*!*/ context, object protocol, object bin) {
+                Initialize(context, protocol, bin);
+            }
+
+            private void Initialize(CodeContext/*!*/ context, object protocol, object bin) {
                 _privMemo = new Dictionary<object, int>(256, ReferenceEqualityComparer.Instance);
 
                 if (protocol == null) protocol = PythonOps.IsTrue(bin) ? 1 : 0;
 
-                intProtocol = context.LanguageContext.ConvertToInt32(protocol);
+                int intProtocol = context.LanguageContext.ConvertToInt32(protocol);
                 if (intProtocol > highestProtocol) {
                     throw PythonOps.ValueError("pickle protocol {0} asked for; the highest available protocol is {1}", intProtocol, highestProtocol);
                 } else if (intProtocol < 0) {
@@ -528,9 +505,21 @@ namespace IronPython.Modules {
                 + "then create multiple references to a single object."
                 )]
             public void dump(CodeContext/*!*/ context, object obj) {
-                if (_protocol >= 2) WriteProto(context);
-                Save(context, obj);
-                Write(context, Opcode.Stop);
+                try {
+                    Dump(context, obj);
+                    Flush(context);
+                } finally {
+                    EndDump();
+                }
+            }
+
+            internal string DumpToString(CodeContext/*!*/ context, object obj) {
+                try {
+                    Dump(context, obj);
+                    return new string(_buffer, 0, _bufferLength);
+                } finally {
+                    EndDump();
+                }
             }
 
             [Documentation("clear_memo() -> None\n\n"
@@ -547,7 +536,9 @@ namespace IronPython.Modules {
             }
 
             private void Memoize(object obj) {
-                if (_memo != null) {
+                if (_fast) {
+                    return;
+                } else if (_memo != null) {
                     if (!MemoContains(PythonOps.Id(obj))) {
                         _memo[PythonOps.Id(obj)] = PythonTuple.MakeTuple(_memo.Count, obj);
                     }
@@ -558,10 +549,14 @@ namespace IronPython.Modules {
                 }
             }
 
+            /// <summary>
+            /// Adds obj to the memo and returns its index, or -1 in fast mode.
+            /// </summary>
             private int MemoizeNew(object obj) {
-                
                 int res;
-                if (_memo != null) {
+                if (_fast) {
+                    res = -1;
+                } else if (_memo != null) {
                     Debug.Assert(!_memo.ContainsKey(obj));
                     _memo[PythonOps.Id(obj)] = PythonTuple.MakeTuple(res = _memo.Count, obj);
                 } else {
@@ -571,8 +566,10 @@ namespace IronPython.Modules {
                 return res;
             }
 
-            private bool MemoContains(object obj) {                
-                if (_memo != null) {
+            private bool MemoContains(object obj) {
+                if (_fast) {
+                    return false;
+                } else if (_memo != null) {
                     return _memo.Contains(PythonOps.Id(obj));
                 }
 
@@ -581,7 +578,9 @@ namespace IronPython.Modules {
 
             private bool TryWriteFastGet(CodeContext context, object obj) {
                 int value;
-                if (_memo != null) {
+                if (_fast) {
+                    return false;
+                } else if (_memo != null) {
                     return TryWriteSlowGet(context, obj);
                 } else if (_privMemo.TryGetValue(obj, out value)) {
                     WriteGetOrPut(context, true, value);
@@ -614,10 +613,21 @@ namespace IronPython.Modules {
 
             #region Save functions
 
+            private void Dump(CodeContext/*!*/ context, object obj) {
+                if (_protocol >= 2) WriteProto(context);
+                Save(context, obj);
+                Write(context, Opcode.Stop);
+            }
+
             private void Save(CodeContext/*!*/ context, object obj) {
+                if (_bufferLength >= FlushSize) {
+                    Flush(context);
+                }
+
                 if (_persist_id == null || !TrySavePersistId(context, obj)) {
                     PickleFunction pickleFunction;
-                    // several typees are never memoized, check for these first.
+                    // several types are never memoized, check for these first.  The type tests
+                    // are a lot cheaper than a lookup in the dispatch table.
                     if (obj == null) {
                         SaveNone(this, context, obj);
                     } else if (obj is int) {
@@ -699,7 +709,9 @@ namespace IronPython.Modules {
 
                 pickler.WritePut(context, index);
 
+                pickler.FastSaveEnter(context, obj);
                 pickler.BatchSetItems(context, (PythonDictionary)obj);
+                pickler.FastSaveLeave(obj);
             }
 
             private static void SaveFloat(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
@@ -710,7 +722,7 @@ namespace IronPython.Modules {
                     pickler.WriteFloatAsString(context, obj);
                 } else {
                     pickler.Write(context, Opcode.BinFloat);
-                    pickler.WriteFloat64(context, obj);
+                    pickler.WriteFloat64(context, (double)obj);
                 }
             }
 
@@ -772,6 +784,7 @@ namespace IronPython.Modules {
                 Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.OldInstance), "arg must be old-class instance");
                 Debug.Assert(!pickler.MemoContains(obj));
 
+                pickler.FastSaveEnter(context, obj);
                 pickler.Write(context, Opcode.Mark);
 
                 // Memoize() call isn't in the usual spot to allow class to be memoized before
@@ -811,6 +824,7 @@ namespace IronPython.Modules {
                 }
 
                 pickler.Write(context, Opcode.Build);
+                pickler.FastSaveLeave(obj);
             }
 
             private static void SaveInteger(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
@@ -819,17 +833,17 @@ namespace IronPython.Modules {
                     pickler.Write(context, Opcode.Int);
                     pickler.WriteIntAsString(context, obj);
                 } else {
-                    if (IsUInt8(context, obj)) {
+                    int value = (int)obj;
+                    if (IsUInt8(value)) {
                         pickler.Write(context, Opcode.BinInt1);
-                        pickler.WriteUInt8(context, obj);
-                    } else if (IsUInt16(context, obj)) {
+                        pickler.WriteUInt8(context, value);
+                    } else if (IsUInt16(value)) {
                         pickler.Write(context, Opcode.BinInt2);
-                        pickler.WriteUInt16(context, obj);
-                    } else if (IsInt32(context, obj)) {
-                        pickler.Write(context, Opcode.BinInt);
-                        pickler.WriteInt32(context, obj);
+                        pickler.WriteUInt8(context, value & 0xff);
+                        pickler.WriteUInt8(context, (value >> 8) & 0xff);
                     } else {
-                        throw PythonOps.RuntimeError("unrecognized integer format");
+                        pickler.Write(context, Opcode.BinInt);
+                        pickler.WriteInt32(context, value);
                     }
                 }
             }
@@ -847,7 +861,9 @@ namespace IronPython.Modules {
                 }
 
                 pickler.WritePut(context, index);
+                pickler.FastSaveEnter(context, obj);
                 pickler.BatchAppends(context, ((IEnumerable)obj).GetEnumerator());
+                pickler.FastSaveLeave(obj);
             }
 #if CLR2
             private static readonly BigInteger MaxInt = BigInteger.Create(Int32.MaxValue);
@@ -871,7 +887,7 @@ namespace IronPython.Modules {
                     int value = (int)bi;
                     if (IsInt8(value)) {
                         pickler.WriteUInt8(context, 1);
-                        pickler._file.Write(context, (char)(byte)value);
+                        pickler.Write(context, (char)(byte)value);
                     } else if (IsInt16(value)) {
                         pickler.WriteUInt8(context, 2);
                         pickler.WriteUInt8(context, value & 0xff);
@@ -909,6 +925,7 @@ namespace IronPython.Modules {
             private void SaveObject(PicklerObject/*!*/ pickler, CodeContext/*!*/ context, object obj) {
                 Debug.Assert(!MemoContains(obj));
                 MemoizeNew(obj);
+                FastSaveEnter(context, obj);
 
                 object reduceCallable, result;
                 PythonType objType = DynamicHelpers.GetPythonType(obj);
@@ -956,6 +973,7 @@ namespace IronPython.Modules {
                 } else {
                     throw CannotPickle(context, obj, "{0} must return string or tuple", reduceCallable);
                 }
+                FastSaveLeave(obj);
             }
 
             /// <summary>
@@ -1077,31 +1095,16 @@ namespace IronPython.Modules {
                 Debug.Assert(DynamicHelpers.GetPythonType(obj).Equals(TypeCache.String), "arg must be unicode");
                 Debug.Assert(!pickler.MemoContains(obj));
 
-                if (pickler._memo != null) {
-                    pickler.MemoizeNew(obj);
-                    if (pickler._protocol < 1) {
-                        pickler.Write(context, Opcode.Unicode);
-                        pickler.WriteUnicodeStringRaw(context, obj);
-                    } else {
-                        pickler.Write(context, Opcode.BinUnicode);
-                        pickler.WriteUnicodeStringUtf8(context, obj);
-                    }
-
-                    pickler.WritePut(context, obj);
+                int index = pickler.MemoizeNew(obj);
+                if (pickler._protocol < 1) {
+                    pickler.Write(context, Opcode.Unicode);
+                    pickler.WriteUnicodeStringRaw(context, obj);
                 } else {
-                    var memo = pickler._privMemo[obj] = pickler._privMemo.Count;
-
-                    if (pickler._protocol < 1) {
-                        pickler.Write(context, Opcode.Unicode);
-                        pickler.WriteUnicodeStringRaw(context, obj);
-                    } else {
-                        pickler.Write(context, Opcode.BinUnicode);
-                        pickler.WriteUnicodeStringUtf8(context, obj);
-                    }
-
-                    pickler.WriteGetOrPut(context, false, memo);
+                    pickler.Write(context, Opcode.BinUnicode);
+                    pickler.WriteUnicodeStringUtf8(context, obj);
                 }
 
+                pickler.WritePut(context, index);
             }
 
             #endregion
@@ -1120,9 +1123,12 @@ namespace IronPython.Modules {
             /// <summary>
             /// Write value in pickle float8 format.
             /// </summary>
-            private void WriteFloat64(CodeContext/*!*/ context, object value) {
-                Debug.Assert(DynamicHelpers.GetPythonType(value).Equals(TypeCache.Double));
-                Write(context, _float64.pack(context, value));
+            private void WriteFloat64(CodeContext/*!*/ context, double value) {
+                long bits = BitConverter.DoubleToInt64Bits(value);
+                EnsureBuffer(8);
+                for (int shift = 56; shift >= 0; shift -= 8) {
+                    _buffer[_bufferLength++] = (char)((bits >> shift) & 0xff);
+                }
             }
 
             /// <summary>
@@ -1144,7 +1150,7 @@ namespace IronPython.Modules {
             }
 
             private void WriteUInt8(CodeContext/*!*/ context, int value) {
-                _file.Write(context, (char)value);
+                Write(context, (char)value);
             }
 
             /// <summary>
@@ -1168,7 +1174,11 @@ namespace IronPython.Modules {
             }
 
             private void WriteInt32(CodeContext context, int val) {
-                _file.Write(context, val);
+                EnsureBuffer(4);
+                _buffer[_bufferLength++] = (char)(val & 0xff);
+                _buffer[_bufferLength++] = (char)((val >> 8) & 0xff);
+                _buffer[_bufferLength++] = (char)((val >> 16) & 0xff);
+                _buffer[_bufferLength++] = (char)((val >> 24) & 0xff);
             }
 
             /// <summary>
@@ -1217,9 +1227,12 @@ namespace IronPython.Modules {
                 // if the string contains non-ASCII elements it needs to be re-encoded as UTF8.
                 for (int i = 0; i < strVal.Length; i++) {                    
                     if (strVal[i] >= 128) {
-                        string encodedString = System.Text.Encoding.UTF8.GetBytes((string)value).MakeString();
-                        WriteInt32(context, encodedString.Length);
-                        Write(context, encodedString);
+                        byte[] encoded = Encoding.UTF8.GetBytes(strVal);
+                        WriteInt32(context, encoded.Length);
+                        EnsureBuffer(encoded.Length);
+                        for (int j = 0; j < encoded.Length; j++) {
+                            _buffer[_bufferLength++] = (char)encoded[j];
+                        }
                         return;
                     }
                 }
@@ -1316,11 +1329,65 @@ namespace IronPython.Modules {
             #region Output generation helpers
 
             private void Write(CodeContext/*!*/ context, string data) {
-                _file.Write(context, data);
+                EnsureBuffer(data.Length);
+                data.CopyTo(0, _buffer, _bufferLength, data.Length);
+                _bufferLength += data.Length;
             }
 
             private void Write(CodeContext/*!*/ context, char data) {
-                _file.Write(context, data);
+                if (_bufferLength == _buffer.Length) {
+                    EnsureBuffer(1);
+                }
+                _buffer[_bufferLength++] = data;
+            }
+
+            private void EnsureBuffer(int count) {
+                if (_bufferLength + count > _buffer.Length) {
+                    Array.Resize(ref _buffer, Math.Max(_buffer.Length * 2, _bufferLength + count));
+                }
+            }
+
+            /// <summary>
+            /// Writes the buffered output to the file.  Picklers without a file keep everything
+            /// in the buffer.
+            /// </summary>
+            private void Flush(CodeContext/*!*/ context) {
+                if (_file != null && _bufferLength > 0) {
+                    _file.Write(context, new string(_buffer, 0, _bufferLength));
+                    _bufferLength = 0;
+                }
+            }
+
+            private void EndDump() {
+                // output of a failed dump is discarded
+                _bufferLength = 0;
+                if (_buffer.Length > 2 * FlushSize) {
+                    _buffer = new char[InitialBufferSize];
+                }
+                _fastNesting = 0;
+                _fastActive = null;
+            }
+
+            /// <summary>
+            /// Keeps track of the containers being pickled in fast mode.  Only the containers nested
+            /// deeper than FastNestingLimit are recorded, recursive data ends up there.
+            /// </summary>
+            private void FastSaveEnter(CodeContext/*!*/ context, object obj) {
+                if (_fast && ++_fastNesting > FastNestingLimit) {
+                    if (_fastActive == null) {
+                        _fastActive = new HashSet<object>(ReferenceEqualityComparer.Instance);
+                    }
+                    if (!_fastActive.Add(obj)) {
+                        throw PythonOps.ValueError("fast mode: can't pickle cyclic objects including object type {0} at {1}",
+                            DynamicHelpers.GetPythonType(obj).Name, PythonOps.Id(obj));
+                    }
+                }
+            }
+
+            private void FastSaveLeave(object obj) {
+                if (_fast && _fastNesting-- > FastNestingLimit) {
+                    _fastActive.Remove(obj);
+                }
             }
 
             private void WriteGet(CodeContext/*!*/ context, object obj) {
@@ -1360,7 +1427,7 @@ namespace IronPython.Modules {
                 if (_protocol < 1) {
                     Write(context, isGet ? Opcode.Get : Opcode.Put);
                     WriteIntAsString(context, index);
-                } else if(index >= 0 && index <= 1 << 8) {
+                } else if (index >= 0 && index < 1 << 8) {
                     Write(context, isGet ? Opcode.BinGet : Opcode.BinPut);
                     WriteUInt8(context, index);
                 } else {
@@ -1383,11 +1450,15 @@ namespace IronPython.Modules {
             }
 
             private void WritePut(CodeContext/*!*/ context, object obj) {
-                WriteGetOrPut(context, obj, false);
+                if (!_fast) {
+                    WriteGetOrPut(context, obj, false);
+                }
             }
 
             private void WritePut(CodeContext/*!*/ context, int index) {
-                WriteGetOrPut(context, false, index);
+                if (!_fast) {
+                    WriteGetOrPut(context, false, index);
+                }
             }
 
             private void WriteProto(CodeContext/*!*/ context) {
@@ -22,6 +22,7 @@ using System.Runtime.CompilerServices;
 using System.Runtime.InteropServices;
 using System.Text;
 using System.Text.RegularExpressions;
+using System.Threading;
 
 using Microsoft.Scripting;
 using Microsoft.Scripting.Runtime;
@@ -39,12 +40,38 @@ namespace IronPython.Modules {
     /// Python regular expression module.
     /// </summary>
     public static class PythonRegex {
-        private static CacheDict<PatternKey, RE_Pattern> _cachedPatterns = new CacheDict<PatternKey, RE_Pattern>(100);
+        private const int DefaultCacheSize = 100;
+
+        // patterns used by the module level functions this many times are compiled to IL
+        private const int CompileThreshold = 1000;
+
+        private static PatternCache<RE_Pattern> _cachedPatterns = new PatternCache<RE_Pattern>(DefaultCacheSize);
+        private static PatternCache<PythonSRegEx.SRE_Pattern> _cachedSrePatterns = new PatternCache<PythonSRegEx.SRE_Pattern>(DefaultCacheSize);
+        private static int _compiledPatterns;
 
         [SpecialName]
         public static void PerformModuleReload(PythonContext/*!*/ context, PythonDictionary/*!*/ dict) {
-            context.EnsureModuleException("reerror", dict, "error", "re");
-            PythonCopyReg.GetDispatchTable(context.SharedContext)[DynamicHelpers.GetPythonTypeFromType(typeof(RE_Pattern))] = dict["_pickle"];
+            int cacheSize = context.PythonOptions.RegexCacheSize;
+            if (cacheSize != _cachedPatterns.MaxSize) {
+                _cachedPatterns = new PatternCache<RE_Pattern>(cacheSize);
+                _cachedSrePatterns = new PatternCache<PythonSRegEx.SRE_Pattern>(cacheSize);
+            }
+
+            if (context.PythonOptions.RegexEngine == "sre") {
+                // patterns are compiled by sre_compile which raises sre_constants.error
+                object sreConstants = Importer.ImportModule(context.SharedContext, new PythonDictionary(), "sre_constants", false, 0);
+                object sreError = PythonOps.GetBoundAttr(context.SharedContext, sreConstants, "error");
+                context.SetModuleState("reerror", sreError);
+                dict["error"] = sreError;
+                dict["engine"] = "sre";
+            } else {
+                context.EnsureModuleException("reerror", dict, "error", "re");
+                dict["engine"] = "cli reg ex";
+            }
+
+            PythonDictionary dispatchTable = PythonCopyReg.GetDispatchTable(context.SharedContext);
+            dispatchTable[DynamicHelpers.GetPythonTypeFromType(typeof(RE_Pattern))] = dict["_pickle"];
+            dispatchTable[DynamicHelpers.GetPythonTypeFromType(typeof(PythonSRegEx.SRE_Pattern))] = dict["_pickle"];
         }
         
         private static readonly Random r = new Random(DateTime.Now.Millisecond);
@@ -71,7 +98,11 @@ namespace IronPython.Modules {
 
         #region Public API Surface
 
-        public static RE_Pattern compile(CodeContext/*!*/ context, object pattern, [DefaultParameterValue(0)]int flags) {
+        public static object compile(CodeContext/*!*/ context, object pattern, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags);
+            }
+
             try {
                 return GetPattern(context, pattern, flags, true);
             } catch (ArgumentException e) {
@@ -79,8 +110,6 @@ namespace IronPython.Modules {
             }
         }
 
-        public const string engine = "cli reg ex";
-
         public static string escape(string text) {
             if (text == null) throw PythonOps.TypeError("text must not be None");
 
@@ -112,6 +141,10 @@ namespace IronPython.Modules {
         }
 
         public static List findall(CodeContext/*!*/ context, object pattern, string @string, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).findall(@string);
+            }
+
             RE_Pattern pat = GetPattern(context, ValidatePattern(pattern), flags);
             ValidateString(@string, "string");
 
@@ -120,6 +153,10 @@ namespace IronPython.Modules {
         }
 
         public static List findall(CodeContext context, object pattern, IList<byte> @string, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).findall(@string);
+            }
+
             RE_Pattern pat = GetPattern(context, ValidatePattern (pattern), flags);
             ValidateString (@string, "string");
 
@@ -175,36 +212,77 @@ namespace IronPython.Modules {
         }
 
         public static object finditer(CodeContext/*!*/ context, object pattern, object @string, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).finditer(@string);
+            }
+
             RE_Pattern pat = GetPattern(context, ValidatePattern(pattern), flags);
 
             string str = ValidateString(@string, "string");
             return MatchIterator(pat.FindAllWorker(context, str, 0, str.Length), pat, str);
         }
 
-        public static RE_Match match(CodeContext/*!*/ context, object pattern, object @string, [DefaultParameterValue(0)]int flags) {
+        public static object match(CodeContext/*!*/ context, object pattern, object @string, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).match(@string);
+            }
+
             return GetPattern(context, ValidatePattern(pattern), flags).match(ValidateString(@string, "string"));
         }
 
-        public static RE_Match search(CodeContext/*!*/ context, object pattern, object @string, [DefaultParameterValue(0)]int flags) {
+        public static object search(CodeContext/*!*/ context, object pattern, object @string, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).search(@string);
+            }
+
             return GetPattern(context, ValidatePattern(pattern), flags).search(ValidateString(@string, "string"));
         }
 
         [return: SequenceTypeInfo(typeof(string))]
         public static List split(CodeContext/*!*/ context, object pattern, object @string, [DefaultParameterValue(0)]int maxsplit, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).split(@string, maxsplit);
+            }
+
             return GetPattern(context, ValidatePattern(pattern), flags).split(ValidateString(@string, "string"), maxsplit);
         }
 
         public static string sub(CodeContext/*!*/ context, object pattern, object repl, object @string, [DefaultParameterValue(0)]int count, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).sub(context, repl, @string, count);
+            }
+
             return GetPattern(context, ValidatePattern(pattern), flags).sub(context, repl, ValidateString(@string, "string"), count);
         }
 
         public static object subn(CodeContext/*!*/ context, object pattern, object repl, object @string, [DefaultParameterValue(0)]int count, [DefaultParameterValue(0)]int flags) {
+            if (UseSre(context)) {
+                return GetSrePattern(context, pattern, flags).subn(context, repl, @string, count);
+            }
+
             return GetPattern(context, ValidatePattern(pattern), flags).subn(context, repl, ValidateString(@string, "string"), count);
 
         }
 
         public static void purge() {
-            _cachedPatterns = new CacheDict<PatternKey, RE_Pattern>(100);
+            _cachedPatterns = new PatternCache<RE_Pattern>(_cachedPatterns.MaxSize);
+            _cachedSrePatterns = new PatternCache<PythonSRegEx.SRE_Pattern>(_cachedSrePatterns.MaxSize);
+        }
+
+        /// <summary>
+        /// Reports how well the pattern cache of the module level functions works: hits, misses,
+        /// evictions, the current and maximum number of patterns (set with -X:RegexCacheSize)
+        /// and how many patterns were compiled to IL because they were used often.
+        /// </summary>
+        public static PythonDictionary _cache_info(CodeContext/*!*/ context) {
+            PythonDictionary res = new PythonDictionary();
+            if (UseSre(context)) {
+                _cachedSrePatterns.GetInfo(res);
+            } else {
+                _cachedPatterns.GetInfo(res);
+                res["compiled"] = _compiledPatterns;
+            }
+            return res;
         }
 
         #endregion
@@ -245,6 +323,22 @@ namespace IronPython.Modules {
                 this._compileFlags = flags;
             }
 
+            /// <summary>
+            /// Switches to a regular expression compiled to IL, returns false if it already is.
+            /// </summary>
+            internal bool EnsureCompiled() {
+#if SILVERLIGHT
+                return false;
+#else
+                Regex re = _re;
+                if ((re.Options & RegexOptions.Compiled) != 0) {
+                    return false;
+                }
+                _re = new Regex(re.ToString(), re.Options | RegexOptions.Compiled);
+                return true;
+#endif
+            }
+
             public RE_Match match(object text) {
                 string input = ValidateString(text, "text");
                 return RE_Match.makeMatch(_re.Match(input), this, input, 0, input.Length);
@@ -527,6 +621,15 @@ namespace IronPython.Modules {
             throw new InvalidOperationException("couldn't find compile method");
         }
 
+        public static PythonTuple _pickle(CodeContext/*!*/ context, PythonSRegEx.SRE_Pattern pattern) {
+            object scope = Importer.ImportModule(context, new PythonDictionary(), "re", false, 0);
+            object compile;
+            if (scope is PythonModule && ((PythonModule)scope).__dict__.TryGetValue("compile", out compile)) {
+                return PythonTuple.MakeTuple(compile, PythonTuple.MakeTuple(pattern.pattern, pattern.flags));
+            }
+            throw new InvalidOperationException("couldn't find compile method");
+        }
+
         [PythonType]
         public class RE_Match {
             RE_Pattern _pattern;
@@ -843,20 +946,44 @@ namespace IronPython.Modules {
 
             string strPattern = ValidatePatternAsString(pattern);
             PatternKey key = new PatternKey(strPattern, flags);
-            lock (_cachedPatterns) {
-                if (_cachedPatterns.TryGetValue(new PatternKey(strPattern, flags), out res)) {
-#if SILVERLIGHT
-                    return res;
-#else
-                    if ( ! compiled || (res._re.Options & RegexOptions.Compiled) == RegexOptions.Compiled) {
-                        return res;
-                    }
-#endif
+            int hits;
+            if (_cachedPatterns.TryGetValue(key, out res, out hits)) {
+                // hot patterns are worth the time it takes to compile them
+                if ((compiled || hits == CompileThreshold) && res.EnsureCompiled()) {
+                    Interlocked.Increment(ref _compiledPatterns);
                 }
-                res = new RE_Pattern(context, strPattern, flags, compiled);
-                _cachedPatterns[key] = res;
                 return res;
             }
+
+            res = new RE_Pattern(context, strPattern, flags, compiled);
+            _cachedPatterns.Add(key, res);
+            return res;
+        }
+
+        private static bool UseSre(CodeContext/*!*/ context) {
+            return context.LanguageContext.PythonOptions.RegexEngine == "sre";
+        }
+
+        /// <summary>
+        /// Gets the pattern compiled by sre_compile for the -X:RegexEngine sre option.
+        /// </summary>
+        private static PythonSRegEx.SRE_Pattern GetSrePattern(CodeContext/*!*/ context, object pattern, int flags) {
+            PythonSRegEx.SRE_Pattern res = pattern as PythonSRegEx.SRE_Pattern;
+            if (res != null) {
+                return res;
+            }
+
+            string strPattern = ValidatePatternAsString(pattern);
+            PatternKey key = new PatternKey(strPattern, flags);
+            int hits;
+            if (_cachedSrePatterns.TryGetValue(key, out res, out hits)) {
+                return res;
+            }
+
+            object sreCompile = Importer.ImportModule(context, new PythonDictionary(), "sre_compile", false, 0);
+            res = (PythonSRegEx.SRE_Pattern)PythonOps.Invoke(context, sreCompile, "compile", strPattern, flags);
+            _cachedSrePatterns.Add(key, res);
+            return res;
         }
 
         private static IEnumerator MatchIterator(MatchCollection matches, RE_Pattern pattern, string input) {
@@ -1241,7 +1368,7 @@ namespace IronPython.Modules {
             throw PythonOps.TypeError("pattern must be a string or compiled pattern");
         }
 
-        private static string ValidateString(object str, string param) {
+        internal static string ValidateString(object str, string param) {
             if (str is string) return str as string;
 
             ExtensibleString es = str as ExtensibleString;
@@ -1310,6 +1437,123 @@ namespace IronPython.Modules {
 
             #endregion
         }
+
+        /// <summary>
+        /// Cache of the patterns used by the module level functions.  The patterns are spread
+        /// over stripes which are locked independently so threads using different patterns
+        /// rarely contend; a full stripe evicts its least recently used pattern.
+        /// </summary>
+        private sealed class PatternCache<T> where T : class {
+            private const int PatternsPerStripe = 32, MaxStripes = 16;
+
+            public readonly int MaxSize;
+            private readonly Stripe[]/*!*/ _stripes;
+
+            public PatternCache(int maxSize) {
+                MaxSize = maxSize;
+                _stripes = new Stripe[Math.Min(Math.Max(maxSize / PatternsPerStripe, 1), MaxStripes)];
+                for (int i = 0; i < _stripes.Length; i++) {
+                    // the first stripes take the remainder so that the sizes add up to maxSize
+                    _stripes[i] = new Stripe(maxSize / _stripes.Length + (i < maxSize % _stripes.Length ? 1 : 0));
+                }
+            }
+
+            /// <summary>
+            /// Looks up a pattern, hits is the number of times it has been found so far.
+            /// </summary>
+            public bool TryGetValue(PatternKey/*!*/ key, out T value, out int hits) {
+                Stripe stripe = GetStripe(key);
+                lock (stripe) {
+                    Entry entry;
+                    if (stripe.Entries.TryGetValue(key, out entry)) {
+                        entry.LastUse = ++stripe.Clock;
+                        hits = ++entry.Hits;
+                        value = entry.Value;
+                        stripe.Hits++;
+                        return true;
+                    }
+                    stripe.Misses++;
+                }
+
+                hits = 0;
+                value = null;
+                return false;
+            }
+
+            public void Add(PatternKey/*!*/ key, T/*!*/ value) {
+                Stripe stripe = GetStripe(key);
+                if (stripe.Size == 0) {
+                    return;
+                }
+
+                lock (stripe) {
+                    Dictionary<PatternKey, Entry> entries = stripe.Entries;
+                    if (entries.Count >= stripe.Size && !entries.ContainsKey(key)) {
+                        PatternKey oldest = null;
+                        long oldestUse = Int64.MaxValue;
+                        foreach (KeyValuePair<PatternKey, Entry> item in entries) {
+                            if (item.Value.LastUse < oldestUse) {
+                                oldest = item.Key;
+                                oldestUse = item.Value.LastUse;
+                            }
+                        }
+                        entries.Remove(oldest);
+                        stripe.Evictions++;
+                    }
+
+                    Entry entry = new Entry(value);
+                    entry.LastUse = ++stripe.Clock;
+                    entries[key] = entry;
+                }
+            }
+
+            public void GetInfo(PythonDictionary/*!*/ info) {
+                int count = 0, hits = 0, misses = 0, evictions = 0;
+                foreach (Stripe stripe in _stripes) {
+                    lock (stripe) {
+                        count += stripe.Entries.Count;
+                        hits += stripe.Hits;
+                        misses += stripe.Misses;
+                        evictions += stripe.Evictions;
+                    }
+                }
+
+                info["hits"] = hits;
+                info["misses"] = misses;
+                info["evictions"] = evictions;
+                info["currsize"] = count;
+                info["maxsize"] = MaxSize;
+            }
+
+            private Stripe/*!*/ GetStripe(PatternKey/*!*/ key) {
+                return _stripes[(key.GetHashCode() & Int32.MaxValue) % _stripes.Length];
+            }
+
+            /// <summary>
+            /// A part of the cache with its own lock; the statistics are kept per stripe so that
+            /// lookups in different stripes don't contend on shared counters.
+            /// </summary>
+            private sealed class Stripe {
+                public readonly Dictionary<PatternKey, Entry>/*!*/ Entries = new Dictionary<PatternKey, Entry>();
+                public readonly int Size;
+                public long Clock;
+                public int Hits, Misses, Evictions;
+
+                public Stripe(int size) {
+                    Size = size;
+                }
+            }
+
+            private sealed class Entry {
+                public readonly T Value;
+                public long LastUse;
+                public int Hits;
+
+                public Entry(T value) {
+                    Value = value;
+                }
+            }
+        }
         
         #endregion
     }
@@ -17,7 +17,10 @@
 using System;
 using System.Collections;
 using System.Collections.Generic;
+using System.Diagnostics;
+using System.Numerics;
 using System.Runtime.InteropServices;
+using System.Threading;
 using Microsoft.Scripting;
 
 using IronPython.Runtime;
@@ -40,6 +43,18 @@ namespace IronPython.Modules {
             context.EnsureModuleException("selecterror", dict, "error", "select");
         }
 
+        public const int POLLIN = 0x001;
+        public const int POLLPRI = 0x002;
+        public const int POLLOUT = 0x004;
+        public const int POLLERR = 0x008;
+        public const int POLLHUP = 0x010;
+        public const int POLLNVAL = 0x020;
+        public const int POLLRDNORM = 0x040;
+        public const int POLLRDBAND = 0x080;
+        public const int POLLWRNORM = 0x100;
+        public const int POLLWRBAND = 0x200;
+        public const int POLLMSG = 0x400;
+
         #region Public API
 
         [Documentation("select(iwtd, owtd, ewtd[, timeout]) -> readlist, writelist, errlist\n\n"
@@ -93,6 +108,412 @@ namespace IronPython.Modules {
             return PythonTuple.MakeTuple(readerList, writerList, errorList);
         }
 
+        [Documentation("poll() -> poll object\n\n"
+            + "Returns a polling object, which supports registering and\n"
+            + "unregistering file descriptors, and then polling them for I/O events.")]
+        public static PollObject poll(CodeContext/*!*/ context) {
+            return new PollObject(context);
+        }
+
+        /// <summary>
+        /// Persistent set of registered sockets.
+        ///
+        /// Connected sockets which are only waited on for reading are watched with an outstanding
+        /// one byte peek receive which completes when data (or EOF or an error) arrives, so the
+        /// cost of a poll() call depends on the number of ready sockets rather than the number of
+        /// registered ones.  The receive is re-issued for the sockets reported by a poll() call
+        /// on the next call, which keeps the level-triggered semantics of poll(2).  All other
+        /// sockets (listening ones and those waited on for writing or priority data) are checked
+        /// with Socket.Select on every call.
+        /// </summary>
+        [PythonType("poll")]
+        public sealed class PollObject {
+            // how long poll waits for completions before it checks the selected sockets again
+            private const int SelectInterval = 10;
+            private const int ReadEvents = POLLIN | POLLRDNORM;
+            private const int WriteEvents = POLLOUT | POLLWRNORM | POLLWRBAND;
+            private const int AlwaysReported = POLLERR | POLLHUP | POLLNVAL;
+
+            private readonly CodeContext/*!*/ _context;
+            private readonly Dictionary<long, Registration>/*!*/ _registrations = new Dictionary<long, Registration>();
+            private readonly Dictionary<Socket, Registration>/*!*/ _selected = new Dictionary<Socket, Registration>();
+            private readonly Queue<Registration>/*!*/ _ready = new Queue<Registration>();
+            private readonly List<Registration>/*!*/ _reported = new List<Registration>();
+            private readonly AutoResetEvent/*!*/ _readyEvent = new AutoResetEvent(false);
+
+            internal PollObject(CodeContext/*!*/ context) {
+                _context = context;
+            }
+
+            [Documentation("register(fd [, eventmask] ) -> None\n\n"
+                + "Register a file descriptor with the polling object.\n"
+                + "fd -- either an integer, or an object with a fileno() method returning an\n"
+                + "      int.\n"
+                + "events -- an optional bitmask describing the type of events to check for")]
+            public void register(object fd, [DefaultParameterValue(POLLIN | POLLPRI | POLLOUT)] int eventmask) {
+                long handle;
+                Socket socket = ObjectToSocket(_context, fd, out handle);
+
+                lock (this) {
+                    Registration reg;
+                    if (!_registrations.TryGetValue(handle, out reg) || reg.Socket != socket) {
+                        if (reg != null) {
+                            Remove(reg);
+                        }
+                        reg = new Registration(this, handle, socket);
+                        _registrations[handle] = reg;
+                    }
+                    reg.Events = eventmask;
+                    Update(reg);
+                }
+            }
+
+            [Documentation("modify(fd, eventmask) -> None\n\n"
+                + "Modify an already registered file descriptor.\n"
+                + "fd -- either an integer, or an object with a fileno() method returning an\n"
+                + "      int.\n"
+                + "events -- an optional bitmask describing the type of events to check for")]
+            public void modify(object fd, int eventmask) {
+                long handle;
+                ObjectToSocket(_context, fd, out handle);
+
+                lock (this) {
+                    Registration reg;
+                    if (!_registrations.TryGetValue(handle, out reg)) {
+                        throw PythonExceptions.CreateThrowable(PythonExceptions.IOError, PythonErrorNumber.ENOENT, "No such file or directory");
+                    }
+                    reg.Events = eventmask;
+                    Update(reg);
+                }
+            }
+
+            [Documentation("unregister(fd) -> None\n\n"
+                + "Remove a file descriptor being tracked by the polling object.")]
+            public void unregister(object fd) {
+                long handle = ObjectToHandle(_context, fd);
+
+                lock (this) {
+                    Registration reg;
+                    if (!_registrations.TryGetValue(handle, out reg)) {
+                        throw PythonOps.KeyError(FdToObject(handle));
+                    }
+                    Remove(reg);
+                }
+            }
+
+            [Documentation("poll( [timeout] ) -> list of (fd, event) 2-tuples\n\n"
+                + "Polls the set of registered file descriptors, returning a list containing \n"
+                + "any descriptors that have events or errors to report.  The timeout is given\n"
+                + "in milliseconds; if it is omitted, negative or None the call blocks until an\n"
+                + "event occurs.")]
+            public List poll([DefaultParameterValue(null)] object timeout) {
+                int timeoutMilliseconds = Timeout.Infinite;
+                if (timeout != null) {
+                    double ms;
+                    if (!Converter.TryConvertToDouble(timeout, out ms)) {
+                        throw PythonOps.TypeErrorForTypeMismatch("int or None", timeout);
+                    }
+                    if (ms >= 0) {
+                        timeoutMilliseconds = ms >= Int32.MaxValue ? Int32.MaxValue : (int)ms;
+                    }
+                }
+
+                Stopwatch watch = Stopwatch.StartNew();
+                var hits = new List<Registration>();
+                while (true) {
+                    Registration[] selected;
+                    bool watching;
+                    lock (this) {
+                        // sockets reported last time are watched again, the receive completes at
+                        // once if they're still readable
+                        foreach (Registration reg in _reported) {
+                            if (reg.Registered) {
+                                Update(reg);
+                            }
+                        }
+                        _reported.Clear();
+
+                        foreach (Registration reg in new List<Registration>(_selected.Values)) {
+                            Update(reg);
+                        }
+                        selected = new Registration[_selected.Count];
+                        _selected.Values.CopyTo(selected, 0);
+                        watching = _registrations.Count > selected.Length;
+
+                        CollectReady(hits);
+                    }
+
+                    int remaining = timeoutMilliseconds;
+                    if (timeoutMilliseconds != Timeout.Infinite) {
+                        remaining = (int)Math.Max(0, timeoutMilliseconds - watch.ElapsedMilliseconds);
+                    }
+
+                    if (selected.Length > 0) {
+                        // block in select only if there's nothing to wait for completions of
+                        Select(selected, hits, hits.Count > 0 || watching ? 0 : remaining);
+                    }
+
+                    if (hits.Count > 0) {
+                        break;
+                    }
+
+                    if (timeoutMilliseconds != Timeout.Infinite) {
+                        remaining = (int)Math.Max(0, timeoutMilliseconds - watch.ElapsedMilliseconds);
+                    }
+                    if (remaining == 0) {
+                        break;
+                    }
+
+                    if (selected.Length == 0) {
+                        _readyEvent.WaitOne(remaining);
+                    } else if (watching) {
+                        _readyEvent.WaitOne(remaining == Timeout.Infinite ? SelectInterval : Math.Min(remaining, SelectInterval));
+                    }
+                }
+
+                List res = new List(hits.Count);
+                lock (this) {
+                    foreach (Registration reg in hits) {
+                        res.AddNoLock(PythonTuple.MakeTuple(reg.Fd, reg.Revents));
+                        reg.Revents = 0;
+                    }
+                }
+                return res;
+            }
+
+            #region Implementation details
+
+            private sealed class Registration {
+                public readonly PollObject/*!*/ Owner;
+                public readonly object/*!*/ Fd;
+                public readonly long Handle;
+                public readonly Socket/*!*/ Socket;
+                public int Events, Revents, Completed;
+                public bool Registered = true, Pending, Queued;
+                public SocketAsyncEventArgs Receive;
+
+                public Registration(PollObject/*!*/ owner, long handle, Socket/*!*/ socket) {
+                    Owner = owner;
+                    Handle = handle;
+                    Fd = FdToObject(handle);
+                    Socket = socket;
+                }
+
+                /// <summary>
+                /// True if the socket can be watched with a peek receive, which doesn't see out of
+                /// band data, so sockets registered for POLLPRI go through select.
+                /// </summary>
+                public bool CanWatch {
+                    get {
+                        if ((Events & ReadEvents) == 0 || (Events & (WriteEvents | POLLPRI)) != 0) {
+                            return false;
+                        }
+                        try {
+                            return Socket.SocketType == SocketType.Stream ? Socket.Connected : Socket.IsBound;
+                        } catch (ObjectDisposedException) {
+                            return false;
+                        }
+                    }
+                }
+            }
+
+            /// <summary>
+            /// Watches the socket with a receive or adds it to the sockets checked with select,
+            /// depending on the events it's registered for.
+            /// </summary>
+            private void Update(Registration/*!*/ reg) {
+                if (reg.CanWatch) {
+                    _selected.Remove(reg.Socket);
+                    Watch(reg);
+                } else if (reg.Events != 0) {
+                    _selected[reg.Socket] = reg;
+                } else {
+                    _selected.Remove(reg.Socket);
+                }
+            }
+
+            private void Remove(Registration/*!*/ reg) {
+                reg.Registered = false;
+                _registrations.Remove(reg.Handle);
+                Registration selected;
+                if (_selected.TryGetValue(reg.Socket, out selected) && selected == reg) {
+                    _selected.Remove(reg.Socket);
+                }
+                if (!reg.Pending && reg.Receive != null) {
+                    reg.Receive.Dispose();
+                    reg.Receive = null;
+                }
+            }
+
+            private void Watch(Registration/*!*/ reg) {
+                if (reg.Pending || reg.Queued) {
+                    return;
+                }
+
+                if (reg.Receive == null) {
+                    reg.Receive = new SocketAsyncEventArgs();
+                    reg.Receive.SetBuffer(new byte[1], 0, 1);
+                    reg.Receive.SocketFlags = SocketFlags.Peek;
+                    reg.Receive.UserToken = reg;
+                    reg.Receive.Completed += ReceiveCompleted;
+                }
+
+                reg.Pending = true;
+                try {
+                    if (reg.Socket.ReceiveAsync(reg.Receive)) {
+                        return;
+                    }
+                } catch (ObjectDisposedException) {
+                    reg.Pending = false;
+                    Enqueue(reg, POLLNVAL);
+                    return;
+                } catch (SocketException) {
+                    reg.Pending = false;
+                    Enqueue(reg, POLLERR);
+                    return;
+                }
+                Received(reg);
+            }
+
+            private static void ReceiveCompleted(object sender, SocketAsyncEventArgs/*!*/ e) {
+                Registration reg = (Registration)e.UserToken;
+                lock (reg.Owner) {
+                    reg.Owner.Received(reg);
+                }
+            }
+
+            private void Received(Registration/*!*/ reg) {
+                reg.Pending = false;
+                if (!reg.Registered) {
+                    reg.Receive.Dispose();
+                    reg.Receive = null;
+                    return;
+                }
+
+                switch (reg.Receive.SocketError) {
+                    case SocketError.Success:
+                    case SocketError.MessageSize:   // datagram larger than the peek buffer
+                        Enqueue(reg, POLLIN);
+                        break;
+                    case SocketError.OperationAborted:
+                        Enqueue(reg, POLLNVAL);
+                        break;
+                    case SocketError.ConnectionReset:
+                    case SocketError.ConnectionAborted:
+                    case SocketError.Shutdown:
+                        Enqueue(reg, POLLIN | POLLERR | POLLHUP);
+                        break;
+                    default:
+                        Enqueue(reg, POLLERR);
+                        break;
+                }
+            }
+
+            private void Enqueue(Registration/*!*/ reg, int revents) {
+                reg.Completed = revents;
+                if (!reg.Queued) {
+                    reg.Queued = true;
+                    _ready.Enqueue(reg);
+                    _readyEvent.Set();
+                }
+            }
+
+            private void CollectReady(List<Registration>/*!*/ hits) {
+                while (_ready.Count > 0) {
+                    Registration reg = _ready.Dequeue();
+                    reg.Queued = false;
+                    if (!reg.Registered) {
+                        continue;
+                    }
+
+                    int revents = reg.Completed & AlwaysReported;
+                    if ((reg.Completed & POLLIN) != 0) {
+                        revents |= reg.Events & ReadEvents;
+                    }
+                    Report(reg, revents, hits);
+                    _reported.Add(reg);
+                }
+            }
+
+            private void Select(Registration[]/*!*/ selected, List<Registration>/*!*/ hits, int timeoutMilliseconds) {
+                var readers = new List<Socket>();
+                var writers = new List<Socket>();
+                var errors = new List<Socket>();
+                foreach (Registration reg in selected) {
+                    if ((reg.Events & ReadEvents) != 0) readers.Add(reg.Socket);
+                    if ((reg.Events & WriteEvents) != 0) writers.Add(reg.Socket);
+                    errors.Add(reg.Socket);
+                }
+
+                int timeoutMicroseconds;
+                if (timeoutMilliseconds == Timeout.Infinite || timeoutMilliseconds >= Int32.MaxValue / 1000) {
+                    // see select above
+                    timeoutMicroseconds = -2;
+                } else {
+                    timeoutMicroseconds = timeoutMilliseconds * 1000;
+                }
+
+                try {
+                    Socket.Select(readers.Count > 0 ? readers : null, writers.Count > 0 ? writers : null, errors, timeoutMicroseconds);
+                } catch (ObjectDisposedException) {
+                    lock (this) {
+                        foreach (Registration reg in selected) {
+                            try {
+                                reg.Socket.Poll(0, SelectMode.SelectError);
+                            } catch (ObjectDisposedException) {
+                                Report(reg, POLLNVAL, hits);
+                            }
+                        }
+                    }
+                    return;
+                } catch (SocketException e) {
+                    throw MakeException(_context, SocketExceptionToTuple(e));
+                }
+
+                lock (this) {
+                    foreach (Registration reg in selected) {
+                        if (!reg.Registered) {
+                            continue;
+                        }
+
+                        int revents = 0;
+                        if (readers.Contains(reg.Socket)) {
+                            revents |= reg.Events & ReadEvents;
+                        }
+                        if (writers.Contains(reg.Socket)) {
+                            revents |= reg.Events & (POLLOUT | POLLWRNORM);
+                        }
+                        if (errors.Contains(reg.Socket)) {
+                            // out of band data or a failed connect
+                            revents |= (reg.Events & POLLPRI) != 0 ? POLLPRI : POLLERR;
+                        }
+                        if (revents != 0) {
+                            Report(reg, revents, hits);
+                        }
+                    }
+                }
+            }
+
+            private static void Report(Registration/*!*/ reg, int revents, List<Registration>/*!*/ hits) {
+                if (revents == 0) {
+                    return;
+                }
+                if (reg.Revents == 0) {
+                    hits.Add(reg);
+                }
+                reg.Revents |= revents;
+            }
+
+            #endregion
+        }
+
+        private static object FdToObject(long handle) {
+            if (handle >= Int32.MinValue && handle <= Int32.MaxValue) {
+                return (int)handle;
+            }
+            return (BigInteger)handle;
+        }
+
         private static PythonTuple SocketExceptionToTuple(SocketException e) {
             return PythonTuple.MakeTuple((int)e.SocketErrorCode, e.Message);
         }
@@ -132,28 +553,43 @@ namespace IronPython.Modules {
         /// which is in turn converted to a Socket.
         /// </summary>
         private static Socket ObjectToSocket(CodeContext context, object obj) {
-            Socket socket;
             PythonSocket.socket pythonSocket = obj as PythonSocket.socket;
             if (pythonSocket != null) {
                 return pythonSocket._socket;
             }
 
             Int64 handle;
-            if (!Converter.TryConvertToInt64(obj, out handle)) {
-                object userSocket = obj;
-                object filenoCallable = PythonOps.GetBoundAttr(context, userSocket, "fileno");
+            return ObjectToSocket(context, obj, out handle);
+        }
+
+        private static Socket ObjectToSocket(CodeContext context, object obj, out Int64 handle) {
+            handle = ObjectToHandle(context, obj);
+            Socket socket = PythonSocket.socket.HandleToSocket(handle);
+            if (socket == null) {
+                SocketException e = new SocketException((int)SocketError.NotSocket);
+                throw PythonExceptions.CreateThrowable((PythonType)context.LanguageContext.GetModuleState("selecterror"), SocketExceptionToTuple(e));
+            }
+            return socket;
+        }
+
+        /// <summary>
+        /// Return the file descriptor number of obj, which can be an integer or an object with
+        /// a fileno() method.
+        /// </summary>
+        private static Int64 ObjectToHandle(CodeContext context, object obj) {
+            Int64 handle;
+            PythonSocket.socket pythonSocket = obj as PythonSocket.socket;
+            if (pythonSocket != null) {
+                handle = pythonSocket.fileno();
+            } else if (!Converter.TryConvertToInt64(obj, out handle)) {
+                object filenoCallable = PythonOps.GetBoundAttr(context, obj, "fileno");
                 object fileno = PythonCalls.Call(context, filenoCallable);
                 handle = Converter.ConvertToInt64(fileno);
             }
             if (handle < 0) {
                 throw PythonOps.ValueError("file descriptor cannot be a negative number ({0})", handle);
             }
-            socket = PythonSocket.socket.HandleToSocket(handle);
-            if (socket == null) {
-                SocketException e = new SocketException((int)SocketError.NotSocket);
-                throw PythonExceptions.CreateThrowable((PythonType)context.LanguageContext.GetModuleState("selecterror"), SocketExceptionToTuple(e));
-            }
-            return socket;
+            return handle;
         }
 
         #endregion
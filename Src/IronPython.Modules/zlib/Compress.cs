@@ -62,13 +62,13 @@ be stored in internal buffers for later processing.
 Call the flush() method to clear these buffers.")]
         public string compress([BytesConversion]IList<byte> data)
         {
-            byte[] input = data.ToArray();
+            ArraySegment<byte> input = data.ToSegment();
             byte[] output = new byte[ZlibModule.DEFAULTALLOC];
 
             long start_total_out = zst.total_out;
-            zst.next_in = input;
-            zst.next_in_index = 0;
-            zst.avail_in = input.Length;
+            zst.next_in = input.Array;
+            zst.next_in_index = input.Offset;
+            zst.avail_in = input.Count;
             zst.next_out = output;
             zst.next_out_index = 0;
             zst.avail_out = output.Length;
@@ -83,13 +83,13 @@ the unconsumed_tail attribute.")]
         {
             if(max_length < 0) throw new ArgumentException("max_length must be greater than zero");
 
-            byte[] input = value.ToArray();
+            ArraySegment<byte> input = value.ToSegment();
             byte[] output = new byte[max_length > 0 && ZlibModule.DEFAULTALLOC > max_length ? max_length : ZlibModule.DEFAULTALLOC];
 
             long start_total_out = zst.total_out;
-            zst.next_in = input;
-            zst.next_in_index = 0;
-            zst.avail_in = input.Length;
+            zst.next_in = input.Array;
+            zst.next_in_index = input.Offset;
+            zst.avail_in = input.Count;
             zst.next_out = output;
             zst.next_out_index = 0;
             zst.avail_out = output.Length;
@@ -86,7 +86,8 @@ An optional starting value can be specified.  The returned checksum is
 a signed integer.")]
         public static int adler32([BytesConversion]IList<byte> data, long baseValue=1L)
         {
-            return (int)Adler32.GetAdler32Checksum(baseValue, data.ToArray(), 0, data.Count());
+            ArraySegment<byte> input = data.ToSegment();
+            return (int)Adler32.GetAdler32Checksum(baseValue, input.Array, input.Offset, input.Count);
         }
 
         [Documentation(@"crc32(string[, start]) -- Compute a CRC-32 checksum of string.
@@ -98,10 +99,9 @@ a signed integer.")]
             if(baseValue < int.MinValue || baseValue > uint.MaxValue)
                 throw new ArgumentOutOfRangeException("baseValue");
 
-            if(baseValue >= 0 && baseValue <= uint.MaxValue)
-                return IronPython.Modules.PythonBinaryAscii.crc32(data.ToArray(), (uint)baseValue);
-            else
-                return IronPython.Modules.PythonBinaryAscii.crc32(data.ToArray(), (int)baseValue);
+            ArraySegment<byte> input = data.ToSegment();
+            uint start = baseValue >= 0 ? (uint)baseValue : unchecked((uint)(int)baseValue);
+            return unchecked((int)IronPython.Modules.PythonBinaryAscii.crc32(input.Array, input.Offset, input.Count, start));
         }
 
         [Documentation(@"compress(string[, level]) -- Returned compressed string.
@@ -110,12 +110,13 @@ Optional arg level is the compression level, in 1-9.")]
         public static string compress([BytesConversion]IList<byte> data,
             int level=Z_DEFAULT_COMPRESSION)
         {
-            byte[] input = data.ToArray();
-            byte[] output = new byte[input.Length + input.Length / 1000 + 12 + 1];
+            ArraySegment<byte> input = data.ToSegment();
+            byte[] output = new byte[input.Count + input.Count / 1000 + 12 + 1];
 
             ZStream zst = new ZStream();
-            zst.next_in = input;
-            zst.avail_in = input.Length;
+            zst.next_in = input.Array;
+            zst.next_in_index = input.Offset;
+            zst.avail_in = input.Count;
             zst.next_out = output;
             zst.avail_out = output.Length;
 
@@ -172,7 +173,7 @@ the initial output buffer size.")]
             int wbits=MAX_WBITS,
             int bufsize=DEFAULTALLOC)
         {
-            var bytes = Decompress(data.ToArray(), wbits, bufsize);
+            var bytes = Decompress(data.ToSegment(), wbits, bufsize);
             return PythonAsciiEncoding.Instance.GetString(bytes, 0, bytes.Length);
         }
 
@@ -223,14 +224,20 @@ Optional arg wbits is the window buffer size.")]
 
         [PythonHidden]
         internal static byte[] Decompress(byte[] input, int wbits=MAX_WBITS, int bufsize=DEFAULTALLOC) 
+        {
+            return Decompress(new ArraySegment<byte>(input), wbits, bufsize);
+        }
+
+        private static byte[] Decompress(ArraySegment<byte> input, int wbits, int bufsize)
         {
             byte[] outputBuffer = new byte[bufsize];
             byte[] output = new byte[bufsize];
             int outputOffset = 0;
 
             ZStream zst = new ZStream();
-            zst.next_in = input;
-            zst.avail_in = input.Length;
+            zst.next_in = input.Array;
+            zst.next_in_index = input.Offset;
+            zst.avail_in = input.Count;
             zst.next_out = outputBuffer;
             zst.avail_out = outputBuffer.Length;
 
@@ -66,6 +66,8 @@ namespace IronPython.SQLite
             private List<WeakReference> statements = new List<WeakReference>();
             private int created_statements = 0;
 
+            internal StatementCache statement_cache;
+
             private Dictionary<object, object> function_pinboard = new Dictionary<object, object>();
 
             internal Sqlite3.sqlite3 db;
@@ -97,7 +99,7 @@ namespace IronPython.SQLite
                 [Optional][DefaultParameterValue((string)null)]string isolation_level,
                 [Optional][DefaultParameterValue(true)]bool check_same_thread,
                 [Optional][DefaultParameterValue(null)]object factory,
-                [Optional][DefaultParameterValue(0)]int cached_statements)
+                [Optional][DefaultParameterValue(100)]int cached_statements)
             {
                 this.text_factory = typeof(string);
 
@@ -110,6 +112,8 @@ namespace IronPython.SQLite
                 this.detect_types = detect_types;
                 this.timeout = timeout;
                 this.check_same_thread = check_same_thread;
+
+                this.statement_cache = new StatementCache(this, cached_statements);
             }
 
             ~Connection()
@@ -123,6 +127,7 @@ namespace IronPython.SQLite
             {
                 checkThread();
 
+                this.statement_cache.Clear();
                 doAllStatements(AllStatmentsAction.Finalize);
 
                 if(this.db != null)
@@ -255,6 +260,21 @@ namespace IronPython.SQLite
             }
 
             public object __call__(string sql)
+            {
+                return createStatement(sql);
+            }
+
+            [Documentation("Returns (hits, misses, maxsize, currsize) for the prepared statement cache. Non-standard.")]
+            public PythonTuple statement_cache_info()
+            {
+                return PythonTuple.MakeTuple(
+                    this.statement_cache.Hits,
+                    this.statement_cache.Misses,
+                    this.statement_cache.MaxSize,
+                    this.statement_cache.Count);
+            }
+
+            internal Statement createStatement(string sql)
             {
                 dropUnusedStatementReferences();
 
@@ -263,6 +283,11 @@ namespace IronPython.SQLite
                 return statement;
             }
 
+            internal void invalidateStatementCache()
+            {
+                this.statement_cache.Clear();
+            }
+
             private void dropUnusedStatementReferences()
             {
                 if(this.created_statements++ < 200)
@@ -80,7 +80,8 @@ namespace IronPython.SQLite
 
             ~Cursor()
             {
-                if(this.statement != null)
+                // the statement may have been handed to another cursor by the cache
+                if(this.statement != null && this.statement.owner == this)
                     this.statement.Reset();
             }
 
@@ -89,7 +90,7 @@ namespace IronPython.SQLite
             {
                 connection.checkThread(); connection.checkConnection();
 
-                if(this.statement != null)
+                if(this.statement != null && this.statement.owner == this)
                 {
                     this.statement.Reset();
                 }
@@ -138,17 +139,14 @@ namespace IronPython.SQLite
                     parameters_iter = parameters_list.GetEnumerator();
                 }
 
-                if(this.statement != null)
+                if(this.statement != null && this.statement.owner == this)
                     rc = this.statement.Reset();
 
                 this.description = null;
                 this.rowcount = -1;
 
-                // TODO: use stmt cache instead ?
-                this.statement = (Statement)this.connection.__call__(operation);
-
-                if(this.statement.in_use)
-                    this.statement = new Statement(connection, operation);
+                this.statement = this.connection.statement_cache.Get(operation);
+                this.statement.owner = this;
 
                 this.statement.Reset();
                 this.statement.MarkDirty();
@@ -290,6 +288,9 @@ namespace IronPython.SQLite
                         rc = this.statement.Reset();
                 }
 
+                if(this.statement.IsSchemaChange)
+                    this.connection.invalidateStatementCache();
+
                 return this;
             }
 
@@ -416,6 +417,9 @@ namespace IronPython.SQLite
                 if(!statement_completed)
                     throw MakeProgrammingError("you did not provide a complete SQL statement");
 
+                // the script may have altered the schema
+                this.connection.invalidateStatementCache();
+
                 return this;
             }
 
@@ -49,9 +49,12 @@ namespace IronPython.SQLite
         private string sql;
         private bool bound = false;
         internal bool in_use = false;
+        internal object owner;
 
         public string Tail { get; private set; }
 
+        public string Sql { get { return this.sql; } }
+
         public Statement(PythonSQLite.Connection connection, string operation)
         {
             this.uniqueid = Guid.NewGuid();
@@ -119,6 +122,25 @@ namespace IronPython.SQLite
             }
         }
 
+        /// <summary>
+        /// True for statements that may change the database schema, which
+        /// invalidates every other prepared statement on the connection.
+        /// </summary>
+        public bool IsSchemaChange
+        {
+            get
+            {
+                if(this.StatementType != StatementType.Other)
+                    return false;
+
+                string s = this.sql.TrimStart();
+
+                return CultureInfo.InvariantCulture.CompareInfo.IsPrefix(s, "create", CompareOptions.IgnoreCase) ||
+                    CultureInfo.InvariantCulture.CompareInfo.IsPrefix(s, "drop", CompareOptions.IgnoreCase) ||
+                    CultureInfo.InvariantCulture.CompareInfo.IsPrefix(s, "alter", CompareOptions.IgnoreCase);
+            }
+        }
+
         public void BindParameters(CodeContext context, object parameters)
         {
             if(bound)
@@ -327,11 +349,13 @@ namespace IronPython.SQLite
             int rc = Sqlite3.sqlite3_prepare(this.db, this.sql, -1, ref new_st, ref tail);
             if(rc == Sqlite3.SQLITE_OK)
             {
-                Statement new_stmt = new Statement(this.st.db, new_st, this.sql, tail);
-                new_stmt.BindParameters(context, parameters);
-
+                // swap in place so that cached references to this statement stay valid
                 Sqlite3.sqlite3_finalize(this.st);
                 this.st = new_st;
+                this.Tail = tail;
+                this.bound = false;
+
+                this.BindParameters(context, parameters);
             }
 
             return rc;
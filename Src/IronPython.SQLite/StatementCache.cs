@@ -0,0 +1,105 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Jeff Hardy 2010-2012.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System.Collections.Generic;
+using System.Diagnostics;
+
+namespace IronPython.SQLite
+{
+    /// <summary>
+    /// Per-connection LRU cache of prepared statements, keyed by SQL text.
+    ///
+    /// Statements that are currently in use by a cursor are never handed out
+    /// twice; a fresh, uncached statement is prepared instead. Evicted statements
+    /// are not finalized eagerly since a cursor may still hold on to them, they
+    /// are cleaned up by their finalizer.
+    /// </summary>
+    [DebuggerDisplay("{Count}/{maxsize}")]
+    internal class StatementCache
+    {
+        private readonly PythonSQLite.Connection connection;
+        private readonly int maxsize;
+        private readonly Dictionary<string, LinkedListNode<Statement>> map = new Dictionary<string, LinkedListNode<Statement>>();
+        private readonly LinkedList<Statement> lru = new LinkedList<Statement>();
+
+        private int hits, misses;
+
+        public StatementCache(PythonSQLite.Connection connection, int maxsize)
+        {
+            this.connection = connection;
+            this.maxsize = maxsize;
+        }
+
+        public int Hits { get { return hits; } }
+        public int Misses { get { return misses; } }
+        public int MaxSize { get { return maxsize; } }
+        public int Count { get { return map.Count; } }
+
+        public Statement Get(string sql)
+        {
+            LinkedListNode<Statement> node;
+            if(map.TryGetValue(sql, out node))
+            {
+                Statement cached = node.Value;
+                if(cached.st == null)
+                {
+                    // finalized behind our back (e.g. by rollback/close), drop it
+                    Remove(node);
+                }
+                else if(!cached.in_use)
+                {
+                    this.hits++;
+                    if(node != lru.First)
+                    {
+                        lru.Remove(node);
+                        lru.AddFirst(node);
+                    }
+                    return cached;
+                }
+                else
+                {
+                    // still being stepped by another cursor, don't share it
+                    this.misses++;
+                    return this.connection.createStatement(sql);
+                }
+            }
+
+            this.misses++;
+
+            Statement statement = this.connection.createStatement(sql);
+            if(this.maxsize > 0)
+            {
+                if(map.Count >= this.maxsize)
+                    Remove(lru.Last);
+
+                map[sql] = lru.AddFirst(statement);
+            }
+
+            return statement;
+        }
+
+        public void Clear()
+        {
+            map.Clear();
+            lru.Clear();
+        }
+
+        private void Remove(LinkedListNode<Statement> node)
+        {
+            map.Remove(node.Value.Sql);
+            lru.Remove(node);
+        }
+    }
+}
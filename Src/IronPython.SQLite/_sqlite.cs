@@ -56,7 +56,7 @@ namespace IronPython.SQLite
             [Optional][DefaultParameterValue((string)null)]string isolation_level,
             [Optional][DefaultParameterValue(true)]bool check_same_thread,
             [Optional][DefaultParameterValue(null)]object factory,
-            [Optional][DefaultParameterValue(0)]int cached_statements)
+            [Optional][DefaultParameterValue(100)]int cached_statements)
         {
             if(factory == null)
                 return new Connection(database, timeout, detect_types, isolation_level, check_same_thread, factory, cached_statements);
@@ -100,6 +100,11 @@ namespace IronPython.Compiler.Ast {
         public static readonly MethodInfo FormatUnicode = GetMethod((Func<CodeContext, string, object, string>)PythonOps.FormatUnicode);
         public static readonly MethodInfo FormatString = GetMethod((Func<CodeContext, string, object, string>)PythonOps.FormatString);
         public static readonly MethodInfo GetUnicodeFunction = GetMethod((Func<BuiltinFunction>)PythonOps.GetUnicodeFuntion);
+        public static readonly MethodInfo GetRangeLoopCount = GetMethod((Func<object, object, object, object, int>)PythonOps.GetRangeLoopCount);
+        public static readonly MethodInfo Int32ToObject = GetMethod((Func<int, object>)ScriptingRuntimeHelpers.Int32ToObject);
+        public static readonly MethodInfo BooleanToObject = GetMethod((Func<bool, object>)ScriptingRuntimeHelpers.BooleanToObject);
+        public static readonly MethodInfo FunctionCountCall = GetMethod((Action<PythonFunction>)PythonOps.FunctionCountCall);
+        public static readonly MethodInfo Int64ToBigIntegerObject = GetMethod((Func<long, object>)PythonOps.Int64ToBigIntegerObject);
         public static readonly MethodInfo GeneratorCheckThrowableAndReturnSendValue = GetMethod((Func<object, object>)PythonOps.GeneratorCheckThrowableAndReturnSendValue);
         
         private static MethodInfo GetMethod(Delegate x) {
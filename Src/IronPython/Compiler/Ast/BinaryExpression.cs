@@ -175,6 +175,9 @@ namespace IronPython.Compiler.Ast {
             if (NeedComparisonTransformation()) {
                 // This is a compound comparison like: (a < b < c)
                 return FinishCompare(_left);
+            } else if (CanSpecialize && (_feedback == FeedbackInt || _feedback == FeedbackDouble)) {
+                // The interpreter has only seen ints or only floats here.
+                return MakeSpecializedOperation();
             } else {
                 // Simple binary operator.
                 return MakeBinaryOperation(_op, _left, _right, Span);
@@ -202,7 +205,17 @@ namespace IronPython.Compiler.Ast {
                     compiler.Instructions.Emit(IsNotInstruction.Instance);
                     break;
                 default:
-                    compiler.Compile(Reduce());
+                    if (CanSpecialize && ConstantFold() == null) {
+                        // record the operand types for when the function gets compiled
+                        compiler.Compile(_left);
+                        compiler.Compile(_right);
+                        compiler.Instructions.Emit(new TypeFeedbackInstruction(this));
+                        compiler.Instructions.EmitDynamic<object, object, object>(
+                            Binders.BinaryOperationBinder(GlobalParent.PyContext, PythonOperatorToAction(_op))
+                        );
+                    } else {
+                        compiler.Compile(Reduce());
+                    }
                     break;
             }
         }
@@ -244,6 +257,153 @@ namespace IronPython.Compiler.Ast {
 
 
 
+        class TypeFeedbackInstruction : Instruction {
+            private readonly BinaryExpression _node;
+
+            public TypeFeedbackInstruction(BinaryExpression node) {
+                _node = node;
+            }
+
+            public override int ConsumedStack {
+                get {
+                    return 2;
+                }
+            }
+
+            public override int ProducedStack {
+                get {
+                    return 2;
+                }
+            }
+
+            public override int Run(InterpretedFrame frame) {
+                object right = frame.Pop();
+                object left = frame.Pop();
+                _node.RecordFeedback(left, right);
+                frame.Push(left);
+                frame.Push(right);
+                return +1;
+            }
+        }
+
+        #endregion
+
+        #region Type Feedback
+
+        // Operand types seen while the enclosing function runs in the interpreter.  Once it
+        // gets compiled, int-only and float-only operations are emitted as inline arithmetic
+        // guarded by a type check which falls back to the dynamic site.
+        private const int FeedbackInt = 0x01, FeedbackDouble = 0x02, FeedbackOther = 0x04;
+        private int _feedback;
+
+        private bool CanSpecialize {
+            get {
+                if (!(Parent is FunctionDefinition) || CanEmitWarning(_op)) {
+                    return false;
+                }
+
+                switch (_op) {
+                    case PythonOperator.Add:
+                    case PythonOperator.Subtract:
+                    case PythonOperator.Multiply:
+                    case PythonOperator.LessThan:
+                    case PythonOperator.LessThanOrEqual:
+                    case PythonOperator.GreaterThan:
+                    case PythonOperator.GreaterThanOrEqual:
+                    case PythonOperator.Equal:
+                    case PythonOperator.NotEqual:
+                        return true;
+                }
+                return false;
+            }
+        }
+
+        private void RecordFeedback(object left, object right) {
+            int kind;
+            if (left != null && right != null && left.GetType() == right.GetType()) {
+                if (left.GetType() == typeof(int)) {
+                    kind = FeedbackInt;
+                } else if (left.GetType() == typeof(double) && !IsComparison()) {
+                    // float comparisons have special cases for nan and infinity, leave them to the site
+                    kind = FeedbackDouble;
+                } else {
+                    kind = FeedbackOther;
+                }
+            } else {
+                kind = FeedbackOther;
+            }
+
+            // racing updates can lose a bit, which only costs a failed guard later
+            if ((_feedback & kind) == 0) {
+                _feedback |= kind;
+            }
+        }
+
+        /// <summary>
+        /// Emits the operation for the operand type recorded in _feedback:
+        /// 
+        /// left, right = _left, _right
+        /// if type(left) is type(right) is int (or float): unboxed operation, ints promote to long on overflow
+        /// else: the dynamic site
+        /// </summary>
+        private MSAst.Expression MakeSpecializedOperation() {
+            Type type = _feedback == FeedbackInt ? typeof(int) : typeof(double);
+            MSAst.ParameterExpression left = Ast.Variable(typeof(object), "left");
+            MSAst.ParameterExpression right = Ast.Variable(typeof(object), "right");
+            MSAst.Expression x = Ast.Unbox(left, type);
+            MSAst.Expression y = Ast.Unbox(right, type);
+
+            MSAst.Expression fast;
+            if (IsComparison()) {
+                MSAst.Expression compare;
+                switch (_op) {
+                    case PythonOperator.LessThan: compare = Ast.LessThan(x, y); break;
+                    case PythonOperator.LessThanOrEqual: compare = Ast.LessThanOrEqual(x, y); break;
+                    case PythonOperator.GreaterThan: compare = Ast.GreaterThan(x, y); break;
+                    case PythonOperator.GreaterThanOrEqual: compare = Ast.GreaterThanOrEqual(x, y); break;
+                    case PythonOperator.Equal: compare = Ast.Equal(x, y); break;
+                    default: compare = Ast.NotEqual(x, y); break;
+                }
+                fast = Ast.Call(AstMethods.BooleanToObject, compare);
+            } else if (type == typeof(double)) {
+                fast = AstUtils.Convert(MakeArithmetic(x, y), typeof(object));
+            } else {
+                // int results are computed as long, anything outside of int becomes a long
+                MSAst.ParameterExpression res = Ast.Variable(typeof(long), "res");
+                fast = Ast.Block(
+                    new[] { res },
+                    Ast.Assign(res, MakeArithmetic(Ast.Convert(x, typeof(long)), Ast.Convert(y, typeof(long)))),
+                    Ast.Condition(
+                        Ast.AndAlso(
+                            Ast.GreaterThanOrEqual(res, AstUtils.Constant((long)Int32.MinValue)),
+                            Ast.LessThanOrEqual(res, AstUtils.Constant((long)Int32.MaxValue))
+                        ),
+                        Ast.Call(AstMethods.Int32ToObject, Ast.Convert(res, typeof(int))),
+                        Ast.Call(AstMethods.Int64ToBigIntegerObject, res)
+                    )
+                );
+            }
+
+            return Ast.Block(
+                new[] { left, right },
+                Ast.Assign(left, AstUtils.Convert(_left, typeof(object))),
+                Ast.Assign(right, AstUtils.Convert(_right, typeof(object))),
+                Ast.Condition(
+                    Ast.AndAlso(Ast.TypeIs(left, type), Ast.TypeIs(right, type)),
+                    fast,
+                    MakeBinaryOperation(_op, left, right, Span)
+                )
+            );
+        }
+
+        private MSAst.Expression MakeArithmetic(MSAst.Expression x, MSAst.Expression y) {
+            switch (_op) {
+                case PythonOperator.Add: return Ast.Add(x, y);
+                case PythonOperator.Subtract: return Ast.Subtract(x, y);
+                default: return Ast.Multiply(x, y);
+            }
+        }
+
         #endregion
 
         internal override string CheckAssign() {
@@ -21,6 +21,8 @@ using System.Collections.Generic;
 using System.Reflection;
 
 using Microsoft.Scripting;
+using Microsoft.Scripting.Actions;
+using Microsoft.Scripting.Runtime;
 
 using IronPython.Runtime.Binding;
 using IronPython.Runtime.Operations;
@@ -89,6 +91,11 @@ namespace IronPython.Compiler.Ast {
             // Temporary variable for the IEnumerator object
             MSAst.ParameterExpression enumerator = Ast.Variable(typeof(KeyValuePair<IEnumerator, IDisposable>), "foreach_enumerator");
 
+            CallExpression range = GetRangeCall(_list);
+            if (range != null) {
+                return TransformRangeFor(range, enumerator);
+            }
+
             return Ast.Block(new[] { enumerator }, TransformFor(Parent, enumerator, _list, _left, _body, _else, Span, GlobalParent.IndexToLocation(_headerIndex), _break, _continue, true));
         }
 
@@ -110,6 +117,150 @@ namespace IronPython.Compiler.Ast {
             walker.PostWalk(this);
         }
 
+        /// <summary>
+        /// Returns the call if the loop is over range(...) or xrange(...) with 1 to 3 positional
+        /// arguments.  Whether the name still refers to the builtin is checked at runtime.
+        /// </summary>
+        private static CallExpression GetRangeCall(Expression list) {
+            CallExpression call = list as CallExpression;
+            if (call == null) {
+                return null;
+            }
+
+            NameExpression name = call.Target as NameExpression;
+            if (name == null || (name.Name != "range" && name.Name != "xrange")) {
+                return null;
+            }
+
+            if (call.Args.Count < 1 || call.Args.Count > 3) {
+                return null;
+            }
+
+            foreach (Arg arg in call.Args) {
+                if (arg.Name != null) {
+                    return null;
+                }
+            }
+
+            return call;
+        }
+
+        /// <summary>
+        /// Transforms a loop over range(...) or xrange(...) into a counted int loop which doesn't
+        /// create the list or the xrange iterator.  If the name has been rebound or the arguments
+        /// aren't ints the call is made and its result iterated as usual.  Both cases share the
+        /// loop so that the body is only emitted once.
+        /// </summary>
+        private MSAst.Expression TransformRangeFor(CallExpression range, MSAst.ParameterExpression enumerator) {
+            MSAst.ParameterExpression func = Ast.Variable(typeof(object), "range_func");
+            MSAst.ParameterExpression counted = Ast.Variable(typeof(bool), "range_counted");
+            MSAst.ParameterExpression count = Ast.Variable(typeof(int), "range_count");
+            MSAst.ParameterExpression current = Ast.Variable(typeof(int), "range_current");
+            MSAst.ParameterExpression step = Ast.Variable(typeof(int), "range_step");
+
+            List<MSAst.ParameterExpression> variables = new List<MSAst.ParameterExpression> { enumerator, func, counted, count, current, step };
+            List<MSAst.Expression> init = new List<MSAst.Expression>();
+
+            // func = range; args = (start, stop, step)
+            init.Add(Ast.Assign(func, AstUtils.Convert(range.Target, typeof(object))));
+
+            MSAst.ParameterExpression[] args = new MSAst.ParameterExpression[range.Args.Count];
+            for (int i = 0; i < args.Length; i++) {
+                args[i] = Ast.Variable(typeof(object), "range_arg" + i);
+                variables.Add(args[i]);
+                init.Add(Ast.Assign(args[i], AstUtils.Convert(range.Args[i].Expression, typeof(object))));
+            }
+
+            MSAst.Expression startArg = args.Length > 1 ? args[0] : (MSAst.Expression)Ast.Constant(ScriptingRuntimeHelpers.Int32ToObject(0), typeof(object));
+            MSAst.Expression stopArg = args.Length > 1 ? args[1] : args[0];
+            MSAst.Expression stepArg = args.Length > 2 ? args[2] : (MSAst.Expression)Ast.Constant(ScriptingRuntimeHelpers.Int32ToObject(1), typeof(object));
+
+            MSAst.Expression[] callArgs = new MSAst.Expression[args.Length + 2];
+            Argument[] kinds = new Argument[args.Length];
+            callArgs[0] = Parent.LocalContext;
+            callArgs[1] = func;
+            for (int i = 0; i < args.Length; i++) {
+                kinds[i] = Argument.Simple;
+                callArgs[i + 2] = args[i];
+            }
+
+            // count = GetRangeLoopCount(func, start, stop, step)
+            // if count >= 0:
+            //    counted, current, step = True, start, step
+            // else:
+            //    enumerator = Dynamic(GetEnumeratorBinder, func(*args))
+            init.Add(Ast.Assign(count, Ast.Call(AstMethods.GetRangeLoopCount, func, startArg, stopArg, stepArg)));
+            init.Add(
+                Ast.IfThenElse(
+                    Ast.GreaterThanOrEqual(count, Ast.Constant(0)),
+                    Ast.Block(
+                        Ast.Assign(counted, AstUtils.Constant(true)),
+                        Ast.Assign(current, Ast.Convert(startArg, typeof(int))),
+                        Ast.Assign(step, Ast.Convert(stepArg, typeof(int)))
+                    ),
+                    Ast.Assign(
+                        enumerator,
+                        new PythonDynamicExpression1<KeyValuePair<IEnumerator, IDisposable>>(
+                            Binders.UnaryOperationBinder(
+                                GlobalParent.PyContext,
+                                PythonOperationKind.GetEnumeratorForIteration
+                            ),
+                            GlobalParent.CompilationMode,
+                            Parent.Invoke(new CallSignature(kinds), callArgs)
+                        )
+                    )
+                )
+            );
+
+            MSAst.Expression key = Ast.Property(enumerator, typeof(KeyValuePair<IEnumerator, IDisposable>).GetProperty("Key"));
+
+            // while (counted ? --count >= 0 : enumerator.MoveNext()):
+            //    left = counted ? (current += step) - step : enumerator.Current
+            //    body
+            // else:
+            //    else
+            MSAst.Expression ls = AstUtils.Loop(
+                    GlobalParent.AddDebugInfo(
+                        Ast.Condition(
+                            counted,
+                            Ast.GreaterThanOrEqual(Ast.Assign(count, Ast.Decrement(count)), Ast.Constant(0)),
+                            Ast.Call(key, typeof(IEnumerator).GetMethod("MoveNext"))
+                        ),
+                        _left.Span
+                    ),
+                    null,
+                    Ast.Block(
+                        _left.TransformSet(
+                            SourceSpan.None,
+                            Ast.Condition(
+                                counted,
+                                Ast.Call(AstMethods.Int32ToObject, Ast.Subtract(Ast.Assign(current, Ast.Add(current, step)), step)),
+                                Ast.Call(key, typeof(IEnumerator).GetProperty("Current").GetGetMethod())
+                            ),
+                            PythonOperationKind.None
+                        ),
+                        _body,
+                        UpdateLineNumber(GlobalParent.IndexToLocation(_list.StartIndex).Line),
+                        AstUtils.Empty()
+                    ),
+                    _else,
+                    _break,
+                    _continue
+            );
+
+            init.Add(
+                Ast.TryFinally(
+                    ls,
+                    Ast.Block(
+                        Ast.Call(AstMethods.ForLoopDispose, enumerator),
+                        Ast.Assign(enumerator, Ast.New(typeof(KeyValuePair<IEnumerator, IDisposable>)))
+                    )
+                )
+            );
+
+            return Ast.Block(variables, init);
+        }
+
         internal static MSAst.Expression TransformFor(ScopeStatement parent, MSAst.ParameterExpression enumerator,
                                                     Expression list, Expression left, MSAst.Expression body,
                                                     Statement else_, SourceSpan span, SourceLocation header,
@@ -637,6 +637,10 @@ namespace IronPython.Compiler.Ast {
                 statements.Add(UpdateLineNumber(GlobalParent.IndexToLocation(_body.StartIndex).Line));
             }
 
+            if (GlobalParent.PyContext.PythonOptions.CompilationProfile) {
+                statements.Add(Ast.Call(AstMethods.FunctionCountCall, _functionParam));
+            }
+
             statements.Add(Body);
             MSAst.Expression body = Ast.Block(statements);
 
@@ -50,12 +50,23 @@ namespace IronPython.Compiler {
             _compilationThreshold = compilationThreshold;
         }
 
-        public T EnsureDelegate() {
+        /// <summary>
+        /// Returns the delegate, creating it on first use.  If a compilation queue is provided,
+        /// code which isn't interpreted runs interpreted until the queue has compiled it.  The
+        /// interpreter keeps the usual compilation threshold so loops in code which is already
+        /// running are still compiled.
+        /// </summary>
+        public T EnsureDelegate(CompilationQueue queue) {
             if (Delegate == null) {
                 lock (this) {
                     if (Delegate == null) {
-                        Delegate = Compile();
-                        Code = null;
+                        if (!_shouldInterpret && queue != null) {
+                            Delegate = (T)(object)Microsoft.Scripting.Generation.CompilerHelpers.LightCompile(Code, _compilationThreshold);
+                            queue.Enqueue(CompileInBackground);
+                        } else {
+                            Delegate = Compile();
+                            Code = null;
+                        }
                     }
                 }
             }
@@ -63,6 +74,14 @@ namespace IronPython.Compiler {
             return Delegate;
         }
 
+        private void CompileInBackground() {
+            T compiled = Code.Compile();
+            lock (this) {
+                Delegate = compiled;
+                Code = null;
+            }
+        }
+
         private T Compile() {
             if (_shouldInterpret) {
                 return (T)(object)Microsoft.Scripting.Generation.CompilerHelpers.LightCompile(Code, _compilationThreshold);
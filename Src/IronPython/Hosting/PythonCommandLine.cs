@@ -305,11 +305,24 @@ namespace IronPython.Hosting {
             if (Options.SkipImportSite)
                 return;
 
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+            StartupImage image = PythonContext.StartupImage;
+            if (image != null) {
+                image.BeginStartupImports();
+            }
+#endif
+
             try {
                 Importer.ImportModule(PythonContext.SharedContext, null, "site", false, -1);
             } catch (Exception e) {
                 Console.Write(Language.FormatException(e), Style.Error);
             }
+
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+            if (image != null) {
+                image.EndStartupImports();
+            }
+#endif
         }
 
         #endregion
@@ -186,6 +186,50 @@ namespace IronPython.Hosting {
                     LanguageSetup.Options["LightweightScopes"] = ScriptingRuntimeHelpers.True;
                     break;
 
+                case "-X:ImportProfile":
+                    LanguageSetup.Options["ImportProfile"] = ScriptingRuntimeHelpers.True;
+                    break;
+
+                case "-X:StartupImage":
+                    LanguageSetup.Options["StartupImage"] = PopNextArg();
+                    break;
+
+                case "-X:RegexEngine":
+                    string engine = PopNextArg();
+                    if (engine != "cli" && engine != "sre") {
+                        throw new InvalidOptionException(String.Format("The argument for the {0} option must be cli or sre.", arg));
+                    }
+                    LanguageSetup.Options["RegexEngine"] = engine;
+                    break;
+
+                case "-X:BackgroundCompilation":
+                    LanguageSetup.Options["BackgroundCompilation"] = ScriptingRuntimeHelpers.True;
+                    break;
+
+                case "-X:CompilationProfile":
+                    LanguageSetup.Options["CompilationProfile"] = ScriptingRuntimeHelpers.True;
+                    break;
+
+                case "-X:RegexCacheSize":
+                    int cacheSize;
+                    if (!StringUtils.TryParseInt32(PopNextArg(), out cacheSize) || cacheSize < 0) {
+                        throw new InvalidOptionException(String.Format("The argument for the {0} option must be a non-negative integer.", arg));
+                    }
+                    LanguageSetup.Options["RegexCacheSize"] = cacheSize;
+                    break;
+
+                case "-X:EvalCacheSize":
+                    int evalCacheSize;
+                    if (!StringUtils.TryParseInt32(PopNextArg(), out evalCacheSize) || evalCacheSize < 0) {
+                        throw new InvalidOptionException(String.Format("The argument for the {0} option must be a non-negative integer.", arg));
+                    }
+                    LanguageSetup.Options["EvalCacheSize"] = evalCacheSize;
+                    break;
+
+                case "-X:CompiledCodeCache":
+                    LanguageSetup.Options["CompiledCodeCache"] = PopNextArg();
+                    break;
+
                 case "-X:MTA":
                     ConsoleOptions.IsMta = true;
                     break;
@@ -294,6 +338,14 @@ namespace IronPython.Hosting {
                 { "-X:Python30",            "Enable available Python 3.0 features" },
                 { "-X:EnableProfiler",      "Enables profiling support in the compiler" },
                 { "-X:LightweightScopes",   "Generate optimized scopes that can be garbage collected" },
+                { "-X:ImportProfile",       "Report the time taken by each import to stderr" },
+                { "-X:StartupImage <file>", "Save the startup state to file on the first launch and load it on later launches" },
+                { "-X:CompiledCodeCache <dir>", "Cache compiled modules in dir and reuse them while the source is unchanged" },
+                { "-X:RegexEngine <cli|sre>", "Select the engine used by the re module (default cli)" },
+                { "-X:RegexCacheSize <n>",  "Number of patterns cached by the re module functions (default 100)" },
+                { "-X:BackgroundCompilation", "Compile functions on a background thread while they run interpreted" },
+                { "-X:CompilationProfile",  "Count function calls for clr.GetCompilationProfile" },
+                { "-X:EvalCacheSize <n>",   "Number of exec/eval source strings whose code is cached (default 100)" },
                 { "-X:BasicConsole",        "Use only the basic console features" },
             };
 
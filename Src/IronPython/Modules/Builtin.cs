@@ -491,7 +491,7 @@ namespace IronPython.Modules {
             var compilerOptions = GetRuntimeGeneratedCodeCompilerOptions(context, true, 0);
             compilerOptions.Module |= ModuleOptions.LightThrow;
             compilerOptions.Module &= ~ModuleOptions.ModuleBuiltins;
-            var code = FunctionCode.FromSourceUnit(sourceUnit, compilerOptions, false);
+            var code = FunctionCode.FromSourceText(sourceUnit, compilerOptions);
 
             return code.Call(scope);
         }
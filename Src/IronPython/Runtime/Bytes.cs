@@ -35,7 +35,7 @@ using IronPython.Runtime.Types;
 
 namespace IronPython.Runtime {
     [PythonType("bytes")]
-    public class Bytes : IList<byte>, ICodeFormattable, IExpressionSerializable, IBufferProtocol {
+    public class Bytes : IList<byte>, ICodeFormattable, IExpressionSerializable, IBufferProtocol, IDirectBuffer {
         internal byte[]/*!*/ _bytes;
         internal static Bytes/*!*/ Empty = new Bytes();
 
@@ -1043,5 +1043,19 @@ namespace IronPython.Runtime {
         }
 
         #endregion
+
+        #region IDirectBuffer Members
+
+        bool IDirectBuffer.TryGetSegment(bool writable, out ArraySegment<byte> segment) {
+            if (writable) {
+                segment = default(ArraySegment<byte>);
+                return false;
+            }
+
+            segment = new ArraySegment<byte>(_bytes);
+            return true;
+        }
+
+        #endregion
     }
 }
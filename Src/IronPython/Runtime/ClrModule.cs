@@ -1128,6 +1128,157 @@ import Namespace.")]
             po.EnableProfiler = enable;
         }
 
+#if FEATURE_THREAD
+        /// <summary>
+        /// Starts the sampling profiler for the current ScriptEngine.  Every interval milliseconds
+        /// the Python call stacks of all threads are recorded.  Unlike EnableProfiler or sys.settrace
+        /// no code needs to be recompiled and the profiled threads run at full speed.
+        /// </summary>
+        public static void StartSamplingProfiler(CodeContext/*!*/ context, [DefaultParameterValue(SamplingProfiler.DefaultInterval)]int interval) {
+            SamplingProfiler.GetSamplingProfiler(context.LanguageContext).Start(interval);
+        }
+
+        /// <summary>
+        /// Stops the sampling profiler.  The samples collected so far are kept.
+        /// </summary>
+        public static void StopSamplingProfiler(CodeContext/*!*/ context) {
+            SamplingProfiler.GetSamplingProfiler(context.LanguageContext).Stop();
+        }
+
+        /// <summary>
+        /// Discards all samples collected by the sampling profiler
+        /// </summary>
+        public static void ClearSamplingProfilerData(CodeContext/*!*/ context) {
+            SamplingProfiler.GetSamplingProfiler(context.LanguageContext).Reset();
+        }
+
+        /// <summary>
+        /// Returns the samples collected by the sampling profiler.
+        /// 
+        /// format can be "folded", returning a string with one "outer;...;inner count" line per
+        /// distinct stack as consumed by flame graph tools, or "pstats", returning a dictionary
+        /// in the format of pstats.Stats.stats where call counts are sample counts.
+        /// </summary>
+        public static object GetSamplingProfilerData(CodeContext/*!*/ context, [DefaultParameterValue("folded")]string format) {
+            SamplingProfiler sampler = SamplingProfiler.GetSamplingProfiler(context.LanguageContext);
+            switch (format) {
+                case "folded": return sampler.GetFoldedStacks();
+                case "pstats": return sampler.GetStats();
+                default: throw PythonOps.ValueError("unknown format: {0}", format);
+            }
+        }
+
+#if FEATURE_FILESYSTEM
+        /// <summary>
+        /// Writes the samples collected by the sampling profiler to a file.  Files written in the
+        /// "pstats" format can be loaded with pstats.Stats(filename).
+        /// </summary>
+        public static void DumpSamplingProfilerData(CodeContext/*!*/ context, [NotNull]string filename, [DefaultParameterValue("folded")]string format) {
+            object data = GetSamplingProfilerData(context, format);
+            if (format == "pstats") {
+                object marshal = Importer.ImportModule(context, new PythonDictionary(), "marshal", false, 0);
+                data = PythonOps.Invoke(context, marshal, "dumps", data);
+            }
+
+            byte[] bytes = ((string)data).MakeByteArray();
+            using (Stream stream = context.LanguageContext.DomainManager.Platform.OpenOutputFileStream(filename)) {
+                stream.Write(bytes, 0, bytes.Length);
+            }
+        }
+#endif
+#endif
+
+#if FEATURE_FILESYSTEM
+        /// <summary>
+        /// Discards the directory listings the importer has cached.  Directories are re-read when
+        /// they are modified so this is only needed when a module is created on a file system which
+        /// doesn't update the last write time of directories.
+        /// </summary>
+        public static void InvalidateImportCaches(CodeContext/*!*/ context) {
+            ImportDirectoryCache cache = context.LanguageContext.GetImportDirectoryCache();
+            if (cache != null) {
+                cache.Invalidate();
+            }
+        }
+
+        /// <summary>
+        /// Returns a dictionary with the statistics of the importer's directory listing cache: hits
+        /// is the number of file system probes answered without accessing the file system, misses
+        /// the number of times a directory was read and directories the number of cached listings.
+        /// 
+        /// Returns None if the host provides its own file system and the cache isn't used.
+        /// </summary>
+        public static PythonDictionary GetImportCacheStats(CodeContext/*!*/ context) {
+            ImportDirectoryCache cache = context.LanguageContext.GetImportDirectoryCache();
+            if (cache == null) {
+                return null;
+            }
+
+            PythonDictionary res = new PythonDictionary();
+            res["hits"] = cache.Hits;
+            res["misses"] = cache.Misses;
+            res["directories"] = cache.Count;
+            return res;
+        }
+#endif
+
+        /// <summary>
+        /// Returns the imports recorded when running with -X:ImportProfile as a list of
+        /// (name, depth, self, cumulative, find, parse, compile, exec) tuples in the order the
+        /// imports completed.  Times are in microseconds; self excludes and cumulative includes
+        /// the nested imports and self is split into the time to find, parse, compile and
+        /// execute the module.  Steps of the runtime initialization are reported with their
+        /// names in brackets.
+        /// 
+        /// Returns None if the runtime wasn't started with -X:ImportProfile.
+        /// </summary>
+        public static List GetImportProfile(CodeContext/*!*/ context) {
+            ImportProfiler profiler = context.LanguageContext.ImportProfiler;
+            return profiler != null ? profiler.GetRecords() : null;
+        }
+
+        /// <summary>
+        /// Returns a dictionary with the counters of the background compilation queue: depth is
+        /// the number of functions waiting to be compiled including the one being compiled,
+        /// compiled and failed count the finished compilations and compile_time and
+        /// max_compile_time are the total and the longest compilation time in microseconds.
+        /// 
+        /// Returns None if the runtime wasn't started with -X:BackgroundCompilation.
+        /// </summary>
+        public static PythonDictionary GetCompilationQueueStats(CodeContext/*!*/ context) {
+            CompilationQueue queue = context.LanguageContext.CompilationQueue;
+            return queue != null ? queue.GetStats() : null;
+        }
+
+        /// <summary>
+        /// Returns a list of (name, filename, line, tier, calls, compile_time, il_size) tuples for
+        /// the live code objects in the order they were created.  tier is 'interpreted', 'compiled'
+        /// or 'tracing', or None if the code hasn't run yet.  calls is the number of calls of a
+        /// function and None for module and class bodies.  compile_time is the time in
+        /// microseconds spent creating the code's delegates, not including the compilation the
+        /// interpreter starts after -X:CompilationThreshold calls.  il_size is the size of the
+        /// compiled IL in bytes or None if the code isn't compiled or the platform doesn't expose
+        /// the IL.
+        /// 
+        /// Returns None if the runtime wasn't started with -X:CompilationProfile.
+        /// </summary>
+        public static List GetCompilationProfile(CodeContext/*!*/ context) {
+            PythonContext pc = context.LanguageContext;
+            return pc.PythonOptions.CompilationProfile ? FunctionCode.GetCompilationProfile(pc) : null;
+        }
+
+        /// <summary>
+        /// Returns a dictionary with the statistics of the cache of code compiled for the source
+        /// strings passed to exec and eval: hits, misses, evictions and the current and
+        /// maximum number of cached strings (set with -X:EvalCacheSize).
+        /// 
+        /// Returns None if the cache is disabled with -X:EvalCacheSize 0.
+        /// </summary>
+        public static PythonDictionary GetEvalCacheStats(CodeContext/*!*/ context) {
+            EvalCodeCache cache = context.LanguageContext.EvalCodeCache;
+            return cache != null ? cache.GetStats() : null;
+        }
+
 #if FEATURE_SERIALIZATION
         /// <summary>
         /// Serializes data using the .NET serialization formatter for complex
@@ -0,0 +1,106 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Threading;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Compiles code off the thread which runs it when -X:BackgroundCompilation is specified.
+    ///
+    /// Functions which are compiled before they first run, such as functions containing for
+    /// loops, start out interpreted instead and the compilation is queued here.  A thread pool
+    /// thread compiles the queued code one item at a time and the compiled delegate replaces
+    /// the interpreted one when it is done, so the calling thread doesn't wait for the JIT.
+    /// </summary>
+    internal sealed class CompilationQueue {
+        private readonly Queue<Action>/*!*/ _queue = new Queue<Action>();
+        private bool _draining;
+        private int _depth;                 // queued items including the one being compiled
+        private int _compiled, _failed;
+        private long _compileTicks, _maxCompileTicks;
+
+        /// <summary>
+        /// Queues a compilation.  Exceptions thrown by it are counted and otherwise ignored, the
+        /// code keeps running interpreted.
+        /// </summary>
+        public void Enqueue(Action/*!*/ compile) {
+            lock (_queue) {
+                _queue.Enqueue(compile);
+                _depth++;
+                if (!_draining) {
+                    _draining = true;
+                    ThreadPool.QueueUserWorkItem(Drain);
+                }
+            }
+        }
+
+        private void Drain(object state) {
+            for (;;) {
+                Action compile;
+                lock (_queue) {
+                    if (_queue.Count == 0) {
+                        _draining = false;
+                        return;
+                    }
+                    compile = _queue.Dequeue();
+                }
+
+                long start = Stopwatch.GetTimestamp();
+                bool failed = false;
+                try {
+                    compile();
+                } catch (Exception) {
+                    failed = true;
+                }
+                long ticks = Stopwatch.GetTimestamp() - start;
+
+                lock (_queue) {
+                    _depth--;
+                    if (failed) {
+                        _failed++;
+                    } else {
+                        _compiled++;
+                    }
+                    _compileTicks += ticks;
+                    _maxCompileTicks = Math.Max(_maxCompileTicks, ticks);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Returns the counters reported by clr.GetCompilationQueueStats: depth is the number
+        /// of queued compilations including the one in progress, compiled and failed count the
+        /// finished ones and compile_time and max_compile_time are in microseconds.
+        /// </summary>
+        public PythonDictionary/*!*/ GetStats() {
+            PythonDictionary res = new PythonDictionary();
+            lock (_queue) {
+                res["depth"] = _depth;
+                res["compiled"] = _compiled;
+                res["failed"] = _failed;
+                res["compile_time"] = ToMicroseconds(_compileTicks);
+                res["max_compile_time"] = ToMicroseconds(_maxCompileTicks);
+            }
+            return res;
+        }
+
+        private static long ToMicroseconds(long ticks) {
+            return ticks * 1000000 / Stopwatch.Frequency;
+        }
+    }
+}
@@ -0,0 +1,259 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+
+using System;
+using System.IO;
+using System.Reflection;
+using System.Security.Cryptography;
+using System.Text;
+using System.Threading;
+
+using Microsoft.Scripting;
+using Microsoft.Scripting.Runtime;
+
+using IronPython.Compiler;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Persistent cache of compiled source modules, the IronPython equivalent of .pyc files.
+    ///
+    /// Modules are compiled with CompilationMode.ToDisk and saved as one assembly per module
+    /// in the cache directory.  The assembly name contains a hash of the source file contents,
+    /// its path, the IronPython build and the options which affect code generation so a
+    /// changed file simply misses the cache.  Older assemblies for the same file are deleted
+    /// when the new one is written.
+    ///
+    /// The cache is best effort: any failure to read or write it falls back to compiling the
+    /// module in memory.
+    /// </summary>
+    internal sealed class CompiledCodeCache {
+        private readonly PythonContext/*!*/ _context;
+        private readonly string/*!*/ _directory;
+        private int _hits, _misses, _failures;
+
+        public CompiledCodeCache(PythonContext/*!*/ context, string/*!*/ directory) {
+            _context = context;
+            _directory = directory;
+        }
+
+        public string/*!*/ Directory {
+            get { return _directory; }
+        }
+
+        public int Hits {
+            get { return _hits; }
+        }
+
+        public int Misses {
+            get { return _misses; }
+        }
+
+        public int Failures {
+            get { return _failures; }
+        }
+
+        /// <summary>
+        /// Returns true if code compiled now would be the same as code stored in the cache.
+        /// Tracing, debugging and profiling instrument the generated code so they bypass it.
+        /// </summary>
+        private bool IsEnabled {
+            get {
+                PythonOptions options = _context.PythonOptions;
+                return !options.Debug && !options.EnableProfiler && !_context.EnableTracing;
+            }
+        }
+
+        /// <summary>
+        /// Loads and initializes the module from the cache, compiling and storing it first if
+        /// needed.  Returns null if the cache can't be used for this module.
+        /// </summary>
+        public PythonModule LoadModule(SourceUnit/*!*/ sourceUnit, string/*!*/ name, string/*!*/ path) {
+            if (!IsEnabled) {
+                return null;
+            }
+
+            string assemblyPath = GetAssemblyPath(sourceUnit, name, path);
+            if (assemblyPath == null) {
+                return null;
+            }
+
+            OnDiskScriptCode code = TryLoad(assemblyPath, name);
+            if (code != null) {
+                Interlocked.Increment(ref _hits);
+            } else {
+                Interlocked.Increment(ref _misses);
+                if (!TrySave(sourceUnit, name, path, assemblyPath)) {
+                    return null;
+                }
+
+                code = TryLoad(assemblyPath, name);
+                if (code == null) {
+                    return null;
+                }
+            }
+
+            CodeContext newContext = code.CreateContext();
+            newContext.ModuleContext.InitializeBuiltins(false);
+            return _context.InitializeModule(path, newContext.ModuleContext, code, ModuleOptions.Initialize);
+        }
+
+        #region Implementation details
+
+        private OnDiskScriptCode TryLoad(string/*!*/ assemblyPath, string/*!*/ name) {
+            PlatformAdaptationLayer pal = _context.DomainManager.Platform;
+            if (!pal.FileExists(assemblyPath)) {
+                return null;
+            }
+
+            try {
+                Assembly asm = Assembly.LoadFile(assemblyPath);
+                foreach (ScriptCode sc in SavableScriptCode.LoadFromAssembly(_context.DomainManager, asm)) {
+                    OnDiskScriptCode onDisk = sc as OnDiskScriptCode;
+                    if (onDisk != null && onDisk.ModuleName == name) {
+                        return onDisk;
+                    }
+                }
+            } catch (BadImageFormatException) {
+                // truncated by a crashed writer, it'll be replaced
+                TryDelete(assemblyPath);
+            } catch (Exception) {
+                // e.g. a locked file or an assembly the current runtime can't initialize, the
+                // module is compiled in memory instead
+            }
+
+            Interlocked.Increment(ref _failures);
+            return null;
+        }
+
+        private bool TrySave(SourceUnit/*!*/ sourceUnit, string/*!*/ name, string/*!*/ path, string/*!*/ assemblyPath) {
+            try {
+                var code = _context.GetScriptCode(sourceUnit, name, ModuleOptions.Initialize, CompilationMode.ToDisk) as SavableScriptCode;
+                if (code == null) {
+                    return false;
+                }
+
+                if (!_context.DomainManager.Platform.DirectoryExists(_directory)) {
+                    System.IO.Directory.CreateDirectory(_directory);
+                }
+
+                SavableScriptCode.SaveToAssembly(assemblyPath, code);
+            } catch (SyntaxErrorException) {
+                // syntax errors are reported as usual
+                throw;
+            } catch (Exception) {
+                // e.g. another process is writing the same module or the code can't be saved,
+                // the module is compiled in memory instead
+                Interlocked.Increment(ref _failures);
+                return false;
+            }
+
+            RemoveStaleEntries(GetAssemblyPrefix(name, path), assemblyPath);
+            return true;
+        }
+
+        /// <summary>
+        /// Removes the assemblies compiled from earlier versions of the same source file.
+        /// </summary>
+        private void RemoveStaleEntries(string/*!*/ prefix, string/*!*/ current) {
+            try {
+                foreach (string file in System.IO.Directory.GetFiles(_directory, prefix + "*.dll")) {
+                    if (!String.Equals(Path.GetFullPath(file), Path.GetFullPath(current), StringComparison.OrdinalIgnoreCase)) {
+                        TryDelete(file);
+                    }
+                }
+            } catch (IOException) {
+            } catch (UnauthorizedAccessException) {
+            }
+        }
+
+        private static void TryDelete(string/*!*/ file) {
+            try {
+                File.Delete(file);
+            } catch (IOException) {
+                // still loaded by another process
+            } catch (UnauthorizedAccessException) {
+            }
+        }
+
+        private string GetAssemblyPath(SourceUnit/*!*/ sourceUnit, string/*!*/ name, string/*!*/ path) {
+            byte[] source;
+            try {
+                using (Stream stream = _context.DomainManager.Platform.OpenInputFileStream(path)) {
+                    source = new byte[stream.Length];
+                    int read = 0, count;
+                    while (read < source.Length && (count = stream.Read(source, read, source.Length - read)) > 0) {
+                        read += count;
+                    }
+                }
+            } catch (IOException) {
+                return null;
+            } catch (UnauthorizedAccessException) {
+                return null;
+            }
+
+            string key;
+            using (SHA256 sha = SHA256.Create()) {
+                byte[] header = Encoding.UTF8.GetBytes(GetCodeGenerationKey(_context) + "\0" + path + "\0");
+                sha.TransformBlock(header, 0, header.Length, header, 0);
+                sha.TransformFinalBlock(source, 0, source.Length);
+                key = ToHex(sha.Hash, 16);
+            }
+
+            return Path.Combine(_directory, GetAssemblyPrefix(name, path) + key + ".dll");
+        }
+
+        private static string/*!*/ GetAssemblyPrefix(string/*!*/ name, string/*!*/ path) {
+            // modules with the same name can come from different directories
+            using (SHA256 sha = SHA256.Create()) {
+                string pathHash = ToHex(sha.ComputeHash(Encoding.UTF8.GetBytes(path.ToLowerInvariant())), 4);
+                return name + "." + pathHash + ".";
+            }
+        }
+
+        /// <summary>
+        /// Identifies the compiler and the options which influence the generated code.
+        /// </summary>
+        internal static string/*!*/ GetCodeGenerationKey(PythonContext/*!*/ context) {
+            PythonOptions options = context.PythonOptions;
+            return String.Join(";", new string[] {
+                typeof(PythonContext).Assembly.ManifestModule.ModuleVersionId.ToString(),
+                options.PythonVersion.ToString(),
+                options.DivisionOptions.ToString(),
+                options.Optimize.ToString(),
+                options.StripDocStrings.ToString(),
+                options.Frames.ToString(),
+                options.FullFrames.ToString(),
+                options.LightweightScopes.ToString(),
+                options.RecursionLimit == Int32.MaxValue ? "norecursionlimit" : "recursionlimit",
+                options.WarnPython30.ToString(),
+                options.BytesWarning.ToString(),
+            });
+        }
+
+        private static string/*!*/ ToHex(byte[]/*!*/ bytes, int count) {
+            StringBuilder res = new StringBuilder(count * 2);
+            for (int i = 0; i < count; i++) {
+                res.Append(bytes[i].ToString("x2"));
+            }
+            return res.ToString();
+        }
+
+        #endregion
+    }
+}
+
+#endif
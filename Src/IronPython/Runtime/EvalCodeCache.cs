@@ -0,0 +1,127 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Collections.Generic;
+
+using Microsoft.Scripting;
+
+using IronPython.Compiler;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Caches the code compiled for the source strings passed to exec and eval so that running
+    /// the same string again doesn't tokenize, parse and compile it again.  compile() isn't
+    /// cached because the code objects it returns are visible to Python code.
+    ///
+    /// The code is looked up by the source text, file name, kind of code and the compiler
+    /// options, which include the __future__ features inherited from the caller.  Exec and
+    /// eval code is compiled in lookup mode and resolves names in whatever globals and locals
+    /// it runs against, so one entry serves every namespace.  When the cache is full the least
+    /// recently used code is evicted.  The size is set with -X:EvalCacheSize.
+    /// </summary>
+    internal sealed class EvalCodeCache {
+        private readonly Dictionary<Key, LinkedListNode<KeyValuePair<Key, FunctionCode>>>/*!*/ _entries = new Dictionary<Key, LinkedListNode<KeyValuePair<Key, FunctionCode>>>();
+        private readonly LinkedList<KeyValuePair<Key, FunctionCode>>/*!*/ _lru = new LinkedList<KeyValuePair<Key, FunctionCode>>();  // most recently used first
+        private readonly int _maxSize;
+        private int _hits, _misses, _evictions;
+
+        public EvalCodeCache(int maxSize) {
+            _maxSize = maxSize;
+        }
+
+        public bool TryGetValue(Key/*!*/ key, out FunctionCode code) {
+            lock (_entries) {
+                LinkedListNode<KeyValuePair<Key, FunctionCode>> node;
+                if (_entries.TryGetValue(key, out node)) {
+                    _lru.Remove(node);
+                    _lru.AddFirst(node);
+                    _hits++;
+                    code = node.Value.Value;
+                    return true;
+                }
+
+                _misses++;
+                code = null;
+                return false;
+            }
+        }
+
+        public void Add(Key/*!*/ key, FunctionCode/*!*/ code) {
+            lock (_entries) {
+                if (_entries.ContainsKey(key)) {
+                    // another thread compiled the same source
+                    return;
+                }
+
+                if (_entries.Count >= _maxSize) {
+                    _entries.Remove(_lru.Last.Value.Key);
+                    _lru.RemoveLast();
+                    _evictions++;
+                }
+
+                _entries[key] = _lru.AddFirst(new KeyValuePair<Key, FunctionCode>(key, code));
+            }
+        }
+
+        public PythonDictionary/*!*/ GetStats() {
+            PythonDictionary res = new PythonDictionary();
+            lock (_entries) {
+                res["hits"] = _hits;
+                res["misses"] = _misses;
+                res["evictions"] = _evictions;
+                res["currsize"] = _entries.Count;
+                res["maxsize"] = _maxSize;
+            }
+            return res;
+        }
+
+        internal sealed class Key : IEquatable<Key> {
+            private readonly string/*!*/ _text;
+            private readonly string _path;
+            private readonly SourceCodeKind _kind;
+            private readonly ModuleOptions _module;
+            private readonly bool _dontImplyDedent;
+            private readonly int _hashCode;
+
+            public Key(string/*!*/ text, string path, SourceCodeKind kind, PythonCompilerOptions/*!*/ options) {
+                _text = text;
+                _path = path;
+                _kind = kind;
+                _module = options.Module;
+                _dontImplyDedent = options.DontImplyDedent;
+                _hashCode = text.GetHashCode() ^ (int)_module ^ ((int)kind << 24);
+            }
+
+            public override int GetHashCode() {
+                return _hashCode;
+            }
+
+            public override bool Equals(object obj) {
+                return Equals(obj as Key);
+            }
+
+            public bool Equals(Key other) {
+                return other != null &&
+                    other._hashCode == _hashCode &&
+                    other._kind == _kind &&
+                    other._module == _module &&
+                    other._dontImplyDedent == _dontImplyDedent &&
+                    other._text == _text &&
+                    other._path == _path;
+            }
+        }
+    }
+}
@@ -52,6 +52,8 @@ namespace IronPython.Runtime {
         private readonly int _argCount;                             // cached locally because it's used during calls w/ defaults
         private bool _compilingLight;                               // true if we're compiling for light exceptions
         private int _exceptionCount;
+        internal long _callCount;                                   // the number of calls, only counted with -X:CompilationProfile
+        private long _compileTicks;                                 // the time spent creating the delegates for the code
 
         // debugging/tracing support
         private LambdaExpression _tracingLambda;                    // the transformed lambda used for tracing/debugging
@@ -275,6 +277,64 @@ namespace IronPython.Runtime {
             }
         }
 
+        /// <summary>
+        /// Returns a (name, filename, line, tier, calls, compile time, IL size) tuple for each live
+        /// function code in the order they were created, see clr.GetCompilationProfile.
+        /// </summary>
+        internal static List GetCompilationProfile(PythonContext context) {
+            List res = new List();
+            foreach (FunctionCode fc in GetAllCode(context)) {
+                res.append(fc.GetCompilationInfo(context));
+            }
+            res.reverse();
+            return res;
+        }
+
+        private PythonTuple GetCompilationInfo(PythonContext context) {
+            Delegate current;
+            string tier;
+            if (context.EnableTracing && _tracingDelegate != null) {
+                current = _tracingDelegate;
+                tier = "tracing";
+            } else {
+                current = _normalDelegate;
+                tier = current == null ? null : current.Target is LightLambda ? "interpreted" : "compiled";
+            }
+
+            return PythonTuple.MakeTuple(
+                co_name,
+                co_filename,
+                co_firstlineno,
+                tier,
+                _lambda is Compiler.Ast.FunctionDefinition ? (object)_callCount : null,
+                _compileTicks * 1000000 / Stopwatch.Frequency,
+                tier == "compiled" ? GetILSize(current) : null
+            );
+        }
+
+        /// <summary>
+        /// Gets the size of the IL of a compiled delegate or null if the runtime doesn't expose it
+        /// (the desktop CLR hides the DynamicMethod of a delegate created from an expression tree).
+        /// </summary>
+        private static object GetILSize(Delegate compiled) {
+#if FEATURE_REFEMIT
+            MethodInfo method = compiled.Method;
+            var dynamicMethod = method as System.Reflection.Emit.DynamicMethod;
+            if (dynamicMethod != null) {
+                return dynamicMethod.GetILGenerator().ILOffset;
+            }
+
+            try {
+                MethodBody body = method.GetMethodBody();
+                if (body != null) {
+                    return body.GetILAsByteArray().Length;
+                }
+            } catch (InvalidOperationException) {
+            }
+#endif
+            return null;
+        }
+
         internal static void UpdateAllCode(PythonContext context) {
             foreach (FunctionCode fc in GetAllCode(context)) {
                 fc.UpdateDelegate(context, false);
@@ -644,6 +704,31 @@ namespace IronPython.Runtime {
             return ((RunnableScriptCode)code).GetFunctionCode(register);
         }
 
+        /// <summary>
+        /// Creates an unregistered FunctionCode object for a source string run by exec or eval,
+        /// reusing the code compiled for an earlier call with the same source, file name and
+        /// options.  Unlike compile(), which creates a new code object on every call, exec and
+        /// eval don't return the code object, so callers can't tell that it's shared.
+        /// 
+        /// Code compiled while tracing is enabled isn't cached because it's only updated for
+        /// tracing when it is registered.
+        /// </summary>
+        internal static FunctionCode FromSourceText(SourceUnit sourceUnit, PythonCompilerOptions options) {
+            PythonContext context = (PythonContext)sourceUnit.LanguageContext;
+            EvalCodeCache cache = context.EvalCodeCache;
+            if (cache == null || context.EnableTracing) {
+                return FromSourceUnit(sourceUnit, options, false);
+            }
+
+            var key = new EvalCodeCache.Key(sourceUnit.GetCode(), sourceUnit.Path, sourceUnit.Kind, options);
+            FunctionCode code;
+            if (!cache.TryGetValue(key, out code)) {
+                code = FromSourceUnit(sourceUnit, options, false);
+                cache.Add(key, code);
+            }
+            return code;
+        }
+
         #endregion
 
         #region Private helper functions
@@ -740,7 +825,9 @@ namespace IronPython.Runtime {
                 }
 
                 if (_tracingDelegate == null) {
+                    long start = Stopwatch.GetTimestamp();
                     _tracingDelegate = CompileLambda(_tracingLambda, new TargetUpdaterForCompilation(context, this).SetCompiledTargetTracing);
+                    AddCompileTime(start);
                 }
 
                 finalTarget = _tracingDelegate;
@@ -754,7 +841,13 @@ namespace IronPython.Runtime {
                         LightThrowTarget = Target;
                         return;
                     }
-                    _normalDelegate = CompileLambda(GetGeneratorOrNormalLambda(), new TargetUpdaterForCompilation(context, this).SetCompiledTarget);
+                    long start = Stopwatch.GetTimestamp();
+                    if (context.CompilationQueue != null && !_lambda.ShouldInterpret && !_lambda.EmitDebugSymbols) {
+                        _normalDelegate = CompileInBackground(context, GetGeneratorOrNormalLambda());
+                    } else {
+                        _normalDelegate = CompileLambda(GetGeneratorOrNormalLambda(), new TargetUpdaterForCompilation(context, this).SetCompiledTarget);
+                    }
+                    AddCompileTime(start);
                 }
 
                 finalTarget = _normalDelegate;
@@ -879,6 +972,59 @@ namespace IronPython.Runtime {
             return code.Compile();
         }
 
+        /// <summary>
+        /// Returns an interpreted delegate for code which would otherwise be compiled right away
+        /// and queues the compilation.  The compiled delegate becomes the target when it is done
+        /// unless the code has been updated for tracing in the meantime.
+        /// 
+        /// The interpreted delegate keeps the usual compilation threshold so that loops in calls
+        /// which are already running still get compiled.  If the interpreter compiles the whole
+        /// function before the queue gets to it, that becomes the target instead.
+        /// </summary>
+        private Delegate CompileInBackground(PythonContext context, LightLambdaExpression code) {
+            EventHandler<LightLambdaCompileEventArgs> handler = new TargetUpdaterForCompilation(context, this).SetCompiledTarget;
+            Delegate interpreted = code.Compile(context.Options.CompilationThreshold);
+            var lightLambda = interpreted.Target as LightLambda;
+            if (lightLambda != null) {
+                lightLambda.Compile += handler;
+            }
+
+            context.CompilationQueue.Enqueue(() => {
+                lock (_CodeCreateAndUpdateDelegateLock) {
+                    if (_normalDelegate != interpreted) {
+                        // compiled by the interpreter or replaced
+                        return;
+                    }
+                }
+
+                long start = Stopwatch.GetTimestamp();
+                Delegate compiled = code.Compile();
+                AddCompileTime(start);
+
+                lock (_CodeCreateAndUpdateDelegateLock) {
+                    if (_normalDelegate == interpreted) {
+                        if (lightLambda != null) {
+                            lightLambda.Compile -= handler;
+                        }
+                        _normalDelegate = compiled;
+                        if (!context.EnableTracing) {
+                            SetTarget(AddRecursionCheck(context, compiled));
+                        }
+                    }
+                }
+            });
+
+            return interpreted;
+        }
+
+        /// <summary>
+        /// Compilations which the interpreter starts after CompilationThreshold calls run in
+        /// the DLR and aren't included.
+        /// </summary>
+        private void AddCompileTime(long start) {
+            Interlocked.Add(ref _compileTicks, Stopwatch.GetTimestamp() - start);
+        }
+
         internal Delegate AddRecursionCheck(PythonContext context, Delegate finalTarget) {
             if (context.RecursionLimit != Int32.MaxValue) {
                 if (finalTarget is Func<CodeContext, CodeContext> || 
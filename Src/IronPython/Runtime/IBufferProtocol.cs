@@ -60,4 +60,18 @@ namespace IronPython.Runtime {
 
         List ToList(int start, int? end);
     }
+
+    /// <summary>
+    /// Implemented by buffer objects which keep their contents in a byte array so that
+    /// consumers such as sockets, files and zlib can read or write the contents in place
+    /// instead of copying them first.
+    /// </summary>
+    public interface IDirectBuffer {
+        /// <summary>
+        /// Gets the part of the backing array which holds the contents.  Returns false if the
+        /// contents can't be accessed directly, or if writable is true and the object is
+        /// read-only.  The segment is only valid until the object is resized.
+        /// </summary>
+        bool TryGetSegment(bool writable, out ArraySegment<byte> segment);
+    }
 }
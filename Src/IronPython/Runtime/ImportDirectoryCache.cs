@@ -0,0 +1,209 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+#if FEATURE_FILESYSTEM
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Threading;
+
+using Microsoft.Scripting;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Caches the contents of the directories the importer searches so that looking for a
+    /// module in each sys.path entry doesn't cost several failed file system probes, similar
+    /// to the FileFinder of CPython 3.
+    ///
+    /// Listings are keyed by full path.  A listing is used until the last write time of its
+    /// directory changes, which is checked the first time the directory is probed during each
+    /// import statement; later probes in the same import don't touch the file system.  Because
+    /// the file system only records that time with limited precision, listings of directories
+    /// which were modified in the last couple of seconds are re-read whenever they're checked.
+    /// clr.InvalidateImportCaches drops all listings, e.g. after creating a module on a file
+    /// system which doesn't update directory times.
+    ///
+    /// The cache reads the real file system so it's only used when the host hasn't replaced
+    /// the PlatformAdaptationLayer.
+    /// </summary>
+    internal sealed class ImportDirectoryCache {
+        private static readonly TimeSpan TimestampPrecision = TimeSpan.FromSeconds(2);
+
+        private readonly Dictionary<string, DirectoryListing>/*!*/ _directories = new Dictionary<string, DirectoryListing>(StringComparer.Ordinal);
+        private int _hits, _misses, _generation;
+
+        /// <summary>
+        /// Number of file system probes answered from a listing already checked during the
+        /// current import, without accessing the file system
+        /// </summary>
+        public int Hits {
+            get { return _hits; }
+        }
+
+        /// <summary>
+        /// Number of times a directory had to be read
+        /// </summary>
+        public int Misses {
+            get { return _misses; }
+        }
+
+        public int Count {
+            get {
+                lock (_directories) {
+                    return _directories.Count;
+                }
+            }
+        }
+
+        internal static bool IsSupported(PlatformAdaptationLayer/*!*/ pal) {
+            return pal.GetType() == typeof(PlatformAdaptationLayer);
+        }
+
+        /// <summary>
+        /// Returns true if the directory contains a file (or a sub directory if isDir is true)
+        /// with exactly the given name, using case sensitive comparison even on case
+        /// insensitive file systems.  Returns false if the directory doesn't exist.
+        /// </summary>
+        public bool Contains(string/*!*/ directory, string/*!*/ name, bool isDir) {
+            DirectoryListing listing = GetListing(directory);
+            if (listing == null) {
+                return false;
+            }
+
+            return isDir ? listing.Directories.Contains(name) : listing.Files.Contains(name);
+        }
+
+        /// <summary>
+        /// Starts a new import; each listing's directory will be checked for changes again the
+        /// next time it's probed.
+        /// </summary>
+        public void BeginImport() {
+            Interlocked.Increment(ref _generation);
+        }
+
+        /// <summary>
+        /// Drops all cached listings.
+        /// </summary>
+        public void Invalidate() {
+            lock (_directories) {
+                _directories.Clear();
+            }
+        }
+
+        private DirectoryListing GetListing(string/*!*/ directory) {
+            int generation = _generation;
+            string key;
+            try {
+                key = Path.GetFullPath(directory.Length == 0 ? "." : directory);
+            } catch (ArgumentException) {
+                // invalid characters in a sys.path entry
+                return null;
+            } catch (NotSupportedException) {
+                return null;
+            } catch (IOException) {
+                return null;
+            }
+
+            DirectoryListing listing;
+            lock (_directories) {
+                if (_directories.TryGetValue(key, out listing) && listing.CheckedGeneration == generation) {
+                    _hits++;
+                    return listing.Exists ? listing : null;
+                }
+            }
+
+            DateTime lastWrite;
+            try {
+                // returns the 1601 epoch rather than failing if the directory doesn't exist
+                lastWrite = Directory.GetLastWriteTimeUtc(key);
+            } catch (IOException) {
+                return null;
+            } catch (UnauthorizedAccessException) {
+                return null;
+            }
+
+            if (listing == null || !listing.IsCurrent(lastWrite)) {
+                lock (_directories) {
+                    _misses++;
+                }
+                listing = ReadListing(key, lastWrite);
+            }
+
+            lock (_directories) {
+                if (listing != null) {
+                    listing.CheckedGeneration = generation;
+                    _directories[key] = listing;
+                } else {
+                    _directories.Remove(key);
+                }
+            }
+            return listing != null && listing.Exists ? listing : null;
+        }
+
+        private static DirectoryListing ReadListing(string/*!*/ directory, DateTime lastWrite) {
+            // take the time before reading so that a change made while we're reading
+            // isn't mistaken as older than the listing
+            DateTime readTime = DateTime.UtcNow;
+
+            if (lastWrite == DateTime.FromFileTimeUtc(0)) {
+                // a sys.path entry which doesn't exist, remembered until it's created
+                return new DirectoryListing(lastWrite, readTime, null, null);
+            }
+
+            try {
+                var files = new HashSet<string>(StringComparer.Ordinal);
+                foreach (string file in Directory.GetFiles(directory)) {
+                    files.Add(Path.GetFileName(file));
+                }
+
+                var dirs = new HashSet<string>(StringComparer.Ordinal);
+                foreach (string dir in Directory.GetDirectories(directory)) {
+                    dirs.Add(Path.GetFileName(dir));
+                }
+
+                return new DirectoryListing(lastWrite, readTime, files, dirs);
+            } catch (IOException) {
+                return null;
+            } catch (UnauthorizedAccessException) {
+                return null;
+            }
+        }
+
+        private sealed class DirectoryListing {
+            public readonly DateTime LastWriteTime;
+            public readonly bool Stable;
+            public readonly HashSet<string> Files, Directories;     // null if the directory doesn't exist
+            public int CheckedGeneration;
+
+            public DirectoryListing(DateTime lastWriteTime, DateTime readTime, HashSet<string> files, HashSet<string> directories) {
+                LastWriteTime = lastWriteTime;
+                Stable = readTime - lastWriteTime > TimestampPrecision;
+                Files = files;
+                Directories = directories;
+            }
+
+            public bool Exists {
+                get { return Files != null; }
+            }
+
+            public bool IsCurrent(DateTime lastWriteTime) {
+                return Stable && lastWriteTime == LastWriteTime;
+            }
+        }
+    }
+}
+
+#endif
@@ -0,0 +1,207 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Records how long each import takes when -X:ImportProfile is specified.
+    ///
+    /// Every module loaded by the importer is reported to stderr when its import completes
+    /// in the format of CPython's -X importtime: the time spent in the module itself and the
+    /// cumulative time including the modules it imported, both in microseconds, with the
+    /// nesting shown by indentation.  clr.GetImportProfile additionally splits the time
+    /// spent in each module into finding it, parsing, compiling and executing it.  Python
+    /// functions are compiled when they are first called so that time is part of execution.
+    ///
+    /// The initialization of the runtime itself is reported as a few pseudo modules in
+    /// brackets.
+    /// </summary>
+    internal sealed class ImportProfiler {
+        private readonly PythonContext/*!*/ _context;
+        private readonly Microsoft.Scripting.Utils.ThreadLocal<List<ImportFrame>> _stack = new Microsoft.Scripting.Utils.ThreadLocal<List<ImportFrame>>();
+        private readonly List<ImportRecord>/*!*/ _records = new List<ImportRecord>();
+        private bool _headerWritten;
+
+        public ImportProfiler(PythonContext/*!*/ context) {
+            _context = context;
+        }
+
+        public static long GetTimestamp() {
+            return Stopwatch.GetTimestamp();
+        }
+
+        /// <summary>
+        /// Starts timing the import of a module which isn't in sys.modules yet.
+        /// </summary>
+        public void Begin(string/*!*/ name) {
+            List<ImportFrame> stack = _stack.Value;
+            if (stack == null) {
+                _stack.Value = stack = new List<ImportFrame>();
+            }
+            stack.Add(new ImportFrame(name, GetTimestamp()));
+        }
+
+        /// <summary>
+        /// Finishes the import started by the last call to Begin.  Attempts which didn't find
+        /// the module aren't reported, their time is accounted to the importing module.
+        /// </summary>
+        public void End(bool found) {
+            List<ImportFrame> stack = _stack.Value;
+            ImportFrame frame = stack[stack.Count - 1];
+            stack.RemoveAt(stack.Count - 1);
+
+            long cumulative = GetTimestamp() - frame.Start;
+            ImportFrame parent = stack.Count > 0 ? stack[stack.Count - 1] : null;
+            if (!found) {
+                return;
+            }
+
+            if (parent != null) {
+                parent.Children += cumulative;
+            }
+
+            long self = Math.Max(cumulative - frame.Children, 0);
+            long exec = Math.Max(frame.Exec - frame.Children, 0);
+            long find = Math.Max(self - frame.Parse - frame.Compile - exec, 0);
+
+            Report(new ImportRecord(frame.Name, stack.Count, self, cumulative, find, frame.Parse, frame.Compile, exec));
+        }
+
+        public void AddParseTime(long ticks) {
+            ImportFrame frame = Current;
+            if (frame != null) {
+                frame.Parse += ticks;
+            }
+        }
+
+        public void AddCompileTime(long ticks) {
+            ImportFrame frame = Current;
+            if (frame != null) {
+                frame.Compile += ticks;
+            }
+        }
+
+        public void AddExecTime(long ticks) {
+            ImportFrame frame = Current;
+            if (frame != null) {
+                frame.Exec += ticks;
+            }
+        }
+
+        /// <summary>
+        /// Reports a step of the runtime initialization as a top level pseudo module.
+        /// </summary>
+        public void AddStartupTime(string/*!*/ name, long ticks) {
+            Report(new ImportRecord("[" + name + "]", 0, ticks, ticks, 0, 0, 0, ticks));
+        }
+
+        /// <summary>
+        /// Returns all imports recorded so far in the order they completed as a list of
+        /// (name, depth, self, cumulative, find, parse, compile, exec) tuples with the times
+        /// in microseconds.
+        /// </summary>
+        public List/*!*/ GetRecords() {
+            List res = new List();
+            lock (_records) {
+                foreach (ImportRecord record in _records) {
+                    res.AddNoLock(PythonTuple.MakeTuple(
+                        record.Name,
+                        record.Depth,
+                        ToMicroseconds(record.Self),
+                        ToMicroseconds(record.Cumulative),
+                        ToMicroseconds(record.Find),
+                        ToMicroseconds(record.Parse),
+                        ToMicroseconds(record.Compile),
+                        ToMicroseconds(record.Exec)
+                    ));
+                }
+            }
+            return res;
+        }
+
+        public void Clear() {
+            lock (_records) {
+                _records.Clear();
+            }
+        }
+
+        #region Implementation details
+
+        private ImportFrame Current {
+            get {
+                List<ImportFrame> stack = _stack.Value;
+                return stack != null && stack.Count > 0 ? stack[stack.Count - 1] : null;
+            }
+        }
+
+        private void Report(ImportRecord/*!*/ record) {
+            lock (_records) {
+                _records.Add(record);
+
+                TextWriter writer = _context.DomainManager.SharedIO.ErrorWriter;
+                if (!_headerWritten) {
+                    writer.WriteLine("import time: self [us] | cumulative | imported package");
+                    _headerWritten = true;
+                }
+                writer.WriteLine(
+                    "import time: {0,9} | {1,10} | {2}{3}",
+                    ToMicroseconds(record.Self),
+                    ToMicroseconds(record.Cumulative),
+                    new string(' ', record.Depth * 2 + 1),
+                    record.Name
+                );
+                writer.Flush();
+            }
+        }
+
+        private static long ToMicroseconds(long ticks) {
+            return ticks * 1000000 / Stopwatch.Frequency;
+        }
+
+        private sealed class ImportFrame {
+            public readonly string/*!*/ Name;
+            public readonly long Start;
+            public long Children, Parse, Compile, Exec;
+
+            public ImportFrame(string/*!*/ name, long start) {
+                Name = name;
+                Start = start;
+            }
+        }
+
+        private sealed class ImportRecord {
+            public readonly string/*!*/ Name;
+            public readonly int Depth;
+            public readonly long Self, Cumulative, Find, Parse, Compile, Exec;
+
+            public ImportRecord(string/*!*/ name, int depth, long self, long cumulative, long find, long parse, long compile, long exec) {
+                Name = name;
+                Depth = depth;
+                Self = self;
+                Cumulative = cumulative;
+                Find = find;
+                Parse = parse;
+                Compile = compile;
+                Exec = exec;
+            }
+        }
+
+        #endregion
+    }
+}
@@ -195,6 +195,13 @@ namespace IronPython.Runtime {
                 throw PythonOps.ImportError("Import by filename is not supported.", modName);
             }
 
+#if FEATURE_FILESYSTEM
+            ImportDirectoryCache cache = context.LanguageContext.GetImportDirectoryCache();
+            if (cache != null) {
+                cache.BeginImport();
+            }
+#endif
+
             string package = null;
             object attribute;
             PythonDictionary pyGlobals = globals as PythonDictionary;
@@ -239,24 +246,36 @@ namespace IronPython.Runtime {
                 List path;      // path to search
                 if (TryGetNameAndPath(context, globals, firstName, level, package, out name, out path, out parentModule)) {
                     finalName = name;
-                    // import relative
-                    if (!TryGetExistingOrMetaPathModule(context, name, path, out newmod)) {
-                        newmod = ImportFromPath(context, firstName, name, path);
-                        if (newmod == null) {
-                            // add an indirection entry saying this module does not exist
-                            // see http://www.python.org/doc/essays/packages.html "Dummy Entries"
-                            context.LanguageContext.SystemStateModules[name] = null;
-                        } else if (parentModule != null) {
-                            parentModule.__dict__[firstName] = newmod;
-                        }
+                    ImportProfiler profiler = context.LanguageContext.ImportProfiler;
+                    bool profiled = profiler != null && !TryGetExistingModule(context, name, out newmod);
+                    if (profiled) {
+                        profiler.Begin(name);
+                    }
+
+                    try {
+                        // import relative
+                        if (!TryGetExistingOrMetaPathModule(context, name, path, out newmod)) {
+                            newmod = ImportFromPath(context, firstName, name, path);
+                            if (newmod == null) {
+                                // add an indirection entry saying this module does not exist
+                                // see http://www.python.org/doc/essays/packages.html "Dummy Entries"
+                                context.LanguageContext.SystemStateModules[name] = null;
+                            } else if (parentModule != null) {
+                                parentModule.__dict__[firstName] = newmod;
+                            }
                         
-                    } else if (firstDot == -1) {
-                        // if we imported before having the assembly
-                        // loaded and then loaded the assembly we want
-                        // to make the assembly available now.
+                        } else if (firstDot == -1) {
+                            // if we imported before having the assembly
+                            // loaded and then loaded the assembly we want
+                            // to make the assembly available now.
 
-                        if (newmod is NamespaceTracker) {
-                            context.ShowCls = true;
+                            if (newmod is NamespaceTracker) {
+                                context.ShowCls = true;
+                            }
+                        }
+                    } finally {
+                        if (profiled) {
+                            profiler.End(newmod != null);
                         }
                     }
                 }
@@ -628,6 +647,22 @@ namespace IronPython.Runtime {
                 return ret;
             }
 
+            ImportProfiler profiler = context.LanguageContext.ImportProfiler;
+            if (profiler == null) {
+                return LoadTopAbsolute(context, name);
+            }
+
+            profiler.Begin(name);
+            try {
+                ret = LoadTopAbsolute(context, name);
+                return ret;
+            } finally {
+                profiler.End(ret != null);
+            }
+        }
+
+        private static object LoadTopAbsolute(CodeContext/*!*/ context, string/*!*/ name) {
+            object ret;
             if (TryLoadMetaPathModule(context, name, null, out ret)) {
                 return ret;
             }
@@ -677,6 +712,30 @@ namespace IronPython.Runtime {
         }
 
         private static object ImportNestedModule(CodeContext/*!*/ context, PythonModule/*!*/ module,
+            string[] parts, int current, List/*!*/ path) {
+            ImportProfiler profiler = context.LanguageContext.ImportProfiler;
+            if (profiler == null) {
+                return LoadNestedModule(context, module, parts, current, path);
+            }
+
+            object ret;
+            string fullName = CreateFullName(module.GetName() as string, parts[current]);
+            if (TryGetExistingModule(context, fullName, out ret)) {
+                return LoadNestedModule(context, module, parts, current, path);
+            }
+
+            ret = null;
+
+            profiler.Begin(fullName);
+            try {
+                ret = LoadNestedModule(context, module, parts, current, path);
+                return ret;
+            } finally {
+                profiler.End(ret != null);
+            }
+        }
+
+        private static object LoadNestedModule(CodeContext/*!*/ context, PythonModule/*!*/ module,
             string[] parts, int current, List/*!*/ path) {
             object ret;
             string name = parts[current];
@@ -810,7 +869,7 @@ namespace IronPython.Runtime {
                         continue;
                     }
 
-                    if (context.DomainManager.Platform.FileExists(fullPath)) {
+                    if (ImportFileExists(context, fullPath)) {
                         if (candidatePath != null) {
                             throw PythonOps.ImportError(String.Format("Found multiple modules of the same name '{0}': '{1}' and '{2}'",
                                 name, candidatePath, fullPath));
@@ -974,6 +1033,16 @@ namespace IronPython.Runtime {
 
             PlatformAdaptationLayer pal = context.DomainManager.Platform;
             string dir = pal.GetDirectoryName(path);
+#if FEATURE_FILESYSTEM
+            PythonContext pc = context as PythonContext;
+            ImportDirectoryCache cache = pc != null ? pc.GetImportDirectoryCache() : null;
+            if (cache != null) {
+                if (!cache.Contains(dir, pal.GetFileName(path), isDir)) {
+                    return null;
+                }
+                return pal.GetFullPath(path);
+            }
+#endif
             if (!pal.DirectoryExists(dir)) {
                 return null;
             }
@@ -995,6 +1064,21 @@ namespace IronPython.Runtime {
 #endif
         }
 
+        /// <summary>
+        /// Checks for a file the importer is looking for, using the directory listing cache
+        /// when it's available.
+        /// </summary>
+        private static bool ImportFileExists(PythonContext/*!*/ context, string/*!*/ path) {
+            PlatformAdaptationLayer pal = context.DomainManager.Platform;
+#if FEATURE_FILESYSTEM
+            ImportDirectoryCache cache = context.GetImportDirectoryCache();
+            if (cache != null) {
+                return cache.Contains(pal.GetDirectoryName(path), pal.GetFileName(path), false);
+            }
+#endif
+            return pal.FileExists(path);
+        }
+
         internal static PythonModule LoadPackageFromSource(CodeContext/*!*/ context, string/*!*/ name, string/*!*/ path) {
             Assert.NotNull(context, name, path);
 
@@ -1003,7 +1087,7 @@ namespace IronPython.Runtime {
                 return null;
             }
 
-            if(context.LanguageContext.DomainManager.Platform.DirectoryExists(path) && !context.LanguageContext.DomainManager.Platform.FileExists(context.LanguageContext.DomainManager.Platform.CombinePaths(path, "__init__.py"))) {
+            if(context.LanguageContext.DomainManager.Platform.DirectoryExists(path) && !ImportFileExists(context.LanguageContext, context.LanguageContext.DomainManager.Platform.CombinePaths(path, "__init__.py"))) {
                 PythonOps.Warn(context, PythonExceptions.ImportWarning, "Not importing directory '{0}': missing __init__.py", path);
             }
 
@@ -1012,6 +1096,15 @@ namespace IronPython.Runtime {
 
         private static PythonModule/*!*/ LoadFromSourceUnit(CodeContext/*!*/ context, SourceUnit/*!*/ sourceCode, string/*!*/ name, string/*!*/ path) {
             Assert.NotNull(sourceCode, name, path);
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+            CompiledCodeCache cache = context.LanguageContext.GetCompiledCodeCache();
+            if (cache != null) {
+                PythonModule module = cache.LoadModule(sourceCode, name, path);
+                if (module != null) {
+                    return module;
+                }
+            }
+#endif
             return context.LanguageContext.CompileModule(path, name, sourceCode, ModuleOptions.Initialize | ModuleOptions.Optimized);
         }
     }
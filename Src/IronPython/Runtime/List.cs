@@ -36,6 +36,13 @@ using SpecialNameAttribute = System.Runtime.CompilerServices.SpecialNameAttribut
 
 namespace IronPython.Runtime {
 
+    /// <summary>
+    /// Python's list.  There's no GIL so the list locks itself.  Operations which don't call user code
+    /// while they hold the lock take a thin lock, a compare-exchange on a field, which is cheaper than
+    /// entering the monitor.  The first time the list is contended, or locked by an operation which can
+    /// call user code, the thin lock is inflated and from then on every operation uses the monitor.
+    /// Code outside of List which locks a list must call Inflate first.
+    /// </summary>
     [PythonType("list"), Serializable, System.Diagnostics.CodeAnalysis.SuppressMessage("Microsoft.Naming", "CA1710:IdentifiersShouldHaveCorrectSuffix")]
     [DebuggerTypeProxy(typeof(ObjectCollectionDebugProxy)), DebuggerDisplay("list, {Count} items")]
     public class List : IList, ICodeFormattable, IList<object>, IReversible, IStructuralEquatable, IStructuralComparable
@@ -44,9 +51,12 @@ namespace IronPython.Runtime {
 #endif
     {
         private const int INITIAL_SIZE = 20;
+        private const int Unlocked = 0, ThinLocked = 1, Inflated = 2;
 
         internal int _size;
         internal volatile object[] _data;
+        [NonSerialized]
+        private volatile int _lockState;
 
         public void __init__() {
             _data = new object[8];
@@ -225,8 +235,68 @@ namespace IronPython.Runtime {
             return new List(data);
         }
 
+        #region Locking
+
+#pragma warning disable 0420 // "a reference to a volatile field will not be treated as volatile"
+
+        private bool TryEnterThin() {
+            int state = _lockState;
+            if (state == Unlocked && Interlocked.CompareExchange(ref _lockState, ThinLocked, Unlocked) == Unlocked) {
+                return true;
+            } else if (state != Inflated) {
+                // contended
+                Inflate();
+            }
+            return false;
+        }
+
+        /// <summary>
+        /// Switches the list to its monitor for good.  Must be called before locking the list
+        /// with lock or Monitor.Enter.
+        /// </summary>
+        internal void Inflate() {
+            if (_lockState != Inflated) {
+                // a thin lock is only held for a short time and never while calling user code
+                SpinWait spin = new SpinWait();
+                while (Interlocked.CompareExchange(ref _lockState, Inflated, Unlocked) == ThinLocked) {
+                    spin.SpinOnce();
+                }
+            }
+        }
+
+#pragma warning restore 0420
+
+        /// <summary>
+        /// Takes the thin lock of a list, or its monitor once the lock has been inflated.  Only
+        /// for operations which don't call user code while they hold the lock.
+        /// </summary>
+        private struct ThinLocker : IDisposable {
+            private readonly List _list;
+            private readonly bool _thin;
+            private bool _lockTaken;
+
+            public ThinLocker(List/*!*/ list) {
+                _list = list;
+                _lockTaken = false;
+                _thin = list.TryEnterThin();
+                if (!_thin) {
+                    MonitorUtils.Enter(list, ref _lockTaken);
+                }
+            }
+
+            public void Dispose() {
+                if (_thin) {
+                    _list._lockState = Unlocked;
+                } else {
+                    MonitorUtils.Exit(_list, ref _lockTaken);
+                }
+            }
+        }
+
+        #endregion
+
         internal object[] GetObjectArray() {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 return ArrayOps.CopyArray(_data, _size);
             }
         }
@@ -236,12 +306,12 @@ namespace IronPython.Runtime {
         public static List operator +([NotNull]List l1, [NotNull]List l2) {
             object[] ret;
             int size;
-            lock (l1) {
+            using (new ThinLocker(l1)) {
                 ret = ArrayOps.CopyArray(l1._data, GetAddSize(l1._size, l2._size));
                 size = l1._size;
             }
 
-            lock (l2) {
+            using (new ThinLocker(l2)) {
                 if (l2._size + size > ret.Length) {
                     ret = ArrayOps.CopyArray(ret, GetAddSize(size, l2._size));
                 }
@@ -311,7 +381,7 @@ namespace IronPython.Runtime {
 
             int n, newCount;
             object[] ret;
-            lock (self) {
+            using (new ThinLocker(self)) {
                 n = self._size;
                 //??? is this useful optimization
                 //???if (n == 1) return new List(Array.ArrayList.Repeat(this[0], count));
@@ -354,27 +424,27 @@ namespace IronPython.Runtime {
         }
 
         internal bool ContainsWorker(object value) {
-            bool lockTaken = false;
-            try {
-                MonitorUtils.Enter(this, ref lockTaken);
+            object item;
+            for (int i = 0; TryGetItem(i, out item); i++) {
+                // the lock isn't held while we may call user code...
+                if (PythonOps.EqualRetBool(item, value))
+                    return true;
+            }
+            return false;
+        }
 
-                for (int i = 0; i < _size; i++) {
-                    object thisIndex = _data[i];
-
-                    // release the lock while we may call user code...
-                    MonitorUtils.Exit(this, ref lockTaken);
-                    try {
-                        if (PythonOps.EqualRetBool(thisIndex, value))
-                            return true;
-                    } finally {
-                        MonitorUtils.Enter(this, ref lockTaken);
-                    }
-                }
-            } finally {
-                if (lockTaken) {
-                    Monitor.Exit(this);
+        /// <summary>
+        /// Gets the item at index if the list is still long enough.  For operations which call
+        /// user code for every item and so can't hold the lock while iterating.
+        /// </summary>
+        private bool TryGetItem(int index, out object item) {
+            using (new ThinLocker(this)) {
+                if (index < _size) {
+                    item = _data[index];
+                    return true;
                 }
             }
+            item = null;
             return false;
         }
 
@@ -400,7 +470,7 @@ namespace IronPython.Runtime {
 
         [SpecialName]
         public List InPlaceMultiply(int count) {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 int n = this._size;
                 int newCount = checked(n * count);
                 EnsureSize(newCount);
@@ -437,7 +507,7 @@ namespace IronPython.Runtime {
         }
 
         public virtual object __getslice__(int start, int stop) {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 Slice.FixSliceArguments(_size, ref start, ref stop);
                 
                 object[] ret = ArrayOps.GetSlice(_data, start, stop);
@@ -449,7 +519,7 @@ namespace IronPython.Runtime {
             if (start < 0) start = 0;
             if (stop > Count) stop = Count;
 
-            lock (this) return ArrayOps.GetSlice(_data, start, stop);
+            using (new ThinLocker(this)) return ArrayOps.GetSlice(_data, start, stop);
         }
 
         public virtual void __setslice__(int start, int stop, object value) {
@@ -463,7 +533,7 @@ namespace IronPython.Runtime {
         }
 
         public virtual void __delslice__(int start, int stop) {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 Slice.FixSliceArguments(_size, ref start, ref stop);
                 if (start > stop) return;
 
@@ -488,13 +558,13 @@ namespace IronPython.Runtime {
 
                 if (step == 1) {
                     object[] ret;
-                    lock (this) ret = ArrayOps.GetSlice(_data, start, stop);
+                    using (new ThinLocker(this)) ret = ArrayOps.GetSlice(_data, start, stop);
                     return new List(ret);
                 } else {
                     // start/stop/step could be near Int32.MaxValue, and simply addition could cause overflow
                     int n = (int)(step > 0 ? (0L + stop - start + step - 1) / step : (0L + stop - start + step + 1) / step);
                     object[] ret = new object[n];
-                    lock (this) {
+                    using (new ThinLocker(this)) {
                         int ri = 0;
                         for (int i = 0, index = start; i < n; i++, index += step) {
                             ret[ri++] = _data[index];
@@ -515,6 +585,7 @@ namespace IronPython.Runtime {
                         // we don't need to worry about lock ordering of accesses to the 
                         // RHS & ourselves.  We can lock once and avoid repeatedly locking/unlocking
                         // on each assign.
+                        Inflate();
                         lock (this) {
                             slice.DoSliceAssign(this.SliceAssignNoLock, _size, value);
                         }
@@ -554,7 +625,7 @@ namespace IronPython.Runtime {
             int otherSize = other._size;
             object[] otherData = other._data;
             
-            lock (this) {
+            using (new ThinLocker(this)) {
                 if ((stop - start) == otherSize) {
                     // we are simply replacing values, this is fast...
                     for (int i = 0; i < otherSize; i++) {
@@ -591,6 +662,7 @@ namespace IronPython.Runtime {
             // makes it easy to hold the lock for the duration fo the copy.
             IList<object> other = value as IList<object> ?? new List(PythonOps.GetEnumerator(value));
 
+            Inflate();
             lock (this) {
                 if ((stop - start) == other.Count) {
                     // we are simply replacing values, this is fast...
@@ -632,7 +704,7 @@ namespace IronPython.Runtime {
         }
 
         public virtual void __delitem__(int index) {
-            lock (this) RawDelete(PythonOps.FixIndex(index, _size));
+            using (new ThinLocker(this)) RawDelete(PythonOps.FixIndex(index, _size));
         }
 
         public virtual void __delitem__(object index) {
@@ -642,6 +714,7 @@ namespace IronPython.Runtime {
         public void __delitem__(Slice slice) {
             if (slice == null) throw PythonOps.TypeError("list indices must be integers or slices");
 
+            Inflate();
             lock (this) {
                 int start, stop, step;
                 // slice is sealed, indices can't be user code...
@@ -734,7 +807,7 @@ namespace IronPython.Runtime {
         }
 
         public void append(object item) {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 AddNoLock(item);
             }
         }
@@ -768,42 +841,27 @@ namespace IronPython.Runtime {
         }
 
         public int count(object item) {
-            bool lockTaken = false;
-            try {
-                MonitorUtils.Enter(this, ref lockTaken);
-                int cnt = 0;
-                for (int i = 0, len = _size; i < len; i++) {
-                    object val = _data[i];
-
-                    MonitorUtils.Exit(this, ref lockTaken);
-                    try {
-                        if (PythonOps.EqualRetBool(val, item)) cnt++;
-                    } finally {
-                        MonitorUtils.Enter(this, ref lockTaken);
-                    }
-                }
-                return cnt;
-            } finally {
-                if (lockTaken) {
-                    Monitor.Exit(this);
-                }
+            int cnt = 0;
+            object val;
+            for (int i = 0; TryGetItem(i, out val); i++) {
+                if (PythonOps.EqualRetBool(val, item)) cnt++;
             }
+            return cnt;
         }
 
         public void extend([NotNull]List/*!*/ seq) {
-            using(new OrderedLocker(this, seq)) {
-                // use the original count for if we're extending this w/ this
-                int count = seq.Count;  
-                EnsureSize(Count + count);
-
-                for (int i = 0; i < count; i++) {
-                    AddNoLock(seq[i]);
-                }
+            // copy the items so only one of the lists is locked at a time, this also takes the
+            // original count if we're extending this w/ this
+            object[] items = seq.GetObjectArray();
+            using (new ThinLocker(this)) {
+                EnsureSize(_size + items.Length);
+                Array.Copy(items, 0, _data, _size, items.Length);
+                _size += items.Length;
             }
         }
 
         public void extend([NotNull]PythonTuple/*!*/ seq) {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 EnsureSize(Count + seq.Count);
 
                 for (int i = 0; i < seq.Count; i++) {
@@ -839,7 +897,7 @@ namespace IronPython.Runtime {
 
             object[] locData;
             int locSize;
-            lock (this) {
+            using (new ThinLocker(this)) {
                 // get a stable view on size / data...
                 locData = _data;
                 locSize = _size;
@@ -869,7 +927,7 @@ namespace IronPython.Runtime {
                 return;
             }
 
-            lock (this) {
+            using (new ThinLocker(this)) {
                 index = PythonOps.FixSliceIndex(index, _size);
 
                 EnsureSize(_size + 1);
@@ -889,14 +947,14 @@ namespace IronPython.Runtime {
         public object pop() {
             if (this._size == 0) throw PythonOps.IndexError("pop off of empty list");
 
-            lock (this) {
+            using (new ThinLocker(this)) {
                 this._size -= 1;
                 return _data[this._size];
             }
         }
 
         public object pop(int index) {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 index = PythonOps.FixIndex(index, _size);
                 if (_size == 0) throw PythonOps.IndexError("pop off of empty list");
 
@@ -910,6 +968,7 @@ namespace IronPython.Runtime {
         }
 
         public void remove(object value) {
+            Inflate();
             lock (this) RawDelete(index(value));
         }
 
@@ -918,11 +977,11 @@ namespace IronPython.Runtime {
         }
 
         public void reverse() {
-            lock (this) Array.Reverse(_data, 0, _size);
+            using (new ThinLocker(this)) Array.Reverse(_data, 0, _size);
         }
 
         internal void reverse(int index, int count) {
-            lock (this) Array.Reverse(_data, index, count);
+            using (new ThinLocker(this)) Array.Reverse(_data, index, count);
         }
 
         public void sort(CodeContext/*!*/ context) {
@@ -947,12 +1006,8 @@ namespace IronPython.Runtime {
             }
 
             // the empty list is already sorted
-            if (_size != 0) {                
-                IComparer comparer = context.LanguageContext.GetComparer(
-                    cmp,
-                    GetComparisonType());
-
-                DoSort(context, comparer, key, reverse, 0, _size);
+            if (_size != 0) {
+                DoSort(context, cmp, key, reverse, 0, _size);
             }
         }
 
@@ -971,27 +1026,32 @@ namespace IronPython.Runtime {
             return typeof(object);
         }
 
-        internal void DoSort(CodeContext/*!*/ context, IComparer cmp, object key, bool reverse, int index, int count) {
+        internal void DoSort(CodeContext/*!*/ context, object cmp, object key, bool reverse, int index, int count) {
+            Inflate();
             lock (this) {
                 object[] sortData = _data;
                 int sortSize = _size;
+                Type comparisonType = GetComparisonType();
 
                 try {
                     // make the list appear empty for the duration of the sort...
                     _data = ArrayUtils.EmptyObjects;
                     _size = 0;
 
+                    object[] keys = sortData;
                     if (key != null) {
-                        object[] keys = new object[sortSize];
+                        keys = new object[sortSize];
                         for (int i = 0; i < sortSize; i++) {
                             Debug.Assert(_data.Length == 0);
                             keys[i] = PythonCalls.Call(context, key, sortData[i]);
                             if (_data.Length != 0) throw PythonOps.ValueError("list mutated while determing keys");
                         }
+                    }
 
-                        sortData = ListMergeSort(sortData, keys, cmp, index, count, reverse);
-                    } else {
-                        sortData = ListMergeSort(sortData, cmp, index, count, reverse);
+                    // ints, floats and strings can be compared without calling back into Python
+                    if (cmp != null || !TimSort.TrySortHomogeneous(keys, sortData, index, count, reverse)) {
+                        IComparer comparer = context.LanguageContext.GetComparer(cmp, comparisonType);
+                        TimSort.Sort(keys, sortData, index, count, new SortComparer(this, comparer, reverse));
                     }
                 } finally {
                     // restore the list to it's old data & size (which is now supported appropriately)
@@ -1002,135 +1062,39 @@ namespace IronPython.Runtime {
             }
         }
 
-        internal object[] ListMergeSort(object[] sortData, IComparer cmp, int index, int count, bool reverse) {
-            return ListMergeSort(sortData, null, cmp, index, count, reverse);
-        }
-
-        internal object[] ListMergeSort(object[] sortData, object[] keys, IComparer cmp, int index, int count, bool reverse) {
-            if (count - index < 2) return sortData;  // 1 or less items, we're sorted, quit now...
-
-            if (keys == null) keys = sortData;
-            // list merge sort - stable sort w/ a minimum # of comparisons.
-
-            int len = count - index;
-            // prepare the two lists.
-            int[] lists = new int[len + 2];    //0 and count + 1 are auxillary fields
+        /// <summary>
+        /// Compares the keys with the comparer used for the sort and ensures the list isn't
+        /// modified by the comparison.
+        /// </summary>
+        private struct SortComparer : ISortComparer<object> {
+            private readonly List/*!*/ _list;
+            private readonly IComparer/*!*/ _comparer;
+            private readonly bool _reverse;
 
-            lists[0] = 1;
-            lists[len + 1] = 2;
-            for (int i = 1; i <= len - 2; i++) {
-                lists[i] = -(i + 2);
+            public SortComparer(List/*!*/ list, IComparer/*!*/ comparer, bool reverse) {
+                _list = list;
+                _comparer = comparer;
+                _reverse = reverse;
             }
 
-            lists[len - 1] = lists[len] = 0;
-
-            // new pass
-            for (; ; ) {
-                // p & q  traverse the lists during each pass.  
-                //  s is usually the most most recently processed record of the current sublist
-                //  t points to the end of the previously output sublist
-                int s = 0;
-                int t = len + 1;
-                int p = lists[s];
-                int q = lists[t];
-
-                if (q == 0) break;  // we're done
-                for (; ; ) {
-                    // Indexes into the array here are 1 based.  0 is a 
-                    // virtual element and so is (len - 1) - they only exist in
-                    // the length array.
-
-                    if ((p < 1) || (q <= len && DoCompare(keys, cmp, p + index - 1, q + index - 1, reverse))) {
-                        // advance p
-                        if (lists[s] < 0) lists[s] = Math.Abs(p) * -1;
-                        else lists[s] = Math.Abs(p);
-
-                        s = p;
-                        p = lists[p];
+            public bool LessThan(object x, object y) {
+                Debug.Assert(_list._data.Length == 0);
 
-                        if (p > 0) continue;
+                int result = _reverse ? _comparer.Compare(y, x) : _comparer.Compare(x, y);
 
-                        // complete the sublist
-                        lists[s] = q;
-                        s = t;
-                        do {
-                            t = q;
-                            q = lists[q];
-                        } while (q > 0);
-                    } else {
-                        // advance q
-                        if (lists[s] < 0) lists[s] = Math.Abs(q) * -1;
-                        else lists[s] = Math.Abs(q);
-
-                        s = q;
-                        q = lists[q];
-
-                        if (q > 0) continue;
-
-                        // Complete the sublist
-                        lists[s] = p;
-                        s = t;
-
-                        do {
-                            t = p;
-                            p = lists[p];
-                        } while (p > 0);
-                    }
-
-                    Debug.Assert(p <= 0);
-                    Debug.Assert(q <= 0);
-                    p *= -1;
-                    q *= -1;
-
-                    if (q == 0) {
-                        if (lists[s] < 0) lists[s] = Math.Abs(p) * -1;
-                        else lists[s] = Math.Abs(p);
-                        lists[t] = 0;
-                        // go back to new pass
-                        break;
-                    } // else keep going
-                }
-            }
-
-            // use the resulting indices to
-            // extract the order.
-            object[] newData = new object[len];
-            int start = lists[0];
-            int outIndex = 0;
-            while (start != 0) {
-                newData[outIndex++] = sortData[start + index - 1];
-                start = lists[start];
+                if (_list._data.Length != 0) throw PythonOps.ValueError("list mutated during sort");
+                return result < 0;
             }
-
-            if (sortData.Length != count || index != 0) {
-                for (int j = 0; j < count; j++) {
-                    sortData[j + index] = newData[j];
-                }
-            } else {
-                sortData = newData;
-            }
-
-            return sortData;
-        }
-
-        /// <summary>
-        /// Compares the two specified keys
-        /// </summary>
-        private bool DoCompare(object[] keys, IComparer cmp, int p, int q, bool reverse) {
-            Debug.Assert(_data.Length == 0);
-
-            int result = cmp.Compare(keys[p], keys[q]);
-            bool ret = reverse ? (result >= 0) : (result <= 0);
-
-            if (_data.Length != 0) throw PythonOps.ValueError("list mutated during sort");
-            return ret;
         }
 
         internal int BinarySearch(int index, int count, object value, IComparer comparer) {
+            Inflate();
             lock (this) return Array.BinarySearch(_data, index, count, value, comparer);
         }
 
         internal bool EqualsWorker(List l, IEqualityComparer comparer) {
+            Inflate();
+            l.Inflate();
             using (new OrderedLocker(this, l)) {
                 if (comparer == null) {
                     return PythonOps.ArraysEqual(_data, _size, l._data, l._size);
@@ -1145,6 +1109,8 @@ namespace IronPython.Runtime {
         }
 
         internal int CompareToWorker(List l, IComparer comparer) {
+            Inflate();
+            l.Inflate();
             using (new OrderedLocker(this, l)) {
                 if (comparer == null) {
                     return PythonOps.CompareArrays(_data, _size, l._data, l._size);
@@ -1195,7 +1161,7 @@ namespace IronPython.Runtime {
             set {
                 // but we need a lock here incase we're assigning
                 // while re-sizing.
-                lock (this) _data[PythonOps.FixIndex(index, _size)] = value;
+                using (new ThinLocker(this)) _data[PythonOps.FixIndex(index, _size)] = value;
             }
         }
 
@@ -1227,7 +1193,7 @@ namespace IronPython.Runtime {
 
         [PythonHidden]
         public void RemoveAt(int index) {
-            lock (this) RawDelete(index);
+            using (new ThinLocker(this)) RawDelete(index);
         }
 
         [PythonHidden]
@@ -1237,7 +1203,7 @@ namespace IronPython.Runtime {
 
         [PythonHidden]
         public void Clear() {
-            lock (this) _size = 0;
+            using (new ThinLocker(this)) _size = 0;
         }
 
         [PythonHidden]
@@ -1246,7 +1212,7 @@ namespace IronPython.Runtime {
             // clears it then we'll stop iterating.
             object[] locData;
             int locSize;
-            lock (this) {
+            using (new ThinLocker(this)) {
                 locData = _data;
                 locSize = _size;
             }
@@ -1259,7 +1225,7 @@ namespace IronPython.Runtime {
 
         [PythonHidden]
         public int Add(object value) {
-            lock (this) {
+            using (new ThinLocker(this)) {
                 AddNoLock(value);
                 return _size - 1;
             }
@@ -1293,6 +1259,7 @@ namespace IronPython.Runtime {
 
         object ICollection.SyncRoot {
             get {
+                Inflate();
                 return this;
             }
         }
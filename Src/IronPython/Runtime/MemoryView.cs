@@ -20,8 +20,13 @@ using IronPython.Runtime.Operations;
 using Microsoft.Scripting.Runtime;
 
 namespace IronPython.Runtime {
+    /// <summary>
+    /// A view of the memory of a buffer object.  Slicing a view creates another view of the
+    /// same object without copying, and views of objects implementing IDirectBuffer expose
+    /// the object's backing array to consumers.
+    /// </summary>
     [PythonType("memoryview")]
-    public sealed class MemoryView : ICodeFormattable {
+    public sealed class MemoryView : ICodeFormattable, IDirectBuffer {
         private readonly IBufferProtocol _buffer;
         private readonly int _start;
         private readonly int? _end;
@@ -30,6 +35,10 @@ namespace IronPython.Runtime {
             _buffer = @object;
         }
 
+        public MemoryView([NotNull]MemoryView @object)
+            : this(@object._buffer, @object._start, @object._end) {
+        }
+
         private MemoryView(IBufferProtocol @object, int start, int? end) {
             _buffer = @object;
             _start = start;
@@ -229,6 +238,11 @@ namespace IronPython.Runtime {
             } else if ((object)other == null) {
                 return false;
             }
+
+            ArraySegment<byte> x, y;
+            if (self.TryGetSegment(false, out x) && other.TryGetSegment(false, out y)) {
+                return SegmentEquals(x, y);
+            }
             return self.tobytes().Equals(other.tobytes());
         }
 
@@ -241,12 +255,7 @@ namespace IronPython.Runtime {
         }
 
         public static bool operator !=(MemoryView self, MemoryView other) {
-            if ((object)self == null) {
-                return (object)other != null;
-            } else if ((object)other == null) {
-                return true;
-            }
-            return !self.tobytes().Equals(other.tobytes());
+            return !(self == other);
         }
 
         public static bool operator !=(MemoryView self, IBufferProtocol other) {
@@ -271,6 +280,52 @@ namespace IronPython.Runtime {
             return base.GetHashCode();
         }
 
+        private static bool SegmentEquals(ArraySegment<byte> x, ArraySegment<byte> y) {
+            if (x.Count != y.Count) {
+                return false;
+            }
+
+            for (int i = 0; i < x.Count; i++) {
+                if (x.Array[x.Offset + i] != y.Array[y.Offset + i]) {
+                    return false;
+                }
+            }
+            return true;
+        }
+
+        /// <summary>
+        /// Copies count bytes into the viewed memory starting at the given byte index.
+        /// </summary>
+        internal void Write(int index, byte[] bytes, int offset, int count) {
+            BufferOps.Write(_buffer, _start * (int)_buffer.ItemSize + index, bytes, offset, count);
+        }
+
+        #region IDirectBuffer Members
+
+        /// <summary>
+        /// Gets the part of the underlying object's array which the view covers.
+        /// </summary>
+        private bool TryGetSegment(bool writable, out ArraySegment<byte> segment) {
+            IDirectBuffer direct = _buffer as IDirectBuffer;
+            ArraySegment<byte> whole;
+            if (direct == null || !direct.TryGetSegment(writable, out whole)) {
+                segment = default(ArraySegment<byte>);
+                return false;
+            }
+
+            int itemSize = (int)_buffer.ItemSize;
+            int start = Math.Min(_start * itemSize, whole.Count);
+            int count = Math.Max(Math.Min(__len__() * itemSize, whole.Count - start), 0);
+            segment = new ArraySegment<byte>(whole.Array, whole.Offset + start, count);
+            return true;
+        }
+
+        bool IDirectBuffer.TryGetSegment(bool writable, out ArraySegment<byte> segment) {
+            return TryGetSegment(writable, out segment);
+        }
+
+        #endregion
+
         #region ICodeFormattable Members
 
         public string __repr__(CodeContext context) {
@@ -30,10 +30,18 @@ using TypeInfo = System.Type;
 namespace IronPython.Runtime {
     /// <summary>
     /// Enables lazy initialization of module dictionaries.
+    /// 
+    /// Members of the module type are only reflected over and turned into Python objects when
+    /// they're first accessed.  The reflection results and the builtin functions don't depend
+    /// on the runtime so they're shared between all the engines in the process.
     /// </summary>
     class ModuleDictionaryStorage : GlobalDictionaryStorage {
         private Type/*!*/ _type;
         private bool _cleared;
+        private ModuleMembers _members;
+
+        private static readonly Dictionary<Type, ModuleMembers> _staticMembers = new Dictionary<Type, ModuleMembers>();
+        private static readonly Dictionary<Type, ModuleMembers> _instanceMembers = new Dictionary<Type, ModuleMembers>();
 
         private static readonly Dictionary<string, PythonGlobal> _emptyGlobalDict = new Dictionary<string, PythonGlobal>(0);
         private static readonly PythonGlobal[] _emptyGlobals = new PythonGlobal[0];
@@ -98,13 +106,33 @@ namespace IronPython.Runtime {
                 }
             }
 
-            MemberInfo[] members = _type.GetMembers();
-            foreach (MemberInfo mi in members) {
-                if (base.Contains(mi.Name)) continue;
+            if (!_cleared) {
+                foreach (string name in Members.GetNames()) {
+                    if (base.Contains(name)) continue;
+
+                    object value;
+                    if (TryGetLazyValue(name, out value)) {
+                        res.Add(new KeyValuePair<object, object>(name, value));
+                    }
+                }
+            }
+            return res;
+        }
 
-                object value;
-                if (TryGetLazyValue(mi.Name, out value)) {
-                    res.Add(new KeyValuePair<object, object>(mi.Name, value));
+        public override IEnumerable<object>/*!*/ GetKeys() {
+            // the names are known without creating the values
+            List<object> res = new List<object>();
+            foreach (KeyValuePair<object, object> kvp in base.GetItems()) {
+                if (kvp.Value != Uninitialized.Instance) {
+                    res.Add(kvp.Key);
+                }
+            }
+
+            if (!_cleared) {
+                foreach (string name in Members.GetNames()) {
+                    if (!base.Contains(name)) {
+                        res.Add(name);
+                    }
                 }
             }
             return res;
@@ -112,9 +140,21 @@ namespace IronPython.Runtime {
 
         public override int Count {
             get {
-                // need to ensure we're fully populated
-                GetItems();
-                return base.Count;
+                int count = 0;
+                foreach (KeyValuePair<object, object> kvp in base.GetItems()) {
+                    if (kvp.Value != Uninitialized.Instance) {
+                        count++;
+                    }
+                }
+
+                if (!_cleared) {
+                    foreach (string name in Members.GetNames()) {
+                        if (!base.Contains(name)) {
+                            count++;
+                        }
+                    }
+                }
+                return count;
             }
         }
 
@@ -124,7 +164,7 @@ namespace IronPython.Runtime {
 
         private bool TryGetLazyValue(string name, bool publish, out object value) {
             if (!_cleared) {
-                MemberInfo[] members = NonHiddenMembers(GetMember(name));
+                MemberInfo[] members = Members.GetMembers(name);
                 if (members.Length > 0) {
                     // we only support fields, methods, and nested types in modules.
                     switch (members[0].MemberType) {
@@ -144,27 +184,9 @@ namespace IronPython.Runtime {
                             return true;
                         case MemberTypes.Method:
                             if (!((MethodInfo)members[0]).IsSpecialName) {
-                                var methods = new MethodInfo[members.Length];
-                                FunctionType ft = FunctionType.ModuleMethod | FunctionType.AlwaysVisible;
-                                for (int i = 0; i < members.Length; i++) {
-                                    var method = (MethodInfo)members[i];
-                                    if (method.IsStatic) {
-                                        ft |= FunctionType.Function;
-                                    } else {
-                                        ft |= FunctionType.Method;
-                                    }
-
-                                    methods[i] = method;
-                                }
+                                var builtinFunc = Members.GetFunction(name, members);
 
-                                var builtinFunc = BuiltinFunction.MakeMethod(
-                                    name,
-                                    methods,
-                                    members[0].DeclaringType,
-                                    ft
-                                );
-
-                                if ((ft & FunctionType.Method) != 0 && Instance != null) {
+                                if ((builtinFunc.FunctionType & FunctionType.Method) != 0 && Instance != null) {
                                     value = builtinFunc.BindToInstance(Instance);
                                 } else {
                                     value = builtinFunc;
@@ -215,20 +237,23 @@ namespace IronPython.Runtime {
             return false;
         }
 
-        private static MemberInfo[] NonHiddenMembers(MemberInfo[] members) {
-            List<MemberInfo> res = new List<MemberInfo>(members.Length);
-            foreach (MemberInfo t in members) {
-                if (t.IsDefined(typeof(PythonHiddenAttribute), false)) {
-                    continue;
+        private ModuleMembers/*!*/ Members {
+            get {
+                if (_members == null) {
+                    var tables = Instance == null ? _staticMembers : _instanceMembers;
+                    ModuleMembers members;
+                    lock (tables) {
+                        if (!tables.TryGetValue(_type, out members)) {
+                            tables[_type] = members = new ModuleMembers(
+                                _type,
+                                BindingFlags.DeclaredOnly | BindingFlags.Public | (Instance == null ? BindingFlags.Static : (BindingFlags.Instance | BindingFlags.Static))
+                            );
+                        }
+                    }
+                    _members = members;
                 }
-
-                res.Add(t);
+                return _members;
             }
-            return res.ToArray();
-        }
-
-        private MemberInfo[] GetMember(string name) {
-            return _type.GetMember(name, BindingFlags.DeclaredOnly | BindingFlags.Public | (Instance == null ? BindingFlags.Static : (BindingFlags.Instance | BindingFlags.Static)));
         }
 
         public override bool TryGetValue(object key, out object value) {
@@ -253,11 +278,124 @@ namespace IronPython.Runtime {
                     // member exists, need to remove it from the base class
                     // in case it differs from the member we actually have.
                     string strKey = kvp.Key as string;
-                    if (strKey != null && GetMember(strKey).Length > 0) {
+                    if (strKey != null && Members.GetMembers(strKey).Length > 0) {
                         base.Remove(kvp.Key);
                     }
                 }
             }
         }
+
+        /// <summary>
+        /// The members of a module type which are visible from Python, reflected over by name
+        /// on demand.  Shared by all the dictionaries of the module type.
+        /// </summary>
+        private sealed class ModuleMembers {
+            private readonly Type/*!*/ _type;
+            private readonly BindingFlags _flags;
+            private readonly Dictionary<string, MemberInfo[]>/*!*/ _members = new Dictionary<string, MemberInfo[]>(StringComparer.Ordinal);
+            private readonly Dictionary<string, BuiltinFunction>/*!*/ _functions = new Dictionary<string, BuiltinFunction>(StringComparer.Ordinal);
+            private string[] _names;
+
+            public ModuleMembers(Type/*!*/ type, BindingFlags flags) {
+                _type = type;
+                _flags = flags;
+            }
+
+            /// <summary>
+            /// Gets the non-hidden members with the given name.
+            /// </summary>
+            public MemberInfo[]/*!*/ GetMembers(string/*!*/ name) {
+                MemberInfo[] res;
+                lock (_members) {
+                    if (_members.TryGetValue(name, out res)) {
+                        return res;
+                    }
+                }
+
+                res = NonHiddenMembers(_type.GetMember(name, _flags));
+
+                lock (_members) {
+                    _members[name] = res;
+                }
+                return res;
+            }
+
+            /// <summary>
+            /// Gets the names of all the members which the module dictionary exposes.
+            /// </summary>
+            public string[]/*!*/ GetNames() {
+                if (_names == null) {
+                    var names = new List<string>();
+                    var seen = new HashSet<string>(StringComparer.Ordinal);
+                    foreach (MemberInfo mi in _type.GetMembers(_flags)) {
+                        if (seen.Add(mi.Name) && IsModuleMember(GetMembers(mi.Name))) {
+                            names.Add(mi.Name);
+                        }
+                    }
+                    _names = names.ToArray();
+                }
+                return _names;
+            }
+
+            /// <summary>
+            /// Gets the builtin function for the given methods, creating it on first use.
+            /// </summary>
+            public BuiltinFunction/*!*/ GetFunction(string/*!*/ name, MemberInfo/*!*/[]/*!*/ members) {
+                lock (_functions) {
+                    BuiltinFunction res;
+                    if (!_functions.TryGetValue(name, out res)) {
+                        var methods = new MethodInfo[members.Length];
+                        FunctionType ft = FunctionType.ModuleMethod | FunctionType.AlwaysVisible;
+                        for (int i = 0; i < members.Length; i++) {
+                            var method = (MethodInfo)members[i];
+                            if (method.IsStatic) {
+                                ft |= FunctionType.Function;
+                            } else {
+                                ft |= FunctionType.Method;
+                            }
+
+                            methods[i] = method;
+                        }
+
+                        _functions[name] = res = BuiltinFunction.MakeMethod(
+                            name,
+                            methods,
+                            members[0].DeclaringType,
+                            ft
+                        );
+                    }
+                    return res;
+                }
+            }
+
+            private static bool IsModuleMember(MemberInfo/*!*/[]/*!*/ members) {
+                if (members.Length == 0) {
+                    return false;
+                }
+
+                switch (members[0].MemberType) {
+                    case MemberTypes.Field:
+                    case MemberTypes.Property:
+                    case MemberTypes.NestedType:
+                        return true;
+                    case MemberTypes.Method:
+                        return !((MethodInfo)members[0]).IsSpecialName;
+                    default:
+                        return false;
+                }
+            }
+
+            private static MemberInfo[] NonHiddenMembers(MemberInfo[] members) {
+                List<MemberInfo> res = new List<MemberInfo>(members.Length);
+                foreach (MemberInfo t in members) {
+                    if (t.IsDefined(typeof(PythonHiddenAttribute), false)) {
+                        continue;
+                    }
+
+                    res.Add(t);
+                }
+                return res.ToArray();
+            }
+        }
     }
 }
@@ -0,0 +1,217 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Collections.Generic;
+using System.Threading;
+
+namespace IronPython.Runtime.Operations {
+    /// <summary>
+    /// Helpers for the consumers of bytes-like objects.  Objects implementing IDirectBuffer are
+    /// read and written in place; everything else is copied once into a new array.
+    /// </summary>
+    internal static class BufferOps {
+        // scratch buffers larger than this aren't kept for reuse
+        private const int MinCachedBuffer = 4096, MaxCachedBuffer = 64 * 1024;
+
+        /// <summary>
+        /// Gets the contents of a bytes-like object for reading.  Returns false if the object
+        /// isn't bytes-like.
+        /// </summary>
+        internal static bool TryGetReadableSegment(object o, out ArraySegment<byte> segment) {
+            IDirectBuffer direct = o as IDirectBuffer;
+            if (direct != null && direct.TryGetSegment(false, out segment)) {
+                return true;
+            }
+
+            byte[] bytes = o as byte[];
+            if (bytes != null) {
+                segment = new ArraySegment<byte>(bytes);
+                return true;
+            }
+
+            string str = o as string;
+            if (str != null) {
+                segment = new ArraySegment<byte>(str.MakeByteArray());
+                return true;
+            }
+
+            ByteArray byteArray = o as ByteArray;
+            if (byteArray != null) {
+                lock (byteArray) {
+                    segment = new ArraySegment<byte>(byteArray._bytes.ToArray());
+                }
+                return true;
+            }
+
+            MemoryView view = o as MemoryView;
+            if (view != null) {
+                segment = new ArraySegment<byte>(view.tobytes()._bytes);
+                return true;
+            }
+
+            PythonBuffer buffer = o as PythonBuffer;
+            if (buffer != null) {
+                segment = new ArraySegment<byte>(PythonOps.ConvertBufferToByteArray(buffer));
+                return true;
+            }
+
+            IPythonBufferable bufferable = o as IPythonBufferable;
+            if (bufferable != null) {
+                segment = new ArraySegment<byte>(bufferable.GetBytes(0, bufferable.Size));
+                return true;
+            }
+
+            IBufferProtocol protocol = o as IBufferProtocol;
+            if (protocol != null) {
+                segment = new ArraySegment<byte>(protocol.ToBytes(0, null)._bytes);
+                return true;
+            }
+
+            ICollection<byte> collection = o as ICollection<byte>;
+            if (collection != null) {
+                bytes = new byte[collection.Count];
+                collection.CopyTo(bytes, 0);
+                segment = new ArraySegment<byte>(bytes);
+                return true;
+            }
+
+            segment = default(ArraySegment<byte>);
+            return false;
+        }
+
+        /// <summary>
+        /// Gets the contents of a bytes-like parameter for reading.
+        /// </summary>
+        internal static ArraySegment<byte> ToSegment(this IList<byte>/*!*/ data) {
+            ArraySegment<byte> segment;
+            if (!TryGetReadableSegment(data, out segment)) {
+                byte[] bytes = new byte[data.Count];
+                data.CopyTo(bytes, 0);
+                segment = new ArraySegment<byte>(bytes);
+            }
+            return segment;
+        }
+
+        /// <summary>
+        /// Gets the backing array of a writable bytes-like object so that it can be filled in
+        /// place.  Returns false if the object doesn't expose its memory, in which case the
+        /// caller has to write through the object.
+        /// </summary>
+        internal static bool TryGetWritableSegment(object o, out ArraySegment<byte> segment) {
+            IDirectBuffer direct = o as IDirectBuffer;
+            if (direct != null && direct.TryGetSegment(true, out segment)) {
+                return true;
+            }
+
+            byte[] bytes = o as byte[];
+            if (bytes != null) {
+                segment = new ArraySegment<byte>(bytes);
+                return true;
+            }
+
+            segment = default(ArraySegment<byte>);
+            return false;
+        }
+
+        /// <summary>
+        /// Gets the size in bytes of a writable bytes-like object.  Returns false if the object
+        /// isn't writable.
+        /// </summary>
+        internal static bool TryGetWritableLength(object o, out int length) {
+            ArraySegment<byte> segment;
+            if (TryGetWritableSegment(o, out segment)) {
+                length = segment.Count;
+                return true;
+            }
+
+            ByteArray byteArray = o as ByteArray;
+            if (byteArray != null) {
+                length = byteArray.Count;
+                return true;
+            }
+
+            MemoryView view = o as MemoryView;
+            if (view != null && !view.@readonly) {
+                length = view.__len__() * (int)view.itemsize;
+                return true;
+            }
+
+            IBufferProtocol protocol = o as IBufferProtocol;
+            if (protocol != null && !protocol.ReadOnly) {
+                length = protocol.ItemCount * (int)protocol.ItemSize;
+                return true;
+            }
+
+            length = 0;
+            return false;
+        }
+
+        /// <summary>
+        /// Copies count bytes into a writable bytes-like object starting at the given byte
+        /// index.  The object must have been checked with TryGetWritableLength.
+        /// </summary>
+        internal static void Write(object o, int index, byte[] bytes, int offset, int count) {
+            ArraySegment<byte> segment;
+            if (TryGetWritableSegment(o, out segment)) {
+                Buffer.BlockCopy(bytes, offset, segment.Array, segment.Offset + index, count);
+                return;
+            }
+
+            ByteArray byteArray = o as ByteArray;
+            if (byteArray != null) {
+                lock (byteArray) {
+                    List<byte> data = byteArray._bytes;
+                    for (int i = 0; i < count; i++) {
+                        data[index + i] = bytes[offset + i];
+                    }
+                }
+                return;
+            }
+
+            MemoryView view = o as MemoryView;
+            if (view != null) {
+                view.Write(index, bytes, offset, count);
+                return;
+            }
+
+            // replace the items which the bytes cover, keeping the parts of partially covered items
+            IBufferProtocol protocol = (IBufferProtocol)o;
+            int itemSize = (int)protocol.ItemSize;
+            int first = index / itemSize, last = (index + count + itemSize - 1) / itemSize;
+            byte[] items = protocol.ToBytes(first, last).ToByteArray();
+            Array.Copy(bytes, offset, items, index - first * itemSize, count);
+            protocol.SetSlice(new Slice(first, last), Bytes.Make(items));
+        }
+
+        /// <summary>
+        /// Takes the scratch buffer cached in the given field, or allocates a new one if there's
+        /// none or it's too small.  The buffer is handed back with ReturnBuffer.
+        /// </summary>
+        internal static byte[] TakeBuffer(ref byte[] cache, int size) {
+            byte[] res = Interlocked.Exchange(ref cache, null);
+            if (res == null || res.Length < size) {
+                res = new byte[Math.Max(size, MinCachedBuffer)];
+            }
+            return res;
+        }
+
+        internal static void ReturnBuffer(ref byte[] cache, byte[] buffer) {
+            if (buffer.Length <= MaxCachedBuffer) {
+                cache = buffer;
+            }
+        }
+    }
+}
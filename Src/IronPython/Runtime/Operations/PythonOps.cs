@@ -2038,7 +2038,7 @@ namespace IronPython.Runtime.Operations {
                 PythonCompilerOptions compilerOptions = Builtin.GetRuntimeGeneratedCodeCompilerOptions(context, true, 0);
 
                 // do interpretation only on strings -- not on files, streams, or code objects
-                code = FunctionCode.FromSourceUnit(source, compilerOptions, false);
+                code = FunctionCode.FromSourceText(source, compilerOptions);
             }
 
             FunctionCode fc = code as FunctionCode;
@@ -3214,7 +3214,7 @@ namespace IronPython.Runtime.Operations {
         public static PythonGenerator MakeGenerator(PythonFunction function, MutableTuple data, object generatorCode) {
             Func<MutableTuple, object> next = generatorCode as Func<MutableTuple, object>;
             if (next == null) {
-                next = ((LazyCode<Func<MutableTuple, object>>)generatorCode).EnsureDelegate();
+                next = ((LazyCode<Func<MutableTuple, object>>)generatorCode).EnsureDelegate(function.Context.LanguageContext.CompilationQueue);
             }
 
             return new PythonGenerator(function, next, data);
@@ -3281,6 +3281,10 @@ namespace IronPython.Runtime.Operations {
             PythonFunction.AddRecursionDepth(-1);
         }
 
+        public static void FunctionCountCall(PythonFunction func) {
+            Interlocked.Increment(ref func.func_code._callCount);
+        }
+
         #endregion
 
         public static object ReturnConversionResult(object value) {
@@ -4518,7 +4522,15 @@ namespace IronPython.Runtime.Operations {
         private static List<FunctionStack> _funcStack;
 
         public static List<FunctionStack> GetFunctionStack() {
-            return _funcStack ?? (_funcStack = new List<FunctionStack>());
+            return _funcStack ?? (_funcStack = NewFunctionStack());
+        }
+
+        private static List<FunctionStack> NewFunctionStack() {
+            List<FunctionStack> stack = new List<FunctionStack>();
+#if FEATURE_THREAD
+            SamplingProfiler.RegisterThread(stack);
+#endif
+            return stack;
         }
 
         public static List<FunctionStack> GetFunctionStackNoCreate() {
@@ -4662,6 +4674,48 @@ namespace IronPython.Runtime.Operations {
             return UnicodeHelper.Function;
         }
 
+        /// <summary>
+        /// Called before a for loop over range(...) or xrange(...).  Returns the number of
+        /// iterations if func is still the range builtin or the xrange type and the arguments
+        /// are ints, in which case the loop counts with an int instead of iterating the result
+        /// of the call.  Returns -1 otherwise, and the loop calls func and iterates normally.
+        /// </summary>
+        public static int GetRangeLoopCount(object func, object start, object stop, object step) {
+            if (!(start is int) || !(stop is int) || !(step is int) || (int)step == 0) {
+                return -1;
+            }
+
+            BuiltinFunction bf = func as BuiltinFunction;
+            if (bf != null) {
+                if (bf.DeclaringType != typeof(Builtin) || bf.Name != "range") {
+                    return -1;
+                }
+            } else if (func != DynamicHelpers.GetPythonTypeFromType(typeof(XRange))) {
+                return -1;
+            }
+
+            int istart = (int)start, istop = (int)stop, istep = (int)step;
+            long count;
+            if (istep > 0) {
+                count = istart < istop ? (0L + istop - istart + istep - 1) / istep : 0;
+            } else {
+                count = istart > istop ? (0L + istop - istart + istep + 1) / istep : 0;
+            }
+
+            if (count > Int32.MaxValue) {
+                // let range/xrange report the error
+                return -1;
+            }
+            return (int)count;
+        }
+
+        /// <summary>
+        /// Called when int arithmetic specialized from type feedback overflows int.
+        /// </summary>
+        public static object Int64ToBigIntegerObject(long value) {
+            return (BigInteger)value;
+        }
+
         public static bool IsExtensionSet(CodeContext codeContext, int id) {
             return codeContext.ModuleContext.ExtensionMethods.Id == id;
         }
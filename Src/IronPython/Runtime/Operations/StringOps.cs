@@ -831,25 +831,25 @@ namespace IronPython.Runtime.Operations {
         }
 
         public static string join(this string/*!*/ self, [NotNull]List/*!*/ sequence) {
-            if (sequence.__len__() == 0) return String.Empty;
+            // a copy of the items rather than locking the list while they're converted
+            object[] items = sequence.GetObjectArray();
+            if (items.Length == 0) return String.Empty;
 
-            lock (sequence) {
-                if (sequence.__len__() == 1) {
-                    return Converter.ConvertToString(sequence[0]);
-                }
+            if (items.Length == 1) {
+                return Converter.ConvertToString(items[0]);
+            }
 
-                StringBuilder ret = new StringBuilder();
+            StringBuilder ret = new StringBuilder();
 
-                AppendJoin(sequence._data[0], 0, ret);
-                for (int i = 1; i < sequence._size; i++) {
-                    if (!String.IsNullOrEmpty(self)) {
-                        ret.Append(self);
-                    }
-                    AppendJoin(sequence._data[i], i, ret);
+            AppendJoin(items[0], 0, ret);
+            for (int i = 1; i < items.Length; i++) {
+                if (!String.IsNullOrEmpty(self)) {
+                    ret.Append(self);
                 }
-
-                return ret.ToString();
+                AppendJoin(items[i], i, ret);
             }
+
+            return ret.ToString();
         }
 
         public static string ljust(this string self, int width) {
@@ -29,7 +29,7 @@ using IronPython.Runtime.Operations;
 
 namespace IronPython.Runtime {
     [PythonType("buffer"), DontMapGetMemberNamesToDir]
-    public sealed class PythonBuffer : ICodeFormattable, IDynamicMetaObjectProvider, IList<byte> {
+    public sealed class PythonBuffer : ICodeFormattable, IDynamicMetaObjectProvider, IList<byte>, IDirectBuffer {
         internal object _object;
         private int _offset;
         private int _size;
@@ -290,6 +290,23 @@ namespace IronPython.Runtime {
 
         #endregion
 
+        #region IDirectBuffer Members
+
+        bool IDirectBuffer.TryGetSegment(bool writable, out ArraySegment<byte> segment) {
+            IDirectBuffer direct = _object as IDirectBuffer;
+            ArraySegment<byte> whole;
+            if (writable || direct == null || !direct.TryGetSegment(false, out whole)) {
+                segment = default(ArraySegment<byte>);
+                return false;
+            }
+
+            int start = Math.Min(_offset, whole.Count);
+            segment = new ArraySegment<byte>(whole.Array, whole.Offset + start, Math.Max(Math.Min(_size, whole.Count - start), 0));
+            return true;
+        }
+
+        #endregion
+
         #region IList[System.Byte] implementation
         byte[] _objectByteCache = null;
         internal byte[] byteCache {
@@ -144,6 +144,18 @@ namespace IronPython.Runtime
         private CallSite<Func<CallSite, CodeContext, object, object, object>> _propGetSite, _propDelSite;
         private CallSite<Func<CallSite, CodeContext, object, object, object, object>> _propSetSite;
         private CompiledLoader _compiledLoader;
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+        private CompiledCodeCache _compiledCodeCache;
+#endif
+#if FEATURE_FILESYSTEM
+        private ImportDirectoryCache _importDirectoryCache;
+#endif
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+        private readonly StartupImage _startupImage;      // null unless -X:StartupImage
+#endif
+        private readonly ImportProfiler _importProfiler;   // null unless -X:ImportProfile
+        private readonly CompilationQueue _compilationQueue; // null unless -X:BackgroundCompilation
+        private readonly EvalCodeCache _evalCodeCache;       // null if -X:EvalCacheSize is 0
         internal bool _importWarningThrows;
         private bool _importedEncodings;
         private Action<Action> _commandDispatcher; // can be null
@@ -229,7 +241,29 @@ namespace IronPython.Runtime
         public PythonContext(ScriptDomainManager/*!*/ manager, IDictionary<string, object> options)
             : base(manager) {
             _options = new PythonOptions(options);
+
+            if (_options.BackgroundCompilation && !_options.NoAdaptiveCompilation) {
+                _compilationQueue = new CompilationQueue();
+            }
+
+            if (_options.EvalCacheSize > 0) {
+                _evalCodeCache = new EvalCodeCache(_options.EvalCacheSize);
+            }
+
+            long start = 0;
+            if (_options.ImportProfile) {
+                _importProfiler = new ImportProfiler(this);
+                start = ImportProfiler.GetTimestamp();
+            }
+
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+            if (!String.IsNullOrEmpty(_options.StartupImage)) {
+                _startupImage = new StartupImage(this, _options.StartupImage);
+            }
+#endif
+
             _builtinModulesDict = CreateBuiltinTable();
+            start = ProfileStartup("builtin module table", start);
 
             PythonDictionary defaultScope = new PythonDictionary();
             ModuleContext modContext = new ModuleContext(defaultScope, this);
@@ -250,10 +284,12 @@ namespace IronPython.Runtime
             if (DefaultContext._default == null) {
                 DefaultContext.InitializeDefaults(_defaultContext, defaultClsContext);
             }
+            start = ProfileStartup("binder and type system", start);
 
             InitializeBuiltins();
 
             InitializeSystemState();
+            start = ProfileStartup("builtins and sys", start);
 #if SILVERLIGHT
             AddToPath("");
 #endif
@@ -339,6 +375,21 @@ namespace IronPython.Runtime
             manager.AssemblyLoaded += new EventHandler<AssemblyLoadedEventArgs>(ManagerAssemblyLoaded);
 
             _mainThreadFunctionStack = PythonOps.GetFunctionStack();
+            ProfileStartup("runtime setup", start);
+        }
+
+        /// <summary>
+        /// Reports the time since start as a step of the initialization to the import profiler
+        /// and returns the start time for the next step.
+        /// </summary>
+        private long ProfileStartup(string/*!*/ step, long start) {
+            if (_importProfiler == null) {
+                return 0;
+            }
+
+            long now = ImportProfiler.GetTimestamp();
+            _importProfiler.AddStartupTime(step, now - start);
+            return now;
         }
 
         void ManagerAssemblyLoaded(object sender, AssemblyLoadedEventArgs e) {
@@ -918,6 +969,22 @@ namespace IronPython.Runtime
 
             CompilerContext context = new CompilerContext(sourceUnit, options, errorSink);
 
+            PythonContext pc = sourceUnit.LanguageContext as PythonContext;
+            ImportProfiler profiler = pc != null ? pc._importProfiler : null;
+            if (profiler != null) {
+                long start = ImportProfiler.GetTimestamp();
+                PyAst.PythonAst profiledAst = ParseAndBindAst(context);
+                long parsed = ImportProfiler.GetTimestamp();
+                profiler.AddParseTime(parsed - start);
+                if (profiledAst == null) {
+                    return null;
+                }
+
+                ScriptCode res = profiledAst.ToScriptCode();
+                profiler.AddCompileTime(ImportProfiler.GetTimestamp() - parsed);
+                return res;
+            }
+
             PyAst.PythonAst ast = ParseAndBindAst(context);
             if (ast == null) {
                 return null;
@@ -1129,7 +1196,13 @@ namespace IronPython.Runtime
             moduleContext.Features = options;
 
             if ((options & ModuleOptions.Initialize) != 0) {
-                scriptCode.Run(moduleContext.GlobalScope);
+                if (_importProfiler != null) {
+                    long start = ImportProfiler.GetTimestamp();
+                    scriptCode.Run(moduleContext.GlobalScope);
+                    _importProfiler.AddExecTime(ImportProfiler.GetTimestamp() - start);
+                } else {
+                    scriptCode.Run(moduleContext.GlobalScope);
+                }
 
                 if (!moduleContext.Globals.ContainsKey("__package__")) {
                     moduleContext.Globals["__package__"] = null;
@@ -1178,7 +1251,11 @@ namespace IronPython.Runtime
 
         internal PythonModule GetBuiltinModule(string name) {
             lock (this) {
+                long start = _importProfiler != null ? ImportProfiler.GetTimestamp() : 0;
                 PythonModule mod = CreateBuiltinModule(name);
+                if (_importProfiler != null) {
+                    _importProfiler.AddExecTime(ImportProfiler.GetTimestamp() - start);
+                }
                 if (mod != null) {
                     PublishModule(name, mod);
                     return mod;
@@ -1824,6 +1901,22 @@ namespace IronPython.Runtime
         private Dictionary<string, Type> CreateBuiltinTable() {
             Dictionary<string, Type> builtinTable = new Dictionary<string, Type>();
 
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+            if (_startupImage != null) {
+                if (!_startupImage.TryGetBuiltinModules(builtinTable, BuiltinModuleNames)) {
+                    LoadBuiltinTable(builtinTable);
+                }
+                _startupImage.RecordBuiltinModules(builtinTable, BuiltinModuleNames);
+                return builtinTable;
+            }
+#endif
+
+            LoadBuiltinTable(builtinTable);
+            return builtinTable;
+        }
+
+        private void LoadBuiltinTable(Dictionary<string, Type> builtinTable) {
+
             // We should register builtins, if any, from IronPython.dll
             LoadBuiltins(builtinTable, typeof(PythonContext).GetTypeInfo().Assembly, false);
 
@@ -1852,8 +1945,6 @@ namespace IronPython.Runtime
                 }
 #endif
             }
-
-            return builtinTable;
         }
 
         internal void LoadBuiltins(Dictionary<string, Type> builtinTable, Assembly assem, bool updateSys) {
@@ -3091,6 +3182,46 @@ namespace IronPython.Runtime
 
 #region Compiled Code Support
 
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+        /// <summary>
+        /// Gets the startup image or null if -X:StartupImage wasn't specified.
+        /// </summary>
+        internal StartupImage StartupImage {
+            get {
+                return _startupImage;
+            }
+        }
+#endif
+
+        /// <summary>
+        /// Gets the import profiler or null if -X:ImportProfile wasn't specified.
+        /// </summary>
+        internal ImportProfiler ImportProfiler {
+            get {
+                return _importProfiler;
+            }
+        }
+
+        /// <summary>
+        /// Gets the queue of code being compiled in the background or null if -X:BackgroundCompilation
+        /// wasn't specified.
+        /// </summary>
+        internal CompilationQueue CompilationQueue {
+            get {
+                return _compilationQueue;
+            }
+        }
+
+        /// <summary>
+        /// Gets the cache of code compiled for exec, eval and compile or null if -X:EvalCacheSize
+        /// is 0.
+        /// </summary>
+        internal EvalCodeCache EvalCodeCache {
+            get {
+                return _evalCodeCache;
+            }
+        }
+
         internal CompiledLoader GetCompiledLoader() {
             if (_compiledLoader == null) {
                 if (Interlocked.CompareExchange(ref _compiledLoader, new CompiledLoader(), null) == null) {
@@ -3108,6 +3239,34 @@ namespace IronPython.Runtime
             return _compiledLoader;
         }
 
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+        /// <summary>
+        /// Gets the on-disk cache of compiled modules or null if -X:CompiledCodeCache wasn't specified.
+        /// </summary>
+        internal CompiledCodeCache GetCompiledCodeCache() {
+            string directory = PythonOptions.CompiledCodeCache;
+            if (_compiledCodeCache == null && !String.IsNullOrEmpty(directory)) {
+                Interlocked.CompareExchange(ref _compiledCodeCache, new CompiledCodeCache(this, Path.GetFullPath(directory)), null);
+            }
+
+            return _compiledCodeCache;
+        }
+#endif
+
+#if FEATURE_FILESYSTEM
+        /// <summary>
+        /// Gets the cache of directory listings used by the importer or null if the host
+        /// provides its own file system.
+        /// </summary>
+        internal ImportDirectoryCache GetImportDirectoryCache() {
+            if (_importDirectoryCache == null && ImportDirectoryCache.IsSupported(DomainManager.Platform)) {
+                Interlocked.CompareExchange(ref _importDirectoryCache, new ImportDirectoryCache(), null);
+            }
+
+            return _importDirectoryCache;
+        }
+#endif
+
 #endregion
 
         /// <summary>
@@ -4165,8 +4324,14 @@ namespace IronPython.Runtime
             var oldTraceListener = _tracebackListeners.Value;
             var newTraceListener = oldTraceListener;
 
+            IFrameProfiler profiler = oldTraceListener != null ? oldTraceListener.Profiler : null;
             if (o == null) {
-                _tracebackListeners.Value = newTraceListener = null;
+                if (profiler != null) {
+                    // keep delivering call/return events to the profiler
+                    newTraceListener = new PythonTracebackListener(this, null);
+                    newTraceListener.Profiler = profiler;
+                }
+                _tracebackListeners.Value = newTraceListener;
             } else {
                 // We're following CPython behavior here.
                 // If CurrentPythonFrame is not null then we're currently inside a traceback, and
@@ -4174,9 +4339,43 @@ namespace IronPython.Runtime
                 var pyThread = PythonOps.GetFunctionStackNoCreate();
                 if (pyThread == null || (oldTraceListener == null || !oldTraceListener.InTraceBack)) {
                     _tracebackListeners.Value = newTraceListener = new PythonTracebackListener(this, o);
+                    newTraceListener.Profiler = profiler;
                 }
             }
 
+            UpdateTracebackListenersCount(oldTraceListener, newTraceListener);
+        }
+
+        /// <summary>
+        /// Registers a profiler which receives call and return events for Python functions
+        /// executed on the current thread, or unregisters it when profiler is null.  Code is
+        /// recompiled with tracing support the same way it is for sys.settrace; unless a trace
+        /// function is also set, the listener only forwards calls and returns and drops every
+        /// other event without tracking frames.
+        /// </summary>
+        internal void SetProfiler(IFrameProfiler profiler) {
+            if (profiler == null && _debugContext == null)
+                return;
+
+            EnsureDebugContext();
+
+            var oldTraceListener = _tracebackListeners.Value;
+            var newTraceListener = oldTraceListener;
+
+            if (oldTraceListener != null && oldTraceListener.TraceObject != null) {
+                // sys.settrace is active, share its listener
+                oldTraceListener.Profiler = profiler;
+            } else if (profiler != null) {
+                _tracebackListeners.Value = newTraceListener = new PythonTracebackListener(this, null);
+                newTraceListener.Profiler = profiler;
+            } else {
+                _tracebackListeners.Value = newTraceListener = null;
+            }
+
+            UpdateTracebackListenersCount(oldTraceListener, newTraceListener);
+        }
+
+        private void UpdateTracebackListenersCount(PythonTracebackListener oldTraceListener, PythonTracebackListener newTraceListener) {
             // global
             lock (_codeUpdateLock)
             {
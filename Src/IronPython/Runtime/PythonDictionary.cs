@@ -357,8 +357,8 @@ namespace IronPython.Runtime {
 
         public virtual List keys() {
             List res = new List();
-            foreach (KeyValuePair<object, object> kvp in _storage.GetItems()) {
-                res.append(kvp.Key);
+            foreach (object key in _storage.GetKeys()) {
+                res.append(key);
             }
             return res;
         }
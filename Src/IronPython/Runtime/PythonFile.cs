@@ -144,36 +144,46 @@ namespace IronPython.Runtime {
 
             byte[] data;
             if (size <= BufferSize) {
-                if (_buffer == null)
-                    _buffer = new byte[BufferSize];
-                data = _buffer;
+                data = Buffer;
             } else
                 data = new byte[size];
-            int leftCount = size;
-            int offset = 0;
-            while (true) {
-                int count = _stream.Read(data, offset, leftCount);
-                if (count <= 0) break;
-                leftCount -= count;
-                if (leftCount <= 0) break;
-                offset += count;
+
+            return PackDataIntoString(data, Read(data, 0, size));
+        }
+
+        // Read at most count bytes into the given array and return the number of bytes read.
+        public int Read(byte[] data, int offset, int count) {
+            int leftCount = count;
+            while (leftCount > 0) {
+                int read = _stream.Read(data, offset, leftCount);
+                if (read <= 0) break;
+                leftCount -= read;
+                offset += read;
             }
 
             System.Diagnostics.Debug.Assert(leftCount >= 0);
 
-            return PackDataIntoString(data, size - leftCount);
+            return count - leftCount;
+        }
+
+        // The buffer reused by the reads of up to BufferSize bytes.
+        public byte[] Buffer {
+            get {
+                if (_buffer == null)
+                    _buffer = new byte[BufferSize];
+                return _buffer;
+            }
         }
 
         // Read until the end of the stream and return the result as a single string.
         public override String ReadToEnd() {
             StringBuilder sb = new StringBuilder();
-            if (_buffer == null)
-                _buffer = new byte[BufferSize];
+            byte[] buffer = Buffer;
             while (true) {
-                int count = _stream.Read(_buffer, 0, BufferSize);
+                int count = _stream.Read(buffer, 0, BufferSize);
                 if (count == 0)
                     break;
-                sb.Append(PackDataIntoString(_buffer, count));
+                sb.Append(PackDataIntoString(buffer, count));
             }
             if (sb.Length == 0)
                 return String.Empty;
@@ -1655,6 +1665,41 @@ namespace IronPython.Runtime {
             }
         }
 
+        [Documentation("readinto(buffer) -> int.  Read up to len(buffer) bytes into buffer, which must be\n"
+            + "a writable buffer such as a bytearray, an array or a memoryview.  Returns the number of\n"
+            + "bytes read, 0 at end of file.")]
+        public int readinto([NotNull]object buffer) {
+            int length;
+            if (!BufferOps.TryGetWritableLength(buffer, out length)) {
+                throw PythonOps.TypeError("argument 1 must be read-write buffer, not {0}", PythonTypeOps.GetName(buffer));
+            }
+
+            PythonStreamReader reader = GetReader();
+            PythonBinaryReader binary = reader as PythonBinaryReader;
+            if (binary == null) {
+                byte[] bytes = reader.Read(length).MakeByteArray();
+                BufferOps.Write(buffer, 0, bytes, 0, bytes.Length);
+                return bytes.Length;
+            }
+
+            ArraySegment<byte> segment;
+            if (BufferOps.TryGetWritableSegment(buffer, out segment)) {
+                return binary.Read(segment.Array, segment.Offset, length);
+            }
+
+            // read through the reader's buffer so that no data is allocated
+            byte[] data = binary.Buffer;
+            int total = 0;
+            while (total < length) {
+                int count = Math.Min(data.Length, length - total);
+                int read = binary.Read(data, 0, count);
+                BufferOps.Write(buffer, total, data, 0, read);
+                total += read;
+                if (read < count) break;
+            }
+            return total;
+        }
+
         public string readline() {
             return GetReader().ReadLine();
         }
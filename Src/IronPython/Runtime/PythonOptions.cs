@@ -56,6 +56,14 @@ namespace IronPython {
         private readonly int? _gcStress;
         private bool _enableProfiler;
         private readonly bool _lightweightScopes;
+        private readonly string _compiledCodeCache;
+        private readonly bool _importProfile;
+        private readonly string _startupImage;
+        private readonly string _regexEngine;
+        private readonly int _regexCacheSize;
+        private readonly bool _backgroundCompilation;
+        private readonly bool _compilationProfile;
+        private readonly int _evalCacheSize;
 
         /// <summary>
         /// Gets the collection of command line arguments.
@@ -224,6 +232,69 @@ namespace IronPython {
             set { _enableProfiler = value; }
         }
 
+        /// <summary>
+        /// Directory in which compiled modules are cached between runs, or null if imported
+        /// modules are always compiled from source.
+        /// </summary>
+        public string CompiledCodeCache {
+            get { return _compiledCodeCache; }
+        }
+
+        /// <summary>
+        /// Report the time taken by each import to stderr (the -X:ImportProfile option).
+        /// </summary>
+        public bool ImportProfile {
+            get { return _importProfile; }
+        }
+
+        /// <summary>
+        /// File name of the startup image which is created by the first launch and makes later
+        /// launches faster, or null if no image is used.
+        /// </summary>
+        public string StartupImage {
+            get { return _startupImage; }
+        }
+
+        /// <summary>
+        /// The engine which runs the patterns of the re module: "cli" translates them to .NET
+        /// regular expressions, "sre" runs the code produced by sre_compile in the _sre module.
+        /// </summary>
+        public string RegexEngine {
+            get { return _regexEngine; }
+        }
+
+        /// <summary>
+        /// Number of patterns the re module keeps compiled for its module level functions, zero
+        /// disables the cache.
+        /// </summary>
+        public int RegexCacheSize {
+            get { return _regexCacheSize; }
+        }
+
+        /// <summary>
+        /// Interpret code which would be compiled before it first runs and compile it on a
+        /// background thread instead (the -X:BackgroundCompilation option).
+        /// </summary>
+        public bool BackgroundCompilation {
+            get { return _backgroundCompilation; }
+        }
+
+        /// <summary>
+        /// Count the calls of each function so that clr.GetCompilationProfile can report them
+        /// (the -X:CompilationProfile option).
+        /// </summary>
+        public bool CompilationProfile {
+            get { return _compilationProfile; }
+        }
+
+        /// <summary>
+        /// Number of source strings passed to exec and eval whose compiled code is kept,
+        /// zero disables the cache.
+        /// </summary>
+        public int EvalCacheSize {
+            get { return _evalCacheSize; }
+        }
+
         public int? GCStress {
             get { return _gcStress; }            
         }
@@ -277,6 +348,14 @@ namespace IronPython {
             _gcStress = GetOption<int?>(options, "GCStress", null);
             _tracing = GetOption(options, "Tracing", false);
             _noDebug = GetOption(options, "NoDebug", (Regex)null);
+            _compiledCodeCache = GetOption(options, "CompiledCodeCache", (string)null);
+            _importProfile = GetOption(options, "ImportProfile", false);
+            _startupImage = GetOption(options, "StartupImage", (string)null);
+            _regexEngine = GetOption(options, "RegexEngine", "cli");
+            _regexCacheSize = GetOption(options, "RegexCacheSize", 100);
+            _backgroundCompilation = GetOption(options, "BackgroundCompilation", false);
+            _compilationProfile = GetOption(options, "CompilationProfile", false);
+            _evalCacheSize = GetOption(options, "EvalCacheSize", 100);
 
             object value;
             if (options != null && options.TryGetValue("PythonVersion", out value)) {
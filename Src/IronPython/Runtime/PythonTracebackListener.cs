@@ -26,12 +26,23 @@ using IronPython.Runtime.Types;
 using Debugging = Microsoft.Scripting.Debugging;
 
 namespace IronPython.Runtime {
+    /// <summary>
+    /// Receives call and return notifications for Python frames on the thread it is
+    /// registered on.  Unlike a sys.settrace function no TraceBackFrame is created and
+    /// line events are not delivered.
+    /// </summary>
+    internal interface IFrameProfiler {
+        void OnCall(FunctionCode/*!*/ code);
+        void OnReturn(FunctionCode/*!*/ code);
+    }
+
     internal sealed class PythonTracebackListener : Debugging.ITraceCallback {
         private readonly PythonContext _pythonContext;
         private object _traceObject;
         private TracebackDelegate _traceDispatch;
         private bool _inTraceBack;
         private bool _exceptionThrown;
+        private IFrameProfiler _profiler;
         
 #if PROFILE_SUPPORT
         private bool _profile;
@@ -74,6 +85,15 @@ namespace IronPython.Runtime {
             }
         }
 
+        internal IFrameProfiler Profiler {
+            get {
+                return _profiler;
+            }
+            set {
+                _profiler = value;
+            }
+        }
+
 #if PROFILE_SUPPORT
         internal void SetProfile(TracebackDelegate traceDispatch) {
             _traceDispatch = traceDispatch;
@@ -84,6 +104,20 @@ namespace IronPython.Runtime {
         #region ITraceCallback Members
 
         public void OnTraceEvent(Debugging.TraceEventKind kind, string name, string sourceFileName, SourceSpan sourceSpan, Func<IDictionary<object, object>> scopeCallback, object payload, object customPayload) {        
+            IFrameProfiler profiler = _profiler;
+            if (profiler != null && _traceObject == null && !_exceptionThrown && !_pythonContext.PythonOptions.Tracing) {
+                // Only a profiler is registered: it just needs calls and returns, and without a trace
+                // function nothing reads the frame stack (-X:Tracing keeps it for a later sys.settrace).
+                if (!_inTraceBack) {
+                    if (kind == Debugging.TraceEventKind.FrameEnter) {
+                        profiler.OnCall(((PythonDebuggingPayload)customPayload).Code);
+                    } else if (kind == Debugging.TraceEventKind.FrameExit) {
+                        profiler.OnReturn(((PythonDebuggingPayload)customPayload).Code);
+                    }
+                }
+                return;
+            }
+
             if (kind == Debugging.TraceEventKind.ThreadExit ||                  // We don't care about thread-exit events
 #if PROFILE_SUPPORT
                 (_profile && kind == Debugging.TraceEventKind.TracePoint) ||    // Ignore code execute tracebacks when in profile mode
@@ -92,6 +126,14 @@ namespace IronPython.Runtime {
                 return;
             }
 
+            if (profiler != null && !_inTraceBack) {
+                if (kind == Debugging.TraceEventKind.FrameEnter) {
+                    profiler.OnCall(((PythonDebuggingPayload)customPayload).Code);
+                } else if (kind == Debugging.TraceEventKind.FrameExit) {
+                    profiler.OnReturn(((PythonDebuggingPayload)customPayload).Code);
+                }
+            }
+
             TracebackDelegate traceDispatch = null;
             object traceDispatchObject = null;
             var thread = PythonOps.GetFunctionStack();
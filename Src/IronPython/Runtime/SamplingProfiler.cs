@@ -0,0 +1,419 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+#if FEATURE_THREAD
+
+using System;
+using System.Collections.Generic;
+using System.Text;
+using System.Threading;
+
+using Microsoft.Scripting;
+
+using IronPython.Runtime.Operations;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Statistical profiler for a single ScriptRuntime.  A background thread periodically
+    /// copies the Python function stacks (the same stacks sys._getframe uses) of every thread
+    /// and counts identical stacks.  The profiled threads don't execute any extra code, so
+    /// unlike sys.settrace or _lsprof no code needs to be recompiled.
+    ///
+    /// Samples are taken without stopping the sampled thread so an individual sample can be
+    /// slightly off when a call or return races with it; over many samples this is noise.
+    /// Function granularity only: the current line is not tracked without tracing.
+    /// </summary>
+    public sealed class SamplingProfiler {
+        private readonly PythonContext/*!*/ _context;
+        private readonly object _lock = new object();
+        private readonly Dictionary<FunctionCode[], int>/*!*/ _samples = new Dictionary<FunctionCode[], int>(new StackComparer());
+        private Thread _thread;
+        private volatile bool _running;
+        private int _interval;
+        private int _sampleCount;
+
+        [MultiRuntimeAware]
+        private static readonly object _samplerKey = new object();
+
+        // function stacks of the threads which have run Python code, see PythonOps.GetFunctionStack.
+        // Threads push themselves onto the list without locking, entries of dead threads are
+        // unlinked under _pruneLock by the samplers and every PruneInterval registrations.
+        [MultiRuntimeAware]
+        private static ThreadEntry _threads;
+        [MultiRuntimeAware]
+        private static int _registrations;
+        [MultiRuntimeAware]
+        private static readonly object _pruneLock = new object();
+
+        private const int PruneInterval = 64;
+
+        public const int DefaultInterval = 10;
+
+        /// <summary>
+        /// Get the unique SamplingProfiler instance for this ScriptRuntime
+        /// </summary>
+        public static SamplingProfiler/*!*/ GetSamplingProfiler(PythonContext/*!*/ context) {
+            return context.GetOrCreateModuleState(_samplerKey, () => new SamplingProfiler(context));
+        }
+
+        private SamplingProfiler(PythonContext/*!*/ context) {
+            _context = context;
+        }
+
+        internal static void RegisterThread(List<FunctionStack>/*!*/ stack) {
+            ThreadEntry entry = new ThreadEntry(Thread.CurrentThread, stack);
+            ThreadEntry head;
+            do {
+                head = _threads;
+                entry.Next = head;
+            } while (Interlocked.CompareExchange(ref _threads, entry, head) != head);
+
+            if (Interlocked.Increment(ref _registrations) % PruneInterval == 0) {
+                RemoveDeadThreads();
+            }
+        }
+
+        /// <summary>
+        /// Unlinks the entries of threads which have exited.  New entries are only ever pushed
+        /// in front of the head, so only unlinking the head itself can race with RegisterThread.
+        /// </summary>
+        private static void RemoveDeadThreads() {
+            lock (_pruneLock) {
+                ThreadEntry prev = null;
+                for (ThreadEntry entry = _threads; entry != null; entry = entry.Next) {
+                    if (entry.IsAlive) {
+                        prev = entry;
+                    } else if (prev != null) {
+                        prev.Next = entry.Next;
+                    } else if (Interlocked.CompareExchange(ref _threads, entry.Next, entry) != entry) {
+                        // a thread registered meanwhile, the entry is unlinked by a later pass
+                        prev = entry;
+                    }
+                }
+            }
+        }
+
+        private sealed class ThreadEntry {
+            private readonly Thread/*!*/ _thread;
+            private readonly WeakReference/*!*/ _stack;
+            public volatile ThreadEntry Next;
+
+            public ThreadEntry(Thread/*!*/ thread, List<FunctionStack>/*!*/ stack) {
+                _thread = thread;
+                _stack = new WeakReference(stack);
+            }
+
+            /// <summary>
+            /// The function stack of the thread or null once the thread has exited
+            /// </summary>
+            public List<FunctionStack> Stack {
+                get {
+                    return _thread.IsAlive ? (List<FunctionStack>)_stack.Target : null;
+                }
+            }
+
+            public bool IsAlive {
+                get {
+                    return _thread.IsAlive && _stack.IsAlive;
+                }
+            }
+        }
+
+        public bool IsRunning {
+            get {
+                return _running;
+            }
+        }
+
+        /// <summary>
+        /// Number of samples which contained at least one Python frame
+        /// </summary>
+        public int SampleCount {
+            get {
+                return _sampleCount;
+            }
+        }
+
+        /// <summary>
+        /// Sampling interval in milliseconds
+        /// </summary>
+        public int Interval {
+            get {
+                return _interval;
+            }
+        }
+
+        /// <summary>
+        /// Starts sampling every interval milliseconds.  Samples collected by a previous run are
+        /// kept until Reset is called.
+        /// </summary>
+        public void Start(int interval) {
+            if (interval <= 0) {
+                throw PythonOps.ValueError("interval must be positive");
+            }
+            if (!_context.PythonOptions.Frames && !_context.EnableTracing) {
+                throw PythonOps.RuntimeError("the sampling profiler requires -X:Frames or -X:FullFrames");
+            }
+
+            lock (_lock) {
+                if (_running) {
+                    throw PythonOps.RuntimeError("the sampling profiler is already running");
+                }
+
+                _interval = interval;
+                _running = true;
+                _thread = new Thread(SamplerThread);
+                _thread.IsBackground = true;
+                _thread.Name = "IronPython sampling profiler";
+                _thread.Start();
+            }
+        }
+
+        public void Stop() {
+            Thread thread;
+            lock (_lock) {
+                if (!_running) {
+                    return;
+                }
+                _running = false;
+                thread = _thread;
+                _thread = null;
+            }
+
+            if (thread != Thread.CurrentThread) {
+                thread.Join();
+            }
+        }
+
+        /// <summary>
+        /// Discards all samples collected so far
+        /// </summary>
+        public void Reset() {
+            lock (_lock) {
+                _samples.Clear();
+                _sampleCount = 0;
+            }
+        }
+
+        /// <summary>
+        /// Returns the samples in the "folded stacks" format consumed by flamegraph.pl and
+        /// similar tools: one line per distinct stack with the frames separated by
+        /// semicolons, outermost first, followed by the number of samples.
+        /// </summary>
+        public string/*!*/ GetFoldedStacks() {
+            StringBuilder res = new StringBuilder();
+            lock (_lock) {
+                foreach (KeyValuePair<FunctionCode[], int> sample in _samples) {
+                    for (int i = 0; i < sample.Key.Length; i++) {
+                        if (i != 0) {
+                            res.Append(';');
+                        }
+                        res.Append(FormatFunction(sample.Key[i]));
+                    }
+                    res.Append(' ');
+                    res.Append(sample.Value);
+                    res.Append('\n');
+                }
+            }
+            return res.ToString();
+        }
+
+        /// <summary>
+        /// Returns the samples as a pstats compatible dictionary mapping
+        /// (filename, firstlineno, name) to (cc, nc, tt, ct, callers).  Call counts are sample
+        /// counts and times are estimated as samples times the sampling interval.
+        /// </summary>
+        public PythonDictionary/*!*/ GetStats() {
+            var stats = new Dictionary<FunctionCode, FunctionStats>();
+            double interval;
+
+            lock (_lock) {
+                interval = _interval / 1000.0;
+                var seen = new HashSet<FunctionCode>();
+                var seenEdges = new HashSet<KeyValuePair<FunctionCode, FunctionCode>>();
+
+                foreach (KeyValuePair<FunctionCode[], int> sample in _samples) {
+                    FunctionCode[] stack = sample.Key;
+                    int count = sample.Value;
+                    seen.Clear();
+                    seenEdges.Clear();
+
+                    for (int i = 0; i < stack.Length; i++) {
+                        FunctionCode code = stack[i];
+                        FunctionStats func = GetFunctionStats(stats, code);
+                        bool leaf = i == stack.Length - 1;
+
+                        if (leaf) {
+                            func.Self += count;
+                        }
+                        if (seen.Add(code)) {
+                            // recursive frames are only counted once per sample
+                            func.Total += count;
+                        }
+
+                        if (i != 0 && seenEdges.Add(new KeyValuePair<FunctionCode, FunctionCode>(stack[i - 1], code))) {
+                            FunctionStats caller;
+                            if (!func.Callers.TryGetValue(stack[i - 1], out caller)) {
+                                func.Callers[stack[i - 1]] = caller = new FunctionStats();
+                            }
+                            caller.Total += count;
+                            if (leaf) {
+                                caller.Self += count;
+                            }
+                        }
+                    }
+                }
+            }
+
+            PythonDictionary res = new PythonDictionary();
+            foreach (KeyValuePair<FunctionCode, FunctionStats> func in stats) {
+                PythonDictionary callers = new PythonDictionary();
+                foreach (KeyValuePair<FunctionCode, FunctionStats> caller in func.Value.Callers) {
+                    callers[GetLabel(caller.Key)] = PythonTuple.MakeTuple(
+                        caller.Value.Total,
+                        caller.Value.Total,
+                        caller.Value.Self * interval,
+                        caller.Value.Total * interval
+                    );
+                }
+
+                res[GetLabel(func.Key)] = PythonTuple.MakeTuple(
+                    func.Value.Total,
+                    func.Value.Total,
+                    func.Value.Self * interval,
+                    func.Value.Total * interval,
+                    callers
+                );
+            }
+            return res;
+        }
+
+        #region Sampling
+
+        private void SamplerThread() {
+            while (_running) {
+                Thread.Sleep(_interval);
+                if (_running) {
+                    TakeSample();
+                }
+            }
+        }
+
+        private void TakeSample() {
+            RemoveDeadThreads();
+
+            for (ThreadEntry entry = _threads; entry != null; entry = entry.Next) {
+                List<FunctionStack> threadStack = entry.Stack;
+                if (threadStack == null) {
+                    continue;
+                }
+
+                FunctionCode[] stack = CaptureStack(threadStack);
+                if (stack == null) {
+                    continue;
+                }
+
+                lock (_lock) {
+                    int count;
+                    _samples.TryGetValue(stack, out count);
+                    _samples[stack] = count + 1;
+                    _sampleCount++;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Copies the functions on a stack which is concurrently modified by its owning thread.
+        /// Returns null if the thread isn't running Python code of this runtime.
+        /// </summary>
+        private FunctionCode[] CaptureStack(List<FunctionStack>/*!*/ stack) {
+            List<FunctionCode> res = null;
+            try {
+                int count = stack.Count;
+                for (int i = 0; i < count; i++) {
+                    FunctionStack frame = stack[i];
+                    if (frame.Code != null && frame.Context != null && frame.Context.LanguageContext == _context) {
+                        if (res == null) {
+                            res = new List<FunctionCode>(count);
+                        }
+                        res.Add(frame.Code);
+                    }
+                }
+            } catch (ArgumentOutOfRangeException) {
+                // the thread returned while we were reading its stack, use what we have
+            }
+
+            return res != null ? res.ToArray() : null;
+        }
+
+        #endregion
+
+        #region Helpers
+
+        private static string/*!*/ FormatFunction(FunctionCode/*!*/ code) {
+            return String.Format("{0}:{1}({2})", code.co_filename, code.co_firstlineno, code.co_name);
+        }
+
+        private static PythonTuple/*!*/ GetLabel(FunctionCode/*!*/ code) {
+            return PythonTuple.MakeTuple(code.co_filename, code.co_firstlineno, code.co_name);
+        }
+
+        private static FunctionStats/*!*/ GetFunctionStats(Dictionary<FunctionCode, FunctionStats>/*!*/ stats, FunctionCode/*!*/ code) {
+            FunctionStats res;
+            if (!stats.TryGetValue(code, out res)) {
+                stats[code] = res = new FunctionStats();
+            }
+            return res;
+        }
+
+        private sealed class FunctionStats {
+            public int Self, Total;
+
+            private Dictionary<FunctionCode, FunctionStats> _callers;
+
+            public Dictionary<FunctionCode, FunctionStats>/*!*/ Callers {
+                get {
+                    return _callers ?? (_callers = new Dictionary<FunctionCode, FunctionStats>());
+                }
+            }
+        }
+
+        private sealed class StackComparer : IEqualityComparer<FunctionCode[]> {
+            public bool Equals(FunctionCode[] x, FunctionCode[] y) {
+                if (x.Length != y.Length) {
+                    return false;
+                }
+                for (int i = 0; i < x.Length; i++) {
+                    if (x[i] != y[i]) {
+                        return false;
+                    }
+                }
+                return true;
+            }
+
+            public int GetHashCode(FunctionCode[] obj) {
+                int hash = obj.Length;
+                foreach (FunctionCode code in obj) {
+                    hash = hash * 31 + code.GetHashCode();
+                }
+                return hash;
+            }
+        }
+
+        #endregion
+    }
+}
+
+#endif
@@ -0,0 +1,368 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+#if FEATURE_REFEMIT && FEATURE_FILESYSTEM
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Reflection;
+using System.Text;
+
+using Microsoft.Scripting;
+using Microsoft.Scripting.Runtime;
+
+using IronPython.Compiler;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Startup image used with -X:StartupImage to avoid repeating the same work on every launch.
+    ///
+    /// The image consists of an assembly with the compiled code of all modules imported by
+    /// site.py and a text manifest next to it (image + ".manifest") which records the builtin
+    /// module table and, for each compiled module, the size and time stamp of its source file.
+    /// The first launch writes the image after site has been imported.  Later launches read the
+    /// builtin module table from the manifest instead of reflecting over the module assemblies
+    /// and import site's modules from the image assembly through sys.meta_path while site is
+    /// being imported.
+    ///
+    /// The image is ignored if it was created by a different IronPython build, with options that
+    /// change code generation or with a different sys.path.  Modules whose source changed are
+    /// imported from source and the image is rebuilt by the next launch.
+    /// </summary>
+    public sealed class StartupImage {
+        private const string FormatVersion = "IronPython startup image 1";
+
+        private readonly PythonContext/*!*/ _context;
+        private readonly string/*!*/ _assemblyPath, _manifestPath;
+        private readonly Dictionary<string, ImageModule>/*!*/ _modules = new Dictionary<string, ImageModule>(StringComparer.Ordinal);
+        private readonly List<string[]>/*!*/ _builtins = new List<string[]>(), _builtinNames = new List<string[]>();
+        private readonly List<string[]>/*!*/ _assemblies = new List<string[]>();
+        private string _searchPath, _startupSearchPath;
+        private bool _valid, _stale, _active;
+        private Dictionary<string, OnDiskScriptCode> _codes;
+        private Dictionary<string, Type> _savedBuiltins;
+        private Dictionary<Type, string> _savedBuiltinNames;
+
+        internal StartupImage(PythonContext/*!*/ context, string/*!*/ path) {
+            _context = context;
+            _assemblyPath = Path.GetFullPath(path);
+            _manifestPath = _assemblyPath + ".manifest";
+            _valid = ReadManifest();
+        }
+
+        /// <summary>
+        /// Fills in the builtin module tables from the image.  Returns false if the image doesn't
+        /// contain them or any of them is out of date.
+        /// </summary>
+        internal bool TryGetBuiltinModules(Dictionary<string, Type>/*!*/ builtinTable, Dictionary<Type, string>/*!*/ builtinNames) {
+            if (!_valid || _builtins.Count == 0) {
+                return false;
+            }
+
+            try {
+                foreach (string[] asm in _assemblies) {
+                    if (Assembly.Load(new AssemblyName(asm[1])).ManifestModule.ModuleVersionId.ToString() != asm[2]) {
+                        return false;
+                    }
+                }
+
+                foreach (string[] entry in _builtins) {
+                    Type type = Type.GetType(entry[2], false);
+                    if (type == null) {
+                        builtinTable.Clear();
+                        return false;
+                    }
+                    builtinTable[entry[1]] = type;
+                }
+
+                foreach (string[] entry in _builtinNames) {
+                    builtinNames[Type.GetType(entry[1], true)] = entry[2];
+                }
+            } catch (Exception) {
+                // e.g. a module assembly which can no longer be loaded, reflect over the
+                // assemblies as usual and replace the image at the end of startup
+                builtinTable.Clear();
+                builtinNames.Clear();
+                _valid = false;
+                return false;
+            }
+
+            return true;
+        }
+
+        /// <summary>
+        /// Remembers the builtin module tables as created during startup so that they can be
+        /// saved with the image.
+        /// </summary>
+        internal void RecordBuiltinModules(Dictionary<string, Type>/*!*/ builtinTable, Dictionary<Type, string>/*!*/ builtinNames) {
+            _savedBuiltins = new Dictionary<string, Type>(builtinTable);
+            _savedBuiltinNames = new Dictionary<Type, string>(builtinNames);
+        }
+
+        /// <summary>
+        /// Called before site is imported: serves the modules in the image while site is being
+        /// imported if the image is current.
+        /// </summary>
+        internal void BeginStartupImports() {
+            // site changes sys.path so the image is only valid for the path it started with
+            _startupSearchPath = GetSearchPath();
+            if (_valid && _modules.Count > 0 && _searchPath == _startupSearchPath) {
+                List metaPath = _context.GetSystemStateValue("meta_path") as List;
+                if (metaPath != null) {
+                    metaPath.append(this);
+                    _active = true;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Called after site has been imported: stops serving modules and writes the image if
+        /// there's none yet or it's out of date.
+        /// </summary>
+        internal void EndStartupImports() {
+            if (_active) {
+                List metaPath = _context.GetSystemStateValue("meta_path") as List;
+                if (metaPath != null && metaPath.__contains__(this)) {
+                    metaPath.remove(this);
+                }
+                _active = false;
+            }
+
+            if (_valid && !_stale && _searchPath == _startupSearchPath) {
+                return;
+            }
+
+            if (_codes != null) {
+                // our assembly is loaded and can't be replaced, the next launch rebuilds it
+                TryDelete(_manifestPath);
+                return;
+            }
+
+            try {
+                Save();
+            } catch (Exception) {
+                // don't leave a partially written image behind, the next launch tries again
+                TryDelete(_manifestPath);
+                TryDelete(_assemblyPath);
+            }
+        }
+
+        public ModuleLoader find_module(CodeContext/*!*/ context, string fullname, List path) {
+            ImageModule module;
+            if (!_active || !_modules.TryGetValue(fullname, out module)) {
+                return null;
+            }
+
+            if (!module.IsCurrent()) {
+                _stale = true;
+                return null;
+            }
+
+            OnDiskScriptCode code;
+            if (!GetCodes().TryGetValue(fullname, out code)) {
+                _stale = true;
+                return null;
+            }
+
+            int sep = fullname.LastIndexOf('.');
+            if (sep != -1) {
+                return new ModuleLoader(code, fullname.Substring(0, sep), fullname.Substring(sep + 1));
+            }
+            return new ModuleLoader(code, null, fullname);
+        }
+
+        #region Implementation details
+
+        private Dictionary<string, OnDiskScriptCode>/*!*/ GetCodes() {
+            if (_codes == null) {
+                _codes = new Dictionary<string, OnDiskScriptCode>(StringComparer.Ordinal);
+                try {
+                    Assembly asm = Assembly.LoadFile(_assemblyPath);
+                    foreach (ScriptCode sc in SavableScriptCode.LoadFromAssembly(_context.DomainManager, asm)) {
+                        OnDiskScriptCode onDisk = sc as OnDiskScriptCode;
+                        if (onDisk != null) {
+                            _codes[onDisk.ModuleName] = onDisk;
+                        }
+                    }
+                } catch (Exception) {
+                    // the image can't be used, import from source and rebuild it next launch
+                    _codes.Clear();
+                    _stale = true;
+                    TryDelete(_manifestPath);
+                    TryDelete(_assemblyPath);
+                }
+            }
+            return _codes;
+        }
+
+        private static void TryDelete(string/*!*/ file) {
+            try {
+                File.Delete(file);
+            } catch (IOException) {
+                // still loaded by another process
+            } catch (UnauthorizedAccessException) {
+            }
+        }
+
+        private string/*!*/ GetSearchPath() {
+            StringBuilder res = new StringBuilder();
+            List path;
+            if (_context.TryGetSystemPath(out path)) {
+                foreach (object dir in path) {
+                    res.Append(dir as string);
+                    res.Append('\t');
+                }
+            }
+            return res.ToString();
+        }
+
+        private bool ReadManifest() {
+            string[] lines;
+            try {
+                if (!File.Exists(_manifestPath)) {
+                    return false;
+                }
+                lines = File.ReadAllLines(_manifestPath, Encoding.UTF8);
+            } catch (IOException) {
+                return false;
+            } catch (UnauthorizedAccessException) {
+                return false;
+            }
+
+            if (lines.Length < 2 || lines[0] != FormatVersion || lines[1] != "key\t" + CompiledCodeCache.GetCodeGenerationKey(_context)) {
+                return false;
+            }
+
+            for (int i = 2; i < lines.Length; i++) {
+                string[] fields = lines[i].Split('\t');
+                switch (fields[0]) {
+                    case "path":
+                        _searchPath = lines[i].Substring("path\t".Length);
+                        break;
+                    case "assembly":
+                        if (fields.Length != 3) return false;
+                        _assemblies.Add(fields);
+                        break;
+                    case "builtin":
+                        if (fields.Length != 3) return false;
+                        _builtins.Add(fields);
+                        break;
+                    case "builtinname":
+                        if (fields.Length != 3) return false;
+                        _builtinNames.Add(fields);
+                        break;
+                    case "module":
+                        long length, ticks;
+                        if (fields.Length != 5 || !Int64.TryParse(fields[3], out length) || !Int64.TryParse(fields[4], out ticks)) {
+                            return false;
+                        }
+                        _modules[fields[1]] = new ImageModule(fields[2], length, ticks);
+                        break;
+                    default:
+                        return false;
+                }
+            }
+
+            return true;
+        }
+
+        private void Save() {
+            var codes = new List<SavableScriptCode>();
+            var manifest = new StringBuilder();
+            manifest.Append(FormatVersion).Append('\n');
+            manifest.Append("key\t").Append(CompiledCodeCache.GetCodeGenerationKey(_context)).Append('\n');
+            manifest.Append("path\t").Append(_startupSearchPath).Append('\n');
+
+            if (_savedBuiltins != null) {
+                var assemblies = new HashSet<Assembly>();
+                foreach (KeyValuePair<string, Type> entry in _savedBuiltins) {
+                    manifest.Append("builtin\t").Append(entry.Key).Append('\t').Append(entry.Value.AssemblyQualifiedName).Append('\n');
+                    assemblies.Add(entry.Value.Assembly);
+                }
+                foreach (KeyValuePair<Type, string> entry in _savedBuiltinNames) {
+                    manifest.Append("builtinname\t").Append(entry.Key.AssemblyQualifiedName).Append('\t').Append(entry.Value).Append('\n');
+                }
+                foreach (Assembly asm in assemblies) {
+                    manifest.Append("assembly\t").Append(asm.FullName).Append('\t').Append(asm.ManifestModule.ModuleVersionId).Append('\n');
+                }
+            }
+
+            foreach (KeyValuePair<object, object> entry in _context.SystemStateModules) {
+                string name = entry.Key as string;
+                PythonModule module = entry.Value as PythonModule;
+                object file;
+                if (name == null || name == "__main__" || module == null || !module.__dict__.TryGetValue("__file__", out file)) {
+                    continue;
+                }
+
+                string path = file as string;
+                if (path == null || !path.EndsWith(".py", StringComparison.OrdinalIgnoreCase) || path.IndexOf('\t') != -1 || !File.Exists(path)) {
+                    continue;
+                }
+
+                path = Path.GetFullPath(path);
+                SourceUnit su = _context.CreateFileUnit(path, _context.DefaultEncoding, SourceCodeKind.File);
+                SavableScriptCode code;
+                try {
+                    code = _context.GetScriptCode(su, name, ModuleOptions.Initialize, CompilationMode.ToDisk) as SavableScriptCode;
+                } catch (Exception) {
+                    // syntax errors or code which can't be saved, the module is imported from
+                    // source on every launch
+                    continue;
+                }
+                if (code == null) {
+                    continue;
+                }
+
+                FileInfo info = new FileInfo(path);
+                codes.Add(code);
+                manifest.Append("module\t").Append(name).Append('\t').Append(path).Append('\t')
+                    .Append(info.Length).Append('\t').Append(info.LastWriteTimeUtc.Ticks).Append('\n');
+            }
+
+            if (codes.Count > 0) {
+                SavableScriptCode.SaveToAssembly(_assemblyPath, codes.ToArray());
+            }
+            File.WriteAllText(_manifestPath, manifest.ToString(), new UTF8Encoding(false));
+        }
+
+        private sealed class ImageModule {
+            private readonly string/*!*/ _path;
+            private readonly long _length, _lastWriteTicks;
+
+            public ImageModule(string/*!*/ path, long length, long lastWriteTicks) {
+                _path = path;
+                _length = length;
+                _lastWriteTicks = lastWriteTicks;
+            }
+
+            public bool IsCurrent() {
+                try {
+                    FileInfo info = new FileInfo(_path);
+                    return info.Exists && info.Length == _length && info.LastWriteTimeUtc.Ticks == _lastWriteTicks;
+                } catch (IOException) {
+                    return false;
+                } catch (UnauthorizedAccessException) {
+                    return false;
+                }
+            }
+        }
+
+        #endregion
+    }
+}
+
+#endif
@@ -0,0 +1,703 @@
+﻿/* ****************************************************************************
+ *
+ * Copyright (c) Microsoft Corporation.
+ *
+ * This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+ * copy of the license can be found in the License.html file at the root of this distribution. If
+ * you cannot locate the  Apache License, Version 2.0, please send an email to
+ * dlr@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+ * by the terms of the Apache License, Version 2.0.
+ *
+ * You must not remove this notice, or any other, from this software.
+ *
+ *
+ * ***************************************************************************/
+
+using System;
+using System.Diagnostics;
+
+using IronPython.Runtime.Operations;
+
+namespace IronPython.Runtime {
+    /// <summary>
+    /// Compares the keys being sorted.  Implemented by structs so that the sort is specialized
+    /// for each comparison and the comparisons of primitive keys are inlined.
+    /// </summary>
+    internal interface ISortComparer<T> {
+        bool LessThan(T x, T y);
+    }
+
+    /// <summary>
+    /// The stable, adaptive merge sort used by list.sort and sorted, the same algorithm as
+    /// CPython's (see Objects/listsort.txt in the CPython sources).  Existing ascending and
+    /// strictly descending runs are found and merged with galloping so partially ordered
+    /// data needs far fewer than n log n comparisons.
+    ///
+    /// The keys are sorted in place.  If the values differ from the keys (a key function was
+    /// given) they're moved along with the keys.
+    /// </summary>
+    internal static class TimSort {
+        /// <summary>
+        /// Sorts the keys directly if they're all ints, floats or strings, which is the case
+        /// for most lists, without dynamic comparisons.  The values are moved along with the
+        /// keys and can be the same array as the keys.  Returns false if the keys are of any
+        /// other type or of mixed types.
+        /// </summary>
+        public static bool TrySortHomogeneous(object[]/*!*/ keys, object[]/*!*/ values, int index, int count, bool reverse) {
+            if (count < 2) {
+                return true;
+            }
+
+            object first = keys[index];
+            if (first is int) {
+                int[] ints = new int[index + count];
+                for (int i = index; i < index + count; i++) {
+                    if (!(keys[i] is int)) {
+                        return false;
+                    }
+                    ints[i] = (int)keys[i];
+                }
+
+                if (reverse) {
+                    Sort(ints, values, index, count, new ReversedComparer<int, IntComparer>(new IntComparer()));
+                } else {
+                    Sort(ints, values, index, count, new IntComparer());
+                }
+                return true;
+            } else if (first is double) {
+                double[] doubles = new double[index + count];
+                for (int i = index; i < index + count; i++) {
+                    if (!(keys[i] is double)) {
+                        return false;
+                    }
+                    doubles[i] = (double)keys[i];
+                }
+
+                if (reverse) {
+                    Sort(doubles, values, index, count, new ReversedComparer<double, DoubleComparer>(new DoubleComparer()));
+                } else {
+                    Sort(doubles, values, index, count, new DoubleComparer());
+                }
+                return true;
+            } else if (first is string) {
+                string[] strings = new string[index + count];
+                for (int i = index; i < index + count; i++) {
+                    strings[i] = keys[i] as string;
+                    if (strings[i] == null) {
+                        return false;
+                    }
+                }
+
+                if (reverse) {
+                    Sort(strings, values, index, count, new ReversedComparer<string, OrdinalComparer>(new OrdinalComparer()));
+                } else {
+                    Sort(strings, values, index, count, new OrdinalComparer());
+                }
+                return true;
+            }
+
+            return false;
+        }
+
+        /// <summary>
+        /// Sorts keys[index..index+count) and moves the values along with them.  values can be
+        /// null when the keys are the values.
+        /// </summary>
+        public static void Sort<T, TComparer>(T[]/*!*/ keys, object[] values, int index, int count, TComparer comparer)
+            where TComparer : struct, ISortComparer<T> {
+            if (count < 2) {
+                return;
+            }
+
+            new Sorter<T, TComparer>(keys, (object)keys == (object)values ? null : values, comparer).Sort(index, count);
+        }
+
+        #region Comparers
+
+        private struct IntComparer : ISortComparer<int> {
+            public bool LessThan(int x, int y) {
+                return x < y;
+            }
+        }
+
+        private struct DoubleComparer : ISortComparer<double> {
+            public bool LessThan(double x, double y) {
+                return DoubleOps.Compare(x, y) < 0;
+            }
+        }
+
+        private struct OrdinalComparer : ISortComparer<string> {
+            public bool LessThan(string x, string y) {
+                return string.CompareOrdinal(x, y) < 0;
+            }
+        }
+
+        /// <summary>
+        /// Sorts in descending order.  Equal keys keep their order, the same as reversing the
+        /// list, sorting it and reversing it again.
+        /// </summary>
+        private struct ReversedComparer<T, TComparer> : ISortComparer<T> where TComparer : struct, ISortComparer<T> {
+            private TComparer _comparer;
+
+            public ReversedComparer(TComparer comparer) {
+                _comparer = comparer;
+            }
+
+            public bool LessThan(T x, T y) {
+                return _comparer.LessThan(y, x);
+            }
+        }
+
+        #endregion
+
+        private sealed class Sorter<T, TComparer> where TComparer : struct, ISortComparer<T> {
+            // runs shorter than this are extended with a binary insertion sort
+            private const int MinMerge = 64;
+            // initial number of consecutive wins before merging switches to galloping
+            private const int MinGallopStart = 7;
+            // enough for 2 ** 64 elements given the invariants on the run lengths
+            private const int MaxMergePending = 85;
+
+            private readonly T[]/*!*/ _keys;
+            private readonly object[] _values;
+            private TComparer _comparer;
+            private T[] _tmpKeys;
+            private object[] _tmpValues;
+            private int _minGallop = MinGallopStart;
+
+            private readonly int[]/*!*/ _runBase = new int[MaxMergePending], _runLength = new int[MaxMergePending];
+            private int _pendingRuns;
+
+            public Sorter(T[]/*!*/ keys, object[] values, TComparer comparer) {
+                _keys = keys;
+                _values = values;
+                _comparer = comparer;
+            }
+
+            public void Sort(int lo, int remaining) {
+                int minRun = ComputeMinRun(remaining);
+                do {
+                    bool descending;
+                    int runLength = CountRun(lo, lo + remaining, out descending);
+                    if (descending) {
+                        Reverse(lo, lo + runLength);
+                    }
+
+                    // extend short runs to minRun elements
+                    if (runLength < minRun) {
+                        int force = remaining <= minRun ? remaining : minRun;
+                        BinarySort(lo, lo + force, lo + runLength);
+                        runLength = force;
+                    }
+
+                    _runBase[_pendingRuns] = lo;
+                    _runLength[_pendingRuns] = runLength;
+                    _pendingRuns++;
+                    MergeCollapse();
+
+                    lo += runLength;
+                    remaining -= runLength;
+                } while (remaining > 0);
+
+                MergeForceCollapse();
+                Debug.Assert(_pendingRuns == 1);
+            }
+
+            #region Runs
+
+            private static int ComputeMinRun(int n) {
+                int r = 0;
+                while (n >= MinMerge) {
+                    r |= n & 1;
+                    n >>= 1;
+                }
+                return n + r;
+            }
+
+            /// <summary>
+            /// Returns the length of the run starting at lo, which is either ascending or
+            /// strictly descending so that reversing it keeps the sort stable.
+            /// </summary>
+            private int CountRun(int lo, int hi, out bool descending) {
+                descending = false;
+                if (lo + 1 == hi) {
+                    return 1;
+                }
+
+                int n = 2;
+                if (_comparer.LessThan(_keys[lo + 1], _keys[lo])) {
+                    descending = true;
+                    for (int i = lo + 2; i < hi && _comparer.LessThan(_keys[i], _keys[i - 1]); i++) {
+                        n++;
+                    }
+                } else {
+                    for (int i = lo + 2; i < hi && !_comparer.LessThan(_keys[i], _keys[i - 1]); i++) {
+                        n++;
+                    }
+                }
+                return n;
+            }
+
+            private void Reverse(int lo, int hi) {
+                Array.Reverse(_keys, lo, hi - lo);
+                if (_values != null) {
+                    Array.Reverse(_values, lo, hi - lo);
+                }
+            }
+
+            /// <summary>
+            /// Sorts [lo, hi) given that [lo, start) is already sorted.
+            /// </summary>
+            private void BinarySort(int lo, int hi, int start) {
+                for (; start < hi; start++) {
+                    T pivot = _keys[start];
+                    int l = lo, r = start;
+                    while (l < r) {
+                        int p = l + ((r - l) >> 1);
+                        if (_comparer.LessThan(pivot, _keys[p])) {
+                            r = p;
+                        } else {
+                            l = p + 1;
+                        }
+                    }
+
+                    Array.Copy(_keys, l, _keys, l + 1, start - l);
+                    _keys[l] = pivot;
+                    if (_values != null) {
+                        object value = _values[start];
+                        Array.Copy(_values, l, _values, l + 1, start - l);
+                        _values[l] = value;
+                    }
+                }
+            }
+
+            #endregion
+
+            #region Merging
+
+            /// <summary>
+            /// Merges pending runs until the lengths of the runs on the stack decrease faster
+            /// than the Fibonacci numbers, which keeps the merges balanced.
+            /// </summary>
+            private void MergeCollapse() {
+                while (_pendingRuns > 1) {
+                    int n = _pendingRuns - 2;
+                    if ((n > 0 && _runLength[n - 1] <= _runLength[n] + _runLength[n + 1]) ||
+                        (n > 1 && _runLength[n - 2] <= _runLength[n - 1] + _runLength[n])) {
+                        if (_runLength[n - 1] < _runLength[n + 1]) {
+                            n--;
+                        }
+                        MergeAt(n);
+                    } else if (_runLength[n] <= _runLength[n + 1]) {
+                        MergeAt(n);
+                    } else {
+                        break;
+                    }
+                }
+            }
+
+            private void MergeForceCollapse() {
+                while (_pendingRuns > 1) {
+                    int n = _pendingRuns - 2;
+                    if (n > 0 && _runLength[n - 1] < _runLength[n + 1]) {
+                        n--;
+                    }
+                    MergeAt(n);
+                }
+            }
+
+            /// <summary>
+            /// Merges the pending runs i and i + 1.
+            /// </summary>
+            private void MergeAt(int i) {
+                int base1 = _runBase[i], len1 = _runLength[i];
+                int base2 = _runBase[i + 1], len2 = _runLength[i + 1];
+                Debug.Assert(base1 + len1 == base2);
+
+                _runLength[i] = len1 + len2;
+                if (i == _pendingRuns - 3) {
+                    _runBase[i + 1] = _runBase[i + 2];
+                    _runLength[i + 1] = _runLength[i + 2];
+                }
+                _pendingRuns--;
+
+                // elements of run 1 which are not greater than the first element of run 2 are
+                // already in place
+                int k = GallopRight(_keys[base2], _keys, base1, len1, 0);
+                base1 += k;
+                len1 -= k;
+                if (len1 == 0) {
+                    return;
+                }
+
+                // as are elements of run 2 which are not less than the last element of run 1
+                len2 = GallopLeft(_keys[base1 + len1 - 1], _keys, base2, len2, len2 - 1);
+                if (len2 == 0) {
+                    return;
+                }
+
+                if (len1 <= len2) {
+                    MergeLow(base1, len1, base2, len2);
+                } else {
+                    MergeHigh(base1, len1, base2, len2);
+                }
+            }
+
+            /// <summary>
+            /// Returns the index in a[start, start + n) where key belongs, to the left of
+            /// any equal elements.  The search starts at start + hint.
+            /// </summary>
+            private int GallopLeft(T key, T[]/*!*/ a, int start, int n, int hint) {
+                int lastOffset = 0, offset = 1;
+                if (_comparer.LessThan(a[start + hint], key)) {
+                    // a[hint] < key: gallop right until a[hint + lastOffset] < key <= a[hint + offset]
+                    int maxOffset = n - hint;
+                    while (offset < maxOffset && _comparer.LessThan(a[start + hint + offset], key)) {
+                        lastOffset = offset;
+                        offset = (offset << 1) + 1;
+                        if (offset <= 0) {
+                            offset = maxOffset;
+                        }
+                    }
+                    if (offset > maxOffset) {
+                        offset = maxOffset;
+                    }
+                    lastOffset += hint;
+                    offset += hint;
+                } else {
+                    // key <= a[hint]: gallop left until a[hint - offset] < key <= a[hint - lastOffset]
+                    int maxOffset = hint + 1;
+                    while (offset < maxOffset && !_comparer.LessThan(a[start + hint - offset], key)) {
+                        lastOffset = offset;
+                        offset = (offset << 1) + 1;
+                        if (offset <= 0) {
+                            offset = maxOffset;
+                        }
+                    }
+                    if (offset > maxOffset) {
+                        offset = maxOffset;
+                    }
+                    int tmp = lastOffset;
+                    lastOffset = hint - offset;
+                    offset = hint - tmp;
+                }
+
+                // a[lastOffset] < key <= a[offset], binary search in between
+                lastOffset++;
+                while (lastOffset < offset) {
+                    int m = lastOffset + ((offset - lastOffset) >> 1);
+                    if (_comparer.LessThan(a[start + m], key)) {
+                        lastOffset = m + 1;
+                    } else {
+                        offset = m;
+                    }
+                }
+                return offset;
+            }
+
+            /// <summary>
+            /// Returns the index in a[start, start + n) where key belongs, to the right of
+            /// any equal elements.  The search starts at start + hint.
+            /// </summary>
+            private int GallopRight(T key, T[]/*!*/ a, int start, int n, int hint) {
+                int lastOffset = 0, offset = 1;
+                if (_comparer.LessThan(key, a[start + hint])) {
+                    // key < a[hint]: gallop left until a[hint - offset] <= key < a[hint - lastOffset]
+                    int maxOffset = hint + 1;
+                    while (offset < maxOffset && _comparer.LessThan(key, a[start + hint - offset])) {
+                        lastOffset = offset;
+                        offset = (offset << 1) + 1;
+                        if (offset <= 0) {
+                            offset = maxOffset;
+                        }
+                    }
+                    if (offset > maxOffset) {
+                        offset = maxOffset;
+                    }
+                    int tmp = lastOffset;
+                    lastOffset = hint - offset;
+                    offset = hint - tmp;
+                } else {
+                    // a[hint] <= key: gallop right until a[hint + lastOffset] <= key < a[hint + offset]
+                    int maxOffset = n - hint;
+                    while (offset < maxOffset && !_comparer.LessThan(key, a[start + hint + offset])) {
+                        lastOffset = offset;
+                        offset = (offset << 1) + 1;
+                        if (offset <= 0) {
+                            offset = maxOffset;
+                        }
+                    }
+                    if (offset > maxOffset) {
+                        offset = maxOffset;
+                    }
+                    lastOffset += hint;
+                    offset += hint;
+                }
+
+                // a[lastOffset] <= key < a[offset], binary search in between
+                lastOffset++;
+                while (lastOffset < offset) {
+                    int m = lastOffset + ((offset - lastOffset) >> 1);
+                    if (_comparer.LessThan(key, a[start + m])) {
+                        offset = m;
+                    } else {
+                        lastOffset = m + 1;
+                    }
+                }
+                return offset;
+            }
+
+            /// <summary>
+            /// Merges the adjacent runs [base1, base1 + len1) and [base2, base2 + len2) when
+            /// len1 &lt;= len2, working from the left with run 1 copied to the temporary
+            /// storage.  The first element of run 2 belongs before run 1 and the last element
+            /// of run 1 belongs after run 2.
+            ///
+            /// If a comparison throws the remaining elements are still copied back so that the
+            /// list ends up with all its elements.
+            /// </summary>
+            private void MergeLow(int base1, int len1, int base2, int len2) {
+                Debug.Assert(len1 > 0 && len2 > 0 && base1 + len1 == base2);
+
+                EnsureCapacity(len1);
+                Copy(_keys, _values, base1, _tmpKeys, _tmpValues, 0, len1);
+
+                int cursor1 = 0, cursor2 = base2, dest = base1;
+                try {
+                    Move(cursor2++, dest++);
+                    if (--len2 == 0) {
+                        return;
+                    }
+                    if (len1 == 1) {
+                        goto CopyRun2;
+                    }
+
+                    int minGallop = _minGallop;
+                    for (; ; ) {
+                        int count1 = 0, count2 = 0;
+
+                        // one pair at a time until one run wins consistently
+                        do {
+                            if (_comparer.LessThan(_keys[cursor2], _tmpKeys[cursor1])) {
+                                Move(cursor2++, dest++);
+                                count2++;
+                                count1 = 0;
+                                if (--len2 == 0) {
+                                    return;
+                                }
+                            } else {
+                                MoveFromTemp(cursor1++, dest++);
+                                count1++;
+                                count2 = 0;
+                                if (--len1 == 1) {
+                                    goto CopyRun2;
+                                }
+                            }
+                        } while ((count1 | count2) < minGallop);
+
+                        // then gallop until neither run wins consistently anymore
+                        minGallop++;
+                        do {
+                            if (minGallop > 1) {
+                                minGallop--;
+                            }
+                            _minGallop = minGallop;
+
+                            count1 = GallopRight(_keys[cursor2], _tmpKeys, cursor1, len1, 0);
+                            if (count1 != 0) {
+                                Copy(_tmpKeys, _tmpValues, cursor1, _keys, _values, dest, count1);
+                                dest += count1;
+                                cursor1 += count1;
+                                len1 -= count1;
+                                if (len1 == 1) {
+                                    goto CopyRun2;
+                                }
+                                if (len1 == 0) {
+                                    // only possible with an inconsistent comparison
+                                    return;
+                                }
+                            }
+                            Move(cursor2++, dest++);
+                            if (--len2 == 0) {
+                                return;
+                            }
+
+                            count2 = GallopLeft(_tmpKeys[cursor1], _keys, cursor2, len2, 0);
+                            if (count2 != 0) {
+                                Copy(_keys, _values, cursor2, _keys, _values, dest, count2);
+                                dest += count2;
+                                cursor2 += count2;
+                                len2 -= count2;
+                                if (len2 == 0) {
+                                    return;
+                                }
+                            }
+                            MoveFromTemp(cursor1++, dest++);
+                            if (--len1 == 1) {
+                                goto CopyRun2;
+                            }
+                        } while (count1 >= MinGallopStart || count2 >= MinGallopStart);
+
+                        minGallop++;
+                        _minGallop = minGallop;
+                    }
+
+                CopyRun2:
+                    // the last element of run 1 goes after the rest of run 2
+                    Debug.Assert(len1 == 1 && len2 > 0);
+                    Copy(_keys, _values, cursor2, _keys, _values, dest, len2);
+                    MoveFromTemp(cursor1, dest + len2);
+                    len1 = 0;
+                } finally {
+                    if (len1 > 0) {
+                        Copy(_tmpKeys, _tmpValues, cursor1, _keys, _values, dest, len1);
+                    }
+                }
+            }
+
+            /// <summary>
+            /// Merges the adjacent runs [base1, base1 + len1) and [base2, base2 + len2) when
+            /// len1 &gt;= len2, working from the right with run 2 copied to the temporary
+            /// storage.  The same conditions as for MergeLow apply.
+            /// </summary>
+            private void MergeHigh(int base1, int len1, int base2, int len2) {
+                Debug.Assert(len1 > 0 && len2 > 0 && base1 + len1 == base2);
+
+                EnsureCapacity(len2);
+                Copy(_keys, _values, base2, _tmpKeys, _tmpValues, 0, len2);
+
+                int cursor1 = base1 + len1 - 1, cursor2 = len2 - 1, dest = base2 + len2 - 1;
+                try {
+                    Move(cursor1--, dest--);
+                    if (--len1 == 0) {
+                        return;
+                    }
+                    if (len2 == 1) {
+                        goto CopyRun1;
+                    }
+
+                    int minGallop = _minGallop;
+                    for (; ; ) {
+                        int count1 = 0, count2 = 0;
+
+                        // one pair at a time until one run wins consistently
+                        do {
+                            if (_comparer.LessThan(_tmpKeys[cursor2], _keys[cursor1])) {
+                                Move(cursor1--, dest--);
+                                count1++;
+                                count2 = 0;
+                                if (--len1 == 0) {
+                                    return;
+                                }
+                            } else {
+                                MoveFromTemp(cursor2--, dest--);
+                                count2++;
+                                count1 = 0;
+                                if (--len2 == 1) {
+                                    goto CopyRun1;
+                                }
+                            }
+                        } while ((count1 | count2) < minGallop);
+
+                        // then gallop until neither run wins consistently anymore
+                        minGallop++;
+                        do {
+                            if (minGallop > 1) {
+                                minGallop--;
+                            }
+                            _minGallop = minGallop;
+
+                            count1 = len1 - GallopRight(_tmpKeys[cursor2], _keys, base1, len1, len1 - 1);
+                            if (count1 != 0) {
+                                dest -= count1;
+                                cursor1 -= count1;
+                                Copy(_keys, _values, cursor1 + 1, _keys, _values, dest + 1, count1);
+                                len1 -= count1;
+                                if (len1 == 0) {
+                                    return;
+                                }
+                            }
+                            MoveFromTemp(cursor2--, dest--);
+                            if (--len2 == 1) {
+                                goto CopyRun1;
+                            }
+
+                            count2 = len2 - GallopLeft(_keys[cursor1], _tmpKeys, 0, len2, len2 - 1);
+                            if (count2 != 0) {
+                                dest -= count2;
+                                cursor2 -= count2;
+                                Copy(_tmpKeys, _tmpValues, cursor2 + 1, _keys, _values, dest + 1, count2);
+                                len2 -= count2;
+                                if (len2 == 1) {
+                                    goto CopyRun1;
+                                }
+                                if (len2 == 0) {
+                                    // only possible with an inconsistent comparison
+                                    return;
+                                }
+                            }
+                            Move(cursor1--, dest--);
+                            if (--len1 == 0) {
+                                return;
+                            }
+                        } while (count1 >= MinGallopStart || count2 >= MinGallopStart);
+
+                        minGallop++;
+                        _minGallop = minGallop;
+                    }
+
+                CopyRun1:
+                    // the first element of run 2 goes before the rest of run 1
+                    Debug.Assert(len2 == 1 && len1 > 0);
+                    dest -= len1;
+                    cursor1 -= len1;
+                    Copy(_keys, _values, cursor1 + 1, _keys, _values, dest + 1, len1);
+                    MoveFromTemp(cursor2, dest);
+                    len2 = 0;
+                } finally {
+                    if (len2 > 0) {
+                        Copy(_tmpKeys, _tmpValues, 0, _keys, _values, dest - (len2 - 1), len2);
+                    }
+                }
+            }
+
+            #endregion
+
+            #region Element moves
+
+            private void EnsureCapacity(int length) {
+                if (_tmpKeys == null || _tmpKeys.Length < length) {
+                    // grow geometrically so that a series of merges doesn't reallocate each time
+                    int size = Math.Max(length, _tmpKeys == null ? 0 : Math.Min(_tmpKeys.Length * 2, _keys.Length / 2));
+                    _tmpKeys = new T[size];
+                    if (_values != null) {
+                        _tmpValues = new object[size];
+                    }
+                }
+            }
+
+            private void Move(int from, int to) {
+                _keys[to] = _keys[from];
+                if (_values != null) {
+                    _values[to] = _values[from];
+                }
+            }
+
+            private void MoveFromTemp(int from, int to) {
+                _keys[to] = _tmpKeys[from];
+                if (_values != null) {
+                    _values[to] = _tmpValues[from];
+                }
+            }
+
+            private void Copy(T[]/*!*/ fromKeys, object[] fromValues, int from, T[]/*!*/ toKeys, object[] toValues, int to, int length) {
+                Array.Copy(fromKeys, from, toKeys, to, length);
+                if (_values != null) {
+                    Array.Copy(fromValues, from, toValues, to, length);
+                }
+            }
+
+            #endregion
+        }
+    }
+}
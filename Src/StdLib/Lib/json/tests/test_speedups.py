@@ -1,5 +1,4 @@
 from json.tests import CTest
-import unittest, sys
 
 class TestSpeedups(CTest):
     def test_scanstring(self):
@@ -12,7 +11,6 @@ class TestSpeedups(CTest):
         self.assertIs(self.json.encoder.encode_basestring_ascii,
                       self.json.encoder.c_encode_basestring_ascii)
 
-@unittest.skipIf(sys.platform == 'cli', 'No json speedups for IronPython.')
 class TestDecode(CTest):
     def test_make_scanner(self):
         self.assertRaises(AttributeError, self.json.scanner.c_make_scanner, 1)
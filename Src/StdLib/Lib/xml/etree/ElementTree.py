@@ -1195,7 +1195,10 @@ def parse(source, parser=None):
 
 def iterparse(source, events=None, parser=None):
     if sys.platform == 'cli':
-        raise NotImplementedError('iterparse is not supported on IronPython. (CP #31923)')
+        import _elementtree
+        if not parser:
+            parser = XMLParser(target=TreeBuilder())
+        return _elementtree.iterparse(source, events, parser)
 
     if not hasattr(source, "read"):
         source = open(source, "rb")
@@ -1670,8 +1673,11 @@ class XMLParser(object):
         return tree
 
 if sys.platform == 'cli':
-    from . import SimpleXMLTreeBuilder
-    XMLParser = SimpleXMLTreeBuilder.TreeBuilder
+    try:
+        from _elementtree import XMLParser
+    except ImportError:
+        from . import SimpleXMLTreeBuilder
+        XMLParser = SimpleXMLTreeBuilder.TreeBuilder
 
 # compatibility
 XMLTreeBuilder = XMLParser
@@ -1,3 +1,59 @@
 # Wrapper module for _elementtree
 
-from _elementtree import *
+import sys
+
+if sys.platform == 'cli':
+    # IronPython's _elementtree only provides the performance critical parts
+    # (Element, SubElement, TreeBuilder, XMLParser, iterparse); the rest of
+    # the API is taken from the Python implementation.
+    from xml.etree.ElementTree import *
+    from xml.etree.ElementTree import ParseError, iselement, dump
+    from xml.etree import ElementTree as _ET
+    from _elementtree import *
+
+    # comments and processing instructions are tagged with the Python
+    # factories so that the ElementTree serializer recognizes them
+    def Comment(text=None):
+        element = Element(_ET.Comment)
+        element.text = text
+        return element
+
+    def ProcessingInstruction(target, text=None):
+        element = Element(_ET.ProcessingInstruction)
+        element.text = target
+        if text:
+            element.text = element.text + " " + text
+        return element
+
+    PI = ProcessingInstruction
+
+    class ElementTree(_ET.ElementTree):
+
+        def parse(self, source, parser=None):
+            close_source = False
+            if not hasattr(source, "read"):
+                source = open(source, "rb")
+                close_source = True
+            try:
+                if parser is None:
+                    parser = XMLParser(target=TreeBuilder())
+                while 1:
+                    data = source.read(65536)
+                    if not data:
+                        break
+                    parser.feed(data)
+                self._root = parser.close()
+                return self._root
+            finally:
+                if close_source:
+                    source.close()
+
+    def parse(source, parser=None):
+        tree = ElementTree()
+        tree.parse(source, parser)
+        return tree
+
+    del sys
+else:
+    del sys
+    from _elementtree import *
@@ -198,10 +198,50 @@ class FileIOTest(unittest.TestCase):
         pass
 
     def test__FileIO_readinto(self):
-        '''
-        TODO
-        '''
-        pass
+        import array
+        import io
+        name = TEMP_READINTO_NAME % 100
+        data = b''.join(chr(i % 256) for i in xrange(20000))
+        with FileIO(name, "w") as f:
+            f.write(data)
+
+        try:
+            with FileIO(name, "r") as f:
+                b = bytearray(10)
+                self.assertEqual(f.readinto(b), 10)
+                self.assertEqual(bytes(b), data[:10])
+
+                m = memoryview(bytearray(b'x' * 10))
+                self.assertEqual(f.readinto(m[2:6]), 4)
+                self.assertEqual(m.tobytes(), b'xx' + data[10:14] + b'xxxx')
+
+                a = array.array('B', [0] * 5)
+                self.assertEqual(f.readinto(a), 5)
+                self.assertEqual(a.tostring(), data[14:19])
+
+                f.seek(-3, 2)
+                b = bytearray(10)
+                self.assertEqual(f.readinto(b), 3)
+                self.assertEqual(bytes(b[:3]), data[-3:])
+                self.assertEqual(f.readinto(b), 0)
+
+            # buffered reads which are larger than the buffer go to the file directly
+            with io.open(name, "rb", buffering=4096) as f:
+                self.assertEqual(f.read(3), data[:3])
+                b = bytearray(10000)
+                self.assertEqual(f.readinto(b), 10000)
+                self.assertEqual(bytes(b), data[3:10003])
+                b = bytearray(20000)
+                self.assertEqual(f.readinto(b), len(data) - 10003)
+                self.assertEqual(bytes(b[:len(data) - 10003]), data[10003:])
+
+            with open(name, "rb") as f:
+                b = bytearray(5)
+                self.assertEqual(f.readinto(b), 5)
+                self.assertEqual(bytes(b), data[:5])
+                self.assertEqual(f.read(2), data[5:7])
+        finally:
+            os.remove(name)
 
     def test__FileIO_seek(self):
         '''
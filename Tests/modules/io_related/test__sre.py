@@ -0,0 +1,168 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+'''
+Tests for the _sre module which runs the patterns compiled by sre_compile.
+'''
+
+import os
+import sys
+import unittest
+
+import _sre
+import sre_compile
+import sre_constants
+
+from iptest import IronPythonTestCase, run_test, skipUnlessIronPython
+
+def compile(pattern, flags=0):
+    return sre_compile.compile(pattern, flags)
+
+class SreTest(IronPythonTestCase):
+
+    def test_module(self):
+        self.assertEqual(_sre.MAGIC, sre_constants.MAGIC)
+        self.assertEqual(_sre.CODESIZE, 4)
+        self.assertEqual(_sre.getcodesize(), 4)
+        self.assertEqual(_sre.MAXREPEAT, 2 ** 32 - 1)
+        self.assertEqual(_sre.getlower(ord('A'), 0), ord('a'))
+        self.assertEqual(_sre.getlower(0xc9, 0), 0xc9)
+        self.assertEqual(_sre.getlower(0xc9, sre_constants.SRE_FLAG_UNICODE), 0xe9)
+
+    def test_re_tests(self):
+        from test.re_tests import tests, SUCCEED, FAIL, SYNTAX_ERROR
+        for t in tests:
+            pattern, s, outcome = t[:3]
+            try:
+                obj = compile(pattern)
+            except sre_constants.error:
+                self.assertEqual(outcome, SYNTAX_ERROR, t)
+                continue
+            result = obj.search(s)
+            if outcome == FAIL:
+                self.assertIsNone(result, t)
+            elif outcome == SUCCEED:
+                self.assertIsNotNone(result, t)
+                if len(t) == 5:
+                    vardict = {'found': result.group(0), 'groups': result.group(), 'flags': result.re.flags}
+                    for i in range(1, 100):
+                        try:
+                            gi = result.group(i)
+                            if gi is None:
+                                gi = "None"
+                        except IndexError:
+                            gi = "Error"
+                        vardict['g%d' % i] = gi
+                    for i in result.re.groupindex.keys():
+                        gi = result.group(i)
+                        vardict[i] = "None" if gi is None else gi
+                    self.assertEqual(eval(t[3], vardict), t[4], t)
+
+    def test_match(self):
+        p = compile(r'(?P<key>\w+)\s*=\s*(?P<value>\w*)(;)?')
+        m = p.match('  name = value;', 2)
+        self.assertEqual(m.group(), 'name = value;')
+        self.assertEqual(m.group('key', 2, 3), ('name', 'value', ';'))
+        self.assertEqual(m.groups(), ('name', 'value', ';'))
+        self.assertEqual(m.groupdict(), {'key': 'name', 'value': 'value'})
+        self.assertEqual(m.span(), (2, 15))
+        self.assertEqual(m.span('value'), (9, 14))
+        self.assertEqual(m.regs, ((2, 15), (2, 6), (9, 14), (14, 15)))
+        self.assertEqual((m.pos, m.endpos), (2, 15))
+        self.assertEqual(m.lastindex, 3)
+        self.assertEqual(m.lastgroup, None)
+        self.assertEqual(m.string, '  name = value;')
+        self.assertIs(m.re, p)
+        self.assertRaises(IndexError, m.group, 4)
+        self.assertRaises(IndexError, m.group, 'missing')
+
+        m = p.match('name=', 0, 5)
+        self.assertEqual(m.groups('x'), ('name', '', 'x'))
+        self.assertEqual(m.lastgroup, 'value')
+        self.assertEqual(m.start(3), -1)
+        self.assertIsNone(p.match('name = value', 0, 3))
+        self.assertIsNone(p.match('  name = value'))
+
+    def test_search(self):
+        p = compile('b+')
+        self.assertEqual(p.search('abbbc').span(), (1, 4))
+        self.assertEqual(p.search('abbbc', 2).span(), (2, 4))
+        self.assertEqual(p.search('abbbc', 0, 3).span(), (1, 3))
+        self.assertIsNone(p.search('abbbc', 4))
+        self.assertIsNone(p.search('abbbc', 3, 1))
+        self.assertEqual(compile(u'(?iu)\xe9t\xe9').search(u'L\x27\xc9T\xc9').span(), (2, 5))
+        self.assertEqual(compile(r'^\d+$', sre_constants.SRE_FLAG_MULTILINE).search('a\n12\nb').group(), '12')
+
+    def test_findall(self):
+        self.assertEqual(compile(r'\d+').findall('a1b22c333'), ['1', '22', '333'])
+        self.assertEqual(compile(r'(\w)=(\d)?').findall('a=1 b= c=3'), [('a', '1'), ('b', ''), ('c', '3')])
+        self.assertEqual(compile('x*').findall('axxb'), ['', 'xx', '', ''])
+        self.assertEqual([m.span() for m in compile('x*').finditer('axxb')], [(0, 0), (1, 3), (3, 3), (4, 4)])
+
+    def test_split(self):
+        self.assertEqual(compile(r'\W+').split('a, b,,c.'), ['a', 'b', 'c', ''])
+        self.assertEqual(compile(r'(,)').split('a,b,c', 1), ['a', ',', 'b,c'])
+        self.assertEqual(compile('(x)?,').split('a,bx,c'), ['a', None, 'b', 'x', 'c'])
+        self.assertEqual(compile('x*').split('axbc'), ['a', 'bc'])
+
+    def test_sub(self):
+        p = compile(r'(?P<word>\w+)')
+        self.assertEqual(p.sub('<\g<word>>', 'a bc'), '<a> <bc>')
+        self.assertEqual(p.sub(r'[\1]', 'a bc', 1), '[a] bc')
+        self.assertEqual(p.subn('-', 'a bc'), ('- -', 2))
+        self.assertEqual(p.sub(lambda m: m.group().upper(), 'a bc'), 'A BC')
+        self.assertEqual(compile('x*').sub('-', 'abxd'), '-a-b-d-')
+        self.assertEqual(compile('x*').subn('-', 'abxd', 2), ('-a-bxd', 2))
+        self.assertEqual(p.match('ab').expand(r'\g<0>\n\1'), 'ab\nab')
+        self.assertRaises(sre_constants.error, compile('(a)|b').sub, r'\1', 'b')
+        self.assertRaises(IndexError, p.sub, r'\g<other>', 'a')
+
+    def test_scanner(self):
+        s = compile(r'\d').scanner('12a')
+        self.assertEqual(s.match().group(), '1')
+        self.assertEqual(s.match().group(), '2')
+        self.assertIsNone(s.match())
+        s = compile(r'\d').scanner('1a2')
+        self.assertEqual(s.search().group(), '1')
+        self.assertEqual(s.search().group(), '2')
+        self.assertIsNone(s.search())
+
+    def test_backtracking(self):
+        # backtracking keeps its state on the heap, not on the stack
+        text = 'ab' * 20000
+        self.assertIsNone(compile('(?:a|b)*c').match(text))
+        self.assertEqual(compile('(?:(a)|b)*$').match(text).span(), (0, len(text)))
+        self.assertEqual(compile('(a|b)*?x').search(text + 'x').span(), (0, len(text) + 1))
+
+    @skipUnlessIronPython()
+    def test_regex_engine_option(self):
+        out_file = os.path.join(self.temporary_dir, "test__sre_engine.txt")
+        script = os.path.join(self.temporary_dir, "test__sre_engine.py")
+        self.write_to_file(script, '''
+import re
+p = re.compile(r"(?P<a>x)(y)?")
+res = [re.engine, type(p).__name__, p.match("xz").groups(), re.sub("(x)", r"\\1\\1", "axb"), re.compile("a") is re.compile("a")]
+try:
+    re.compile("(")
+except re.error:
+    res.append("error")
+open(%r, "w").write(repr(res))
+''' % out_file)
+        self.assertEqual(self.launch(sys.executable, "-X:RegexEngine", "sre", script), 0)
+        with open(out_file) as f:
+            self.assertEqual(f.read(), repr(['sre', 'SRE_Pattern', ('x', None), 'axxb', True, 'error']))
+        os.unlink(out_file)
+        os.unlink(script)
+
+run_test(__name__)
@@ -938,4 +938,56 @@ FROM_MOD_IN_SUBMOD = mod.KMod()
         import cPickle
         self.assertEqual(type(cPickle.loads(cPickle.dumps(d()))), d)
 
+    def test_large_containers(self):
+        strings = [u'item%d' % i for i in range(300)]
+        data = [{'id': i, 'name': strings[i % 300], 'value': i * 0.5, 'tags': (i, -i, 2 ** 20 + i)} for i in range(20000)]
+        data.append(strings)
+        for proto in range(3):
+            s = cPickle.dumps(data, proto)
+            f = StringIO()
+            cPickle.dump(data, f, proto)
+            self.assertEqual(f.getvalue(), s)
+            res = cPickle.loads(s)
+            self.assertEqual(res, data)
+            # the strings are memoized, references beyond index 255 use LONG_BINGET
+            self.assertIs(res[299]['name'], res[-1][299])
+
+    def test_numbers(self):
+        values = [0, 1, -1, 255, 256, 65535, 65536, -2 ** 31, 2 ** 31 - 1, 2 ** 31, -2 ** 63, 2 ** 100, 0L, 127L, -128L, 32767L, -32769L,
+                  0.0, -0.0, 1.5, -2.25, 1e300, -1e-300, float('inf'), True, False, None]
+        for proto in range(3):
+            res = cPickle.loads(cPickle.dumps(values, proto))
+            self.assertEqual([(type(x), repr(x)) for x in res], [(type(x), repr(x)) for x in values])
+
+    def test_fast(self):
+        shared = [1, 2]
+        data = [shared, shared, u'abc', u'abc']
+        for proto in range(3):
+            f = StringIO()
+            p = cPickle.Pickler(f, proto)
+            self.assertEqual(p.fast, 0)
+            p.fast = 1
+            self.assertEqual(p.fast, 1)
+            p.dump(data)
+            res = cPickle.loads(f.getvalue())
+            self.assertEqual(res, data)
+            self.assertIsNot(res[0], res[1])
+
+            p.fast = 0
+            p.dump(data)
+            f.seek(0)
+            cPickle.load(f)
+            res = cPickle.load(f)
+            self.assertIs(res[0], res[1])
+
+        if is_cli:
+            # CPython's pickle.py recurses until it runs out of stack
+            l = []
+            l.append(l)
+            p = cPickle.Pickler(StringIO(), 2)
+            p.fast = 1
+            self.assertRaises(ValueError, p.dump, l)
+            # the pickler is still usable afterwards
+            p.dump([1])
+
 run_test(__name__)
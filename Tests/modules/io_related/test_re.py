@@ -796,6 +796,34 @@ class ReTest(unittest.TestCase):
                 ('^(?P<msg>NMAKE[A-Za-z0-9]*)\'\\"?(?P<file>[\\\\A-Za-z0-9/:_\\.\\+]+)', 0))
 
 
+    @unittest.skipUnless(is_cli, 'IronPython specific test')
+    def test_cache_info(self):
+        re.purge()
+        for i in range(3):
+            re.match('cache_info', 'cache_info')
+        info = re._cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['evictions'], info['currsize']), (2, 1, 0, 1))
+        self.assertEqual(info['maxsize'], 100)
+
+        # a full cache evicts the least recently used patterns
+        for i in range(150):
+            re.match('cache_info_%d' % i, 'x')
+        info = re._cache_info()
+        self.assertTrue(info['currsize'] <= 100)
+        self.assertEqual(info['currsize'] + info['evictions'], 151)
+
+        # once every part of the cache is full it holds exactly maxsize patterns
+        for i in range(1000):
+            re.match('cache_fill_%d' % i, 'x')
+        self.assertEqual(re._cache_info()['currsize'], 100)
+
+        # patterns which are used often are compiled
+        compiled = info['compiled']
+        for i in range(1100):
+            self.assertEqual(re.search('hot', 'a hot pattern').span(), (2, 5))
+        self.assertEqual(re._cache_info()['compiled'], compiled + 1)
+        re.purge()
+
     def test_conditional(self):
         p = re.compile(r'(a)?(b)((?(1)c))')
         self.assertEqual(p.match('abc').groups(), ('a', 'b', 'c'))
@@ -0,0 +1,135 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+Tests for the native _elementtree module backing xml.etree.cElementTree.
+'''
+
+import unittest
+from StringIO import StringIO
+
+from iptest import IronPythonTestCase, skipUnlessIronPython
+
+DOC = '<root xmlns:a="urn:a"><a:item id="1">one</a:item>tail<item id="2"/><!-- c --></root>'
+
+@skipUnlessIronPython()
+class _ElementTreeTest(IronPythonTestCase):
+
+    def test_fromstring(self):
+        import xml.etree.cElementTree as ET
+        root = ET.fromstring(DOC)
+        self.assertEqual(root.tag, 'root')
+        self.assertEqual(len(root), 2)
+        self.assertEqual(root[0].tag, '{urn:a}item')
+        self.assertEqual(root[0].text, 'one')
+        self.assertEqual(root[0].tail, 'tail')
+        self.assertEqual(root[1].get('id'), '2')
+        self.assertEqual(root.find('item').get('id'), '2')
+        self.assertEqual([e.tag for e in root.iter()], ['root', '{urn:a}item', 'item'])
+        self.assertEqual(list(root.itertext()), ['one', 'tail'])
+
+    def test_feed(self):
+        import _elementtree
+        parser = _elementtree.XMLParser()
+        for i in range(0, len(DOC), 7):
+            parser.feed(DOC[i:i+7])
+        root = parser.close()
+        self.assertEqual([e.get('id') for e in root], ['1', '2'])
+
+    def test_feed_incremental(self):
+        import _elementtree
+        class Target(object):
+            def __init__(self):
+                self.ends = 0
+            def end(self, tag):
+                self.ends += 1
+            def close(self):
+                return self.ends
+
+        target = Target()
+        parser = _elementtree.XMLParser(target=target)
+        parser.feed('<root>')
+        item = '<item>%s</item>' % ('x' * 100)
+        for i in range(2000):
+            parser.feed(item)
+        # elements are reported as the data arrives rather than when the parser is closed
+        self.assertTrue(target.ends > 1000)
+        parser.feed('</root>')
+        self.assertEqual(parser.close(), 2001)
+        self.assertRaises(ValueError, parser.feed, '<root/>')
+
+    def test_feed_encoding(self):
+        import _elementtree
+        # unicode chunks are used as is, even when they only contain characters below 0x100
+        parser = _elementtree.XMLParser()
+        parser.feed(u'<root>')
+        parser.feed(u'caf\xe9</root>')
+        self.assertEqual(parser.close().text, u'caf\xe9')
+
+        # byte strings are decoded, with multi-byte characters split across chunks
+        parser = _elementtree.XMLParser()
+        parser.feed('<root>caf\xc3')
+        parser.feed('\xa9</root>')
+        self.assertEqual(parser.close().text, u'caf\xe9')
+
+        parser = _elementtree.XMLParser()
+        parser.feed('<?xml version="1.0" encoding="iso-8859-1"?><root>caf\xe9</root>')
+        self.assertEqual(parser.close().text, u'caf\xe9')
+
+    def test_element(self):
+        import xml.etree.cElementTree as ET
+        root = ET.Element('root', {'a': '1'}, b='2')
+        self.assertEqual(sorted(root.items()), [('a', '1'), ('b', '2')])
+        child = ET.SubElement(root, 'child')
+        root.insert(0, ET.Element('first'))
+        self.assertEqual([e.tag for e in root], ['first', 'child'])
+        del root[0]
+        self.assertEqual(root[:], [child])
+        root.remove(child)
+        self.assertEqual(len(root), 0)
+        self.assertRaises(TypeError, root.append, 'not an element')
+        self.assertEqual(ET.tostring(ET.fromstring('<a><b>x</b></a>')), '<a><b>x</b></a>')
+
+    def test_iterparse(self):
+        import xml.etree.cElementTree as ET
+        events = [(ev, getattr(el, 'tag', el)) for ev, el in ET.iterparse(StringIO(DOC), ('start', 'end', 'start-ns', 'end-ns'))]
+        self.assertEqual(events, [
+            ('start-ns', ('a', 'urn:a')),
+            ('start', 'root'),
+            ('start', '{urn:a}item'), ('end', '{urn:a}item'),
+            ('start', 'item'), ('end', 'item'),
+            ('end', 'root'),
+            ('end-ns', None),
+        ])
+
+        it = ET.iterparse(StringIO(DOC))
+        for ev, el in it:
+            pass
+        self.assertEqual(it.root.tag, 'root')
+
+        it = ET.iterparse(StringIO('<root>caf\xc3\xa9</root>'))
+        for ev, el in it:
+            pass
+        self.assertEqual(it.root.text, u'caf\xe9')
+
+    def test_parse_error(self):
+        import xml.etree.cElementTree as ET
+        with self.assertRaises(ET.ParseError) as cm:
+            ET.fromstring('<root><a></root>')
+        self.assertEqual(cm.exception.position[0], 1)
+
+if __name__ == '__main__':
+    from test import test_support
+    test_support.run_unittest(__name__)
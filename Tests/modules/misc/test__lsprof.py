@@ -0,0 +1,144 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+Tests for the _lsprof module backing cProfile.
+'''
+
+import unittest
+
+from iptest import IronPythonTestCase, skipUnlessIronPython
+
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+def caller():
+    return fib(5)
+
+def raiser():
+    raise ValueError()
+
+def catcher():
+    try:
+        raiser()
+    except ValueError:
+        pass
+
+def gen(n):
+    for i in xrange(n):
+        yield i
+
+def consumer():
+    return sum(gen(3))
+
+@skipUnlessIronPython()
+class _LsprofTest(IronPythonTestCase):
+
+    def test_getstats(self):
+        import _lsprof
+        prof = _lsprof.Profiler()
+        prof.enable()
+        caller()
+        prof.disable()
+
+        entries = dict((getattr(e.code, 'co_name', e.code), e) for e in prof.getstats())
+        self.assertEqual(entries['caller'].callcount, 1)
+        self.assertEqual(entries['fib'].callcount, 15)
+        self.assertEqual(entries['fib'].reccallcount, 14)
+        self.assertTrue(entries['caller'].totaltime >= entries['fib'].totaltime)
+
+        callees = dict((getattr(s.code, 'co_name', s.code), s) for s in entries['caller'].calls)
+        self.assertEqual(callees['fib'].callcount, 1)
+
+        prof.clear()
+        self.assertEqual(prof.getstats(), [])
+
+    def test_cprofile(self):
+        import cProfile, pstats
+        prof = cProfile.Profile()
+        prof.runcall(caller)
+        stats = pstats.Stats(prof)
+        funcs = dict((func[2], value) for func, value in stats.stats.items())
+        cc, nc, tt, ct, callers = funcs['fib']
+        self.assertEqual((cc, nc), (1, 15))
+        self.assertTrue(any(func[2] == 'caller' for func in callers))
+
+    def test_exception(self):
+        import _lsprof
+        prof = _lsprof.Profiler()
+        prof.enable()
+        catcher()
+        caller()
+        prof.disable()
+
+        entries = dict((getattr(e.code, 'co_name', e.code), e) for e in prof.getstats())
+        self.assertEqual(entries['catcher'].callcount, 1)
+        self.assertEqual(entries['raiser'].callcount, 1)
+        self.assertEqual(entries['caller'].callcount, 1)
+        self.assertEqual(entries['fib'].callcount, 15)
+
+        callees = dict((getattr(s.code, 'co_name', s.code), s) for s in entries['catcher'].calls)
+        self.assertEqual(callees['raiser'].callcount, 1)
+        self.assertEqual(entries['raiser'].calls, [])
+        callees = dict((getattr(s.code, 'co_name', s.code), s) for s in entries['caller'].calls)
+        self.assertEqual(callees.keys(), ['fib'])
+
+    def test_generator(self):
+        import _lsprof
+        prof = _lsprof.Profiler()
+        prof.enable()
+        self.assertEqual(consumer(), 3)
+        caller()
+        prof.disable()
+
+        entries = dict((getattr(e.code, 'co_name', e.code), e) for e in prof.getstats())
+        self.assertEqual(entries['consumer'].callcount, 1)
+        self.assertTrue(entries['gen'].callcount >= 1)
+        self.assertEqual(entries['caller'].callcount, 1)
+        self.assertEqual(entries['fib'].callcount, 15)
+        self.assertTrue(entries['consumer'].totaltime >= entries['gen'].totaltime)
+
+        callees = dict((getattr(s.code, 'co_name', s.code), s) for s in entries['consumer'].calls)
+        self.assertEqual(callees['gen'].callcount, entries['gen'].callcount)
+        self.assertEqual(entries['gen'].calls, [])
+        callees = dict((getattr(s.code, 'co_name', s.code), s) for s in entries['caller'].calls)
+        self.assertEqual(callees.keys(), ['fib'])
+
+    def test_settrace_independent(self):
+        import _lsprof, sys
+        events = []
+        def tracer(frame, event, arg):
+            events.append(event)
+            return None
+
+        prof = _lsprof.Profiler()
+        prof.enable()
+        sys.settrace(tracer)
+        try:
+            caller()
+        finally:
+            sys.settrace(None)
+        caller()
+        prof.disable()
+
+        self.assertTrue('call' in events)
+        entries = dict((getattr(e.code, 'co_name', e.code), e) for e in prof.getstats())
+        self.assertEqual(entries['caller'].callcount, 2)
+
+if __name__ == '__main__':
+    from test import test_support
+    test_support.run_unittest(__name__)
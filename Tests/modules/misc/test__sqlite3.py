@@ -0,0 +1,78 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+This tests what CPythons sqlite3 tests do not hit.
+'''
+
+import unittest
+
+from iptest import IronPythonTestCase, skipUnlessIronPython
+
+@skipUnlessIronPython()
+class _Sqlite3Test(IronPythonTestCase):
+
+    def test_statement_cache_hits(self):
+        import _sqlite3
+        con = _sqlite3.connect(':memory:')
+        con.execute('create table t (a integer)')
+        hits, misses, maxsize, currsize = con.statement_cache_info()
+        self.assertEqual(maxsize, 100)
+
+        for i in range(10):
+            con.execute('insert into t values (?)', (i,))
+
+        new_hits, new_misses, _, _ = con.statement_cache_info()
+        self.assertEqual(new_misses - misses, 1)
+        self.assertEqual(new_hits - hits, 9)
+        self.assertEqual(con.execute('select count(*) from t').fetchone(), (10,))
+
+    def test_statement_cache_in_use(self):
+        import _sqlite3
+        con = _sqlite3.connect(':memory:')
+        con.execute('create table t (a integer)')
+        con.executemany('insert into t values (?)', [(i,) for i in range(5)])
+
+        sql = 'select a from t order by a'
+        c1 = con.execute(sql)
+        c2 = con.execute(sql)
+        self.assertEqual(c1.fetchone(), (0,))
+        self.assertEqual(c2.fetchall(), [(i,) for i in range(5)])
+        self.assertEqual(c1.fetchall(), [(i,) for i in range(1, 5)])
+
+    def test_statement_cache_schema_change(self):
+        import _sqlite3
+        con = _sqlite3.connect(':memory:')
+        con.execute('create table t (a integer)')
+        con.execute('insert into t values (1)')
+        self.assertEqual(con.execute('select * from t').fetchall(), [(1,)])
+
+        con.execute('drop table t')
+        con.execute('create table t (a integer, b integer)')
+        con.execute('insert into t values (1, 2)')
+        self.assertEqual(con.execute('select * from t').fetchall(), [(1, 2)])
+
+    def test_statement_cache_disabled(self):
+        import _sqlite3
+        con = _sqlite3.connect(':memory:', cached_statements=0)
+        for i in range(3):
+            con.execute('select 1').fetchone()
+
+        hits, misses, maxsize, currsize = con.statement_cache_info()
+        self.assertEqual((hits, maxsize, currsize), (0, 0, 0))
+
+if __name__ == '__main__':
+    from test import test_support
+    test_support.run_unittest(__name__)
@@ -440,6 +440,41 @@ class SocketTest(IronPythonTestCase):
         str = f1.readline()
         self.assertTrue(str==test_msg)
 
+    @retryOnFailure
+    def test_recv_into(self):
+        import array
+        listener = _socket.socket()
+        listener.bind(('localhost', 0))
+        listener.listen(1)
+        client = _socket.socket()
+        client.connect(('localhost', listener.getsockname()[1]))
+        server, addr = listener.accept()
+        try:
+            client.sendall(b'abcdefghij')
+
+            b = bytearray(4)
+            self.assertEqual(server.recv_into(b), 4)
+            self.assertEqual(b, bytearray(b'abcd'))
+
+            m = memoryview(bytearray(b'xxxxxx'))
+            self.assertEqual(server.recv_into(m[1:4], 2), 2)
+            self.assertEqual(m.tobytes(), b'xefxxx')
+
+            a = array.array('B', [0, 0])
+            self.assertEqual(server.recv_into(a), 2)
+            self.assertEqual(a.tostring(), b'gh')
+
+            b = bytearray(4)
+            nbytes, address = server.recvfrom_into(b)
+            self.assertEqual(nbytes, 2)
+            self.assertEqual(b, bytearray(b'ij\x00\x00'))
+
+            self.assertRaises(TypeError, server.recv_into, b'abc')
+        finally:
+            client.close()
+            server.close()
+            listener.close()
+
     @retryOnFailure
     def test_fileobject_close(self):
         """verify we can construct fileobjects w/ the close kw arg"""
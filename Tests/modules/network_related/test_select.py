@@ -0,0 +1,141 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+#
+# test select
+#
+
+import select
+import socket
+import unittest
+
+from iptest import IronPythonTestCase, retryOnFailure
+
+class PollTest(IronPythonTestCase):
+
+    def setUp(self):
+        super(PollTest, self).setUp()
+        self.listener = socket.socket()
+        self.listener.bind(('localhost', 0))
+        self.listener.listen(5)
+
+    def tearDown(self):
+        self.listener.close()
+
+    def connect(self):
+        client = socket.socket()
+        client.connect(self.listener.getsockname())
+        server = self.listener.accept()[0]
+        return client, server
+
+    def test_register(self):
+        p = select.poll()
+        fd = self.listener.fileno()
+        p.register(self.listener, select.POLLIN)
+        self.assertEqual(p.poll(0), [])
+
+        self.assertRaises(IOError, p.modify, 12345, select.POLLIN)
+        self.assertRaises(KeyError, p.unregister, 12345)
+
+        p.unregister(fd)
+        self.assertRaises(KeyError, p.unregister, self.listener)
+
+    @retryOnFailure
+    def test_accept(self):
+        p = select.poll()
+        p.register(self.listener, select.POLLIN)
+        client = socket.socket()
+        try:
+            client.connect(self.listener.getsockname())
+            self.assertEqual(p.poll(5000), [(self.listener.fileno(), select.POLLIN)])
+            self.listener.accept()[0].close()
+        finally:
+            client.close()
+
+    @retryOnFailure
+    def test_readable(self):
+        p = select.poll()
+        client, server = self.connect()
+        try:
+            p.register(server, select.POLLIN | select.POLLPRI)
+            self.assertEqual(p.poll(0), [])
+
+            client.send(b'abc')
+            self.assertEqual(p.poll(5000), [(server.fileno(), select.POLLIN)])
+
+            # poll is level-triggered, the socket stays readable until it's drained
+            server.recv(1)
+            self.assertEqual(p.poll(5000), [(server.fileno(), select.POLLIN)])
+            server.recv(2)
+            self.assertEqual(p.poll(0), [])
+
+            p.modify(server, select.POLLIN | select.POLLOUT)
+            self.assertEqual(p.poll(5000), [(server.fileno(), select.POLLOUT)])
+
+            p.modify(server, select.POLLIN)
+            client.close()
+            res = p.poll(5000)
+            self.assertEqual(len(res), 1)
+            self.assertEqual(res[0][0], server.fileno())
+            self.assertTrue(res[0][1] & select.POLLIN)
+            self.assertEqual(server.recv(1), b'')
+        finally:
+            client.close()
+            server.close()
+
+    @retryOnFailure
+    def test_out_of_band(self):
+        p = select.poll()
+        client, server = self.connect()
+        try:
+            p.register(server, select.POLLIN | select.POLLPRI)
+            self.assertEqual(p.poll(0), [])
+
+            client.send(b'!', socket.MSG_OOB)
+            res = p.poll(5000)
+            self.assertEqual(len(res), 1)
+            self.assertEqual(res[0][0], server.fileno())
+            self.assertTrue(res[0][1] & select.POLLPRI)
+            self.assertEqual(server.recv(1, socket.MSG_OOB), b'!')
+        finally:
+            client.close()
+            server.close()
+
+    @retryOnFailure
+    def test_many(self):
+        p = select.poll()
+        pairs = [self.connect() for i in range(20)]
+        try:
+            for client, server in pairs:
+                p.register(server, select.POLLIN)
+            self.assertEqual(p.poll(0), [])
+
+            for client, server in pairs[::4]:
+                client.send(b'x')
+            expected = sorted((server.fileno(), select.POLLIN) for client, server in pairs[::4])
+            res = []
+            for i in range(50):
+                res.extend(p.poll(100))
+                if len(set(res)) == len(expected):
+                    break
+            self.assertEqual(sorted(set(res)), expected)
+        finally:
+            for client, server in pairs:
+                client.close()
+                server.close()
+
+if __name__ == '__main__':
+    from test import test_support
+    test_support.run_unittest(__name__)
@@ -303,10 +303,18 @@ class ArrayTest(unittest.TestCase):
         pass
 
     def test_array_byteswap(self):
-        '''
-        TODO
-        '''
-        pass
+        a = array.array('h', [1, 2, -1])
+        a.byteswap()
+        self.assertEqual(a, array.array('h', [256, 512, -1]))
+
+        a = array.array('i', [1, 0x01020304])
+        a.byteswap()
+        self.assertEqual(a.tostring(), '\x00\x00\x00\x01\x01\x02\x03\x04')
+
+        a = array.array('d', [1.5, -2.0])
+        a.byteswap()
+        a.byteswap()
+        self.assertEqual(a, array.array('d', [1.5, -2.0]))
 
     def test_array_count(self):
         '''
@@ -321,10 +329,27 @@ class ArrayTest(unittest.TestCase):
         pass
 
     def test_array_fromfile(self):
-        '''
-        TODO
-        '''
-        pass
+        import os
+        import tempfile
+        fd, name = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            for typecode, values in [('c', 'spam'), ('b', [-1, 2]), ('B', [1, 255]), ('u', u'ab'),
+                                     ('h', [-1, 2]), ('H', [1, 65535]), ('i', [-1, 2**31-1]),
+                                     ('I', [1, 2**32-1]), ('l', [-1, 2]), ('L', [1, 2]),
+                                     ('f', [0.5, -2.0]), ('d', [1e100, -0.25])]:
+                a = array.array(typecode, values * 1000)
+                with open(name, 'wb') as f:
+                    a.tofile(f)
+                with open(name, 'rb') as f:
+                    b = array.array(typecode)
+                    b.fromfile(f, len(a))
+                    self.assertRaises(EOFError, b.fromfile, f, 1)
+                self.assertEqual(a, b)
+                self.assertEqual(a.tostring(), b.tostring())
+                self.assertEqual(len(a.tostring()), len(a) * a.itemsize)
+        finally:
+            os.unlink(name)
 
     def test_array_fromlist(self):
         '''
@@ -422,6 +447,28 @@ class ArrayTest(unittest.TestCase):
         pass
 
 
+    @unittest.skipUnless(is_cli, 'array does not support the new buffer protocol in CPython 2')
+    def test_array_memoryview(self):
+        a = array.array('i', [1, 2, 3])
+        m = memoryview(a)
+        self.assertEqual(len(m), 3)
+        self.assertEqual(m.format, 'i')
+        self.assertEqual(m.itemsize, 4)
+        self.assertEqual(m.tolist(), [1, 2, 3])
+        self.assertEqual(m[1:].tobytes(), '\x02\x00\x00\x00\x03\x00\x00\x00')
+        self.assertEqual(m[0], '\x01\x00\x00\x00')
+
+        m[0] = '\x05\x00\x00\x00'
+        self.assertEqual(a[0], 5)
+        m[1:3] = array.array('i', [7, 8])
+        self.assertEqual(a, array.array('i', [5, 7, 8]))
+
+        b = array.array('B', [1, 2, 3])
+        mb = memoryview(b)
+        mb[0] = '\x09'
+        self.assertEqual(b, array.array('B', [9, 2, 3]))
+        self.assertEqual(mb[1:].tobytes(), '\x02\x03')
+
     def test_cp9348(self):
         test_cases = {  ('c', "a") : "array('c', 'a')",
                         ('b', "a") : "array('b', [97])",
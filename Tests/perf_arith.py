@@ -0,0 +1,178 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+int/float arithmetic benchmark.
+
+Runs numeric workloads (an n-body simulation, pystone style integer loops and
+a sieve) twice: with the default adaptive compilation, where functions are
+interpreted first and then compiled with the int and float operations they
+have seen inlined, and with -X:NoAdaptiveCompilation, where functions are
+compiled up front and every operation goes through its dynamic site.  Reports
+the best time of each and the speedup.
+
+usage: perf_arith.py with the options described in perf_harness.py
+'''
+
+import sys
+
+import perf_harness
+
+MODES = [
+    ('generic',     ['-X:NoAdaptiveCompilation']),
+    ('specialized', []),
+]
+
+PI = 3.14159265358979323
+SOLAR_MASS = 4 * PI * PI
+DAYS_PER_YEAR = 365.24
+
+def make_bodies():
+    return [
+        # sun, jupiter, saturn, uranus, neptune: [x, y, z, vx, vy, vz, mass]
+        [0.0, 0.0, 0.0, 0.0, 0.0, 0.0, SOLAR_MASS],
+        [4.84143144246472090e+00, -1.16032004402742839e+00, -1.03622044471123109e-01,
+         1.66007664274403694e-03 * DAYS_PER_YEAR, 7.69901118419740425e-03 * DAYS_PER_YEAR,
+         -6.90460016972063023e-05 * DAYS_PER_YEAR, 9.54791938424326609e-04 * SOLAR_MASS],
+        [8.34336671824457987e+00, 4.12479856412430479e+00, -4.03523417114321381e-01,
+         -2.76742510726862411e-03 * DAYS_PER_YEAR, 4.99852801234917238e-03 * DAYS_PER_YEAR,
+         2.30417297573763929e-05 * DAYS_PER_YEAR, 2.85885980666130812e-04 * SOLAR_MASS],
+        [1.28943695621391310e+01, -1.51111514016986312e+01, -2.23307578892655734e-01,
+         2.96460137564761618e-03 * DAYS_PER_YEAR, 2.37847173959480950e-03 * DAYS_PER_YEAR,
+         -2.96589568540237556e-05 * DAYS_PER_YEAR, 4.36624404335156298e-05 * SOLAR_MASS],
+        [1.53796971148509165e+01, -2.59193146099879641e+01, 1.79258772950371181e-01,
+         2.68067772490389322e-03 * DAYS_PER_YEAR, 1.62824170038242295e-03 * DAYS_PER_YEAR,
+         -9.51592254519715870e-05 * DAYS_PER_YEAR, 5.15138902046611451e-05 * SOLAR_MASS],
+    ]
+
+def advance(bodies, dt, steps):
+    n = len(bodies)
+    for step in xrange(steps):
+        for i in xrange(n):
+            b1 = bodies[i]
+            x1, y1, z1, m1 = b1[0], b1[1], b1[2], b1[6]
+            for j in xrange(i + 1, n):
+                b2 = bodies[j]
+                dx = x1 - b2[0]
+                dy = y1 - b2[1]
+                dz = z1 - b2[2]
+                d2 = dx * dx + dy * dy + dz * dz
+                mag = dt / (d2 * d2 ** 0.5)
+                b1m = m1 * mag
+                b2m = b2[6] * mag
+                b1[3] = b1[3] - dx * b2m
+                b1[4] = b1[4] - dy * b2m
+                b1[5] = b1[5] - dz * b2m
+                b2[3] = b2[3] + dx * b1m
+                b2[4] = b2[4] + dy * b1m
+                b2[5] = b2[5] + dz * b1m
+        for b in bodies:
+            b[0] = b[0] + dt * b[3]
+            b[1] = b[1] + dt * b[4]
+            b[2] = b[2] + dt * b[5]
+
+def energy(bodies):
+    e = 0.0
+    n = len(bodies)
+    for i in xrange(n):
+        b1 = bodies[i]
+        e = e + 0.5 * b1[6] * (b1[3] * b1[3] + b1[4] * b1[4] + b1[5] * b1[5])
+        for j in xrange(i + 1, n):
+            b2 = bodies[j]
+            dx = b1[0] - b2[0]
+            dy = b1[1] - b2[1]
+            dz = b1[2] - b2[2]
+            e = e - b1[6] * b2[6] / (dx * dx + dy * dy + dz * dz) ** 0.5
+    return e
+
+def workload_nbody():
+    bodies = make_bodies()
+    advance(bodies, 0.01, 20000)
+    return '%.9f' % energy(bodies)
+
+def proc(n):
+    # the integer part of pystone: counters, comparisons and index arithmetic
+    int_glob = 0
+    arr = [0] * 51
+    for run in xrange(n):
+        int1 = 2
+        int2 = 3
+        int3 = int2 * int1 - int2
+        while int1 < int2:
+            int3 = 5 * int1 - int2
+            int1 = int1 + 1
+        loc = int1 + 5
+        arr[loc] = int3
+        arr[loc + 1] = arr[loc]
+        arr[loc + 30] = loc
+        int_glob = int_glob + loc - int3 * 2 + run % 7
+        if int_glob > 100000:
+            int_glob = int_glob - 100000
+    return int_glob
+
+def workload_pystone():
+    return proc(500000)
+
+def workload_sieve():
+    n = 200000
+    flags = [True] * (n + 1)
+    count = 0
+    for i in xrange(2, n + 1):
+        if flags[i]:
+            count = count + 1
+            j = i * i
+            while j <= n:
+                flags[j] = False
+                j = j + i
+    return count
+
+def workload_overflow():
+    # int operations which overflow into long keep their result type
+    total = 0
+    x = 1
+    for i in xrange(200000):
+        x = x * 3 + i
+        if x > 10000000000:
+            x = x % 10000000000
+        total = total + x % 1000
+    return total
+
+WORKLOADS = [
+    ('nbody',    workload_nbody),
+    ('pystone',  workload_pystone),
+    ('sieve',    workload_sieve),
+    ('overflow', workload_overflow),
+]
+
+def main(argv):
+    opts = perf_harness.parse_args(argv)
+    if opts.child is not None:
+        return perf_harness.report_child(WORKLOADS, opts.child)
+
+    results = dict((mode, perf_harness.run_child(opts.ipy, options, __file__, opts.runs)) for mode, options in MODES)
+    print '%-10s %10s %12s %8s' % ('', 'generic', 'specialized', 'speedup')
+    for name, workload in WORKLOADS:
+        generic, specialized = results['generic'][name], results['specialized'][name]
+        line = '%-10s %9.3fs %11.3fs %7.2fx' % (name, generic[0], specialized[0], generic[0] / specialized[0])
+        if name in opts.baseline.get('specialized', {}):
+            line += '  (baseline %7.3fs, %s)' % (opts.baseline['specialized'][name][0], perf_harness.change(specialized[0], opts.baseline['specialized'][name][0]))
+        if generic[1] != specialized[1]:
+            line += '  results differ'
+        print line
+
+    perf_harness.save(opts, results)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
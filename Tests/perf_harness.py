@@ -0,0 +1,95 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+
+'''
+Command line handling and timing helpers shared by the perf_*.py benchmarks.
+
+The benchmarks take the same arguments:
+
+    [-n runs] [-o results.json] [-b baseline.json] [ipy.exe]
+
+-n sets how many times each measurement is repeated, -o saves the results as
+JSON and -b compares against results saved by an earlier run.  Benchmarks
+which start ipy use ipy.exe, which defaults to sys.executable.
+'''
+
+import json
+import subprocess
+import sys
+import time
+
+class Options(object):
+    def __init__(self, runs):
+        self.runs = runs
+        self.output = None
+        self.baseline = {}
+        self.ipy = sys.executable
+        self.child = None
+        self.extra = {}
+
+def parse_args(argv, runs=5, ipy=True, extra=None):
+    '''parses the common arguments, extra maps additional integer options to their defaults'''
+    opts = Options(runs)
+    opts.extra = dict(extra or {})
+    baseline = None
+    args = list(argv)
+    while args:
+        arg = args.pop(0)
+        if arg == '--child': opts.child = int(args.pop(0))
+        elif arg == '-n': opts.runs = int(args.pop(0))
+        elif arg == '-o': opts.output = args.pop(0)
+        elif arg == '-b': baseline = args.pop(0)
+        elif arg in opts.extra: opts.extra[arg] = int(args.pop(0))
+        elif ipy and not arg.startswith('-'): opts.ipy = arg
+        else: raise ValueError('unknown argument ' + arg)
+
+    if baseline:
+        with open(baseline) as f:
+            opts.baseline = json.load(f)
+    return opts
+
+def save(opts, results):
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+def change(value, baseline):
+    '''formats the relative change from baseline to value'''
+    return '%+.1f%%' % ((value / baseline - 1) * 100)
+
+def best_time(func, runs):
+    times = []
+    for i in range(runs):
+        start = time.time()
+        func()
+        times.append(time.time() - start)
+    return min(times)
+
+def run_child(ipy, options, script, runs):
+    '''runs script with --child in a new ipy process, returns the JSON it printed last'''
+    p = subprocess.Popen([ipy] + options + [script, '--child', str(runs)], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = p.communicate()
+    if p.returncode != 0:
+        raise RuntimeError('%s %s failed:\n%s' % (ipy, ' '.join(options), err))
+    return json.loads(out.splitlines()[-1])
+
+def report_child(workloads, runs):
+    '''times each (name, func) workload in this process, prints {name: [best time, result]}'''
+    res = {}
+    for name, func in workloads:
+        result = func()
+        res[name] = [best_time(func, runs), repr(result)]
+    print json.dumps(res)
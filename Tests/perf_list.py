@@ -0,0 +1,139 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+list micro-benchmarks.
+
+Measures the throughput of the basic list operations on a list owned by a
+single thread, which take the list's thin lock, and of append on a list shared
+by several threads, where the lock has been inflated to the list's monitor.
+Reports the best rate of each in millions of operations per second.
+
+usage: perf_list.py with the options described in perf_harness.py
+'''
+
+import sys
+import threading
+
+import perf_harness
+
+N = 1000000
+
+def bench_append():
+    l = []
+    append = l.append
+    for i in xrange(N):
+        append(i)
+
+def bench_getitem():
+    l = range(1000)
+    for i in xrange(N / 1000):
+        for j in xrange(1000):
+            l[j]
+
+def bench_setitem():
+    l = range(1000)
+    for i in xrange(N / 1000):
+        for j in xrange(1000):
+            l[j] = j
+
+def bench_pop():
+    l = range(N)
+    pop = l.pop
+    for i in xrange(N):
+        pop()
+
+def bench_insert_front():
+    l = []
+    for i in xrange(N / 100):
+        l.insert(0, i)
+        del l[0]
+        l.insert(0, i)
+
+def bench_slice():
+    l = range(100)
+    for i in xrange(N / 100):
+        l[10:20]
+
+def bench_append_after_sort():
+    # sort can call user code, the list uses its monitor afterwards
+    l = [2, 1]
+    l.sort()
+    append = l.append
+    for i in xrange(N):
+        append(i)
+
+def bench_append_after_extend():
+    # extending with a list or searching it keeps the thin lock of both lists
+    l = [0]
+    l.extend([1, 2])
+    l.extend(l)
+    l.count(1)
+    1 in l
+    append = l.append
+    for i in xrange(N):
+        append(i)
+
+def bench_append_after_join():
+    # so does joining it
+    l = ['a', 'b']
+    ','.join(l)
+    append = l.append
+    for i in xrange(N):
+        append(i)
+
+def bench_append_shared():
+    l = []
+    def worker():
+        append = l.append
+        for i in xrange(N / 4):
+            append(i)
+    threads = [threading.Thread(target=worker) for i in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+BENCHMARKS = [
+    ('append',              bench_append, N),
+    ('getitem',             bench_getitem, N),
+    ('setitem',             bench_setitem, N),
+    ('pop',                 bench_pop, N),
+    ('insert/del front',    bench_insert_front, N / 100 * 3),
+    ('slice',               bench_slice, N / 100),
+    ('append after sort',   bench_append_after_sort, N),
+    ('append after extend', bench_append_after_extend, N),
+    ('append after join',   bench_append_after_join, N),
+    ('append, 4 threads',   bench_append_shared, N),
+]
+
+def run(runs):
+    '''returns {name: best rate in Mops/s}'''
+    res = {}
+    for name, bench, ops in BENCHMARKS:
+        res[name] = ops / max(perf_harness.best_time(bench, runs), 1e-6) / 1e6
+    return res
+
+def main(argv):
+    opts = perf_harness.parse_args(argv, ipy=False)
+    results = run(opts.runs)
+    for name, bench, ops in BENCHMARKS:
+        line = '%-20s %8.2f Mops/s' % (name, results[name])
+        if name in opts.baseline:
+            line += '  (baseline %8.2f, %s)' % (opts.baseline[name], perf_harness.change(results[name], opts.baseline[name]))
+        print line
+
+    perf_harness.save(opts, results)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,104 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+cPickle benchmark.
+
+Pickles and unpickles a set of payloads with each protocol, with the memo and
+in fast mode (Pickler.fast = 1, which skips the memo), and reports the best
+time of each.  The payloads are large lists and dicts of primitives as sent
+between processes, plus a graph of instances.
+
+usage: perf_pickle.py with the options described in perf_harness.py
+'''
+
+import cPickle
+import sys
+
+from cStringIO import StringIO
+
+import perf_harness
+
+class Record(object):
+    def __init__(self, i):
+        self.id = i
+        self.name = 'record %d' % i
+        self.parent = None
+
+def payload_ints():
+    return [i * 7919 - 500000 for i in range(100000)]
+
+def payload_floats():
+    return [i / 7.0 for i in range(100000)]
+
+def payload_strings():
+    return ['string number %d' % i for i in range(50000)] + [u'\xfcnicode %d' % i for i in range(10000)]
+
+def payload_rows():
+    return [{'id': i, 'name': 'row %d' % i, 'price': i * 0.25, 'active': i % 2 == 0, 'tags': ('a', 'b', i)} for i in range(20000)]
+
+def payload_nested():
+    return dict(('key%d' % i, [range(10), {'x': i, 'y': [i] * 5}]) for i in range(5000))
+
+def payload_objects():
+    records = [Record(i) for i in range(10000)]
+    for i in range(1, len(records)):
+        records[i].parent = records[i // 2]
+    return records
+
+PAYLOADS = [
+    ('ints',    payload_ints, True),
+    ('floats',  payload_floats, True),
+    ('strings', payload_strings, True),
+    ('rows',    payload_rows, True),
+    ('nested',  payload_nested, True),
+    ('objects', payload_objects, False),    # shared references, no fast mode
+]
+
+def dump(data, proto, fast):
+    f = StringIO()
+    p = cPickle.Pickler(f, proto)
+    p.fast = fast
+    p.dump(data)
+    return f.getvalue()
+
+def run(runs):
+    '''returns {payload/proto/mode: [dump time, load time, pickle size]}'''
+    res = {}
+    for name, payload, acyclic in PAYLOADS:
+        data = payload()
+        for proto in range(3):
+            for fast in ([0, 1] if acyclic else [0]):
+                s = dump(data, proto, fast)
+                load_time = perf_harness.best_time(lambda: cPickle.loads(s), runs)
+                dump_time = perf_harness.best_time(lambda: dump(data, proto, fast), runs)
+                res['%s/%d/%s' % (name, proto, 'fast' if fast else 'memo')] = [dump_time, load_time, len(s)]
+    return res
+
+def main(argv):
+    opts = perf_harness.parse_args(argv, ipy=False)
+    results = run(opts.runs)
+    print '%-20s %9s %9s %10s' % ('', 'dump', 'load', 'size')
+    for key in sorted(results):
+        dump_time, load_time, size = results[key]
+        line = '%-20s %8.3fs %8.3fs %10d' % (key, dump_time, load_time, size)
+        if key in opts.baseline:
+            line += '  (baseline dump %s, load %s)' % (perf_harness.change(dump_time, opts.baseline[key][0]), perf_harness.change(load_time, opts.baseline[key][1]))
+        print line
+
+    perf_harness.save(opts, results)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
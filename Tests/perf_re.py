@@ -0,0 +1,101 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+Regular expression benchmark.
+
+Runs a set of re workloads with each of the engines selected by -X:RegexEngine
+(cli translates patterns to .NET regular expressions, sre runs the code from
+sre_compile) and reports the best time of each.  The workloads include the
+patterns of the stdlib re_tests corpus, which also checks that the engines
+agree with each other.
+
+usage: perf_re.py with the options described in perf_harness.py
+'''
+
+import sys
+
+import perf_harness
+
+ENGINES = ['cli', 'sre']
+
+LOG = '\n'.join('2017-03-%02d 12:%02d:%02d [%s] worker-%d: request /api/item/%d took %dms' % (
+    i % 28 + 1, i % 60, i * 7 % 60, ('INFO', 'WARN', 'ERROR')[i % 3], i % 8, i, i * 13 % 1000) for i in range(2000))
+TEXT = ' '.join(['The quick brown fox jumps over the lazy dog, said Mr. Smith-Jones on 2017-03-04.'] * 500)
+
+def workload_re_tests(re):
+    from test.re_tests import tests, SUCCEED, FAIL
+    res = []
+    for t in tests:
+        if t[2] not in (SUCCEED, FAIL):
+            continue
+        try:
+            p = re.compile(t[0])
+        except Exception:
+            continue
+        m = p.search(t[1])
+        res.append(m and m.span())
+    return res
+
+def workload_log(re):
+    p = re.compile(r'^(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d) \[(\w+)\] ([\w-]+): request (\S+) took (\d+)ms$', re.M)
+    return len([m.group(7) for m in p.finditer(LOG) if m.group(7) != 'INFO'])
+
+def workload_findall(re):
+    return len(re.findall(r'\b\w+\b', TEXT)) + len(re.findall(r'(?i)the', TEXT))
+
+def workload_sub(re):
+    return len(re.sub(r'(\d+)-(\d+)-(\d+)', r'\3.\2.\1', TEXT)) + len(re.sub(r'\s+', ' ', LOG))
+
+def workload_split(re):
+    return len(re.split(r'[,.]\s*', TEXT)) + len(re.split(r'\n', LOG))
+
+def workload_backtrack(re):
+    p = re.compile(r'(a|b)*c')
+    return [p.match('ab' * n) for n in range(200)].count(None)
+
+WORKLOADS = [
+    ('re_tests',  workload_re_tests, 5),
+    ('log',       workload_log, 5),
+    ('findall',   workload_findall, 20),
+    ('sub',       workload_sub, 20),
+    ('split',     workload_split, 20),
+    ('backtrack', workload_backtrack, 5),
+]
+
+def repeat(workload, re, loops):
+    return lambda: [workload(re) for i in range(loops)][-1]
+
+def main(argv):
+    opts = perf_harness.parse_args(argv)
+    if opts.child is not None:
+        import re
+        return perf_harness.report_child([(name, repeat(workload, re, loops)) for name, workload, loops in WORKLOADS], opts.child)
+
+    results = dict((engine, perf_harness.run_child(opts.ipy, ['-X:RegexEngine', engine], __file__, opts.runs)) for engine in ENGINES)
+    print '%-10s %10s %10s %8s' % ('', 'cli', 'sre', 'sre/cli')
+    for name, workload, loops in WORKLOADS:
+        cli, sre = results['cli'][name], results['sre'][name]
+        line = '%-10s %9.3fs %9.3fs %7.2fx' % (name, cli[0], sre[0], sre[0] / cli[0])
+        if name in opts.baseline.get('sre', {}):
+            line += '  (baseline sre %7.3fs, %s)' % (opts.baseline['sre'][name][0], perf_harness.change(sre[0], opts.baseline['sre'][name][0]))
+        if cli[1] != sre[1]:
+            line += '  results differ'
+        print line
+
+    perf_harness.save(opts, results)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,98 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+Startup time benchmark.
+
+Starts ipy repeatedly for a few typical scenarios and reports the best and the
+median wall clock time of each, then runs every scenario once more with
+-X:ImportProfile and lists where the time went: the runtime initialization
+steps and the imports with the highest self time.
+
+usage: perf_startup.py [-t top] plus the options described in perf_harness.py
+'''
+
+import re
+import subprocess
+import sys
+import time
+
+import perf_harness
+
+SCENARIOS = [
+    ('empty',       ['-S', '-c', 'pass']),
+    ('site',        ['-c', 'pass']),
+    ('stdlib',      ['-c', 'import os, re, collections, json, xml.etree.ElementTree, unittest']),
+]
+
+_import_time = re.compile(r'^import time:\s*(\d+) \|\s*(\d+) \| ( *)(.*)$')
+
+def run(ipy, args):
+    start = time.time()
+    p = subprocess.Popen([ipy] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = p.communicate()
+    elapsed = time.time() - start
+    if p.returncode != 0:
+        raise RuntimeError('%s %s failed:\n%s' % (ipy, ' '.join(args), err))
+    return elapsed, err
+
+def time_scenario(ipy, args, runs):
+    times = sorted(run(ipy, args)[0] for i in xrange(runs))
+    return times[0], times[len(times) // 2]
+
+def profile_scenario(ipy, args):
+    '''returns a list of (name, depth, self us, cumulative us) parsed from -X:ImportProfile output'''
+    err = run(ipy, ['-X:ImportProfile'] + args)[1]
+    res = []
+    for line in err.splitlines():
+        m = _import_time.match(line.rstrip())
+        if m:
+            res.append((m.group(4), (len(m.group(3)) - 1) // 2, int(m.group(1)), int(m.group(2))))
+    return res
+
+def main(argv):
+    opts = perf_harness.parse_args(argv, runs=10, extra={'-t': 15})
+    top = opts.extra['-t']
+
+    results = {}
+    for name, args in SCENARIOS:
+        best, median = time_scenario(opts.ipy, args, opts.runs)
+        records = profile_scenario(opts.ipy, args)
+        results[name] = {
+            'best': best,
+            'median': median,
+            'startup_us': sum(r[2] for r in records if r[0].startswith('[')),
+            'imports_us': sum(r[3] for r in records if r[1] == 0 and not r[0].startswith('[')),
+            'modules': len([r for r in records if not r[0].startswith('[')]),
+        }
+
+        line = '%-8s best %7.3fs  median %7.3fs' % (name, best, median)
+        if name in opts.baseline:
+            line += '  (baseline median %7.3fs, %s)' % (opts.baseline[name]['median'], perf_harness.change(median, opts.baseline[name]['median']))
+        print line
+        print '    runtime initialization %8d us, imports %8d us in %d modules' % (
+            results[name]['startup_us'], results[name]['imports_us'], results[name]['modules'])
+
+        for rec in [r for r in records if r[0].startswith('[')]:
+            print '    %10d us  %s' % (rec[2], rec[0])
+        print '    top imports by self time:'
+        for rec in sorted((r for r in records if not r[0].startswith('[')), key=lambda r: -r[2])[:top]:
+            print '    %10d us  %10d us cumulative  %s' % (rec[2], rec[3], rec[0])
+        print
+
+    perf_harness.save(opts, results)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
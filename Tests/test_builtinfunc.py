@@ -632,6 +632,35 @@ class BuiltinsTest2(IronPythonTestCase):
         for code in ["abc" + chr(0) + "def", chr(0) + "def", "def" + chr(0)]:
             self.assertRaises(TypeError, compile, code, 'f', 'exec')
 
+    def test_eval_code_cache(self):
+        # repeated source strings reuse their code, keyed by the __future__ flags and file name
+        import __future__
+        src = 'x / 2'
+        self.assertEqual([eval(src, {'x': i}) for i in range(4)], [0, 0, 1, 1])
+        self.assertEqual(eval(compile(src, '<string>', 'eval', __future__.division.compiler_flag), {'x': 3}), 1.5)
+        self.assertEqual(eval(src, {'x': 3}), 1)
+        self.assertEqual([compile('1', name, 'eval').co_filename for name in ['a', 'b', 'a']], ['a', 'b', 'a'])
+        # compile() returns a new code object each time
+        self.assertTrue(compile(src, '<string>', 'eval') is not compile(src, '<string>', 'eval'))
+
+        class Namespace(dict): pass
+        for globals in [{'x': 1}, Namespace(x=2), {'x': 3}]:
+            locals = {}
+            exec 'y = x * 2' in globals, locals
+            self.assertEqual(locals, {'y': globals['x'] * 2})
+
+        for i in range(2):
+            self.assertRaises(SyntaxError, eval, '1 +')
+
+        if is_cli:
+            import clr
+            hits = clr.GetEvalCacheStats()['hits']
+            for i in range(3):
+                eval('1 + 1')
+            stats = clr.GetEvalCacheStats()
+            self.assertTrue(stats['hits'] >= hits + 2)
+            self.assertEqual(stats['maxsize'], 100)
+
     def test_str_none(self):
         class foo(object):
             def __str__(self):
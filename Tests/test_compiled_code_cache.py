@@ -0,0 +1,89 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+Tests for the -X:CompiledCodeCache on-disk cache of compiled modules.
+'''
+
+import os
+import shutil
+import sys
+import unittest
+
+from iptest import IronPythonTestCase, is_netstandard, skipUnlessIronPython
+
+@unittest.skipIf(is_netstandard, 'compiled modules cannot be saved on netstandard')
+@skipUnlessIronPython()
+class CompiledCodeCacheTest(IronPythonTestCase):
+
+    def setUp(self):
+        super(CompiledCodeCacheTest, self).setUp()
+        self.work_dir = os.path.join(self.temporary_dir, "compiled_code_cache")
+        self.cache_dir = os.path.join(self.work_dir, "cache")
+        if os.path.exists(self.work_dir):
+            shutil.rmtree(self.work_dir)
+        self.ensure_directory_present(self.work_dir)
+
+        self.log_file = os.path.join(self.work_dir, "result.log")
+        self.main_file = os.path.join(self.work_dir, "main.py")
+        self.write_to_file(self.main_file, '''
+import sys
+sys.path.insert(0, %r)
+import cachedmod
+open(%r, "w").write(str(cachedmod.value()))
+''' % (self.work_dir, self.log_file))
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, True)
+
+    def run_main(self):
+        self.assertEqual(self.launch(sys.executable, "-X:CompiledCodeCache", self.cache_dir, self.main_file), 0)
+        with open(self.log_file) as f:
+            return f.read()
+
+    def cached_assemblies(self):
+        return [x for x in os.listdir(self.cache_dir) if x.startswith("cachedmod.")]
+
+    def test_reuse_and_invalidate(self):
+        module = os.path.join(self.work_dir, "cachedmod.py")
+        self.write_to_file(module, "def value(): return 1\n")
+
+        self.assertEqual(self.run_main(), "1")
+        first = self.cached_assemblies()
+        self.assertEqual(len(first), 1)
+
+        # unchanged source reuses the cached assembly
+        self.assertEqual(self.run_main(), "1")
+        self.assertEqual(self.cached_assemblies(), first)
+
+        # changed source is recompiled and the stale assembly removed
+        self.write_to_file(module, "def value(): return 2\n")
+        self.assertEqual(self.run_main(), "2")
+        second = self.cached_assemblies()
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(second, first)
+
+    def test_save_failure(self):
+        module = os.path.join(self.work_dir, "cachedmod.py")
+        self.write_to_file(module, "def value(): return 1\n")
+
+        # the cache directory can't be created, the module is compiled in memory
+        self.write_to_file(self.cache_dir, "")
+        self.assertEqual(self.run_main(), "1")
+        self.assertTrue(os.path.isfile(self.cache_dir))
+
+if __name__ == '__main__':
+    from test import test_support
+    test_support.run_unittest(__name__)
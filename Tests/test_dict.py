@@ -816,6 +816,31 @@ class DictTest(IronPythonTestCase):
         self.assertEqual(moduleDict["DictTest"], DictTest)
         self.assertEqual(moduleDict.keys().__contains__("DictTest"), True)
 
+    @unittest.skipUnless(is_cli, 'IronPython specific test')
+    def test_builtin_module_dict(self):
+        import time
+        d = time.__dict__
+        keys = d.keys()
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(len(d), len(keys))
+        self.assertEqual(sorted(keys), sorted(k for k, v in d.items()))
+        self.assertEqual(sorted(keys), sorted(d))
+        self.assertTrue('time' in keys)
+        self.assertEqual(d['time'], time.time)
+
+        # members are shared between engines but not their dictionaries
+        import clr
+        clr.AddReference('IronPython')
+        from IronPython.Hosting import Python
+        engine = Python.CreateEngine()
+        other = engine.Execute('__import__("time")')
+        self.assertEqual(sorted(engine.Execute('dir(__import__("time"))')), sorted(dir(time)))
+
+        time.lazy_test_value = 42
+        self.assertFalse(hasattr(other, 'lazy_test_value'))
+        del time.lazy_test_value
+        self.assertEqual(len(d), len(keys))
+
     def test_eval_locals_simple(self):
         class Locals(dict):
             def __getitem__(self, key):
@@ -13,6 +13,8 @@
 #
 #####################################################################################
 
+import os
+import sys
 import unittest
 
 from iptest import IronPythonTestCase, is_cli, is_mono, is_netstandard, run_test, skipUnlessIronPython
@@ -1402,5 +1404,70 @@ class FunctionTest(IronPythonTestCase):
         self.assertRaises(NotImplementedError, FunctionType, fn_no_closure.func_code,
                 fn_no_closure.func_globals, "name", fn_no_closure.func_defaults,
                 fn_with_closure.func_closure)
-   
+
+    @skipUnlessIronPython()
+    def test_background_compilation(self):
+        import clr
+        self.assertEqual(clr.GetCompilationQueueStats(), None)
+
+        out_file = os.path.join(self.temporary_dir, "test_background_compilation.txt")
+        script = os.path.join(self.temporary_dir, "test_background_compilation.py")
+        self.write_to_file(script, '''
+import clr, time
+def total(n):
+    # functions with for loops are compiled before they first run
+    res = 0
+    for i in range(n):
+        res += i
+    return res
+def squares(n):
+    for i in range(n):
+        yield i * i
+res = [total(100) for i in range(50)] + [sum(squares(10)) for i in range(50)]
+for i in range(1000):
+    stats = clr.GetCompilationQueueStats()
+    if stats["depth"] == 0: break
+    time.sleep(0.01)
+res += [total(100), sum(squares(10))]
+open(%r, "w").write(repr([set(res), stats["depth"], stats["compiled"] >= 3, stats["failed"]]))
+''' % out_file)
+        self.assertEqual(self.launch(sys.executable, "-X:BackgroundCompilation", script), 0)
+        with open(out_file) as f:
+            self.assertEqual(f.read(), repr([set([4950, 285]), 0, True, 0]))
+        os.unlink(out_file)
+        os.unlink(script)
+
+    @skipUnlessIronPython()
+    def test_compilation_profile(self):
+        import clr
+        self.assertEqual(clr.GetCompilationProfile(), None)
+
+        out_file = os.path.join(self.temporary_dir, "test_compilation_profile.txt")
+        script = os.path.join(self.temporary_dir, "test_compilation_profile.py")
+        self.write_to_file(script, '''
+import clr
+def interpreted(x):
+    return x + 1
+def compiled(n):
+    # functions with for loops are compiled before they first run
+    res = 0
+    for i in range(n):
+        res += i
+    return res
+def unused():
+    pass
+for i in range(3):
+    interpreted(i)
+compiled(10)
+profile = dict((p[0], p) for p in clr.GetCompilationProfile() if p[1] == __file__)
+res = [profile[name][3:5] for name in ("interpreted", "compiled", "unused")]
+res.append(profile["compiled"][6] is None or profile["compiled"][6] > 0)
+open(%r, "w").write(repr(res))
+''' % out_file)
+        self.assertEqual(self.launch(sys.executable, "-X:CompilationProfile", script), 0)
+        with open(out_file) as f:
+            self.assertEqual(f.read(), repr([("interpreted", 3), ("compiled", 1), (None, 0), True]))
+        os.unlink(out_file)
+        os.unlink(script)
+
 run_test(__name__)
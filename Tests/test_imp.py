@@ -1323,6 +1323,41 @@ X = 3.14
         # can't access private fields
         self.assertRaises(AttributeError, lambda : test_new_module._value)
 
+    @unittest.skipUnless(is_cli, 'IronPython specific test')
+    def test_import_directory_cache(self):
+        import clr
+        if clr.GetImportCacheStats() is None:
+            return
+
+        cache_dir = os.path.join(self.temporary_dir, "import_cache")
+        self.ensure_directory_present(cache_dir)
+        try:
+            self.write_to_file(os.path.join(cache_dir, "cached_a.py"), "value = 1")
+            with path_modifier(cache_dir):
+                import cached_a
+                self.assertEqual(cached_a.value, 1)
+
+                # failed probes of other modules are answered from the listing
+                before = clr.GetImportCacheStats()
+                self.assertRaises(ImportError, __import__, "cached_does_not_exist")
+                after = clr.GetImportCacheStats()
+                self.assertTrue(after["hits"] > before["hits"])
+
+                # the directory is checked for changes again by the next import
+                self.write_to_file(os.path.join(cache_dir, "cached_c.py"), "value = 3")
+                import cached_c
+                self.assertEqual(cached_c.value, 3)
+
+                # a module created after the listing was cached is still found
+                self.write_to_file(os.path.join(cache_dir, "cached_b.py"), "value = 2")
+                clr.InvalidateImportCaches()
+                import cached_b
+                self.assertEqual(cached_b.value, 2)
+        finally:
+            for name in ["cached_a", "cached_b", "cached_c"]:
+                sys.modules.pop(name, None)
+            self.clean_directory(cache_dir, remove=True)
+
 if __name__ == '__main__':
     from test import test_support
     from iptest.file_util import delete_all_f
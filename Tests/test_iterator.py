@@ -271,6 +271,138 @@ class IteratorTest(IronPythonTestCase):
         a = A()
         self.assertEqual(next(a), 2)
 
+    def test_range_for(self):
+        def collect(*args):
+            res = []
+            for i in range(*args):
+                res.append(i)
+            return res
+
+        for args in [(5,), (0,), (-3,), (2, 7), (7, 2), (1, 10, 3), (10, 1, -3), (5, -5, -1), (-5, 5, 4)]:
+            expected = collect(*args)
+            if len(args) == 1:
+                self.assertEqual([i for i in range(args[0]) for j in [0]], expected)
+                res = []
+                for i in range(args[0]): res.append(i)
+                self.assertEqual(res, expected)
+                res = []
+                for i in xrange(args[0]): res.append(i)
+                self.assertEqual(res, expected)
+            elif len(args) == 2:
+                res = []
+                for i in range(args[0], args[1]): res.append(i)
+                self.assertEqual(res, expected)
+                res = []
+                for i in xrange(args[0], args[1]): res.append(i)
+                self.assertEqual(res, expected)
+            else:
+                res = []
+                for i in range(args[0], args[1], args[2]): res.append(i)
+                self.assertEqual(res, expected)
+                res = []
+                for i in xrange(args[0], args[1], args[2]): res.append(i)
+                self.assertEqual(res, expected)
+
+        # the loop variable keeps its last value, assigning to it doesn't change the iteration
+        res = []
+        for i in xrange(5):
+            res.append(i)
+            i = 100
+        self.assertEqual((res, i), ([0, 1, 2, 3, 4], 100))
+        for i in range(3): pass
+        self.assertEqual(i, 2)
+
+        # break, continue and else
+        res = []
+        for i in xrange(10):
+            if i % 2: continue
+            if i == 6: break
+            res.append(i)
+        else:
+            res.append('else')
+        self.assertEqual(res, [0, 2, 4])
+        for i in xrange(3): pass
+        else: res.append('else')
+        self.assertEqual(res, [0, 2, 4, 'else'])
+        for i in range(0): self.fail()
+        else: res.append('empty')
+        self.assertEqual(res[-1], 'empty')
+
+        # the bounds are evaluated once, in order
+        calls = []
+        def arg(x):
+            calls.append(x)
+            return x
+        for i in xrange(arg(1), arg(3), arg(1)): pass
+        self.assertEqual(calls, [1, 3, 1])
+
+        # ints at the edges of the range of int
+        self.assertEqual([i for i in [0] for j in xrange(sys.maxint - 2, sys.maxint)], [0, 0])
+        res = []
+        for i in xrange(sys.maxint - 2, sys.maxint): res.append(i)
+        self.assertEqual(res, [sys.maxint - 2, sys.maxint - 1])
+        res = []
+        for i in xrange(sys.maxint - 2, sys.maxint, 3): res.append(i)
+        self.assertEqual(res, [sys.maxint - 2])
+        res = []
+        for i in xrange(-sys.maxint, -sys.maxint - 1, -1): res.append(i)
+        self.assertEqual(res, [-sys.maxint])
+
+        # other argument types go through range/xrange
+        res = []
+        for i in range(2L): res.append(i)
+        self.assertEqual(res, [0, 1])
+        res = []
+        for i in xrange(True, 3): res.append(i)
+        self.assertEqual(res, [1, 2])
+        def f(step):
+            for i in xrange(0, 5, step): pass
+        self.assertRaises(ValueError, f, 0)
+        def f(stop):
+            for i in xrange(stop): pass
+        self.assertRaises(TypeError, f, 'abc')
+        def g():
+            for i in xrange(1, 2, 3, 4): pass
+        self.assertRaises(TypeError, g)
+
+        # range and xrange can be rebound
+        def f(range):
+            res = []
+            for i in range(3): res.append(i)
+            return res
+        self.assertEqual(f(lambda n: 'abc'), ['a', 'b', 'c'])
+        self.assertEqual(f(xrange), [0, 1, 2])
+        def f():
+            res = []
+            for i in xrange(1, 2): res.append(i)
+            return res
+        globals()['xrange'] = lambda *args: ['x'] + list(args)
+        try:
+            self.assertEqual(f(), ['x', 1, 2])
+        finally:
+            del globals()['xrange']
+        self.assertEqual(f(), [1])
+
+        import __builtin__
+        old = __builtin__.range
+        try:
+            __builtin__.range = lambda n: [n] * n
+            res = []
+            for i in range(2): res.append(i)
+            self.assertEqual(res, [2, 2])
+        finally:
+            __builtin__.range = old
+
+        # in a generator
+        def gen(n):
+            for i in xrange(n):
+                yield i
+                if i == 2: break
+            else:
+                yield 'else'
+        self.assertEqual(list(gen(5)), [0, 1, 2])
+        self.assertEqual(list(gen(2)), [0, 1, 'else'])
+
 if __name__ == '__main__':
     from test import test_support
     test_support.run_unittest(__name__)
\ No newline at end of file
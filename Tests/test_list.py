@@ -114,6 +114,58 @@ class ListTest(IronPythonTestCase):
         l.sort(lambda x, y: x > y)
         self.assertEqual(l, l2)
 
+    def test_sort_stable(self):
+        import random
+        rnd = random.Random(42)
+
+        def check(data, **kwargs):
+            key = kwargs.get('key') or (lambda x: x)
+            # stable reference: ties are broken by the original position
+            decorated = [(key(x), i, x) for i, x in enumerate(data)]
+            if kwargs.get('reverse'):
+                decorated.sort(key=lambda t: (t[0], -t[1]), reverse=True)
+            else:
+                decorated.sort(key=lambda t: (t[0], t[1]))
+            expected = [t[2] for t in decorated]
+
+            res = list(data)
+            res.sort(**kwargs)
+            self.assertEqual(res, expected)
+            self.assertEqual([id(x) for x in res], [id(x) for x in expected])
+            self.assertEqual(sorted(data, **kwargs), expected)
+
+        for n in (0, 1, 2, 5, 63, 64, 65, 200, 1000, 5000):
+            ints = [rnd.randrange(n // 4 + 1) for i in xrange(n)]
+            runs = range(n // 2) + range(n // 3, 0, -1) + [rnd.randrange(n + 1) for i in xrange(n // 10)]
+            for data in (ints, runs, [float(x) / 2 for x in ints], [str(x) for x in ints],
+                         [(x, str(x)) for x in ints], ints + [1.5, 2L, True]):
+                check(data)
+                check(data, reverse=True)
+            pairs = [(x, i) for i, x in enumerate(ints)]
+            check(pairs, key=lambda p: p[0])
+            check(pairs, key=lambda p: p[0], reverse=True)
+            check(pairs, key=lambda p: str(p[0]))
+            check(pairs, key=lambda p: float(p[0]), reverse=True)
+
+    def test_sort_errors(self):
+        l = range(100, 0, -1) * 3
+        def cmp_mutate(x, y):
+            l.append(1)
+            return cmp(x, y)
+        self.assertRaises(ValueError, l.sort, cmp_mutate)
+
+        l = range(200, 0, -1) * 3
+        counter = [0]
+        def cmp_fail(x, y):
+            counter[0] += 1
+            if counter[0] == 500:
+                raise RuntimeError()
+            return cmp(x, y)
+        original = sorted(l)
+        self.assertRaises(RuntimeError, l.sort, cmp_fail)
+        # the list keeps all its items
+        self.assertEqual(sorted(l), original)
+
     def test_list_in_list(self):
         aList = [['a']]
         anItem = ['a']
@@ -467,6 +519,27 @@ class ListTest(IronPythonTestCase):
         t1 = Temp(3.0)
         self.assertEqual(t1 * 3.0, 9.0)
 
+    def test_threads(self):
+        import threading
+        l = []
+        def append(n):
+            for i in xrange(10000):
+                l.append((n, i))
+                l[-1]
+        def mutate():
+            for i in xrange(200):
+                l.index(l[0])
+                l[:10] = l[:10]
+                l.insert(0, l.pop(0))
+                (5, 5) in l
+        threads = [threading.Thread(target=append, args=(n,)) for n in range(4)] + [threading.Thread(target=mutate)]
+        # make sure there's something to pop
+        l.append((0, -1))
+        for t in threads: t.start()
+        for t in threads: t.join()
+        self.assertEqual(len(l), 40001)
+        self.assertEqual(sorted(l), [(0, -1)] + [(n, i) for n in range(4) for i in xrange(10000)])
+
 
 if __name__ == '__main__':
     from test import test_support
@@ -59,6 +59,37 @@ class TestGH1387(unittest.TestCase):
         chunk = self.mview[8:12]
         self.assertEqual(len(chunk), 2)
         
+class ConsumerTests(unittest.TestCase):
+    def testMemoryViewOfMemoryView(self):
+        b = bytearray(xrange(5))
+        m = memoryview(memoryview(b)[1:4])
+        self.assertEqual(m.tobytes(), b'\x01\x02\x03')
+        m[0] = b'\x0b'
+        self.assertEqual(b, bytearray([0, 11, 2, 3, 4]))
+
+    def testSliceEquality(self):
+        m = memoryview(b'abcdef')
+        self.assertTrue(m[1:3] == b'bc')
+        self.assertTrue(m[1:3] == memoryview(b'xbcx')[1:3])
+        self.assertFalse(m[1:3] != memoryview(b'bc'))
+        self.assertTrue(m[1:3] != b'bcd')
+
+    def testZlibBuffer(self):
+        import zlib
+        data = b'spam and eggs' * 100
+        b = buffer(b'xx' + data + b'yy', 2, len(data))
+        self.assertEqual(zlib.decompress(zlib.compress(b)), data)
+        self.assertEqual(zlib.decompress(buffer(zlib.compress(data))), data)
+        self.assertEqual(zlib.crc32(b), zlib.crc32(data))
+        self.assertEqual(zlib.adler32(b), zlib.adler32(data))
+        self.assertEqual(zlib.crc32(buffer(data, 3, 5)), zlib.crc32(data[3:8]))
+
+        c = zlib.compressobj()
+        compressed = c.compress(b) + c.flush()
+        d = zlib.decompressobj()
+        self.assertEqual(d.decompress(buffer(compressed + b'tail', 0, len(compressed))), data)
+        self.assertEqual(d.unused_data, b'')
+
 if __name__ == '__main__':
     from test import test_support
     test_support.run_unittest(__name__)
@@ -2287,6 +2287,40 @@ class NumberTest(IronPythonTestCase):
         self.assertEqual(int(' 0', 0), 0)
         self.assertEqual(int('0', 0), 0)
     
+    def test_specialized_arithmetic(self):
+        # functions get compiled after running in the interpreter for a while, with the int
+        # and float operations they have seen inlined.  Other operands must still work.
+        def ints(a, b):
+            return a + b, a - b, a * b, a < b, a <= b, a > b, a >= b, a == b, a != b
+        def floats(a, b):
+            return a + b, a - b, a * b
+        def add(a, b):
+            return a + b
+        def check(a, b):
+            self.assertEqual(ints(a, b), (a + b, a - b, a * b, a < b, a <= b, a > b, a >= b, a == b, a != b))
+
+        for i in xrange(2000):
+            check(i, 1000)
+            self.assertEqual(floats(i * 0.5, 2.0), (i * 0.5 + 2.0, i * 0.5 - 2.0, i * 1.0))
+            self.assertEqual(add(i, i), i * 2)
+
+        big = sys.maxint
+        self.assertEqual(ints(big, 1)[0], big + 1)
+        self.assertEqual(type(ints(big, 1)[0]), long)
+        self.assertEqual(ints(-big - 1, 1)[1], -big - 2)
+        self.assertEqual(ints(big, big)[2], big * big)
+        self.assertEqual(ints(big, -big)[2], -big * big)
+        self.assertEqual(type(ints(3, 4)[0]), int)
+        check(2.5, 1)
+        check(1L, 2)
+        check(True, 2)
+        check(myfloat(1.5), 2)
+        self.assertEqual(floats(1, 2), (3, -1, 2))
+        self.assertEqual(floats(1e308, 10.0)[2], float('inf'))
+        self.assertEqual(add('a', 'b'), 'ab')
+        self.assertEqual(add([1], [2]), [1, 2])
+        self.assertRaises(TypeError, add, 1, 'b')
+
 if __name__ == '__main__':
     from test import test_support
     test_support.run_unittest(__name__)
\ No newline at end of file
@@ -0,0 +1,120 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+Tests for the statistical profiler exposed as clr.StartSamplingProfiler.
+'''
+
+import os
+import threading
+import time
+import unittest
+
+from iptest import IronPythonTestCase, skipUnlessIronPython
+
+def busy(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        spin()
+
+def spin():
+    x = 0
+    for i in xrange(1000):
+        x += i
+    return x
+
+@skipUnlessIronPython()
+class SamplingProfilerTest(IronPythonTestCase):
+
+    def setUp(self):
+        super(SamplingProfilerTest, self).setUp()
+        import clr
+        clr.ClearSamplingProfilerData()
+
+    def tearDown(self):
+        import clr
+        clr.StopSamplingProfiler()
+        super(SamplingProfilerTest, self).tearDown()
+
+    def test_folded(self):
+        import clr
+        clr.StartSamplingProfiler(1)
+        busy(0.3)
+        clr.StopSamplingProfiler()
+
+        lines = clr.GetSamplingProfilerData().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(int(count) > 0)
+        self.assertTrue(any('(busy);' in line for line in lines))
+
+    def test_pstats(self):
+        import clr, pstats
+        clr.StartSamplingProfiler(1)
+        busy(0.3)
+        clr.StopSamplingProfiler()
+
+        stats = clr.GetSamplingProfilerData('pstats')
+        funcs = dict((func[2], value) for func, value in stats.items())
+        cc, nc, tt, ct, callers = funcs['busy']
+        self.assertTrue(nc > 0)
+        self.assertTrue(ct >= tt)
+
+        filename = os.path.join(self.temporary_dir, 'sampling.prof')
+        clr.DumpSamplingProfilerData(filename, 'pstats')
+        try:
+            s = pstats.Stats(filename)
+            self.assertTrue(any(func[2] == 'spin' for func in s.stats))
+        finally:
+            os.remove(filename)
+
+    def test_running_thread(self):
+        import clr
+        started = threading.Event()
+        stop = threading.Event()
+        def worker_busy():
+            started.set()
+            while not stop.isSet():
+                spin()
+
+        # the worker runs Python code before the profiler is started
+        t = threading.Thread(target=worker_busy)
+        t.start()
+        try:
+            started.wait()
+            clr.StartSamplingProfiler(1)
+            busy(0.3)
+            clr.StopSamplingProfiler()
+        finally:
+            stop.set()
+            t.join()
+
+        lines = clr.GetSamplingProfilerData().splitlines()
+        self.assertTrue(any('(worker_busy);' in line for line in lines))
+        self.assertTrue(any('(busy);' in line for line in lines))
+
+    def test_start_stop(self):
+        import clr
+        clr.StartSamplingProfiler()
+        self.assertRaises(RuntimeError, clr.StartSamplingProfiler)
+        clr.StopSamplingProfiler()
+        clr.StopSamplingProfiler()
+        self.assertRaises(ValueError, clr.StartSamplingProfiler, 0)
+        self.assertRaises(ValueError, clr.GetSamplingProfilerData, 'xml')
+
+if __name__ == '__main__':
+    from test import test_support
+    test_support.run_unittest(__name__)
@@ -0,0 +1,80 @@
+#####################################################################################
+#
+#  Copyright (c) Microsoft Corporation. All rights reserved.
+#
+# This source code is subject to terms and conditions of the Apache License, Version 2.0. A
+# copy of the license can be found in the License.html file at the root of this distribution. If
+# you cannot locate the  Apache License, Version 2.0, please send an email to
+# ironpy@microsoft.com. By using this source code in any fashion, you are agreeing to be bound
+# by the terms of the Apache License, Version 2.0.
+#
+# You must not remove this notice, or any other, from this software.
+#
+#
+#####################################################################################
+
+'''
+Tests for the -X:StartupImage option.
+'''
+
+import os
+import shutil
+import sys
+import unittest
+
+from iptest import IronPythonTestCase, is_netstandard, skipUnlessIronPython
+
+@unittest.skipIf(is_netstandard, 'startup images cannot be saved on netstandard')
+@skipUnlessIronPython()
+class StartupImageTest(IronPythonTestCase):
+
+    def setUp(self):
+        super(StartupImageTest, self).setUp()
+        self.work_dir = os.path.join(self.temporary_dir, "startup_image")
+        if os.path.exists(self.work_dir):
+            shutil.rmtree(self.work_dir)
+        self.ensure_directory_present(self.work_dir)
+
+        self.image = os.path.join(self.work_dir, "startup.dll")
+        self.log_file = os.path.join(self.work_dir, "result.log")
+        self.main_file = os.path.join(self.work_dir, "main.py")
+        self.write_to_file(self.main_file, '''
+import sys
+open(%r, "w").write(repr(sorted(k for k, v in sys.modules.items() if v is not None)))
+''' % self.log_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, True)
+
+    def run_main(self):
+        self.assertEqual(self.launch(sys.executable, "-X:StartupImage", self.image, self.main_file), 0)
+        with open(self.log_file) as f:
+            return f.read()
+
+    def test_create_and_use(self):
+        first = self.run_main()
+        self.assertTrue(os.path.exists(self.image + ".manifest"))
+        with open(self.image + ".manifest") as f:
+            manifest = f.read()
+        self.assertTrue("\nbuiltin\t" in manifest)
+        self.assertTrue("\nmodule\tsite\t" in manifest)
+
+        # the second launch loads site from the image and sees the same modules
+        self.assertEqual(self.run_main(), first)
+        with open(self.image + ".manifest") as f:
+            self.assertEqual(f.read(), manifest)
+
+    def test_corrupt_image(self):
+        first = self.run_main()
+        with open(self.image, "wb") as f:
+            f.write("not an assembly")
+
+        # the bad image is ignored and deleted, the next launch writes a new one
+        self.assertEqual(self.run_main(), first)
+        self.assertFalse(os.path.exists(self.image + ".manifest"))
+        self.assertEqual(self.run_main(), first)
+        self.assertTrue(os.path.exists(self.image + ".manifest"))
+
+if __name__ == '__main__':
+    from test import test_support
+    test_support.run_unittest(__name__)
@@ -17,6 +17,8 @@ import array
 import struct
 import unittest
 
+from iptest import is_cli
+
 class StructTest(unittest.TestCase):
 
     def test_pack(self):
@@ -69,6 +71,66 @@ class StructTest(unittest.TestCase):
         struct.pack_into(b'>H', result, 0, 0xABCD )
         self.assertSequenceEqual(result, array.array('b', b"\xAB\xCD"))
 
+    def test_unpack_from_offset(self):
+        s = struct.Struct('<hI')
+        data = '\xff' + s.pack(-2, 3) + s.pack(4, 0xfffffffe)
+        self.assertEqual(s.unpack_from(data, 1), (-2, 3))
+        self.assertEqual(s.unpack_from(data, -6), (4, 0xfffffffe))
+        self.assertEqual(s.unpack_from(buffer(data), 7), (4, 0xfffffffe))
+        self.assertEqual(s.unpack_from(array.array('c', data), 7), (4, 0xfffffffe))
+        self.assertEqual(s.unpack_from(bytearray(data), 1), (-2, 3))
+        self.assertRaises(struct.error, s.unpack_from, data, 8)
+        self.assertRaises(struct.error, s.unpack_from, data, -14)
+
+    def test_pack_into_buffers(self):
+        buf = bytearray(8)
+        struct.pack_into('>hxb', buf, 2, 0x102, -1)
+        self.assertEqual(buf, bytearray('\x00\x00\x01\x02\x00\xff\x00\x00'))
+        struct.pack_into('<H', buf, -2, 0x304)
+        self.assertEqual(buf[-2:], bytearray('\x04\x03'))
+        self.assertRaises(struct.error, struct.pack_into, '<I', buf, 6, 1)
+
+        a = array.array('c', 'xxxxxx')
+        struct.pack_into('2sc', a, 1, 'ab', 'c')
+        self.assertEqual(a.tostring(), 'xabcxx')
+
+    def test_roundtrip(self):
+        for fmt, values in [
+                ('<?bBhHiIqQfd', (True, -1, 255, -2, 65535, -3, 0xffffffff, -2**63, 2**64 - 1, 0.5, -1.25)),
+                ('>?bBhHiIqQfd', (False, 1, 2, 3, 4, 5, 6, 7, 8, 1.5, 2.5)),
+                ('bhiqd', (1, -2, 3, -4, 5.0)),
+                ('3s5p2c', ('abc', 'de', 'f', 'g')),
+                ('<' + 'H' * 500, tuple(range(500))),
+            ]:
+            data = struct.pack(fmt, *values)
+            self.assertEqual(len(data), struct.calcsize(fmt))
+            self.assertEqual(struct.unpack(fmt, data), values)
+        self.assertEqual(struct.pack('bi', 1, 2), '\x01\x00\x00\x00\x02\x00\x00\x00')
+        self.assertEqual(struct.pack('3?', 1, 0, 2), '\x01\x00\x01')
+        self.assertEqual(struct.unpack('3s5p', 'abc\x09defg'), ('abc', 'defg'))
+
+    def test_reinit(self):
+        s = struct.Struct('<H')
+        s.__init__('<I')
+        self.assertEqual(s.size, 4)
+        self.assertEqual(struct.Struct('<H').size, 2)
+        self.assertEqual(struct.calcsize('<H'), 2)
+
+    @unittest.skipUnless(is_cli, 'iter_unpack is new in Python 3.4')
+    def test_iter_unpack(self):
+        s = struct.Struct('<hb')
+        data = ''.join(s.pack(i, -i) for i in range(100))
+        it = s.iter_unpack(data)
+        self.assertEqual(it.__length_hint__(), 100)
+        self.assertEqual(next(it), (0, 0))
+        self.assertEqual(it.__length_hint__(), 99)
+        self.assertEqual(list(it), [(i, -i) for i in range(1, 100)])
+        self.assertEqual(list(struct.iter_unpack('<hb', bytearray(data[:6]))), [(0, 0), (1, -1)])
+        self.assertEqual(list(s.iter_unpack(array.array('c', data[3:9]))), [(1, -1), (2, -2)])
+        self.assertEqual(list(s.iter_unpack('')), [])
+        self.assertRaises(struct.error, s.iter_unpack, data[:-1])
+        self.assertRaises(struct.error, struct.iter_unpack, 'xx', '')
+
 if __name__ == '__main__':
     from test import test_support
     test_support.run_unittest(__name__)